@@ -0,0 +1,52 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+var fs = require('fs');
+var path = require('path');
+
+// The machine-readable results, read by `benchmark/run.py --frontend`.
+var OUTPUT = path.join(__dirname, 'build', 'frontend.json');
+
+
+/**
+ * A reporter writing the results logged by the benchmark bundle.
+ */
+function BenchmarkReporter(baseReporterDecorator) {
+  baseReporterDecorator(this);
+  var results = [];
+
+  this.onBrowserLog = function(browser, log, type) {
+    var match = /BENCHMARK (\{.*\})/.exec(log);
+    if (match) {
+      var data = JSON.parse(match[1]);
+      data.results.forEach(function(result) {
+        result.browser = browser.name;
+      });
+      results = results.concat(data.results);
+    }
+  };
+
+  this.onRunComplete = function() {
+    fs.writeFileSync(OUTPUT, JSON.stringify({ results: results }, null, 2));
+    this.write('Benchmark results written to ' + OUTPUT + '\n');
+  };
+}
+
+BenchmarkReporter.$inject = ['baseReporterDecorator'];
+
+
+module.exports = function (config) {
+  config.set({
+    basePath: '..',
+    frameworks: ['mocha'],
+    reporters: ['mocha', 'benchmark'],
+    plugins: ['karma-*', { 'reporter:benchmark': ['type', BenchmarkReporter] }],
+    files: ['benchmark/build/bundle.js'],
+    browsers: ['Firefox'],
+    browserNoActivityTimeout: 600000,
+    port: 9877,
+    colors: true,
+    singleRun: true,
+    logLevel: config.LOG_INFO
+  });
+};
@@ -0,0 +1,236 @@
+"""Run the Lab benchmarks and compare them with a stored baseline.
+
+The server benchmarks time `LabHandler` serving the page to concurrent
+clients, with its startup data collected from the kernelspecs and a
+temporary directory of notebooks, and record the size of the built
+bundles.  The frontend
+benchmarks run in a browser with `npm run bench:frontend`, headless on
+Linux under `xvfb-run`, and are merged in with `--frontend`.
+
+    python benchmark/run.py --frontend benchmark/build/frontend.json
+    python benchmark/run.py --save-baseline
+
+Every result is lower-is-better.  The exit status is 1 if a result is
+worse than the baseline by more than `--threshold`.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from jinja2 import Environment
+from tornado import gen, web
+from tornado.httpclient import AsyncHTTPClient
+from tornado.httpserver import HTTPServer
+from tornado.ioloop import IOLoop
+from tornado.testing import bind_unused_port
+
+from jupyter_client.kernelspec import KernelSpecManager
+from notebook.services.contents.filemanager import FileContentsManager
+from notebook.services.kernels.kernelmanager import MappingKernelManager
+from notebook.services.sessions.sessionmanager import SessionManager
+
+import jupyterlab
+from jupyterlab.assets import ENCODINGS
+
+
+DEFAULT_BASELINE = os.path.join(HERE, 'baseline.json')
+
+# The number of notebooks in the directory listed into the page.
+NOTEBOOKS = 50
+
+
+class BenchLabHandler(jupyterlab.LabHandler):
+    """The Lab handler with a fixed user, so no login is needed."""
+
+    def get_current_user(self):
+        return 'bench'
+
+
+def _result(name, value, unit, **extra):
+    result = dict(name=name, value=value, unit=unit)
+    result.update(extra)
+    return result
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def bundle_sizes():
+    """The size of the built scripts, and of their compressed siblings."""
+    jupyterlab.ASSETS.check()
+    results = []
+    total = 0
+    for name, asset in sorted(jupyterlab.ASSETS.assets.items()):
+        if not name.endswith('.js'):
+            continue
+        total += asset.size
+        results.append(_result('bundle_size/%s' % name, asset.size, 'bytes'))
+        for encoding, _ in ENCODINGS:
+            if encoding in asset.variants:
+                size = asset.variants[encoding][1]
+                results.append(_result('bundle_size/%s.%s' % (name, encoding),
+                                       size, 'bytes'))
+    if results:
+        results.append(_result('bundle_size/total', total, 'bytes'))
+    return results
+
+
+def managers(root_dir):
+    """The managers of a server on a directory, without running kernels."""
+    kernel_manager = MappingKernelManager(root_dir=root_dir)
+    contents_manager = FileContentsManager(root_dir=root_dir)
+    return dict(
+        kernel_spec_manager=KernelSpecManager(),
+        kernel_manager=kernel_manager,
+        contents_manager=contents_manager,
+        session_manager=SessionManager(kernel_manager=kernel_manager,
+                                       contents_manager=contents_manager),
+    )
+
+
+def make_notebooks(root_dir, count):
+    """Create empty notebooks for the page to list."""
+    contents_manager = FileContentsManager(root_dir=root_dir)
+    for i in range(count):
+        contents_manager.new(path='notebook-%03d.ipynb' % i)
+
+
+@gen.coroutine
+def serve_page(requests, concurrency):
+    """Time `LabHandler` serving the page to concurrent clients."""
+    root_dir = tempfile.mkdtemp(prefix='lab-bench-')
+    make_notebooks(root_dir, NOTEBOOKS)
+    settings = dict(
+        base_url='/',
+        ws_url='',
+        terminals_available=False,
+        mathjax_url='',
+        jinja2_env=Environment(loader=jupyterlab.FILE_LOADER, autoescape=True,
+                               extensions=['jinja2.ext.i18n']),
+    )
+    settings['jinja2_env'].install_null_translations()
+    settings.update(managers(root_dir))
+    app = web.Application([(jupyterlab.PREFIX, BenchLabHandler)], **settings)
+    sock, port = bind_unused_port()
+    server = HTTPServer(app)
+    server.add_sockets([sock])
+    url = 'http://127.0.0.1:%d%s' % (port, jupyterlab.PREFIX)
+    client = AsyncHTTPClient(force_instance=True, max_clients=concurrency)
+    results = []
+    try:
+        etag = None
+        for label, conditional in [('full', False), ('not_modified', True)]:
+            headers = {'If-None-Match': etag} if conditional else {}
+            latencies = []
+
+            @gen.coroutine
+            def fetch():
+                start = time.time()
+                response = yield client.fetch(url, headers=headers,
+                                              raise_error=False)
+                latencies.append(time.time() - start)
+                raise gen.Return(response)
+
+            # Render and cache the page before timing.
+            response = yield fetch()
+            if response.code != (304 if conditional else 200):
+                raise RuntimeError('Serving the page failed: %s' % response.code)
+            etag = etag or response.headers.get('Etag')
+            del latencies[:]
+
+            start = time.time()
+            yield [fetch() for i in range(requests)]
+            elapsed = time.time() - start
+            name = 'lab_page/%s' % label
+            results.append(_result(name + '/median', _percentile(latencies, 0.5) * 1000, 'ms'))
+            results.append(_result(name + '/p95', _percentile(latencies, 0.95) * 1000, 'ms'))
+            results.append(_result(name + '/total', elapsed * 1000, 'ms',
+                                   requests=requests, concurrency=concurrency))
+    finally:
+        client.close()
+        server.stop()
+        shutil.rmtree(root_dir, ignore_errors=True)
+    raise gen.Return(results)
+
+
+def compare(results, baseline, threshold):
+    """Print the results against a baseline, returning the regressions."""
+    previous = dict((result['name'], result) for result in baseline['results'])
+    regressions = []
+    width = max(len(result['name']) for result in results)
+    for result in results:
+        line = '%-*s %12.2f %s' % (width, result['name'], result['value'],
+                                   result['unit'])
+        old = previous.get(result['name'])
+        if old is not None and old['value'] > 0:
+            change = float(result['value']) / old['value'] - 1
+            line += '  %+7.1f%%' % (change * 100)
+            if change > threshold:
+                line += '  REGRESSION'
+                regressions.append(result['name'])
+        print(line)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--frontend',
+                        help='the frontend results written by karma')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='the stored results to compare with')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the baseline')
+    parser.add_argument('--output', help='write the results to a file')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='the allowed slowdown or growth, as a fraction')
+    parser.add_argument('--requests', type=int, default=500,
+                        help='the number of page requests to time')
+    parser.add_argument('--concurrency', type=int, default=20,
+                        help='the number of concurrent page requests')
+    args = parser.parse_args(argv)
+
+    results = bundle_sizes()
+    results.extend(IOLoop.current().run_sync(
+        lambda: serve_page(args.requests, args.concurrency)))
+    if args.frontend:
+        with open(args.frontend) as f:
+            results.extend(json.load(f)['results'])
+    report = dict(results=results, created=time.time())
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print('Saved the baseline to %s' % args.baseline)
+
+    baseline = dict(results=[])
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print('\n%d results regressed by more than %.0f%%' %
+              (len(regressions), args.threshold * 100))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
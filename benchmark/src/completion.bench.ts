@@ -0,0 +1,78 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  CompletionModel
+} from '../../lib/notebook/completion';
+
+import {
+  ICompletionRequest, ITextChange
+} from '../../lib/notebook/cells/editor';
+
+import {
+  IResult, benchmark, createRandom, randomWord
+} from './harness';
+
+
+/**
+ * The number of completion options.
+ *
+ * #### Notes
+ * This is below the size at which the model filters in a worker, so the
+ * filtering is timed synchronously.
+ */
+const COUNT = 5000;
+
+
+/**
+ * Time setting and filtering completion options.
+ */
+export
+function run(): IResult[] {
+  let random = createRandom();
+  let options: string[] = [];
+  for (let i = 0; i < COUNT; i++) {
+    options.push(randomWord(random, 6 + Math.floor(random() * 10)));
+  }
+  let model: CompletionModel;
+  let setup = () => {
+    model = new CompletionModel();
+    model.original = request('');
+    model.cursor = { start: 0, end: 0 };
+  };
+
+  return [
+    benchmark('completion/set_options', () => {
+      model.options = options;
+    }, { setup }),
+    benchmark('completion/filter_typing', () => {
+      // Type a query a character at a time, as a user would.
+      let query = 'get_val';
+      for (let i = 1; i <= query.length; i++) {
+        model.current = change(query.substring(0, i - 1), query.substring(0, i));
+      }
+    }, { setup: () => { setup(); model.options = options; } })
+  ];
+}
+
+
+/**
+ * Create a completion request for a line.
+ */
+function request(line: string): ICompletionRequest {
+  return {
+    currentValue: line, line: 0, ch: line.length,
+    chHeight: 0, chWidth: 0, coords: null
+  };
+}
+
+
+/**
+ * Create a text change of a line.
+ */
+function change(oldValue: string, newValue: string): ITextChange {
+  return {
+    oldValue, newValue, line: 0, ch: newValue.length,
+    chHeight: 0, chWidth: 0, coords: null
+  };
+}
@@ -0,0 +1,72 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IContentsModel
+} from 'jupyter-js-services';
+
+import {
+  FileBrowserModel
+} from '../../lib/filebrowser/model';
+
+import {
+  IResult, benchmark, createRandom, randomWord
+} from './harness';
+
+
+/**
+ * The number of items in the synthetic directory.
+ */
+const COUNT = 2000;
+
+
+/**
+ * Time sorting the items of a large directory.
+ *
+ * #### Notes
+ * The contents manager is a stub serving a synthetic directory.  The
+ * model falls back to it since the benchmark server has no paged listing
+ * api, so sorting happens in the model.
+ */
+export
+function run(): Promise<IResult[]> {
+  let random = createRandom();
+  let now = new Date('2016-01-01T00:00:00Z').getTime();
+  let content: IContentsModel[] = [];
+  for (let i = 0; i < COUNT; i++) {
+    let name = `${randomWord(random, 12)}.txt`;
+    let date = new Date(now - Math.floor(random() * 1e10)).toISOString();
+    content.push({
+      name, path: name, type: 'file', writable: true,
+      created: date, last_modified: date, mimetype: 'text/plain',
+      content: null, format: null
+    });
+  }
+  let contents: any = {
+    get: () => Promise.resolve({
+      name: '', path: '', type: 'directory', content: content.slice()
+    })
+  };
+  let sessions: any = { listRunning: () => Promise.resolve([]) };
+  let model = new FileBrowserModel(contents, sessions, {
+    default: '', kernelspecs: Object.create(null)
+  });
+
+  return new Promise<void>(resolve => {
+    model.refreshed.connect(() => { resolve(void 0); });
+  }).then(() => {
+    let results = [
+      benchmark('filebrowser/sort_last_modified', () => {
+        model.sortKey = 'last_modified';
+      }, { setup: () => { model.sortKey = 'name'; }, samples: 10 }),
+      benchmark('filebrowser/sort_name', () => {
+        model.sortKey = 'name';
+      }, { setup: () => { model.sortKey = 'last_modified'; }, samples: 10 }),
+      benchmark('filebrowser/reverse', () => {
+        model.sortAscending = !model.sortAscending;
+      }, { samples: 10 })
+    ];
+    model.dispose();
+    return results;
+  });
+}
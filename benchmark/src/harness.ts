@@ -0,0 +1,122 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * The result of a benchmark.
+ */
+export
+interface IResult {
+  /**
+   * The name of the benchmark.
+   */
+  name: string;
+
+  /**
+   * The median time of a run, in ms.
+   */
+  value: number;
+
+  /**
+   * The unit of the value.
+   */
+  unit: string;
+
+  /**
+   * The fastest time of a run, in ms.
+   */
+  min: number;
+
+  /**
+   * The number of timed runs.
+   */
+  samples: number;
+}
+
+
+/**
+ * The options for a benchmark.
+ */
+export
+interface IBenchmarkOptions {
+  /**
+   * A function called before each run, which is not timed.
+   */
+  setup?: () => void;
+
+  /**
+   * The number of timed runs.  The default is 20.
+   */
+  samples?: number;
+
+  /**
+   * The number of untimed runs first, to warm up the JIT.  The default
+   * is 3.
+   */
+  warmup?: number;
+}
+
+
+/**
+ * Time a synchronous function.
+ *
+ * @param name - The name of the benchmark.
+ *
+ * @param fn - The function to time.
+ *
+ * @param options - The options for the benchmark.
+ *
+ * @returns The median and fastest times of the runs.
+ */
+export
+function benchmark(name: string, fn: () => void, options: IBenchmarkOptions = {}): IResult {
+  let setup = options.setup || (() => { /* no setup */ });
+  let samples = options.samples || 20;
+  let warmup = options.warmup === void 0 ? 3 : options.warmup;
+  for (let i = 0; i < warmup; i++) {
+    setup();
+    fn();
+  }
+  let times: number[] = [];
+  for (let i = 0; i < samples; i++) {
+    setup();
+    let start = performance.now();
+    fn();
+    times.push(performance.now() - start);
+  }
+  times.sort((a, b) => a - b);
+  let mid = Math.floor(samples / 2);
+  let value = samples % 2 ? times[mid] : (times[mid - 1] + times[mid]) / 2;
+  return { name, value, unit: 'ms', min: times[0], samples };
+}
+
+
+/**
+ * Create a deterministic pseudo-random number generator.
+ *
+ * #### Notes
+ * The synthetic inputs must be the same on every run for the results to
+ * be comparable, so `Math.random` is not used.
+ */
+export
+function createRandom(seed = 1): () => number {
+  return () => {
+    // A Park-Miller generator.
+    seed = (seed * 16807) % 2147483647;
+    return (seed - 1) / 2147483646;
+  };
+}
+
+
+/**
+ * Create a random identifier-like word.
+ */
+export
+function randomWord(random: () => number, length: number): string {
+  let chars = 'abcdefghijklmnopqrstuvwxyz_';
+  let word = '';
+  for (let i = 0; i < length; i++) {
+    word += chars.charAt(Math.floor(random() * chars.length));
+  }
+  return word;
+}
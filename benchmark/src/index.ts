@@ -0,0 +1,49 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IResult
+} from './harness';
+
+import * as completion
+  from './completion.bench';
+
+import * as filebrowser
+  from './filebrowser.bench';
+
+import * as notebook
+  from './notebook.bench';
+
+import * as outputarea
+  from './outputarea.bench';
+
+
+/**
+ * The benchmark suites, run one after another.
+ */
+const SUITES: (() => IResult[] | Promise<IResult[]>)[] = [
+  outputarea.run,
+  filebrowser.run,
+  completion.run,
+  notebook.run
+];
+
+
+describe('benchmarks', () => {
+
+  it('should run the benchmark suites', function(): Promise<void> {
+    this.timeout(0);
+    let results: IResult[] = [];
+    let promise = Promise.resolve<void>(void 0);
+    for (let suite of SUITES) {
+      promise = promise.then(() => suite()).then(suiteResults => {
+        results = results.concat(suiteResults);
+      });
+    }
+    return promise.then(() => {
+      // The karma benchmark reporter picks the results out of the log.
+      console.log('BENCHMARK ' + JSON.stringify({ results }));
+    });
+  });
+
+});
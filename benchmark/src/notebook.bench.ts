@@ -0,0 +1,95 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  NotebookModel
+} from '../../lib/notebook/notebook/model';
+
+import {
+  nbformat
+} from '../../lib/notebook/notebook/nbformat';
+
+import {
+  IResult, benchmark, createRandom, randomWord
+} from './harness';
+
+
+/**
+ * The number of cells in the synthetic notebook.
+ */
+const COUNT = 1000;
+
+
+/**
+ * Time loading a large notebook into a model.
+ */
+export
+function run(): IResult[] {
+  let content = createNotebook();
+  let text = JSON.stringify(content);
+  let model: NotebookModel;
+  let setup = () => {
+    if (model) {
+      model.dispose();
+    }
+    model = new NotebookModel();
+  };
+
+  let results = [
+    benchmark('notebook/from_json', () => {
+      model.fromJSON(content);
+    }, { setup, samples: 10 }),
+    benchmark('notebook/from_string', () => {
+      model.fromString(text);
+    }, { setup, samples: 10 }),
+    benchmark('notebook/to_string', () => {
+      model.toString();
+    }, { samples: 10 })
+  ];
+  model.dispose();
+  return results;
+}
+
+
+/**
+ * Create a notebook of code and markdown cells with outputs.
+ */
+function createNotebook(): nbformat.INotebookContent {
+  let random = createRandom();
+  let cells: nbformat.ICell[] = [];
+  for (let i = 0; i < COUNT; i++) {
+    let lines: string[] = [];
+    let count = 1 + Math.floor(random() * 20);
+    for (let j = 0; j < count; j++) {
+      lines.push(`${randomWord(random, 8)} = ${randomWord(random, 16)}(${j})\n`);
+    }
+    if (i % 4 === 0) {
+      cells.push({
+        cell_type: 'markdown',
+        source: `# ${randomWord(random, 10)}\n\nSome *text* with $x^${i}$.`,
+        metadata: {}
+      } as nbformat.IMarkdownCell);
+      continue;
+    }
+    cells.push({
+      cell_type: 'code',
+      source: lines.join(''),
+      metadata: {},
+      execution_count: i,
+      outputs: [{
+        output_type: 'stream',
+        name: 'stdout',
+        text: lines.join('')
+      } as nbformat.IStream]
+    } as nbformat.ICodeCell);
+  }
+  return {
+    cells,
+    metadata: {
+      kernelspec: { name: 'python3', display_name: 'Python 3' },
+      language_info: { name: 'python' }
+    },
+    nbformat: 4,
+    nbformat_minor: 0
+  } as nbformat.INotebookContent;
+}
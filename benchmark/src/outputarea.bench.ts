@@ -0,0 +1,54 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  ObservableOutputs
+} from '../../lib/notebook/output-area';
+
+import {
+  nbformat
+} from '../../lib/notebook/notebook/nbformat';
+
+import {
+  IResult, benchmark
+} from './harness';
+
+
+/**
+ * The number of outputs added in a run.
+ */
+const COUNT = 5000;
+
+
+/**
+ * Time adding outputs to an output area model.
+ */
+export
+function run(): IResult[] {
+  let outputs: ObservableOutputs;
+  let setup = () => { outputs = new ObservableOutputs(); };
+
+  let stream = {
+    output_type: 'stream',
+    name: 'stdout',
+    text: 'Epoch 1/10 - loss: 0.6931 - accuracy: 0.5000\n'
+  } as nbformat.IStream;
+  let display = {
+    output_type: 'display_data',
+    data: { 'text/plain': '<matplotlib.figure.Figure>' },
+    metadata: {}
+  } as nbformat.IDisplayData;
+
+  return [
+    benchmark('output_area/add_stream', () => {
+      for (let i = 0; i < COUNT; i++) {
+        outputs.add(stream);
+      }
+    }, { setup }),
+    benchmark('output_area/add_display_data', () => {
+      for (let i = 0; i < COUNT; i++) {
+        outputs.add(display);
+      }
+    }, { setup })
+  ];
+}
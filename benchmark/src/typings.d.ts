@@ -0,0 +1,4 @@
+/// <reference path="../../typings/mocha/mocha.d.ts"/>
+/// <reference path="../../typings/require/require.d.ts"/>
+/// <reference path="../../typings/es6-promise/es6-promise.d.ts"/>
+/// <reference path="../../typings/codemirror/codemirror.d.ts"/>
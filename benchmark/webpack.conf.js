@@ -0,0 +1,15 @@
+module.exports = {
+  entry: './benchmark/build/index.js',
+  output: {
+    path: __dirname + "/build",
+    filename: "bundle.js",
+    publicPath: "./build/"
+  },
+  bail: true,
+  module: {
+    loaders: [
+      { test: /\.css$/, loader: 'style-loader!css-loader' },
+      { test: /\.json$/, loader: 'json-loader' },
+    ],
+  }
+}
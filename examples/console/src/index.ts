@@ -9,6 +9,10 @@ import {
   startNewSession, INotebookSession
 } from 'jupyter-js-services';
 
+import {
+  getConfigOption
+} from 'jupyter-js-utils';
+
 import {
   RenderMime, IRenderer, MimeMap
 } from 'jupyterlab/lib/rendermime';
@@ -45,6 +49,7 @@ let TITLE = 'Console';
 function main(): void {
   startNewSession({
     notebookPath: 'fake_path',
+    ajaxSettings: getConfigOption('ajaxSettings')
   }).then(session => {
     startApp(session);
   });
@@ -6,6 +6,10 @@ import {
   IKernelSpecIds
 } from 'jupyter-js-services';
 
+import {
+  getBaseUrl, getConfigOption
+} from 'jupyter-js-utils';
+
 import {
   FileBrowserWidget, FileBrowserModel
 } from 'jupyterlab/lib/filebrowser';
@@ -48,7 +52,8 @@ import 'jupyterlab/lib/theme.css';
 
 
 function main(): void {
-  let sessionsManager = new NotebookSessionManager();
+  let ajaxSettings = getConfigOption('ajaxSettings');
+  let sessionsManager = new NotebookSessionManager({ ajaxSettings });
   sessionsManager.getSpecs().then(specs => {
     createApp(sessionsManager, specs);
   });
@@ -56,7 +61,8 @@ function main(): void {
 
 
 function createApp(sessionsManager: NotebookSessionManager, specs: IKernelSpecIds): void {
-  let contentsManager = new ContentsManager();
+  let ajaxSettings = getConfigOption('ajaxSettings');
+  let contentsManager = new ContentsManager(getBaseUrl(), ajaxSettings);
   let widgets: DocumentWidget[] = [];
   let activeWidget: DocumentWidget;
 
@@ -0,0 +1,326 @@
+"""
+Start notebook servers and an example's frontend server in one event loop.
+
+The notebook servers run as subprocesses on free ports, started
+concurrently, each with a random token.  A server is ready once its HTTP
+api answers requests made with the token, and its log is streamed as it
+is written.  Notebook servers before 4.3 have no tokens, and are started
+without one.  The frontend is a tornado application served from the same
+asyncio loop, and everything is shut down together.
+
+This needs Python 3.5 or later.  Run it directly to start servers for
+integration tests:
+
+    python examples/launcher.py --servers 3
+
+Other arguments are passed on to the notebook servers.
+
+Copyright (c) Jupyter Development Team.
+Distributed under the terms of the Modified BSD License.
+"""
+import argparse
+import asyncio
+import binascii
+import json
+import os
+import signal
+import socket
+import sys
+from urllib.parse import urlencode
+
+import tornado
+import tornado.web
+from notebook import version_info as notebook_version_info
+from tornado.httpclient import AsyncHTTPClient, HTTPError
+from tornado.httpserver import HTTPServer
+from tornado.platform.asyncio import AsyncIOMainLoop, to_asyncio_future
+
+# The seconds between readiness probes, and before a server is killed
+# when it does not stop.
+PROBE_INTERVAL = 0.1
+STOP_TIMEOUT = 5
+
+# A server may lose its port to another process between picking the port
+# and binding it, in which case it is started again on another port.
+START_ATTEMPTS = 3
+
+# Token authentication came with notebook 4.3.  Older servers without a
+# password take every request from localhost.
+TOKENS = notebook_version_info >= (4, 3)
+
+
+def free_port():
+    """Find a free port on localhost."""
+    sock = socket.socket()
+    try:
+        sock.bind(('localhost', 0))
+        return sock.getsockname()[1]
+    finally:
+        sock.close()
+
+
+class ServerError(Exception):
+    """A notebook server failed to start."""
+
+
+def new_token():
+    """Create a random token for a notebook server."""
+    return binascii.hexlify(os.urandom(24)).decode('ascii')
+
+
+class NotebookServer(object):
+    """A notebook server running in a subprocess.
+
+    The server only listens on localhost, takes requests made with its
+    token and allows the examples' origin.  The token is `None` if the
+    notebook does not have tokens.
+    """
+
+    def __init__(self, name, origin=None, args=()):
+        self.name = name
+        self.origin = origin
+        self.args = list(args)
+        self.token = new_token() if TOKENS else None
+        self.port = None
+        self.process = None
+        self._log_task = None
+
+    @property
+    def url(self):
+        return 'http://localhost:%d/' % self.port
+
+    @property
+    def ws_url(self):
+        return 'ws://localhost:%d/' % self.port
+
+    @property
+    def cookie_name(self):
+        """The name of the login cookie of the server."""
+        return 'username-localhost-%d' % self.port
+
+    @property
+    def headers(self):
+        """The headers authenticating a request to the server."""
+        if self.token is None:
+            return {}
+        return {'Authorization': 'token %s' % self.token}
+
+    def login_url(self, next_url):
+        """The url logging a browser in with the token, then going on."""
+        query = urlencode({'token': self.token, 'next': next_url})
+        return '%slogin?%s' % (self.url, query)
+
+    def page_config(self):
+        """The page config of a frontend using the server.
+
+        Api requests are made with the token, and websockets are opened
+        with the login cookie, since they cannot carry a header.
+        """
+        config = {'baseUrl': self.url, 'wsUrl': self.ws_url}
+        if self.token is not None:
+            config['token'] = self.token
+            config['ajaxSettings'] = {'requestHeaders': self.headers}
+        return config
+
+    async def start(self, timeout=60):
+        """Start the server, and wait until it answers requests."""
+        for attempt in range(START_ATTEMPTS):
+            self.port = free_port()
+            command = [sys.executable, '-m', 'notebook', '--no-browser',
+                       '--ip=localhost', '--port=%d' % self.port,
+                       '--port-retries=0']
+            if self.token is not None:
+                command.append('--NotebookApp.token=%s' % self.token)
+            if self.origin:
+                command.append('--NotebookApp.allow_origin=%s' % self.origin)
+            self.process = await asyncio.create_subprocess_exec(
+                *(command + self.args), stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT)
+            self._log_task = asyncio.ensure_future(self._stream_log())
+            try:
+                await asyncio.wait_for(self._wait_ready(), timeout)
+                return
+            except ServerError:
+                await self._log_task
+                if attempt == START_ATTEMPTS - 1:
+                    raise
+            except asyncio.TimeoutError:
+                await self.stop()
+                raise ServerError('%s did not start in %ss' % (self.name, timeout))
+
+    async def stop(self):
+        """Stop the server, killing it if it does not exit in time."""
+        process = self.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), STOP_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+        if self._log_task is not None:
+            await self._log_task
+
+    async def _wait_ready(self):
+        client = AsyncHTTPClient()
+        # The kernels api is in every notebook version, unlike api/status.
+        url = self.url + 'api/kernels'
+        while True:
+            if self.process.returncode is not None:
+                raise ServerError('%s exited with status %s' %
+                                  (self.name, self.process.returncode))
+            try:
+                await to_asyncio_future(client.fetch(
+                    url, headers=self.headers, request_timeout=5))
+                return
+            except (HTTPError, OSError):
+                await asyncio.sleep(PROBE_INTERVAL)
+
+    async def _stream_log(self):
+        prefix = '[%s] ' % self.name
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            print(prefix + line.decode('utf-8', 'replace').rstrip())
+        await self.process.wait()
+
+
+class PageHandler(tornado.web.RequestHandler):
+    """The `index.html` page of an example using a notebook server.
+
+    A browser without the login cookie of the server is sent to log in
+    with the token first, and comes back to the page.  A server without a
+    token needs no login.
+    """
+
+    def initialize(self, server):
+        self.server = server
+
+    def get(self):
+        server = self.server
+        if server.token is not None and not self.get_cookie(server.cookie_name):
+            self.redirect(server.login_url(self.request.full_url()))
+            return
+        config = json.dumps(server.page_config()).replace('</', '<\\/')
+        self.render('index.html', static=self.static_url, page_config=config)
+
+
+class Launcher(object):
+    """Notebook servers and a frontend server sharing an event loop."""
+
+    def __init__(self, origin=None, server_args=()):
+        self.origin = origin
+        self.server_args = server_args
+        self.servers = []
+        self._http_server = None
+
+    async def start_servers(self, count=1, timeout=60):
+        """Start notebook servers concurrently, returning them once ready."""
+        first = len(self.servers)
+        servers = [NotebookServer('notebook-%d' % (first + i), self.origin,
+                                  self.server_args)
+                   for i in range(count)]
+        self.servers.extend(servers)
+        results = await asyncio.gather(
+            *[server.start(timeout) for server in servers],
+            return_exceptions=True)
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            await asyncio.gather(*[server.stop() for server in servers])
+            raise errors[0]
+        return servers
+
+    def serve_frontend(self, handlers, port, **settings):
+        """Serve a tornado application on localhost."""
+        app = tornado.web.Application(handlers, **settings)
+        self._http_server = HTTPServer(app)
+        self._http_server.listen(port, 'localhost')
+
+    async def stop(self):
+        """Stop the frontend and all of the notebook servers."""
+        if self._http_server is not None:
+            self._http_server.stop()
+            self._http_server = None
+        await asyncio.gather(*[server.stop() for server in self.servers])
+
+
+def install_loop():
+    """Use the asyncio loop for tornado, which is the default since 5.0."""
+    if tornado.version_info < (5,):
+        AsyncIOMainLoop().install()
+    return asyncio.get_event_loop()
+
+
+def run(make_handlers, port, servers=1, server_args=(), **settings):
+    """Run an example until interrupted.
+
+    `make_handlers` is called with the started notebook servers and returns
+    the handlers of the frontend, which is served on `port` with the
+    tornado application `settings`.
+    """
+    launcher = Launcher(origin='http://localhost:%s' % port,
+                        server_args=server_args)
+
+    async def start():
+        started = await launcher.start_servers(servers)
+        launcher.serve_frontend(make_handlers(started), port, **settings)
+        print('Browse to http://localhost:%s' % port)
+
+    run_until_stopped(launcher, start)
+
+
+def run_until_stopped(launcher, start):
+    """Run `start()`, then wait for SIGINT or SIGTERM and stop everything."""
+    loop = install_loop()
+    stopping = asyncio.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stopping.set)
+        except NotImplementedError:
+            # Windows event loops do not support signal handlers, so wait
+            # for a KeyboardInterrupt instead.
+            pass
+
+    async def main():
+        try:
+            await start()
+            await stopping.wait()
+            print(' Shutting down')
+        finally:
+            await launcher.stop()
+
+    task = asyncio.ensure_future(main())
+    try:
+        loop.run_until_complete(task)
+    except KeyboardInterrupt:
+        print(' Shutting down on SIGINT')
+        stopping.set()
+        loop.run_until_complete(task)
+    finally:
+        loop.close()
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description='Start notebook servers until interrupted.')
+    parser.add_argument('--servers', type=int, default=1,
+                        help='the number of servers to start')
+    parser.add_argument('--origin', help='an origin the servers allow')
+    args, server_args = parser.parse_known_args(argv[1:])
+    launcher = Launcher(origin=args.origin, server_args=server_args)
+
+    async def start():
+        for server in await launcher.start_servers(args.servers):
+            if server.token is None:
+                print('%s is running at %s' % (server.name, server.url))
+            else:
+                print('%s is running at %s with token %s' %
+                      (server.name, server.url, server.token))
+
+    run_until_stopped(launcher, start)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
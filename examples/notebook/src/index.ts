@@ -10,6 +10,10 @@ import {
   ContentsManager, IKernelSpecIds, NotebookSessionManager
 } from 'jupyter-js-services';
 
+import {
+  getBaseUrl, getConfigOption
+} from 'jupyter-js-utils';
+
 import {
   DocumentWidget, DocumentManager, DocumentRegistry, selectKernelForContext
 } from 'jupyterlab/lib/docmanager';
@@ -53,7 +57,8 @@ let NOTEBOOK = 'test.ipynb';
 
 
 function main(): void {
-  let sessionsManager = new NotebookSessionManager();
+  let ajaxSettings = getConfigOption('ajaxSettings');
+  let sessionsManager = new NotebookSessionManager({ ajaxSettings });
   sessionsManager.getSpecs().then(specs => {
     createApp(sessionsManager, specs);
   });
@@ -95,12 +100,13 @@ function createApp(sessionsManager: NotebookSessionManager, specs: IKernelSpecId
     }
   };
 
-  let contentsManager = new ContentsManager();
+  let ajaxSettings = getConfigOption('ajaxSettings');
+  let contentsManager = new ContentsManager(getBaseUrl(), ajaxSettings);
   let docRegistry = new DocumentRegistry();
   let docManager = new DocumentManager(
     docRegistry, contentsManager, sessionsManager, specs, opener
   );
-  let mFactory = new NotebookModelFactory();
+  let mFactory = new NotebookModelFactory(ajaxSettings);
   let clipboard = new MimeData();
   let wFactory = new NotebookWidgetFactory(rendermime, clipboard);
   docRegistry.registerModelFactory(mFactory);
@@ -4,40 +4,88 @@
 # Distributed under the terms of the Modified BSD License.
 
 import os
-from tornado import web
-from notebook.base.handlers import IPythonHandler, FileFindHandler
+import email.utils
+from tornado import gen, web
+from notebook.base.handlers import IPythonHandler
 from jinja2 import FileSystemLoader
+from .assets import AssetManifest, AssetHandler
+from .bootstrap import BOOTSTRAP
+from .pagecache import TemplateCache, PageCache
+from . import lines, listing, metrics, mux, patch, sessions, terminal, upload, watch
 
 
 FILE_LOADER = FileSystemLoader(os.path.dirname(__file__))
 PREFIX = '/lab'
+BUILD_PATH = os.path.join(os.path.dirname(__file__), 'build')
+ASSETS = AssetManifest(BUILD_PATH)
+TEMPLATES = TemplateCache(FILE_LOADER)
+PAGES = PageCache()
 
 class LabHandler(IPythonHandler):
     """Render the Jupyter Lab View."""   
 
     @web.authenticated
+    @gen.coroutine
     def get(self):
-        self.write(self.render_template('lab.html',
+        ASSETS.check()
+        template = self.get_template('lab.html')
+        terminals_available = self.settings['terminals_available']
+        metrics_url = 'lab/api/metrics' if self.settings.get('lab_metrics') else ''
+        mux_url = 'lab/api/mux' if self.settings.get('lab_mux') else ''
+        bootstrap = yield BOOTSTRAP.get(self)
+        # Everything else in the page is static for the life of the server.
+        key = (template, ASSETS.version, self.base_url, self.ws_url,
+               repr(self.current_user), terminals_available, metrics_url,
+               mux_url, bootstrap.version)
+        page = PAGES.get(key, lambda: self.render_template('lab.html',
             static_prefix=PREFIX,
+            asset_url=ASSETS.url,
+            preload_scripts=ASSETS.preload(),
+            prefetch_scripts=ASSETS.prefetch(),
             page_title='Pre-Alpha Jupyter Lab Demo',
-            terminals_available=self.settings['terminals_available'],
+            terminals_available=terminals_available,
+            metrics_url=metrics_url,
+            mux_url=mux_url,
+            bootstrap_data=bootstrap.json,
             mathjax_url=self.mathjax_url,
             mathjax_config='TeX-AMS_HTML-full,Safe',
             #mathjax_config=self.mathjax_config # for the next release of the notebook
         ))
 
+        self.set_header('Etag', page.etag)
+        self.set_header('Last-Modified',
+                        email.utils.formatdate(page.last_modified, usegmt=True))
+        self.set_header('Cache-Control', 'no-cache')
+        if self.check_etag_header() or self._not_modified_since(page):
+            self.set_status(304)
+            return
+        self.write(page.body)
+
+    def _not_modified_since(self, page):
+        """Check `If-Modified-Since`, which only applies without an etag."""
+        if 'If-None-Match' in self.request.headers:
+            return False
+        since = self.request.headers.get('If-Modified-Since')
+        if not since:
+            return False
+        parsed = email.utils.parsedate_tz(since)
+        if parsed is None:
+            return False
+        return email.utils.mktime_tz(parsed) >= page.last_modified
+
     def get_template(self, name):
-        return FILE_LOADER.load(self.settings['jinja2_env'], name)
+        return TEMPLATES.get(self.settings['jinja2_env'], name)
 
 #-----------------------------------------------------------------------------
 # URL to handler mappings
 #-----------------------------------------------------------------------------
 
-default_handlers = [
-    (PREFIX, LabHandler),
-    (PREFIX+r"/(.*)", FileFindHandler,
-        {'path': os.path.join(os.path.dirname(__file__), 'build')}),
-    ]
+default_handlers = [(PREFIX, LabHandler)]
+for module in [lines, listing, patch, sessions, terminal, upload, watch]:
+    for handler in module.default_handlers:
+        default_handlers.append((PREFIX + handler[0],) + tuple(handler[1:]))
+# The asset handler matches everything else under the prefix, so comes last.
+default_handlers.append((PREFIX+r"/(.*)", AssetHandler, {'manifest': ASSETS}))
 
 def _jupyter_server_extension_paths():
     return [{
@@ -49,4 +97,22 @@ def load_jupyter_server_extension(nbapp):
 
     webapp = nbapp.web_app
     #base_url = webapp.settings['base_url']
-    webapp.add_handlers(".*$", default_handlers)
+    handlers = default_handlers
+    upload.UPLOADS.start(nbapp.contents_manager)
+    if webapp.settings.get('lab_mux'):
+        nbapp.log.info('Lab websockets are multiplexed at %s/api/mux', PREFIX)
+        # The mux handler must come before the catch-all asset handler.
+        handlers = [(PREFIX + handler[0],) + tuple(handler[1:])
+                    for handler in mux.default_handlers] + handlers
+    if webapp.settings.get('lab_metrics'):
+        nbapp.log.info('Lab metrics are served at %s/api/metrics', PREFIX)
+        metrics.METRICS.add_cache('pages', PAGES)
+        metrics.METRICS.add_cache('listings', listing.LISTINGS)
+        metrics.METRICS.add_cache('bootstrap', BOOTSTRAP)
+        metrics.METRICS.add_cache('line_indexes', lines.INDEXES)
+        # The metrics handler must come before the catch-all asset handler.
+        instrumented = metrics.instrument(handlers)
+        handlers = [(PREFIX + handler[0],) + tuple(handler[1:])
+                    for handler in metrics.default_handlers]
+        handlers.extend(instrumented)
+    webapp.add_handlers(".*$", handlers)
@@ -0,0 +1,291 @@
+"""Tornado handlers for serving the built Lab assets."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from tornado import gen, web
+from notebook.base.handlers import IPythonHandler
+
+
+# Precompressed siblings written at build time, in order of preference.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Cache header for content-hashed urls, which never change content.
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+CHUNK_SIZE = 64 * 1024
+
+# Names that already carry a content hash from webpack, such as plugin chunks
+# (`notebook.<chunkhash>.js`) and file-loader output (`<hash>.woff2`).
+FINGERPRINTED = re.compile(r'(^|[./])[0-9a-f]{16,}\.[^/]+$')
+
+# The chunk manifest written by the webpack build.
+CHUNKS_FILE = 'chunks.json'
+
+# The files rewritten by every build, the chunk manifest by the page build
+# and the render worker by the worker build.  `AssetManifest.check` only
+# looks at these, so a page request does not stat every asset.
+STAMP_FILES = [CHUNKS_FILE, 'renderworker.js']
+
+
+def hashed_name(name, digest):
+    """Insert a content digest into a file name: `bundle.js` ->
+    `bundle.<digest>.js`."""
+    root, ext = os.path.splitext(name)
+    return '%s.%s%s' % (root, digest, ext)
+
+
+def accepted_encodings(header):
+    """Parse an `Accept-Encoding` header into the set of allowed codings."""
+    accepted = set()
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key.strip() == 'q':
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        if qvalue > 0:
+            accepted.add(coding)
+    return accepted
+
+
+class Asset(object):
+    """A built file, its content digest and its precompressed siblings."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        stat = os.stat(path)
+        self.mtime = stat.st_mtime
+        self.size = stat.st_size
+        self.digest = self._hash(path)
+        self.hashed_name = hashed_name(name, self.digest)
+        content_type, _ = mimetypes.guess_type(name)
+        if name.endswith('.map'):
+            content_type = 'application/json'
+        self.content_type = content_type or 'application/octet-stream'
+        # Only use siblings that are at least as new as the asset itself,
+        # a stale `.gz` from a previous build must never be served.
+        self.variants = {}
+        for encoding, suffix in ENCODINGS:
+            variant = path + suffix
+            if os.path.exists(variant):
+                vstat = os.stat(variant)
+                if vstat.st_mtime >= self.mtime:
+                    self.variants[encoding] = (variant, vstat.st_size)
+
+    def _hash(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:20]
+
+    def select(self, accept_encoding):
+        """Pick the best representation for an `Accept-Encoding` header.
+
+        Returns a tuple of (encoding, path, size); `encoding` is `None`
+        for the identity representation.
+        """
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and encoding in accepted:
+                path, size = self.variants[encoding]
+                return encoding, path, size
+        return None, self.path, self.size
+
+    def etag(self, encoding=None):
+        """The strong etag for a representation of the asset."""
+        if encoding:
+            return '"%s-%s"' % (self.digest, encoding)
+        return '"%s"' % self.digest
+
+
+class AssetManifest(object):
+    """An in-memory manifest of the files in a build directory.
+
+    The manifest is computed once, so requests are answered without
+    touching the disk for hashing or cache validation.  Call `check` to
+    pick up a rebuild of the directory.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+        self._assets = None
+        self._hashed = None
+        self._stamp = None
+        self._chunks = {}
+        self.version = ''
+
+    @property
+    def assets(self):
+        if self._assets is None:
+            self.load()
+        return self._assets
+
+    @property
+    def chunks(self):
+        """The webpack chunk manifest, if the build wrote one."""
+        if self._assets is None:
+            self.load()
+        return self._chunks
+
+    def load(self):
+        """Scan the build directory and hash every asset."""
+        assets = {}
+        hashed = {}
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        if os.path.isdir(self.root):
+            for dirpath, dirnames, filenames in os.walk(self.root):
+                for filename in filenames:
+                    if filename.startswith('.') or filename.endswith(suffixes):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                    asset = Asset(name, path)
+                    assets[name] = asset
+                    hashed[asset.hashed_name] = asset
+        digest = hashlib.sha256()
+        for name in sorted(assets):
+            digest.update(assets[name].digest.encode('ascii'))
+        self._assets = assets
+        self._hashed = hashed
+        self._chunks = self._load_chunks()
+        self._stamp = self._compute_stamp()
+        self.version = digest.hexdigest()[:20]
+
+    def check(self):
+        """Reload the manifest if the build directory changed.
+
+        A build is seen by the change of a file in `STAMP_FILES`, or of the
+        files in the build directory.  Returns `True` if the manifest was
+        reloaded.
+        """
+        if self._assets is None:
+            self.load()
+            return True
+        if self._compute_stamp() == self._stamp:
+            return False
+        self.load()
+        return True
+
+    def lookup(self, path):
+        """Find the asset for a request path.
+
+        Returns a tuple of (asset, immutable), where `immutable` is true if
+        the path was a content-hashed name.  The asset is `None` if the
+        path is not in the manifest.
+        """
+        assets = self.assets
+        if path in self._hashed:
+            return self._hashed[path], True
+        return assets.get(path), bool(FINGERPRINTED.search(path))
+
+    def url(self, name):
+        """The content-hashed name of an asset, for use in a page."""
+        asset = self.assets.get(name)
+        return asset.hashed_name if asset else name
+
+    def preload(self):
+        """The scripts of the entry chunk, which every page needs."""
+        scripts = self._chunk_scripts(self.chunks.get('entry', 'main'))
+        return [self.url(script) for script in scripts]
+
+    def prefetch(self):
+        """The scripts of the lazily loaded plugin chunks.
+
+        These are the names webpack itself requests, so they are not
+        mapped to content-hashed names.
+        """
+        entry = self.chunks.get('entry', 'main')
+        scripts = []
+        for name in sorted(self.chunks.get('chunks', {})):
+            if name != entry:
+                scripts.extend(self._chunk_scripts(name))
+        return scripts
+
+    def _chunk_scripts(self, name):
+        files = self.chunks.get('chunks', {}).get(name, [])
+        if not isinstance(files, list):
+            files = [files]
+        return [f for f in files if f.endswith('.js')]
+
+    def _load_chunks(self):
+        path = os.path.join(self.root, CHUNKS_FILE)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _compute_stamp(self):
+        stamp = []
+        if not os.path.isdir(self.root):
+            return stamp
+        stamp.append(os.stat(self.root).st_mtime)
+        for name in STAMP_FILES:
+            try:
+                stamp.append(os.stat(os.path.join(self.root, name)).st_mtime)
+            except OSError:
+                stamp.append(None)
+        return stamp
+
+
+class AssetHandler(IPythonHandler):
+    """Serve built Lab assets from an `AssetManifest`.
+
+    Content-hashed names are served with an immutable cache header, other
+    names are revalidated against the manifest etag.  Precompressed
+    siblings are used when the client accepts their encoding.
+    """
+
+    def initialize(self, manifest):
+        self.manifest = manifest
+
+    def compute_etag(self):
+        # The etag is set from the manifest, never computed from the body.
+        return None
+
+    def head(self, path):
+        return self.get(path, include_body=False)
+
+    @gen.coroutine
+    def get(self, path, include_body=True):
+        asset, immutable = self.manifest.lookup(path)
+        if asset is None:
+            raise web.HTTPError(404)
+
+        accept = self.request.headers.get('Accept-Encoding', '')
+        encoding, filename, size = asset.select(accept)
+        self.set_header('Content-Type', asset.content_type)
+        self.set_header('Vary', 'Accept-Encoding')
+        self.set_header('Etag', asset.etag(encoding))
+        self.set_header('Cache-Control', IMMUTABLE if immutable else 'no-cache')
+        if self.check_etag_header():
+            self.set_status(304)
+            return
+
+        if encoding:
+            self.set_header('Content-Encoding', encoding)
+        self.set_header('Content-Length', size)
+        if not include_body:
+            return
+        with open(filename, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                self.write(chunk)
+                yield self.flush()
@@ -0,0 +1,137 @@
+"""The startup data inlined in the Lab page.
+
+A new page needs the kernelspecs, the root directory listing and its
+running sessions before it is interactive.  They are embedded in the page,
+so startup does not wait on further round trips, and the client
+revalidates them in the background.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import inspect
+import json
+import time
+
+from tornado import gen
+
+from notebook.services.kernelspecs.handlers import (
+    kernelspec_model as _kernelspec_model)
+from jupyter_client.jsonutil import date_default
+
+from .listing import LISTINGS, snapshot_page
+from .sessions import directory_sessions
+
+
+# Characters escaped in the json, so it cannot end the script element it
+# is embedded in.
+HTML_ESCAPES = (('&', '\\u0026'), ('<', '\\u003c'), ('>', '\\u003e'))
+
+
+def html_safe_json(data):
+    """Serialize data as json which is safe in a script element."""
+    text = json.dumps(data, default=date_default, sort_keys=True)
+    for char, escape in HTML_ESCAPES:
+        text = text.replace(char, escape)
+    return text
+
+
+# Whether the kernelspec model of the kernelspecs api loads the spec itself,
+# as before notebook 5.
+_getargspec = getattr(inspect, 'getfullargspec', None) or inspect.getargspec
+_LOADS_SPEC = len(_getargspec(_kernelspec_model).args) == 2
+
+
+def kernelspec_model(handler, name):
+    """The model of a kernelspec, as served by the kernelspecs api."""
+    if _LOADS_SPEC:
+        return _kernelspec_model(handler, name)
+    spec = handler.kernel_spec_manager.get_kernel_spec(name)
+    return _kernelspec_model(handler, name, spec.to_dict(), spec.resource_dir)
+
+
+def kernelspecs_model(handler):
+    """The kernelspecs of the server, as served by the kernelspecs api."""
+    specs = {}
+    for name in handler.kernel_spec_manager.find_kernel_specs():
+        try:
+            specs[name] = kernelspec_model(handler, name)
+        except Exception:
+            handler.log.error('Failed to load kernel spec %s', name,
+                              exc_info=True)
+    return dict(default=handler.kernel_manager.default_kernel_name,
+                kernelspecs=specs)
+
+
+class Bootstrap(object):
+    """Serialized startup data, with a version for the page cache."""
+
+    def __init__(self, data):
+        self.json = html_safe_json(data)
+        self.version = hashlib.sha1(self.json.encode('utf-8')).hexdigest()[:16]
+
+
+class BootstrapCache(object):
+    """The startup data of the pages of each base url.
+
+    The data is collected at most once every `max_age` seconds, which is
+    short so that new pages do not start from stale data, but lets pages
+    opened together share one collection.
+    """
+
+    def __init__(self, max_age=3):
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @gen.coroutine
+    def get(self, handler):
+        """Get the startup data for a page handler."""
+        key = handler.base_url
+        entry = self._entries.get(key)
+        if entry is not None and time.time() - entry[0] < self.max_age:
+            self.hits += 1
+        else:
+            self.misses += 1
+            entry = (time.time(), collect(handler))
+            self._entries[key] = entry
+        try:
+            bootstrap = yield entry[1]
+        except Exception:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            raise
+        raise gen.Return(bootstrap)
+
+    def clear(self):
+        self._entries.clear()
+
+
+@gen.coroutine
+def collect(handler):
+    """Collect the startup data of a page.
+
+    Data which cannot be collected is left out, and the client requests it
+    as it would without a bootstrap.
+    """
+    data = {}
+    try:
+        data['kernelspecs'] = kernelspecs_model(handler)
+    except Exception:
+        handler.log.error('Failed to collect the kernelspecs', exc_info=True)
+    try:
+        snapshot = yield LISTINGS.get(handler.contents_manager, '')
+        data['listing'] = snapshot_page(snapshot)
+        data['sessions'] = yield directory_sessions(handler.session_manager, '')
+    except Exception:
+        handler.log.error('Failed to collect the root directory',
+                          exc_info=True)
+    raise gen.Return(Bootstrap(data))
+
+
+BOOTSTRAP = BootstrapCache()
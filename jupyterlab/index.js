@@ -9,31 +9,150 @@ require('es6-promise').polyfill();
 require('font-awesome/css/font-awesome.min.css');
 require('jupyterlab/lib/default-theme/index.css');
 
+var DocumentRegistry = require('jupyterlab/lib/docmanager').DocumentRegistry;
+var IClipboard = require('jupyterlab/lib/clipboard/plugin').clipboardProvider.provides;
+var JupyterServices = require('jupyterlab/lib/services/plugin').JupyterServices;
+var RenderMime = require('jupyterlab/lib/rendermime').RenderMime;
+var metrics = require('jupyterlab/lib/metrics');
+
+// The entry chunk has been parsed and its modules evaluated.
+metrics.mark('bundle_parse');
+
+
+/**
+ * Create an extension whose module is split into its own chunk.
+ *
+ * The id and requires are declared here, so the chunk is only fetched and
+ * parsed when phosphide activates the extension.  Phosphide activates every
+ * extension when the application starts, so this only takes the chunk off
+ * the critical path of the entry chunk.  `load` is called with a callback
+ * taking the extension loaded from the chunk.
+ */
+function lazyExtension(id, requires, load) {
+  return {
+    id: id,
+    requires: requires,
+    activate: function() {
+      var args = Array.prototype.slice.call(arguments);
+      return new Promise(load).then(function(extension) {
+        return extension.activate.apply(extension, args);
+      });
+    }
+  };
+}
+
+/**
+ * Create an extension which is only loaded on the first use of a command.
+ *
+ * `declared` is the module of the extension declaring its `commandIds` and
+ * `paletteItems`, which the extension adds itself.  It has no imports, so it
+ * is small enough for the entry chunk.  The declared commands and palette
+ * items stand in for the extension until one of the commands is executed.
+ * The chunk is then fetched, the extension is activated in place of the
+ * stand-ins, and the command is executed again.  If the chunk cannot be
+ * loaded, the stand-ins stay, so executing a command again tries again.
+ */
+function deferredExtension(id, requires, declared, load) {
+  var extension = lazyExtension(id, requires, load);
+  return {
+    id: id,
+    requires: requires,
+    activate: function(app) {
+      var args = Array.prototype.slice.call(arguments);
+      var activated = null;
+      var commands = app.commands.add(declared.commandIds.map(function(command) {
+        return {
+          id: command,
+          handler: function(commandArgs) {
+            if (!activated) {
+              activated = activate();
+            }
+            activated.then(function() {
+              app.commands.execute(command, commandArgs);
+            }, function(error) {
+              console.error('Could not load the ' + id + ' extension', error);
+            });
+          }
+        };
+      }));
+      var palette = app.palette.add(declared.paletteItems);
+
+      function activate() {
+        return new Promise(load).catch(function(error) {
+          // Let the next execution of a stand-in try again.
+          activated = null;
+          throw error;
+        }).then(function() {
+          commands.dispose();
+          palette.dispose();
+          return extension.activate.apply(extension, args);
+        });
+      }
+    }
+  };
+}
+
+// The `require.ensure` calls must be written out literally so that webpack
+// can see them and emit one named chunk per plugin.
 var app = new phosphide.Application({
   extensions: [
-    require('jupyterlab/lib/about/plugin').aboutExtension,
-    require('jupyterlab/lib/console/plugin').consoleExtension,
-    require('jupyterlab/lib/editorhandler/plugin').editorHandlerExtension,
+    deferredExtension('jupyter.extensions.about', [], require('jupyterlab/lib/about/commands'), function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/about/plugin').aboutExtension);
+      }, 'about');
+    }),
+    lazyExtension('jupyter.extensions.console', [JupyterServices, RenderMime], function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/console/plugin').consoleExtension);
+      }, 'console');
+    }),
+    lazyExtension('jupyter.extensions.editorHandler', [DocumentRegistry], function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/editorhandler/plugin').editorHandlerExtension);
+      }, 'editorhandler');
+    }),
     require('jupyterlab/lib/filebrowser/plugin').fileBrowserExtension,
-    require('jupyterlab/lib/help/plugin').helpHandlerExtension,
-    require('jupyterlab/lib/imagehandler/plugin').imageHandlerExtension,
+    deferredExtension('jupyter.extensions.helpHandler', [], require('jupyterlab/lib/help/commands'), function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/help/plugin').helpHandlerExtension);
+      }, 'help');
+    }),
+    lazyExtension('jupyter.extensions.imageHandler', [DocumentRegistry], function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/imagehandler/plugin').imageHandlerExtension);
+      }, 'imagehandler');
+    }),
     require('jupyterlab/lib/landing/plugin').landingExtension,
     require('jupyterlab/lib/main/plugin').mainExtension,
-    require('jupyterlab/lib/notebook/plugin').notebookHandlerExtension,
+    lazyExtension('jupyter.extensions.notebookHandler', [DocumentRegistry, JupyterServices, RenderMime, IClipboard], function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/notebook/plugin').notebookHandlerExtension);
+      }, 'notebook');
+    }),
     require('jupyterlab/lib/shortcuts/plugin').shortcutsExtension,
-    require('jupyterlab/lib/terminal/plugin').terminalExtension,
-    require('jupyterlab/lib/widgets/plugin').widgetManagerExtension,
+    deferredExtension('jupyter.extensions.terminal', [JupyterServices], require('jupyterlab/lib/terminal/commands'), function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/terminal/plugin').terminalExtension);
+      }, 'terminal');
+    }),
+    lazyExtension('jupyter.extensions.widgetManager', [DocumentRegistry], function(resolve) {
+      require.ensure([], function(require) {
+        resolve(require('jupyterlab/lib/widgets/plugin').widgetManagerExtension);
+      }, 'widgets');
+    }),
     require('phosphide/lib/extensions/commandpalette').commandPaletteExtension,
   ],
   providers: [
     require('jupyterlab/lib/clipboard/plugin').clipboardProvider,
     require('jupyterlab/lib/docregistry/plugin').docRegistryProvider,
-    require('jupyterlab/lib/notebook/plugin').activeNotebookProvider,
+    require('jupyterlab/lib/notebook/tracker').activeNotebookProvider,
     require('jupyterlab/lib/rendermime/plugin').renderMimeProvider,
     require('jupyterlab/lib/services/plugin').servicesProvider,
   ]
 });
 
 window.onload = function() {
-    app.run();
+    app.run().then(function() {
+      metrics.mark('app_run');
+    });
 }
@@ -0,0 +1,467 @@
+"""Tornado handlers for windowed reads of large text files.
+
+Large files are read by line number through an index of the offsets of
+every `STRIDE`-th line.  The index is built once per file, in chunks so the
+server stays responsive, and kept on disk while the file's size and time
+are unchanged.  A file which only grew, like a log, has its index extended
+instead of rebuilt.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import json
+import os
+import re
+import struct
+from array import array
+from collections import OrderedDict
+
+from tornado import gen, web
+
+from notebook.base.handlers import APIHandler, json_errors, path_regex
+from jupyter_core.paths import jupyter_data_dir
+
+
+# The lines between indexed offsets.  A read scans at most this many
+# lines from the nearest indexed offset.
+STRIDE = 256
+
+# The bytes read at once while indexing or searching, between which other
+# requests are served.
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# The bytes searched by one grep request, which reports where to go on.
+GREP_BUDGET = 64 * 1024 * 1024
+
+DEFAULT_LINES = 1000
+MAX_LINES = 5000
+MAX_MATCHES = 1000
+MAX_RANGE = 16 * 1024 * 1024
+
+# Longer lines are cut, so one huge line cannot exhaust the server.
+MAX_LINE_LENGTH = 64 * 1024
+
+# The bytes before the end of the indexed part of a file which must be
+# unchanged for the index to be extended when the file grows.
+CHECK_LENGTH = 4096
+
+# The index header: magic, file time, indexed size, newlines, start of the
+# last line, and the digest of the checked bytes.
+HEADER = struct.Struct('<8sdQQQ20s')
+MAGIC = b'JLLINES1'
+
+# Offsets are stored as doubles, which are exact up to 2**53 bytes and,
+# unlike 64 bit integers, supported by `array` on every Python.
+OFFSET_TYPE = 'd'
+
+# Atomic rename over an existing file, where Python has it.
+replace = getattr(os, 'replace', os.rename)
+
+
+def index_dir():
+    """The directory of the persisted line indexes."""
+    return os.path.join(jupyter_data_dir(), 'lab', 'lines')
+
+
+class LineIndex(object):
+    """The offsets of every `STRIDE`-th line of a file.
+
+    Lines are separated by `\\n`, and a final line without one counts.
+    """
+
+    def __init__(self, os_path):
+        self.os_path = os_path
+        self.mtime = None
+        self.size = 0
+        self.newlines = 0
+        self.end = 0
+        self.check = b''
+        self.offsets = array(OFFSET_TYPE, [0])
+
+    @property
+    def total(self):
+        """The number of lines in the indexed part of the file."""
+        return self.newlines + (1 if self.end < self.size else 0)
+
+    @property
+    def store_path(self):
+        digest = hashlib.sha1(self.os_path.encode('utf-8')).hexdigest()
+        return os.path.join(index_dir(), digest + '.idx')
+
+    def is_current(self, stat):
+        return self.mtime == stat.st_mtime and self.size == stat.st_size
+
+    def load(self):
+        """Load the persisted index, returning `False` if there is none."""
+        try:
+            with open(self.store_path, 'rb') as f:
+                header = f.read(HEADER.size)
+                if len(header) != HEADER.size:
+                    return False
+                fields = HEADER.unpack(header)
+                if fields[0] != MAGIC:
+                    return False
+                offsets = array(OFFSET_TYPE)
+                data = f.read()
+        except (IOError, OSError):
+            return False
+        if len(data) % offsets.itemsize:
+            return False
+        if hasattr(offsets, 'frombytes'):
+            offsets.frombytes(data)
+        else:
+            offsets.fromstring(data)
+        if not offsets:
+            return False
+        (_, self.mtime, self.size, self.newlines, self.end,
+         self.check) = fields
+        self.offsets = offsets
+        return True
+
+    def save(self):
+        """Persist the index, next to the indexes of other files."""
+        directory = index_dir()
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        tmp_path = self.store_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.mtime, self.size, self.newlines,
+                                self.end, self.check))
+            if hasattr(self.offsets, 'tobytes'):
+                f.write(self.offsets.tobytes())
+            else:
+                f.write(self.offsets.tostring())
+        replace(tmp_path, self.store_path)
+
+    def can_extend(self, f, stat):
+        """Whether the file only grew since it was indexed."""
+        if stat.st_size < self.size:
+            return False
+        return self._digest(f) == self.check
+
+    @gen.coroutine
+    def update(self, f, stat):
+        """Index the file from the end of the indexed part to its size."""
+        position = self.size
+        f.seek(position)
+        while position < stat.st_size:
+            chunk = f.read(min(CHUNK_SIZE, stat.st_size - position))
+            if not chunk:
+                break
+            self._scan(chunk, position)
+            position += len(chunk)
+            self.size = position
+            # Let other requests in between chunks.
+            yield gen.moment
+        self.mtime = stat.st_mtime
+        self.check = self._digest(f)
+
+    def _scan(self, chunk, position):
+        count = chunk.count(b'\n')
+        if not count:
+            return
+        mark = len(self.offsets) * STRIDE
+        if self.newlines + count < mark:
+            # No indexed line starts in this chunk.
+            self.newlines += count
+            self.end = position + chunk.rindex(b'\n') + 1
+            return
+        index = -1
+        for _ in range(count):
+            index = chunk.index(b'\n', index + 1)
+            self.newlines += 1
+            if self.newlines == mark:
+                self.offsets.append(position + index + 1)
+                mark += STRIDE
+        self.end = position + index + 1
+
+    def _digest(self, f):
+        start = max(self.size - CHECK_LENGTH, 0)
+        f.seek(start)
+        return hashlib.sha1(f.read(self.size - start)).digest()
+
+    def seek_line(self, f, line):
+        """Move a file to the start of a line."""
+        mark = min(line // STRIDE, len(self.offsets) - 1)
+        f.seek(int(self.offsets[mark]))
+        for _ in range(line - mark * STRIDE):
+            read_line(f)
+
+    def read_lines(self, f, start, count):
+        """Read lines, returning them with the numbers of cut lines."""
+        start = min(max(start, 0), self.total)
+        count = min(count, self.total - start)
+        self.seek_line(f, start)
+        lines = []
+        cut = []
+        for number in range(start, start + count):
+            data, complete = read_line(f)
+            if not complete:
+                cut.append(number)
+            if data.endswith(b'\n'):
+                data = data[:-1]
+            if data.endswith(b'\r'):
+                data = data[:-1]
+            lines.append(data.decode('utf-8', 'replace'))
+        return start, lines, cut
+
+    @gen.coroutine
+    def grep(self, f, regex, start, limit):
+        """Find the lines matching a regex, from a line on.
+
+        Returns the line numbers and the line to go on from, which is
+        `None` if the end of the indexed file was reached.
+        """
+        matches = []
+        line = min(max(start, 0), self.total)
+        self.seek_line(f, line)
+        position = f.tell()
+        scanned = 0
+        rest = b''
+        while position < self.size:
+            if len(matches) >= limit or scanned >= GREP_BUDGET:
+                raise gen.Return((matches, line))
+            data = f.read(min(CHUNK_SIZE, self.size - position))
+            if not data:
+                break
+            position += len(data)
+            scanned += len(data)
+            chunk = rest + data
+            # Only search whole lines, the rest goes with the next chunk,
+            # unless the chunk is part of one long line.
+            cut = chunk.rfind(b'\n') + 1 if position < self.size else 0
+            cut = cut or len(chunk)
+            chunk, rest = chunk[:cut], chunk[cut:]
+            line = self._grep_chunk(regex, chunk, line, matches, limit)
+            if len(matches) >= limit:
+                # The line to go on from is after the last match.
+                raise gen.Return((matches, matches[-1] + 1))
+            yield gen.moment
+        raise gen.Return((matches, None))
+
+    def _grep_chunk(self, regex, chunk, line, matches, limit):
+        pos = 0
+        while len(matches) < limit:
+            match = regex.search(chunk, pos)
+            if match is None:
+                break
+            line += chunk.count(b'\n', pos, match.start())
+            if not matches or matches[-1] != line:
+                matches.append(line)
+            newline = chunk.find(b'\n', match.start())
+            if newline == -1:
+                return line
+            pos = newline + 1
+            line += 1
+        return line + chunk.count(b'\n', pos)
+
+
+def read_line(f):
+    """Read a line of at most `MAX_LINE_LENGTH` bytes.
+
+    Returns the bytes and whether the line is complete.  The rest of a
+    longer line is skipped.
+    """
+    data = f.readline(MAX_LINE_LENGTH)
+    if len(data) < MAX_LINE_LENGTH or data.endswith(b'\n'):
+        return data, True
+    while True:
+        rest = f.readline(CHUNK_SIZE)
+        if not rest or rest.endswith(b'\n'):
+            return data, False
+
+
+class LineIndexCache(object):
+    """The line indexes of recently read files.
+
+    An index is reused while the file's size and time are unchanged, is
+    loaded from disk if it was persisted, and is extended if the file only
+    grew.  Indexing a file is shared by the requests waiting for it.
+    """
+
+    def __init__(self, max_size=16):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._indexes = OrderedDict()
+        self._updates = {}
+
+    def __len__(self):
+        return len(self._indexes)
+
+    @gen.coroutine
+    def get(self, os_path, f):
+        """Get the current index of an open file."""
+        stat = os.fstat(f.fileno())
+        index = self._indexes.pop(os_path, None)
+        if index is not None and index.is_current(stat):
+            self.hits += 1
+        else:
+            self.misses += 1
+            update = self._updates.get(os_path)
+            if update is None:
+                update = self._update(os_path, index, f, stat)
+                self._updates[os_path] = update
+            try:
+                index = yield update
+            finally:
+                self._updates.pop(os_path, None)
+        self._indexes[os_path] = index
+        while len(self._indexes) > self.max_size:
+            self._indexes.popitem(last=False)
+        raise gen.Return(index)
+
+    @gen.coroutine
+    def _update(self, os_path, index, f, stat):
+        if index is None:
+            index = LineIndex(os_path)
+            if not index.load():
+                index = None
+            elif index.is_current(stat):
+                raise gen.Return(index)
+        if index is None or not index.can_extend(f, stat):
+            index = LineIndex(os_path)
+        yield index.update(f, stat)
+        try:
+            index.save()
+        except (IOError, OSError):
+            # The index still serves this server, it is built again later.
+            pass
+        raise gen.Return(index)
+
+    def clear(self):
+        self._indexes.clear()
+
+
+def open_file(handler, path):
+    """Open the file at a contents path for reading."""
+    cm = handler.contents_manager
+    get_os_path = getattr(cm, '_get_os_path', None)
+    if get_os_path is None:
+        raise web.HTTPError(501, u'Windowed reads need files on disk')
+    if not cm.file_exists(path):
+        raise web.HTTPError(404, u'No such file: %s' % path)
+    if cm.is_hidden(path):
+        raise web.HTTPError(404, u'No such file: %s' % path)
+    os_path = get_os_path(path)
+    return os_path, open(os_path, 'rb')
+
+
+def int_argument(handler, name, default):
+    value = handler.get_query_argument(name, default=None)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise web.HTTPError(400, u'%s %r is invalid' % (name, value))
+
+
+class LinesHandler(APIHandler):
+    """Read a window of lines of a text file, or search its lines.
+
+    Query arguments:
+
+    - `start`, `count`: the window of lines to return.  With `count=0`
+      only the size of the file and its number of lines are returned.
+    - `grep`: instead of lines, return the numbers of up to `limit` lines
+      from `start` on matching this regular expression, and the line to
+      search on from (`null` at the end of the file).  `case=0` ignores
+      case.
+    """
+
+    def initialize(self, cache):
+        self.cache = cache
+
+    @web.authenticated
+    @json_errors
+    @gen.coroutine
+    def get(self, path=''):
+        path = (path or '').strip('/')
+        os_path, f = open_file(self, path)
+        try:
+            index = yield self.cache.get(os_path, f)
+            reply = dict(path=path, size=index.size, total=index.total)
+            start = int_argument(self, 'start', 0)
+            pattern = self.get_query_argument('grep', default=None)
+            if pattern is not None:
+                limit = int_argument(self, 'limit', MAX_MATCHES)
+                limit = min(max(limit, 1), MAX_MATCHES)
+                flags = re.MULTILINE
+                if self.get_query_argument('case', default='1') == '0':
+                    flags |= re.IGNORECASE
+                try:
+                    regex = re.compile(pattern.encode('utf-8'), flags)
+                except re.error as e:
+                    raise web.HTTPError(400, u'Invalid pattern: %s' % e)
+                matches, after = yield index.grep(f, regex, start, limit)
+                reply.update(matches=matches, next=after)
+            else:
+                count = int_argument(self, 'count', DEFAULT_LINES)
+                count = min(max(count, 0), MAX_LINES)
+                start, lines, cut = index.read_lines(f, start, count)
+                reply.update(start=start, lines=lines, cut=cut)
+        finally:
+            f.close()
+        self.finish(json.dumps(reply))
+
+
+class RangeHandler(APIHandler):
+    """Read a byte range of a file, given by an HTTP `Range` header.
+
+    Only single ranges are served, of at most `MAX_RANGE` bytes.  Without
+    a range, the first `MAX_RANGE` bytes are served.
+    """
+
+    @web.authenticated
+    @json_errors
+    def get(self, path=''):
+        path = (path or '').strip('/')
+        os_path, f = open_file(self, path)
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            header = self.request.headers.get('Range')
+            if header:
+                start, end = self._parse_range(header, size)
+                self.set_status(206)
+                self.set_header('Content-Range',
+                                'bytes %i-%i/%i' % (start, end - 1, size))
+            else:
+                start, end = 0, min(size, MAX_RANGE)
+            f.seek(start)
+            data = f.read(end - start)
+        self.set_header('Content-Type', 'application/octet-stream')
+        self.set_header('Accept-Ranges', 'bytes')
+        self.finish(data)
+
+    def _parse_range(self, header, size):
+        match = re.match(r'^bytes=(\d*)-(\d*)$', header.strip())
+        if match is None or match.groups() == ('', ''):
+            raise web.HTTPError(400, u'Invalid range: %s' % header)
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else size
+        else:
+            # A suffix range, the last bytes of the file.
+            start = max(size - int(last), 0)
+            end = size
+        end = min(end, size, start + MAX_RANGE)
+        if start >= size or start >= end:
+            self.set_header('Content-Range', 'bytes */%i' % size)
+            raise web.HTTPError(416, u'Range not satisfiable: %s' % header)
+        return start, end
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+INDEXES = LineIndexCache()
+
+default_handlers = [
+    (r"/api/lines%s" % path_regex, LinesHandler, {'cache': INDEXES}),
+    (r"/api/ranges%s" % path_regex, RangeHandler),
+]
@@ -0,0 +1,234 @@
+"""Tornado handlers for paged directory listings."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from tornado import gen, web
+
+from notebook.base.handlers import APIHandler, json_errors, path_regex
+from jupyter_client.jsonutil import date_default
+
+
+# Sort orders understood by the listing, matching the file browser.
+SORT_KEYS = ('name', 'last_modified')
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+TYPE_ORDER = {'directory': 0, 'notebook': 1, 'file': 2}
+
+
+def name_key(model):
+    """Sort key grouping by type, then by case-insensitive name.
+
+    This is the order of the contents API, with the exact name as a final
+    tie-breaker so the order is total.
+    """
+    name = model['name']
+    return (TYPE_ORDER.get(model['type'], 9), name.lower(), name)
+
+
+class DirectorySnapshot(object):
+    """An immutable listing of a directory at one point in time.
+
+    Every snapshot has a token identifying its contents, which clients use
+    to page through a consistent listing and to ask for the changes since
+    the listing they already hold.
+    """
+
+    def __init__(self, model):
+        self.path = model['path']
+        self.name = model['name']
+        self.last_modified = model['last_modified']
+        self.created = time.time()
+        self.entries = OrderedDict(
+            (entry['name'], entry) for entry in model['content']
+        )
+        digest = hashlib.sha1(self.path.encode('utf-8'))
+        for name in sorted(self.entries):
+            digest.update(self._signature(self.entries[name]).encode('utf-8'))
+        self.token = digest.hexdigest()[:16]
+        self._orders = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def sorted(self, sort='name', reverse=False):
+        """The entries in a sort order, computed once per order."""
+        key = (sort, reverse)
+        if key not in self._orders:
+            entries = sorted(self.entries.values(), key=name_key)
+            if sort == 'last_modified':
+                # Newest first; the sort is stable, so ties keep name order.
+                entries.sort(key=lambda entry: entry['last_modified'],
+                             reverse=True)
+            if reverse:
+                entries.reverse()
+            self._orders[key] = entries
+        return self._orders[key]
+
+    def delta(self, older):
+        """The changes from an older snapshot of the same directory."""
+        added = []
+        modified = []
+        for name, entry in self.entries.items():
+            previous = older.entries.get(name)
+            if previous is None:
+                added.append(entry)
+            elif self._signature(previous) != self._signature(entry):
+                modified.append(entry)
+        removed = [name for name in older.entries if name not in self.entries]
+        return dict(added=added, removed=removed, modified=modified)
+
+    def _signature(self, entry):
+        return u'%s\0%s\0%s\0%s' % (entry['name'], entry['type'],
+                                    entry.get('last_modified'),
+                                    entry.get('size'))
+
+
+class ListingCache(object):
+    """Recent directory snapshots, by path and by token.
+
+    The current snapshot of a path is reused while the directory's own
+    modification time is unchanged and the snapshot is younger than
+    `max_age` seconds.  Older snapshots are kept, up to `max_snapshots`,
+    so clients holding their tokens can get deltas.
+    """
+
+    def __init__(self, max_age=5, max_snapshots=64):
+        self.max_age = max_age
+        self.max_snapshots = max_snapshots
+        self.hits = 0
+        self.misses = 0
+        self._current = {}
+        self._tokens = OrderedDict()
+
+    @gen.coroutine
+    def get(self, contents_manager, path, fresh=False):
+        """Get a current snapshot of a directory.
+
+        With `fresh`, the directory is always listed again, which catches
+        changes to entries that leave the directory's own time untouched.
+        """
+        snapshot = None if fresh else self._current.get(path)
+        if snapshot is not None and time.time() - snapshot.created < self.max_age:
+            model = yield gen.maybe_future(contents_manager.get(
+                path=path, type='directory', content=False))
+            if model['last_modified'] == snapshot.last_modified:
+                self.hits += 1
+                raise gen.Return(snapshot)
+        self.misses += 1
+        model = yield gen.maybe_future(contents_manager.get(
+            path=path, type='directory', content=True))
+        snapshot = DirectorySnapshot(model)
+        previous = self._current.get(path)
+        if previous is not None and previous.token == snapshot.token:
+            # Nothing changed, keep the snapshot with its cached orders.
+            previous.created = snapshot.created
+            previous.last_modified = snapshot.last_modified
+            snapshot = previous
+        self._current[path] = snapshot
+        self._tokens.pop(snapshot.token, None)
+        self._tokens[snapshot.token] = snapshot
+        while len(self._tokens) > self.max_snapshots:
+            self._tokens.popitem(last=False)
+        raise gen.Return(snapshot)
+
+    def find(self, token):
+        """Find a snapshot by token, or `None` if it was evicted."""
+        return self._tokens.get(token)
+
+
+def snapshot_header(snapshot):
+    """The directory model of a snapshot, without its entries."""
+    return dict(
+        path=snapshot.path,
+        name=snapshot.name,
+        type='directory',
+        last_modified=snapshot.last_modified,
+        token=snapshot.token,
+        total=len(snapshot),
+    )
+
+
+def snapshot_page(snapshot, start=0, limit=DEFAULT_PAGE_SIZE, sort='name',
+                  reverse=False):
+    """A page of the sorted entries of a snapshot, as served by the api."""
+    reply = snapshot_header(snapshot)
+    reply.update(
+        start=start,
+        sort=sort,
+        reverse=reverse,
+        content=snapshot.sorted(sort, reverse)[start:start + limit],
+    )
+    return reply
+
+
+class ListingHandler(APIHandler):
+    """Serve a directory listing in sorted pages.
+
+    Query arguments:
+
+    - `start`, `limit`: the window of sorted entries to return.
+    - `sort` (`name` or `last_modified`) and `reverse` (`0` or `1`).
+    - `token`: page through the snapshot with this token, if still cached.
+    - `since`: instead of a page, return the changes from the snapshot with
+      this token.  `delta` is `null` if that snapshot is no longer known.
+    """
+
+    def initialize(self, cache):
+        self.cache = cache
+
+    def _int_argument(self, name, default):
+        value = self.get_query_argument(name, default=None)
+        if value is None:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise web.HTTPError(400, u'%s %r is invalid' % (name, value))
+
+    @web.authenticated
+    @json_errors
+    @gen.coroutine
+    def get(self, path=''):
+        path = (path or '').strip('/')
+        sort = self.get_query_argument('sort', default='name')
+        if sort not in SORT_KEYS:
+            raise web.HTTPError(400, u'Sort %r is invalid' % sort)
+        reverse = self.get_query_argument('reverse', default='0') == '1'
+        start = max(self._int_argument('start', 0), 0)
+        limit = self._int_argument('limit', DEFAULT_PAGE_SIZE)
+        limit = min(max(limit, 1), MAX_PAGE_SIZE)
+
+        token = self.get_query_argument('token', default=None)
+        since = self.get_query_argument('since', default=None)
+        snapshot = self.cache.find(token) if token else None
+        if snapshot is None or snapshot.path != path or since is not None:
+            snapshot = yield self.cache.get(self.contents_manager, path)
+        if since is not None:
+            reply = snapshot_header(snapshot)
+            older = self.cache.find(since)
+            if older is None or older.path != snapshot.path:
+                reply['delta'] = None
+            else:
+                reply['delta'] = snapshot.delta(older)
+        else:
+            reply = snapshot_page(snapshot, start, limit, sort, reverse)
+        self.finish(json.dumps(reply, default=date_default))
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+LISTINGS = ListingCache()
+
+default_handlers = [
+    (r"/api/listing%s" % path_regex, ListingHandler, {'cache': LISTINGS}),
+]
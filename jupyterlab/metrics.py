@@ -0,0 +1,284 @@
+"""Opt-in performance metrics for the Lab handlers.
+
+Enable with the `lab_metrics` tornado setting, for instance
+`c.NotebookApp.tornado_settings = {'lab_metrics': True}`.  The handlers
+registered by the extension then record their latency, the bytes they
+serve and the requests in flight, and the counters are served at
+`/lab/api/metrics` in the Prometheus text format.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import re
+
+from tornado import web
+from tornado.escape import json_encode, utf8
+from tornado.websocket import WebSocketHandler
+
+from notebook.base.handlers import APIHandler, json_errors
+
+
+# The upper bounds of the request latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# The upper bounds of the page load timing buckets, in seconds.
+TIMING_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Client timing marks are limited in name and number, so a client cannot
+# grow the metrics without bound.
+MARK_NAME = re.compile(r'^[a-z][a-z0-9_]{0,63}$')
+MAX_MARKS = 32
+
+
+class Histogram(object):
+    """A cumulative histogram of observed values."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def samples(self):
+        """The cumulative bucket counts, by upper bound."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield _format_number(bound), total
+        yield '+Inf', self.count
+
+
+class Metrics(object):
+    """In-process counters of the Lab handlers.
+
+    The server is single threaded, so the counters are plain numbers.
+    """
+
+    def __init__(self):
+        self.latency = {}
+        self.requests = {}
+        self.bytes_served = {}
+        self.in_flight = {}
+        self.timings = {}
+        self.caches = {}
+
+    def add_cache(self, name, cache):
+        """Report the hit ratio of a cache with `hits` and `misses`."""
+        self.caches[name] = cache
+
+    def start_request(self, route):
+        self.in_flight[route] = self.in_flight.get(route, 0) + 1
+
+    def end_request(self, route):
+        self.in_flight[route] -= 1
+
+    def record_request(self, route, method, status, duration, size):
+        key = (route, method)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram(LATENCY_BUCKETS)
+        histogram.observe(duration)
+        key = (route, method, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.bytes_served[route] = self.bytes_served.get(route, 0) + size
+
+    def record_timing(self, mark, seconds):
+        """Record a client timing mark, returning `False` if it is refused."""
+        histogram = self.timings.get(mark)
+        if histogram is None:
+            if not MARK_NAME.match(mark) or len(self.timings) >= MAX_MARKS:
+                return False
+            histogram = self.timings[mark] = Histogram(TIMING_BUCKETS)
+        histogram.observe(seconds)
+        return True
+
+    def render(self):
+        """The metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, help):
+            lines.append('# HELP %s %s' % (name, help))
+            lines.append('# TYPE %s %s' % (name, kind))
+
+        def histogram(name, labels, hist):
+            for bound, count in hist.samples():
+                lines.append('%s_bucket%s %d' % (
+                    name, _format_labels(labels + [('le', bound)]), count))
+            lines.append('%s_sum%s %s' % (
+                name, _format_labels(labels), _format_number(hist.sum)))
+            lines.append('%s_count%s %d' % (
+                name, _format_labels(labels), hist.count))
+
+        name = 'jupyterlab_request_duration_seconds'
+        header(name, 'histogram', 'Latency of the Lab handlers.')
+        for (route, method), hist in sorted(self.latency.items()):
+            histogram(name, [('route', route), ('method', method)], hist)
+
+        name = 'jupyterlab_requests_total'
+        header(name, 'counter', 'Requests to the Lab handlers.')
+        for (route, method, status), count in sorted(self.requests.items()):
+            labels = [('route', route), ('method', method),
+                      ('status', str(status))]
+            lines.append('%s%s %d' % (name, _format_labels(labels), count))
+
+        name = 'jupyterlab_response_bytes_total'
+        header(name, 'counter', 'Body bytes written by the Lab handlers.')
+        for route, size in sorted(self.bytes_served.items()):
+            lines.append('%s%s %d' % (
+                name, _format_labels([('route', route)]), size))
+
+        name = 'jupyterlab_requests_in_flight'
+        header(name, 'gauge', 'Requests being handled by the Lab handlers.')
+        for route, count in sorted(self.in_flight.items()):
+            lines.append('%s%s %d' % (
+                name, _format_labels([('route', route)]), count))
+
+        caches = sorted(self.caches.items())
+        for suffix, kind, help in [
+                ('hits_total', 'counter', 'Hits of the Lab server caches.'),
+                ('misses_total', 'counter', 'Misses of the Lab server caches.'),
+                ('hit_ratio', 'gauge', 'Hit ratio of the Lab server caches.')]:
+            name = 'jupyterlab_cache_' + suffix
+            header(name, kind, help)
+            for cache_name, cache in caches:
+                hits, misses = cache.hits, cache.misses
+                if suffix == 'hits_total':
+                    value = hits
+                elif suffix == 'misses_total':
+                    value = misses
+                else:
+                    value = float(hits) / (hits + misses) if hits + misses else 0
+                lines.append('%s%s %s' % (
+                    name, _format_labels([('cache', cache_name)]),
+                    _format_number(value)))
+
+        name = 'jupyterlab_client_timing_seconds'
+        header(name, 'histogram', 'Page load timing marks reported by clients.')
+        for mark, hist in sorted(self.timings.items()):
+            histogram(name, [('mark', mark)], hist)
+
+        lines.append('')
+        return '\n'.join(lines)
+
+
+def _format_number(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{%s}' % ','.join(
+        '%s="%s"' % (key, value.replace('\\', r'\\').replace('"', r'\"'))
+        for key, value in labels)
+
+
+METRICS = Metrics()
+
+
+class InstrumentedMixin(object):
+    """Record the requests of a handler in `METRICS`.
+
+    Mixed into the Lab handlers by `instrument`, with `metrics_route` set
+    to the url pattern of the handler.
+    """
+
+    metrics_route = None
+
+    def prepare(self):
+        self._metrics_size = 0
+        self._metrics_open = True
+        METRICS.start_request(self.metrics_route)
+        return super(InstrumentedMixin, self).prepare()
+
+    def write(self, chunk):
+        if isinstance(chunk, dict):
+            self._metrics_count(len(utf8(json_encode(chunk))))
+        else:
+            chunk = utf8(chunk)
+            self._metrics_count(len(chunk))
+        super(InstrumentedMixin, self).write(chunk)
+
+    def on_finish(self):
+        self._metrics_close()
+        METRICS.record_request(self.metrics_route, self.request.method,
+                               self.get_status(), self.request.request_time(),
+                               getattr(self, '_metrics_size', 0))
+        super(InstrumentedMixin, self).on_finish()
+
+    def on_connection_close(self):
+        self._metrics_close()
+        super(InstrumentedMixin, self).on_connection_close()
+
+    def _metrics_count(self, size):
+        self._metrics_size = getattr(self, '_metrics_size', 0) + size
+
+    def _metrics_close(self):
+        # Requests refused before `prepare`, such as by the xsrf check,
+        # were never counted in flight.
+        if getattr(self, '_metrics_open', False):
+            self._metrics_open = False
+            METRICS.end_request(self.metrics_route)
+
+
+def instrument(handlers):
+    """Wrap the handlers of url specs with `InstrumentedMixin`.
+
+    Websocket handlers are left alone, since their requests last for the
+    whole connection.
+    """
+    instrumented = []
+    for spec in handlers:
+        pattern, handler = spec[0], spec[1]
+        if not issubclass(handler, WebSocketHandler):
+            handler = type(handler.__name__, (InstrumentedMixin, handler),
+                           {'metrics_route': pattern})
+        instrumented.append((pattern, handler) + tuple(spec[2:]))
+    return instrumented
+
+
+class MetricsHandler(APIHandler):
+    """Serve the metrics, and record the timing marks of clients.
+
+    A client posts `{"marks": {name: seconds}}`, with the seconds since
+    the start of the page load.
+    """
+
+    @web.authenticated
+    def get(self):
+        self.set_header('Content-Type', 'text/plain; version=0.0.4')
+        self.finish(METRICS.render())
+
+    @web.authenticated
+    @json_errors
+    def post(self):
+        body = self.get_json_body()
+        marks = body.get('marks') if isinstance(body, dict) else None
+        if not isinstance(marks, dict):
+            raise web.HTTPError(400, u'Timing marks must be an object')
+        for mark, seconds in marks.items():
+            if not isinstance(seconds, (int, float)) or seconds < 0:
+                raise web.HTTPError(400, u'Invalid timing for %s' % mark)
+            METRICS.record_timing(mark, seconds)
+        self.set_status(204)
+        self.finish()
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+default_handlers = [
+    (r"/api/metrics", MetricsHandler),
+]
@@ -0,0 +1,353 @@
+"""A websocket carrying the kernel and terminal connections of a page.
+
+A page with many notebooks, consoles and terminals would otherwise hold a
+websocket for each of them.  Here they are channels of one socket:
+
+- Text frames starting with `{` are control messages.  The client sends
+  `{"op": "open", "channel": n, "kind": "kernel", "id": kernel_id,
+  "session_id": ...}` or `{"op": "open", "channel": n, "kind": "terminal",
+  "id": name}`, `{"op": "close", "channel": n}` and `{"op": "ack",
+  "channel": n, "bytes": count}`.  The server sends `{"op": "opened",
+  "channel": n}` and `{"op": "closed", "channel": n, "reason": ...}`.
+- Other text frames are `<channel>:<message>`, where the message is what
+  the websocket of the kernel or terminal would carry.
+- Binary frames are a four byte big endian channel followed by a binary
+  kernel message, as the kernel websocket frames messages with buffers.
+
+Enable with the `lab_mux` tornado setting, for instance
+`c.NotebookApp.tornado_settings = {'lab_mux': True}`.
+"""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import struct
+
+from tornado import gen, web
+from tornado.websocket import WebSocketHandler
+
+from notebook.base.handlers import IPythonHandler
+from notebook.base.zmqhandlers import WebSocketMixin
+from notebook.services.kernels.handlers import ZMQChannelsHandler
+from jupyter_client.jsonutil import date_default
+from ipython_genutils.py3compat import cast_unicode
+
+from .terminal import FlowControl
+
+
+# The bytes of kernel messages sent on a channel but not yet acknowledged
+# by the client at which its iopub output is dropped, and below which it is
+# sent again.
+HIGH_WATERMARK = 1024 * 1024
+LOW_WATERMARK = 256 * 1024
+
+# The iopub messages which are always sent, as by the iopub rate limits,
+# so the client knows when the kernel is idle.
+UNLIMITED_TYPES = frozenset(['status', 'comm_open', 'execute_input'])
+
+DROPPED_OUTPUT = (
+    "Output is being dropped because the page is not keeping up with it.\n"
+    "Output is sent again once the page has caught up.\n")
+
+CHANNEL = struct.Struct('!I')
+
+
+class KernelChannel(ZMQChannelsHandler):
+    """The connection of a channel to a kernel.
+
+    This is the kernel websocket handler of the notebook server, with its
+    session replacement, iopub rate limits and buffering across reconnects,
+    writing to a channel instead of a websocket of its own.
+
+    It also drops iopub output while the client has not acknowledged more
+    than `HIGH_WATERMARK` bytes, until they drop below `LOW_WATERMARK`, and
+    tells the client as the rate limits do.  The kernel is never paused,
+    since reading slower from its iopub socket would make zmq drop messages
+    instead, including the status messages.
+    """
+
+    def __init__(self, mux, channel, kernel_id, session_id):
+        # Channels are not requests of their own, so RequestHandler.__init__
+        # is skipped: it would take over the connection of the socket.
+        self.application = mux.application
+        self.request = mux.request
+        self.mux = mux
+        self.channel = channel
+        self._arguments = {'session_id': session_id}
+        self._opened = False
+        self._closed = False
+        self._unacked = 0
+        self._dropping = False
+        self.initialize()
+        self.kernel_id = cast_unicode(kernel_id, 'ascii')
+
+    @property
+    def ws_connection(self):
+        return None if self._closed else self.mux.ws_connection
+
+    @property
+    def ping_interval(self):
+        # The multiplexed socket is pinged instead.
+        return 0
+
+    def get_current_user(self):
+        # The multiplexed socket is authenticated.
+        return self.mux.current_user
+
+    def get_argument(self, name, default=None, strip=True):
+        return self._arguments.get(name) or default
+
+    @gen.coroutine
+    def connect(self):
+        """Connect to the kernel, as the handler does before it opens."""
+        yield gen.maybe_future(self.pre_get())
+
+    def start(self):
+        self._opened = True
+        self.open(self.kernel_id)
+
+    def write_message(self, message, binary=False):
+        if self.mux.send(self.channel, message):
+            self._unacked += len(message)
+
+    def acknowledge(self, count):
+        self._unacked = max(self._unacked - count, 0)
+        if self._dropping and self._unacked < LOW_WATERMARK:
+            self._dropping = False
+            self.mux.log.warning("iopub messages resumed on channel %d",
+                                 self.channel)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            if self._opened:
+                self.on_close()
+            sessions = getattr(self, '_open_sessions', {})
+            if sessions.get(getattr(self, 'session_key', None)) is self:
+                del sessions[self.session_key]
+            future = getattr(self, '_close_future', None)
+            if future is not None and not future.done():
+                future.set_result(None)
+            self.mux.channel_closed(self.channel, 'closed')
+        return getattr(self, '_close_future', None)
+
+    def on_kernel_restarted(self):
+        self.mux.log.warning("kernel %s restarted", self.kernel_id)
+        self._send_status_message('restarting')
+
+    def on_restart_failed(self):
+        self.mux.log.error("kernel %s restarted failed!", self.kernel_id)
+        self._send_status_message('dead')
+
+    def _on_zmq_reply(self, stream, msg_list):
+        channel = getattr(stream, 'channel', None)
+        if channel == 'iopub' and (self._dropping or
+                                   self._unacked > HIGH_WATERMARK):
+            # Only the header is read, the message is deserialized once it
+            # is sent, and deserializing twice fails the signature check.
+            idents, fed_msg_list = self.session.feed_identities(msg_list)
+            header = self.session.unpack(fed_msg_list[1])
+            if header.get('msg_type') not in UNLIMITED_TYPES:
+                if not self._dropping:
+                    self._dropping = True
+                    parent = self.session.unpack(fed_msg_list[2])
+                    self._write_stderr(DROPPED_OUTPUT, parent)
+                return
+        super(KernelChannel, self)._on_zmq_reply(stream, msg_list)
+
+    def _write_stderr(self, text, parent):
+        self.mux.log.warning("Dropping iopub messages on channel %d",
+                             self.channel)
+        msg = self.session.msg('stream', parent=parent,
+                               content={'name': 'stderr', 'text': text})
+        msg['channel'] = 'iopub'
+        self.write_message(json.dumps(msg, default=date_default))
+
+
+class TerminalChannel(FlowControl):
+    """The connection of a channel to a terminal.
+
+    The channel carries the messages of the flow-controlled terminal
+    websocket, including its `["ack", n]` replies.
+    """
+
+    def __init__(self, mux, channel, name):
+        self.mux = mux
+        self.channel = channel
+        self.name = name
+        self.term_manager = mux.settings.get('terminal_manager')
+        self.terminal = None
+        self.size = (None, None)
+        self.init_flow()
+
+    def connect(self):
+        if self.term_manager is None:
+            raise web.HTTPError(404, u'Terminals are not available')
+        self.terminal = self.term_manager.get_terminal(self.name)
+
+    def start(self):
+        for text in self.terminal.read_buffer:
+            self.on_pty_read(text)
+        self.terminal.clients.append(self)
+        self.send_json_message(['setup', {}])
+
+    def is_connected(self):
+        return self.mux.ws_connection is not None
+
+    def send_json_message(self, content):
+        self.mux.send(self.channel, json.dumps(content))
+
+    def on_message(self, message):
+        command = json.loads(message)
+        if command[0] == 'ack':
+            self.on_ack(int(command[1]))
+        elif command[0] == 'stdin':
+            self.terminal.ptyproc.write(command[1])
+        elif command[0] == 'set_size':
+            self.size = command[1:3]
+            self.terminal.resize_to_smallest()
+
+    def acknowledge(self, count):
+        # Terminal output is acknowledged in the terminal messages.
+        pass
+
+    def on_pty_died(self):
+        self._flush()
+        self.send_json_message(['disconnect', 1])
+        self.close()
+
+    def close(self):
+        self.stop_flow()
+        if self.terminal is not None:
+            if self in self.terminal.clients:
+                self.terminal.clients.remove(self)
+            self.terminal.resize_to_smallest()
+            self.terminal = None
+        self.mux.channel_closed(self.channel, 'closed')
+
+
+class MuxHandler(WebSocketMixin, IPythonHandler, WebSocketHandler):
+    """A websocket multiplexing kernel and terminal channels."""
+
+    def initialize(self):
+        self.channels = {}
+
+    def get(self, *args, **kwargs):
+        if not self.get_current_user():
+            raise web.HTTPError(403)
+        return super(MuxHandler, self).get(*args, **kwargs)
+
+    def on_message(self, message):
+        if isinstance(message, bytes):
+            if len(message) < CHANNEL.size:
+                self.log.warning("Invalid mux frame of %d bytes", len(message))
+                return
+            channel = CHANNEL.unpack_from(message)[0]
+            data = message[CHANNEL.size:]
+        elif message.startswith(u'{'):
+            self._on_control(message)
+            return
+        else:
+            channel, _, data = message.partition(u':')
+            try:
+                channel = int(channel)
+            except ValueError:
+                self.log.warning("Invalid mux frame: %r", message[:80])
+                return
+        target = self.channels.get(channel)
+        if target is None:
+            self.log.debug("Message for closed channel %d", channel)
+            return
+        try:
+            target.on_message(data)
+        except Exception:
+            self.log.error("Error relaying a message on channel %d", channel,
+                           exc_info=True)
+
+    def on_close(self):
+        channels = list(self.channels.values())
+        self.channels.clear()
+        for target in channels:
+            target.close()
+
+    def send(self, channel, data):
+        """Send a message on a channel.
+
+        Returns whether the message was sent.
+        """
+        if self.ws_connection is None or channel not in self.channels:
+            return False
+        if isinstance(data, bytes):
+            self.write_message(CHANNEL.pack(channel) + data, binary=True)
+        else:
+            self.write_message(u'%d:%s' % (channel, data))
+        return True
+
+    def channel_closed(self, channel, reason):
+        """Remove a channel closed on the server side, and tell the client."""
+        if self.channels.pop(channel, None) is not None:
+            self._send_control(op='closed', channel=channel, reason=reason)
+
+    def _on_control(self, message):
+        try:
+            msg = json.loads(message)
+            op = msg['op']
+            channel = int(msg['channel'])
+        except (ValueError, KeyError, TypeError):
+            self.log.warning("Invalid mux control message: %r", message[:80])
+            return
+        if op == 'open':
+            self._open(channel, msg)
+        elif op == 'close':
+            target = self.channels.pop(channel, None)
+            if target is not None:
+                target.close()
+        elif op == 'ack':
+            target = self.channels.get(channel)
+            if target is not None:
+                target.acknowledge(int(msg.get('bytes', 0)))
+
+    @gen.coroutine
+    def _open(self, channel, msg):
+        if channel in self.channels:
+            self.log.warning("Mux channel %d is already open", channel)
+            return
+        kind = msg.get('kind')
+        if kind == 'kernel':
+            target = KernelChannel(self, channel, msg.get('id'),
+                                   msg.get('session_id'))
+        elif kind == 'terminal':
+            target = TerminalChannel(self, channel, msg.get('id'))
+        else:
+            self._send_control(op='closed', channel=channel,
+                               reason='unknown kind')
+            return
+        self.channels[channel] = target
+        try:
+            yield gen.maybe_future(target.connect())
+        except Exception as e:
+            self.log.warning("Cannot open %s channel to %r: %s",
+                             kind, msg.get('id'), e)
+            self.channel_closed(channel, str(e))
+            target.close()
+            return
+        if self.channels.get(channel) is not target:
+            # Closed while connecting.
+            target.close()
+            return
+        self._send_control(op='opened', channel=channel)
+        target.start()
+
+    def _send_control(self, **msg):
+        if self.ws_connection is not None:
+            self.write_message(json.dumps(msg))
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+default_handlers = [
+    (r"/api/mux", MuxHandler),
+]
@@ -0,0 +1,67 @@
+"""Caches for the compiled and rendered Lab page."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import hashlib
+import time
+from collections import OrderedDict
+
+
+class TemplateCache(object):
+    """Compiled jinja templates, reloaded when their source changes."""
+
+    def __init__(self, loader):
+        self.loader = loader
+        self._templates = {}
+
+    def get(self, environment, name):
+        key = (id(environment), name)
+        template = self._templates.get(key)
+        if template is None or not template.is_up_to_date:
+            template = self.loader.load(environment, name)
+            self._templates[key] = template
+        return template
+
+
+class CachedPage(object):
+    """A rendered page with its validators."""
+
+    def __init__(self, body):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        self.last_modified = int(time.time())
+
+
+class PageCache(object):
+    """A bounded LRU cache of rendered pages.
+
+    Keys must cover every input that varies between renders.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._pages = OrderedDict()
+
+    def __len__(self):
+        return len(self._pages)
+
+    def get(self, key, render):
+        """Get the page for a key, calling `render()` on a miss."""
+        page = self._pages.pop(key, None)
+        if page is None:
+            self.misses += 1
+            page = CachedPage(render())
+            while len(self._pages) >= self.max_size:
+                self._pages.popitem(last=False)
+        else:
+            self.hits += 1
+        self._pages[key] = page
+        return page
+
+    def clear(self):
+        self._pages.clear()
@@ -0,0 +1,220 @@
+"""Tornado handlers for saving notebooks with a JSON patch."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import zlib
+
+from tornado import gen, locks, web
+
+from notebook.base.handlers import APIHandler, json_errors, path_regex
+from jupyter_client.jsonutil import date_default
+
+
+class PatchError(ValueError):
+    """A patch does not apply to a document."""
+
+
+def _parse_pointer(pointer):
+    """Split a JSON pointer into its unescaped parts."""
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise PatchError('Invalid pointer: %r' % pointer)
+    return [part.replace('~1', '/').replace('~0', '~')
+            for part in pointer.split('/')[1:]]
+
+
+def _index(container, part, allow_end=False):
+    """The list index named by a pointer part."""
+    if allow_end and part == '-':
+        return len(container)
+    if not part.isdigit() or (len(part) > 1 and part[0] == '0'):
+        raise PatchError('Invalid index: %r' % part)
+    index = int(part)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError('Index out of range: %r' % part)
+    return index
+
+
+def apply_patch(document, patch):
+    """Apply the `add`, `remove` and `replace` operations of a JSON patch.
+
+    The document is changed in place, and the new root is returned since
+    an operation on the root replaces it.  Raises `PatchError` if the
+    patch does not apply.
+    """
+    for op in patch:
+        try:
+            kind = op['op']
+            parts = _parse_pointer(op['path'])
+        except (KeyError, TypeError):
+            raise PatchError('Invalid operation: %r' % (op,))
+        if kind not in ('add', 'remove', 'replace'):
+            raise PatchError('Unsupported operation: %r' % kind)
+        if kind != 'remove' and 'value' not in op:
+            raise PatchError('Operation without a value: %r' % (op,))
+        if not parts:
+            if kind == 'remove':
+                raise PatchError('Cannot remove the document')
+            document = op['value']
+            continue
+
+        parent = document
+        for part in parts[:-1]:
+            try:
+                if isinstance(parent, list):
+                    parent = parent[_index(parent, part)]
+                else:
+                    parent = parent[part]
+            except (KeyError, TypeError):
+                raise PatchError('No such path: %r' % op['path'])
+        last = parts[-1]
+        if isinstance(parent, list):
+            index = _index(parent, last, allow_end=(kind == 'add'))
+            if kind == 'add':
+                parent.insert(index, op['value'])
+            elif kind == 'remove':
+                del parent[index]
+            else:
+                parent[index] = op['value']
+        elif isinstance(parent, dict):
+            if kind != 'add' and last not in parent:
+                raise PatchError('No such path: %r' % op['path'])
+            if kind == 'remove':
+                del parent[last]
+            else:
+                parent[last] = op['value']
+        else:
+            raise PatchError('No such path: %r' % op['path'])
+    return document
+
+
+def content_hash(content):
+    """Hash a JSON document as the client does before patching it.
+
+    This is the byte length and CRC-32 of the UTF-8 encoded JSON of the
+    document with sorted keys and no whitespace, as `<length>:<crc>`.
+    """
+    text = json.dumps(content, sort_keys=True, separators=(',', ':'),
+                      ensure_ascii=False)
+    if not isinstance(text, bytes):
+        text = text.encode('utf-8')
+    return '%d:%08x' % (len(text), zlib.crc32(text) & 0xffffffff)
+
+
+def notebook_hash(content):
+    """Hash a notebook as the client does before patching it.
+
+    This is the `content_hash` of the notebook without the `trusted`
+    metadata of its cells.  The contents manager marks every code cell as
+    trusted or not when it reads a notebook, while the client only marks
+    the cells it ran, and the mark does not change what is written.
+    """
+    cells = content.get('cells') if isinstance(content, dict) else None
+    if not isinstance(cells, list):
+        return content_hash(content)
+    stripped = dict(content)
+    stripped['cells'] = []
+    for cell in cells:
+        metadata = cell.get('metadata') if isinstance(cell, dict) else None
+        if isinstance(metadata, dict) and 'trusted' in metadata:
+            cell = dict(cell)
+            cell['metadata'] = dict(metadata)
+            del cell['metadata']['trusted']
+        stripped['cells'].append(cell)
+    return content_hash(stripped)
+
+
+class PathLocks(object):
+    """Locks held while a path is read, patched and written."""
+
+    def __init__(self):
+        # The lock of each path and the number of patches holding it or
+        # waiting for it, so unused locks are dropped.
+        self._locks = {}
+
+    @gen.coroutine
+    def acquire(self, path):
+        entry = self._locks.get(path)
+        if entry is None:
+            entry = self._locks[path] = [locks.Lock(), 0]
+        entry[1] += 1
+        yield entry[0].acquire()
+
+    def release(self, path):
+        entry = self._locks[path]
+        entry[0].release()
+        entry[1] -= 1
+        if not entry[1]:
+            del self._locks[path]
+
+
+class PatchHandler(APIHandler):
+    """Save a notebook by patching the last saved revision.
+
+    The body is `{"revision": ..., "hash": ..., "patch": [...]}`, where
+    `revision` is the `last_modified` time of the revision the patch was
+    made against and `hash` is the `notebook_hash` of the document it was
+    made against.  Replies `409` if the notebook changed since that
+    revision, reads as a different document than the patch was made
+    against, or the patch does not apply, so the client can fall back to a
+    full save.  The patched notebook is validated and written by the
+    contents manager, as for a full save.
+
+    Patches of a path are applied one at a time, so a patch is not made
+    against a revision another patch is replacing.
+    """
+
+    _locks = PathLocks()
+
+    @web.authenticated
+    @json_errors
+    @gen.coroutine
+    def patch(self, path=''):
+        path = (path or '').strip('/')
+        body = self.get_json_body()
+        if not body or not all(key in body for key in
+                               ('revision', 'hash', 'patch')):
+            raise web.HTTPError(400, u'A patch needs a revision, a hash '
+                                     u'and a patch')
+
+        yield self._locks.acquire(path)
+        try:
+            model = yield self._patch(path, body)
+        finally:
+            self._locks.release(path)
+        self.finish(json.dumps(model, default=date_default))
+
+    @gen.coroutine
+    def _patch(self, path, body):
+        cm = self.contents_manager
+        model = yield gen.maybe_future(cm.get(path, type='notebook'))
+        revision = json.loads(json.dumps(model['last_modified'],
+                                         default=date_default))
+        if revision != body['revision']:
+            raise web.HTTPError(409, u'%s has changed since revision %s' %
+                                (path, body['revision']))
+        if notebook_hash(model['content']) != body['hash']:
+            raise web.HTTPError(409, u'%s differs from the document the '
+                                     u'patch was made against' % path)
+        # The patch applies to the trusted marks of the cells as read, which
+        # are all there, so the notebook is signed as after a full save.
+        try:
+            content = apply_patch(model['content'], body['patch'])
+        except PatchError as e:
+            raise web.HTTPError(409, u'Cannot patch %s: %s' % (path, e))
+
+        model = yield gen.maybe_future(cm.save(
+            dict(type='notebook', format='json', content=content), path))
+        raise gen.Return(model)
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+default_handlers = [
+    (r"/api/patch%s" % path_regex, PatchHandler),
+]
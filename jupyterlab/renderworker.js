@@ -0,0 +1,6 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+// The render worker, which sanitizes outputs and converts Markdown off
+// the main thread.
+require('jupyterlab/lib/rendermime/worker');
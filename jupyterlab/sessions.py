@@ -0,0 +1,82 @@
+"""Tornado handlers for the running sessions of a directory."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import sqlite3
+import weakref
+
+from tornado import gen, web
+
+from notebook.base.handlers import APIHandler, json_errors, path_regex
+from jupyter_client.jsonutil import date_default
+
+
+# The directory of a session path, with a trailing slash, or '' at the root.
+# Trimming the characters of the path other than '/' from its end leaves its
+# directory.  The session table of the notebook server is filled without
+# column names, so the directory is an indexed expression, not a column.
+_DIR = "rtrim(path, replace(path, '/', ''))"
+
+# The session managers whose table has the directory index.
+_indexed = weakref.WeakSet()
+
+
+def _cursor(session_manager):
+    """The session table cursor, with an index on the session directories.
+
+    SQLite before 3.9 cannot index expressions, and then the query scans
+    the table.
+    """
+    cursor = session_manager.cursor
+    if session_manager not in _indexed:
+        try:
+            cursor.execute("CREATE INDEX IF NOT EXISTS session_dir "
+                           "ON session (%s)" % _DIR)
+        except sqlite3.OperationalError:
+            pass
+        _indexed.add(session_manager)
+    return cursor
+
+
+@gen.coroutine
+def directory_sessions(session_manager, path):
+    """The models of the sessions of the files directly in a directory.
+
+    The rows are looked up in the directory index, so the cost does not
+    grow with the number of sessions elsewhere on the server.
+    """
+    cursor = _cursor(session_manager)
+    cursor.execute("SELECT * FROM session WHERE %s = ?" % _DIR,
+                   (path + '/' if path else '',))
+    models = []
+    for row in cursor.fetchall():
+        try:
+            model = yield gen.maybe_future(session_manager.row_to_model(row))
+        except KeyError:
+            # The kernel is gone, and the session was removed.
+            continue
+        models.append(model)
+    raise gen.Return(models)
+
+
+class DirectorySessionsHandler(APIHandler):
+    """List the running sessions of the files in a directory."""
+
+    @web.authenticated
+    @json_errors
+    @gen.coroutine
+    def get(self, path=''):
+        models = yield directory_sessions(self.session_manager,
+                                          (path or '').strip('/'))
+        self.finish(json.dumps(models, default=date_default))
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+default_handlers = [
+    (r"/api/sessions%s" % path_regex, DirectorySessionsHandler),
+]
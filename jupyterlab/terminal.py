@@ -0,0 +1,152 @@
+"""Tornado handlers for flow-controlled terminal websockets."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+
+from tornado import web
+from tornado.ioloop import IOLoop
+
+try:
+    from notebook.terminal.handlers import TermSocket
+except ImportError:
+    # Terminals need terminado, which is not available everywhere.
+    TermSocket = None
+
+
+# Output is sent at most this often, in seconds, or when a frame is full.
+FRAME_DELAY = 0.01
+FRAME_SIZE = 64 * 1024
+
+# The characters sent but not yet acknowledged by the client at which the
+# terminal is paused, and below which it is resumed.
+HIGH_WATERMARK = 1024 * 1024
+LOW_WATERMARK = 256 * 1024
+
+
+def _set_paused(terminal, client, paused):
+    """Pause or resume reading from a terminal for a client.
+
+    A terminal is read while none of its clients is behind, so a slow
+    client holds up the process writing to the terminal instead of the
+    server buffering its output.
+    """
+    clients = getattr(terminal, 'paused_by', None)
+    if clients is None:
+        clients = terminal.paused_by = set()
+    was_paused = bool(clients)
+    if paused:
+        clients.add(client)
+    else:
+        clients.discard(client)
+    if bool(clients) == was_paused:
+        return
+    fd = terminal.ptyproc.fd
+    if fd not in client.term_manager.ptys_by_fd:
+        # The terminal is closed.
+        return
+    loop = IOLoop.current()
+    loop.update_handler(fd, 0 if clients else loop.READ)
+
+
+class FlowControl(object):
+    """Batched terminal output with backpressure, for a terminal client.
+
+    Output read from the terminal is coalesced into frames of up to
+    `FRAME_SIZE` characters, sent every `FRAME_DELAY` seconds.  The client
+    replies `["ack", n]` when it has written `n` characters, and reading
+    from the terminal stops while more than `HIGH_WATERMARK` characters are
+    unacknowledged, until they drop below `LOW_WATERMARK`.
+
+    Clients have `terminal` and `term_manager` attributes, and implement
+    `send_json_message` and `is_connected`.
+    """
+
+    def init_flow(self):
+        self._frames = []
+        self._frame_size = 0
+        self._flush_handle = None
+        self._unacked = 0
+
+    def on_pty_read(self, text):
+        self._frames.append(text)
+        self._frame_size += len(text)
+        if self._frame_size >= FRAME_SIZE:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = IOLoop.current().call_later(
+                FRAME_DELAY, self._flush)
+
+    def on_ack(self, count):
+        self._unacked = max(self._unacked - count, 0)
+        if self._unacked < LOW_WATERMARK and self.terminal:
+            _set_paused(self.terminal, self, False)
+
+    def stop_flow(self):
+        self._cancel_flush()
+        if self.terminal:
+            _set_paused(self.terminal, self, False)
+
+    def _flush(self):
+        self._cancel_flush()
+        if not self._frames or not self.is_connected():
+            return
+        text = ''.join(self._frames)
+        self._frames = []
+        self._frame_size = 0
+        self.send_json_message(['stdout', text])
+        self._unacked += len(text)
+        if self._unacked > HIGH_WATERMARK and self.terminal:
+            _set_paused(self.terminal, self, True)
+
+    def _cancel_flush(self):
+        if self._flush_handle is not None:
+            IOLoop.current().remove_timeout(self._flush_handle)
+            self._flush_handle = None
+
+
+if TermSocket is not None:
+
+    class FlowTermSocket(FlowControl, TermSocket):
+        """A terminal websocket with batched output and backpressure."""
+
+        def initialize(self, term_manager=None):
+            manager = term_manager or self.settings.get('terminal_manager')
+            super(FlowTermSocket, self).initialize(manager)
+            self.init_flow()
+
+        def get(self, *args, **kwargs):
+            if self.term_manager is None:
+                raise web.HTTPError(404, u'Terminals are not available')
+            return super(FlowTermSocket, self).get(*args, **kwargs)
+
+        def is_connected(self):
+            return self.ws_connection is not None
+
+        def on_message(self, message):
+            command = json.loads(message)
+            if command[0] == 'ack':
+                self.on_ack(int(command[1]))
+                return
+            super(FlowTermSocket, self).on_message(message)
+
+        def on_pty_died(self):
+            self._flush()
+            super(FlowTermSocket, self).on_pty_died()
+
+        def on_close(self):
+            self.stop_flow()
+            super(FlowTermSocket, self).on_close()
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+if TermSocket is not None:
+    default_handlers = [
+        (r"/api/terminals/websocket/(\w+)", FlowTermSocket),
+    ]
+else:
+    default_handlers = []
@@ -0,0 +1,129 @@
+"""Tests for the chunked uploads."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import TestCase
+
+from tornado import web
+from tornado.testing import AsyncHTTPTestCase
+
+from notebook.services.contents.filemanager import FileContentsManager
+
+from jupyterlab.upload import (
+    ChunkHandler, UPLOAD_DIR, UploadManager
+)
+
+
+class UploadTestCase(TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.contents_manager = FileContentsManager(root_dir=self.root)
+        self.manager = UploadManager(max_age=60)
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def create(self, manager=None, path='data.bin', size=2500, key='a'):
+        manager = manager or self.manager
+        return manager.create(self.contents_manager, 'user', path, size, key,
+                              1024)
+
+    def write(self, upload, index, data):
+        with open(upload.part_path, 'r+b') as f:
+            f.seek(index * upload.chunk_size)
+            f.write(data)
+        upload.received.add(index)
+        upload.save()
+
+    def test_part_files_in_upload_dir(self):
+        os.mkdir(os.path.join(self.root, 'sub'))
+        upload = self.create(path='sub/data.bin')
+        directory = os.path.join(self.root, UPLOAD_DIR)
+        self.assertEqual(os.path.dirname(upload.part_path), directory)
+        self.assertEqual(os.listdir(os.path.join(self.root, 'sub')), [])
+        self.assertEqual(os.path.getsize(upload.part_path), 2500)
+
+    def test_finish(self):
+        upload = self.create()
+        data = os.urandom(2500)
+        for index in range(upload.chunks):
+            self.write(upload, index, data[index * 1024:(index + 1) * 1024])
+        upload.finish()
+        with open(os.path.join(self.root, 'data.bin'), 'rb') as f:
+            self.assertEqual(f.read(), data)
+        self.assertEqual(os.listdir(os.path.join(self.root, UPLOAD_DIR)), [])
+
+    def test_finish_missing_chunks(self):
+        upload = self.create()
+        self.write(upload, 0, b'x' * 1024)
+        with self.assertRaises(web.HTTPError) as cm:
+            upload.finish()
+        self.assertEqual(cm.exception.status_code, 400)
+
+    def test_resume(self):
+        upload = self.create()
+        self.assertIs(self.create(), upload)
+        self.write(upload, 1, b'x' * 1024)
+        # A new server resumes from the state file.
+        resumed = self.create(manager=UploadManager())
+        self.assertEqual(resumed.received, set([1]))
+        self.assertNotEqual(self.create(key='b').id, upload.id)
+
+    def test_existing_file(self):
+        open(os.path.join(self.root, 'data.bin'), 'w').close()
+        with self.assertRaises(web.HTTPError) as cm:
+            self.create()
+        self.assertEqual(cm.exception.status_code, 409)
+
+    def test_sweep_files(self):
+        upload = self.create()
+        directory = os.path.dirname(upload.part_path)
+        old = time.time() - 120
+        stale = os.path.join(directory, 'f00.part')
+        recent = os.path.join(directory, 'f01.part')
+        for path in (stale, recent):
+            open(path, 'w').close()
+        for path in (stale, upload.part_path, upload.state_path):
+            os.utime(path, (old, old))
+        self.manager.sweep_files(directory)
+        self.assertEqual(sorted(os.listdir(directory)), sorted([
+            'f01.part', upload.id + '.part', upload.id + '.json']))
+
+    def test_sweep(self):
+        upload = self.create()
+        upload.touched = time.time() - 120
+        self.manager.start(self.contents_manager)
+        try:
+            self.manager.sweep()
+        finally:
+            self.manager.stop()
+        self.assertFalse(os.path.exists(upload.part_path))
+        with self.assertRaises(web.HTTPError):
+            self.manager.get(upload.id)
+
+
+class ChunkHandlerTest(AsyncHTTPTestCase):
+
+    def get_app(self):
+        class Handler(ChunkHandler):
+            def get_current_user(self):
+                return 'user'
+
+        self.manager = UploadManager()
+        return web.Application([
+            (r"/api/uploads/(?P<upload_id>[0-9a-f]+)/(?P<index>\d+)",
+             Handler, {'manager': self.manager}),
+        ])
+
+    def test_unknown_upload(self):
+        response = self.fetch('/api/uploads/abc/0', method='PUT', body=b'x')
+        self.assertEqual(response.code, 404)
+        self.assertEqual(response.headers['Content-Type'], 'application/json')
+        self.assertIn('abc', json.loads(response.body.decode('utf-8'))['message'])
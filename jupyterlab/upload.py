@@ -0,0 +1,372 @@
+"""Tornado handlers for chunked, resumable uploads."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import errno
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from tornado import gen, ioloop, web
+from tornado.log import app_log
+
+from notebook.base.handlers import APIHandler, json_errors
+from jupyter_client.jsonutil import date_default
+
+
+CHUNK_SIZE = 4 * 1024 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# The directory of the part files under the contents root.  It is hidden,
+# so it does not show up in listings.
+UPLOAD_DIR = '.~uploads'
+
+# Seconds without a chunk after which an upload is abandoned, and between
+# sweeps for abandoned uploads.
+MAX_AGE = 24 * 60 * 60
+SWEEP_INTERVAL = 60 * 60
+
+# Atomic rename over an existing file, where Python has it.
+replace = getattr(os, 'replace', os.rename)
+
+
+class Upload(object):
+    """An upload in progress.
+
+    The chunks are written straight into a part file in the upload
+    directory of the contents root, so finishing the upload is a rename,
+    which is atomic unless the target is on another filesystem.  The
+    indices of the received chunks are kept in a state file next to it,
+    so an upload can be resumed after a disconnect or a restart.
+    """
+
+    def __init__(self, upload_id, path, os_path, size, chunk_size, directory):
+        self.id = upload_id
+        self.path = path
+        self.os_path = os_path
+        self.size = size
+        self.chunk_size = chunk_size
+        self.received = set()
+        self.touched = time.time()
+        self.part_path = os.path.join(directory, upload_id + '.part')
+        self.state_path = os.path.join(directory, upload_id + '.json')
+
+    @property
+    def chunks(self):
+        return (self.size + self.chunk_size - 1) // self.chunk_size
+
+    def chunk_length(self, index):
+        return min(self.chunk_size, self.size - index * self.chunk_size)
+
+    def open(self):
+        """Resume the upload from its files, or start it."""
+        if os.path.exists(self.part_path) and os.path.exists(self.state_path):
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+            except ValueError:
+                state = {}
+            if (state.get('size') == self.size and
+                    state.get('chunk_size') == self.chunk_size):
+                self.received = set(state['received'])
+                return
+        with open(self.part_path, 'wb') as f:
+            # Allocate the whole file, so chunks can arrive in any order.
+            f.truncate(self.size)
+        self.received = set()
+        self.save()
+
+    def save(self):
+        """Write the state file."""
+        state = dict(path=self.path, size=self.size,
+                     chunk_size=self.chunk_size, received=sorted(self.received))
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        replace(tmp_path, self.state_path)
+
+    def finish(self):
+        """Move the complete file into place."""
+        missing = self.chunks - len(self.received)
+        if missing:
+            raise web.HTTPError(400, u'Upload %s is missing %i chunks' %
+                                (self.id, missing))
+        try:
+            replace(self.part_path, self.os_path)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            shutil.move(self.part_path, self.os_path)
+        os.remove(self.state_path)
+
+    def cancel(self):
+        """Remove the files of the upload."""
+        for path in (self.part_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def model(self):
+        return dict(
+            id=self.id,
+            path=self.path,
+            size=self.size,
+            chunk_size=self.chunk_size,
+            chunks=self.chunks,
+            received=sorted(self.received),
+        )
+
+
+class UploadManager(object):
+    """The uploads in progress, by id.
+
+    An upload id is derived from the user, the target path, the size and a
+    key chosen by the client, so starting the same upload again resumes it.
+
+    Once started, every `sweep_interval` seconds the uploads without a chunk
+    for `max_age` seconds are cancelled, and the files in the upload
+    directory which are that old and belong to no upload are removed.  They
+    are left by uploads abandoned before the server started.
+    """
+
+    def __init__(self, max_age=MAX_AGE, sweep_interval=SWEEP_INTERVAL):
+        self.max_age = max_age
+        self.sweep_interval = sweep_interval
+        self._uploads = {}
+        self._directories = set()
+        self._sweeper = None
+
+    def start(self, contents_manager):
+        """Sweep abandoned uploads periodically."""
+        if self._sweeper is not None:
+            return
+        directory = self.directory(contents_manager)
+        if directory is not None:
+            self._directories.add(directory)
+        self._sweeper = ioloop.PeriodicCallback(
+            self.sweep, self.sweep_interval * 1000)
+        self._sweeper.start()
+
+    def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.stop()
+            self._sweeper = None
+
+    def directory(self, contents_manager):
+        """The upload directory of a contents manager.
+
+        This is `None` if the contents manager does not keep its files on
+        disk.
+        """
+        get_os_path = getattr(contents_manager, '_get_os_path', None)
+        if get_os_path is None:
+            return None
+        return os.path.join(get_os_path(''), UPLOAD_DIR)
+
+    def sweep(self):
+        """Cancel the uploads without a chunk for `max_age` seconds, and
+        remove the files of abandoned uploads."""
+        now = time.time()
+        for upload_id, upload in list(self._uploads.items()):
+            if now - upload.touched > self.max_age:
+                app_log.info("Cancelling abandoned upload of %s", upload.path)
+                upload.cancel()
+                del self._uploads[upload_id]
+        for directory in self._directories:
+            self.sweep_files(directory)
+
+    def sweep_files(self, directory):
+        """Remove the files of an upload directory which belong to no
+        upload and were not changed for `max_age` seconds."""
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        now = time.time()
+        for name in names:
+            upload_id = name.split('.', 1)[0]
+            if upload_id in self._uploads:
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(path) > self.max_age:
+                    app_log.info("Removing the file of an abandoned upload: "
+                                 "%s", path)
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def create(self, contents_manager, user, path, size, key, chunk_size,
+               overwrite=False):
+        upload_dir = self.directory(contents_manager)
+        if upload_dir is None:
+            raise web.HTTPError(501, u'Chunked uploads need files on disk')
+        directory = path.rpartition('/')[0]
+        if not contents_manager.dir_exists(directory):
+            raise web.HTTPError(404, u'No such directory: %s' % directory)
+        if contents_manager.dir_exists(path):
+            raise web.HTTPError(400, u'%s is a directory' % path)
+        if not overwrite and contents_manager.file_exists(path):
+            raise web.HTTPError(409, u'%s already exists' % path)
+
+        digest = hashlib.sha1(json.dumps(
+            [user, path, size, key, chunk_size]).encode('utf-8'))
+        upload_id = digest.hexdigest()[:24]
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            if not os.path.isdir(upload_dir):
+                os.makedirs(upload_dir)
+            self._directories.add(upload_dir)
+            upload = Upload(upload_id, path,
+                            contents_manager._get_os_path(path), size,
+                            chunk_size, upload_dir)
+            upload.open()
+            self._uploads[upload_id] = upload
+        upload.touched = time.time()
+        return upload
+
+    def get(self, upload_id):
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise web.HTTPError(404, u'No such upload: %s' % upload_id)
+        return upload
+
+    def remove(self, upload_id):
+        self._uploads.pop(upload_id, None)
+
+
+class UploadsHandler(APIHandler):
+    """Start or resume an upload.
+
+    The body is `{"path", "size", "key", "chunk_size", "overwrite"}`, where
+    `key` identifies the client's file, e.g. from its name and time.  The
+    reply lists the chunks the server already has.
+    """
+
+    def initialize(self, manager):
+        self.manager = manager
+
+    @web.authenticated
+    @json_errors
+    def post(self):
+        model = self.get_json_body()
+        if not model or 'path' not in model or 'size' not in model:
+            raise web.HTTPError(400, u'An upload needs a path and a size')
+        path = model['path'].strip('/')
+        size = int(model['size'])
+        if size < 0:
+            raise web.HTTPError(400, u'Invalid size: %i' % size)
+        chunk_size = int(model.get('chunk_size') or CHUNK_SIZE)
+        chunk_size = min(max(chunk_size, 1024), MAX_CHUNK_SIZE)
+        upload = self.manager.create(
+            self.contents_manager, self.current_user, path, size,
+            model.get('key'), chunk_size, bool(model.get('overwrite')))
+        self.set_status(201)
+        self.finish(json.dumps(upload.model()))
+
+
+class UploadHandler(APIHandler):
+    """Get the state of, finish or cancel an upload."""
+
+    def initialize(self, manager):
+        self.manager = manager
+
+    @web.authenticated
+    @json_errors
+    def get(self, upload_id):
+        self.finish(json.dumps(self.manager.get(upload_id).model()))
+
+    @web.authenticated
+    @json_errors
+    def post(self, upload_id):
+        upload = self.manager.get(upload_id)
+        upload.finish()
+        self.manager.remove(upload_id)
+        model = self.contents_manager.get(upload.path, content=False)
+        self.set_status(201)
+        self.finish(json.dumps(model, default=date_default))
+
+    @web.authenticated
+    @json_errors
+    def delete(self, upload_id):
+        upload = self.manager.get(upload_id)
+        upload.cancel()
+        self.manager.remove(upload_id)
+        self.set_status(204)
+        self.finish()
+
+
+@web.stream_request_body
+class ChunkHandler(APIHandler):
+    """Receive one chunk of an upload as a raw binary body.
+
+    The body is written to the part file as it arrives, so memory use is
+    bounded by the network buffers, not by the chunk size.
+    """
+
+    def initialize(self, manager):
+        self.manager = manager
+        self.file = None
+
+    @json_errors
+    def prepare(self):
+        super(ChunkHandler, self).prepare()
+        if not self.current_user:
+            raise web.HTTPError(403)
+        if self.request.method != 'PUT':
+            return
+        self.upload = self.manager.get(self.path_kwargs['upload_id'])
+        self.index = int(self.path_kwargs['index'])
+        if not 0 <= self.index < self.upload.chunks:
+            raise web.HTTPError(400, u'Invalid chunk: %i' % self.index)
+        self.length = self.upload.chunk_length(self.index)
+        self.upload.touched = time.time()
+        self.request.connection.set_max_body_size(self.length)
+        self.received = 0
+        self.file = open(self.upload.part_path, 'r+b')
+        self.file.seek(self.index * self.upload.chunk_size)
+
+    def data_received(self, data):
+        self.file.write(data)
+        self.received += len(data)
+
+    @json_errors
+    def put(self, upload_id, index):
+        self._close()
+        if self.received != self.length:
+            raise web.HTTPError(400, u'Chunk %i should have %i bytes, not %i' %
+                                (self.index, self.length, self.received))
+        self.upload.received.add(self.index)
+        self.upload.touched = time.time()
+        self.upload.save()
+        self.set_status(204)
+        self.finish()
+
+    def on_connection_close(self):
+        self._close()
+
+    def on_finish(self):
+        self._close()
+
+    def _close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+UPLOADS = UploadManager()
+
+_upload_id_regex = r"(?P<upload_id>[0-9a-f]+)"
+
+default_handlers = [
+    (r"/api/uploads", UploadsHandler, {'manager': UPLOADS}),
+    (r"/api/uploads/%s" % _upload_id_regex, UploadHandler, {'manager': UPLOADS}),
+    (r"/api/uploads/%s/(?P<index>\d+)" % _upload_id_regex, ChunkHandler,
+     {'manager': UPLOADS}),
+]
@@ -0,0 +1,348 @@
+"""A websocket service pushing directory changes to the file browser."""
+
+# Copyright (c) Jupyter Development Team.
+# Distributed under the terms of the Modified BSD License.
+
+import json
+import os
+import time
+
+from tornado import gen, ioloop, web
+from tornado.log import app_log
+from tornado.websocket import WebSocketHandler
+
+from notebook.base.handlers import IPythonHandler
+from notebook.base.zmqhandlers import WebSocketMixin
+from jupyter_client.jsonutil import date_default
+
+from .listing import LISTINGS
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+
+# Seconds between checks of the modification time of the directories that
+# are polled.
+POLL_INTERVAL = 5
+
+# Seconds between scans of a polled directory whose modification time has
+# not changed, which find changes to the files in it.
+FULL_SCAN_INTERVAL = 60
+
+# Seconds to wait after an inotify event, so a burst of events for one
+# directory causes a single scan.
+SETTLE_DELAY = 0.2
+
+# Filesystems where inotify does not see changes made by other hosts.
+NETWORK_FILESYSTEMS = frozenset([
+    'nfs', 'nfs4', 'cifs', 'smbfs', 'smb3', 'afs', 'ncpfs', '9p', 'lustre',
+    'gpfs', 'ceph', 'glusterfs', 'fuse.sshfs', 'fuse.glusterfs', 'fuse.s3fs',
+])
+
+
+def filesystem_type(os_path):
+    """The type of the filesystem holding a path, or `None` if unknown."""
+    try:
+        with open('/proc/mounts') as f:
+            mounts = [line.split()[1:3] for line in f]
+    except (IOError, OSError):
+        return None
+    os_path = os.path.realpath(os_path)
+    best = None
+    for mount_point, fs_type in mounts:
+        mount_point = mount_point.replace('\\040', ' ')
+        prefix = mount_point.rstrip('/') + '/'
+        if os_path == mount_point or os_path.startswith(prefix):
+            if best is None or len(mount_point) > len(best[0]):
+                best = (mount_point, fs_type)
+    return best[1] if best else None
+
+
+class DirectoryWatch(object):
+    """The listeners of one directory and the last snapshot they were sent."""
+
+    def __init__(self, contents_manager, path):
+        self.contents_manager = contents_manager
+        self.path = path
+        self.listeners = set()
+        self.snapshot = None
+        self.descriptor = None
+        # The modification time of the directory and the time of the scan
+        # which took the snapshot.
+        self.mtime = None
+        self.scanned = 0
+
+
+class WatchService(object):
+    """Watch directories and push their changes to listeners.
+
+    Changes are found by comparing snapshots from the listing cache, so a
+    push carries the same `added`, `removed` and `modified` entries as a
+    listing request with `since`, and the pushed token can be used for
+    paging.  Each directory is scanned once per change however many
+    clients watch it.
+
+    A directory on a local filesystem is scanned when inotify reports a
+    change, if pyinotify is installed.  Other directories are polled every
+    `poll_interval` seconds.  A polled directory with a path on disk is
+    only scanned when its modification time changed, which it does when
+    files are added, removed or renamed, or every `full_scan_interval`
+    seconds, which finds changes to the files in it.
+    """
+
+    def __init__(self, cache, poll_interval=POLL_INTERVAL,
+                 full_scan_interval=FULL_SCAN_INTERVAL, use_inotify=True):
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.full_scan_interval = full_scan_interval
+        self.use_inotify = use_inotify and pyinotify is not None
+        self._watches = {}
+        self._scanning = set()
+        self._scheduled = set()
+        self._poller = None
+        self._inotify = None
+        self._descriptors = {}
+
+    @gen.coroutine
+    def watch(self, contents_manager, path, listener, token=None):
+        """Add a listener to a directory.
+
+        If `token` is not the token of the current listing, the changes
+        since that listing are pushed to the listener right away.
+        """
+        watch = self._watches.get(path)
+        if watch is None:
+            watch = DirectoryWatch(contents_manager, path)
+            watch.mtime = self._mtime(watch)
+            watch.scanned = time.time()
+            watch.snapshot = yield self.cache.get(contents_manager, path)
+            if path in self._watches:
+                # Another listener added the watch while we listed.
+                watch = self._watches[path]
+            else:
+                self._watches[path] = watch
+                self._start(watch)
+        watch.listeners.add(listener)
+        if token and token != watch.snapshot.token:
+            older = self.cache.find(token)
+            listener.notify(self._message(watch.snapshot, token, older))
+
+    def unwatch(self, path, listener):
+        """Remove a listener from a directory."""
+        watch = self._watches.get(path)
+        if watch is None:
+            return
+        watch.listeners.discard(listener)
+        if not watch.listeners:
+            self._stop(watch)
+
+    def _start(self, watch):
+        os_path = self._os_path(watch)
+        if os_path is not None and filesystem_type(os_path) not in NETWORK_FILESYSTEMS:
+            if self._inotify is None:
+                self._inotify = Inotify(self._on_inotify)
+            watch.descriptor = self._inotify.add(os_path)
+        if watch.descriptor is not None:
+            self._descriptors[watch.descriptor] = watch.path
+        elif self._poller is None:
+            self._poller = ioloop.PeriodicCallback(
+                self._poll, self.poll_interval * 1000)
+            self._poller.start()
+
+    def _stop(self, watch):
+        del self._watches[watch.path]
+        if watch.descriptor is not None:
+            self._descriptors.pop(watch.descriptor, None)
+            self._inotify.remove(watch.descriptor)
+        polled = [w for w in self._watches.values() if w.descriptor is None]
+        if not polled and self._poller is not None:
+            self._poller.stop()
+            self._poller = None
+
+    def _os_path(self, watch, inotify=True):
+        """The local path of a watched directory, if it has one.
+
+        With `inotify`, also `None` if inotify is not used.
+        """
+        if inotify and not self.use_inotify:
+            return None
+        get_os_path = getattr(watch.contents_manager, '_get_os_path', None)
+        if get_os_path is None:
+            return None
+        return get_os_path(watch.path)
+
+    def _mtime(self, watch):
+        """The modification time of a watched directory, if it is known."""
+        os_path = self._os_path(watch, inotify=False)
+        if os_path is None:
+            return None
+        try:
+            return os.stat(os_path).st_mtime
+        except OSError:
+            return None
+
+    def _on_inotify(self, descriptor):
+        path = self._descriptors.get(descriptor)
+        if path is None or path in self._scheduled:
+            return
+        self._scheduled.add(path)
+        def scan():
+            self._scheduled.discard(path)
+            self._scan(path)
+        ioloop.IOLoop.current().call_later(SETTLE_DELAY, scan)
+
+    def _poll(self):
+        now = time.time()
+        for watch in list(self._watches.values()):
+            if watch.descriptor is not None:
+                continue
+            # Without a modification time, as for a directory which is not
+            # on disk, only a scan can tell whether it changed.
+            if (watch.mtime is None or
+                    self._mtime(watch) != watch.mtime or
+                    now - watch.scanned >= self.full_scan_interval):
+                self._scan(watch.path)
+
+    @gen.coroutine
+    def _scan(self, path):
+        watch = self._watches.get(path)
+        if watch is None or path in self._scanning:
+            return
+        self._scanning.add(path)
+        # Taken before the listing, so a change during it is seen next time.
+        mtime = self._mtime(watch)
+        scanned = time.time()
+        try:
+            snapshot = yield self.cache.get(watch.contents_manager, path,
+                                            fresh=True)
+        except web.HTTPError as e:
+            # The directory is gone; tell the listeners to list again.
+            app_log.debug("Stopped watching %r: %s", path, e)
+            message = json.dumps(dict(path=path, token=None,
+                                      since=watch.snapshot.token, delta=None))
+            for listener in list(watch.listeners):
+                listener.notify(message)
+            if self._watches.get(path) is watch:
+                self._stop(watch)
+            return
+        finally:
+            self._scanning.discard(path)
+        if self._watches.get(path) is not watch:
+            # Nobody is listening any more.
+            return
+        watch.mtime = mtime
+        watch.scanned = scanned
+        if snapshot.token == watch.snapshot.token:
+            return
+        message = self._message(snapshot, watch.snapshot.token, watch.snapshot)
+        watch.snapshot = snapshot
+        for listener in list(watch.listeners):
+            listener.notify(message)
+
+    def _message(self, snapshot, since, older):
+        delta = snapshot.delta(older) if older is not None else None
+        return json.dumps(dict(
+            path=snapshot.path,
+            token=snapshot.token,
+            total=len(snapshot),
+            since=since,
+            delta=delta,
+        ), default=date_default)
+
+
+class Inotify(object):
+    """Directory watches on a pyinotify watch manager.
+
+    `callback` is called on the IOLoop with the descriptor of a watch that
+    saw an event.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.manager = pyinotify.WatchManager()
+        self.notifier = pyinotify.TornadoAsyncNotifier(
+            self.manager, ioloop.IOLoop.current(),
+            default_proc_fun=self._process)
+
+    def add(self, os_path):
+        """Watch a directory, returning the descriptor or `None` on failure."""
+        mask = (pyinotify.IN_CREATE | pyinotify.IN_DELETE |
+                pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO |
+                pyinotify.IN_CLOSE_WRITE | pyinotify.IN_ATTRIB |
+                pyinotify.IN_DELETE_SELF | pyinotify.IN_MOVE_SELF)
+        result = self.manager.add_watch(os_path, mask, quiet=True)
+        descriptor = result.get(os_path, -1)
+        return descriptor if descriptor >= 0 else None
+
+    def remove(self, descriptor):
+        self.manager.rm_watch(descriptor, quiet=True)
+
+    def _process(self, event):
+        self.callback(event.wd)
+
+
+class WatchHandler(WebSocketMixin, IPythonHandler, WebSocketHandler):
+    """A websocket pushing the changes of the directories a client watches.
+
+    The client sends `{"action": "watch", "path": ..., "token": ...}` and
+    `{"action": "unwatch", "path": ...}`.  The server sends
+    `{"path", "token", "total", "since", "delta"}` whenever a watched
+    directory changes, where `delta` is `null` if the changes since the
+    listing with token `since` are not known.
+    """
+
+    def initialize(self, service):
+        self.service = service
+        self.paths = set()
+
+    def get(self, *args, **kwargs):
+        if not self.get_current_user():
+            raise web.HTTPError(403)
+        return super(WatchHandler, self).get(*args, **kwargs)
+
+    @gen.coroutine
+    def on_message(self, message):
+        try:
+            msg = json.loads(message)
+            action = msg['action']
+            path = msg['path'].strip('/')
+        except (ValueError, KeyError, AttributeError, TypeError):
+            self.log.warning("Invalid watch message: %r", message)
+            return
+        if action == 'watch':
+            self.paths.add(path)
+            try:
+                yield self.service.watch(self.contents_manager, path, self,
+                                         msg.get('token'))
+            except web.HTTPError as e:
+                self.paths.discard(path)
+                self.log.debug("Cannot watch %r: %s", path, e)
+                return
+            if path not in self.paths or self.ws_connection is None:
+                # Unwatched or closed while the directory was being listed.
+                self.service.unwatch(path, self)
+        elif action == 'unwatch':
+            self.paths.discard(path)
+            self.service.unwatch(path, self)
+
+    def on_close(self):
+        for path in self.paths:
+            self.service.unwatch(path, self)
+        self.paths.clear()
+
+    def notify(self, message):
+        if self.ws_connection is not None:
+            self.write_message(message)
+
+
+#-----------------------------------------------------------------------------
+# URL to handler mappings
+#-----------------------------------------------------------------------------
+
+WATCHES = WatchService(LISTINGS)
+
+default_handlers = [
+    (r"/api/watch", WatchHandler, {'service': WATCHES}),
+]
@@ -5,11 +5,32 @@
 // See https://github.com/webpack/css-loader/issues/144
 require('es6-promise').polyfill();
 
+var fs = require('fs');
+var path = require('path');
+
+
+/**
+ * Write `chunks.json`, mapping each chunk name to its emitted files, so the
+ * server can add preload hints for the entry chunk to the page.
+ */
+function ChunkManifestPlugin() {}
+
+ChunkManifestPlugin.prototype.apply = function(compiler) {
+  compiler.plugin('done', function(stats) {
+    var json = stats.toJson({ assets: true, chunks: false, modules: false });
+    var manifest = { entry: 'main', chunks: json.assetsByChunkName };
+    fs.writeFileSync(path.join(compiler.options.output.path, 'chunks.json'),
+                     JSON.stringify(manifest, null, 2));
+  });
+};
+
+
 module.exports = {
   entry: './index.js',
   output: {
     path: __dirname + "/build",
     filename: "bundle.js",
+    chunkFilename: "[name].bundle.js",
     publicPath: "lab/"
   },
   node: {
@@ -30,9 +51,17 @@ module.exports = {
       { test: /\.woff(\?v=\d+\.\d+\.\d+)?$/, loader: "url?limit=10000&minetype=application/font-woff" },
       { test: /\.ttf(\?v=\d+\.\d+\.\d+)?$/, loader: "url?limit=10000&minetype=application/octet-stream" },
       { test: /\.eot(\?v=\d+\.\d+\.\d+)?$/, loader: "file" },
-      { test: /\.svg(\?v=\d+\.\d+\.\d+)?$/, loader: "url?limit=10000&minetype=image/svg+xml" }
+      { test: /\.svg(\?v=\d+\.\d+\.\d+)?$/, loader: "url?limit=10000&minetype=image/svg+xml" },
+      // Kernels create their websockets with the `WebSocket` in scope of the
+      // kernel module, which is bound to the constructor using the kernel
+      // multiplexer, so other websockets of the page are left native.
+      { test: /jupyter-js-services[\/\\]lib[\/\\]kernel\.js$/,
+        loader: 'imports?WebSocket=>require("jupyterlab/lib/services/mux").KernelSocket' }
     ]
   },
+  plugins: [
+    new ChunkManifestPlugin()
+  ],
   externals: {
       "base/js/namespace": "base/js/namespace",
       "notebook/js/outputarea": "notebook/js/outputarea",
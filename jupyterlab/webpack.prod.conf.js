@@ -0,0 +1,20 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+// Production build: minified, deduplicated and with content-hashed plugin
+// chunks.  Source maps are still written, but only fetched by devtools.
+var webpack = require('webpack');
+var config = require('./webpack.conf.js');
+
+config.debug = false;
+config.output.chunkFilename = "[name].[chunkhash].js";
+config.plugins = config.plugins.concat([
+  new webpack.DefinePlugin({
+    'process.env': { NODE_ENV: JSON.stringify('production') }
+  }),
+  new webpack.optimize.DedupePlugin(),
+  new webpack.optimize.OccurenceOrderPlugin(),
+  new webpack.optimize.UglifyJsPlugin({ compress: { warnings: false } })
+]);
+
+module.exports = config;
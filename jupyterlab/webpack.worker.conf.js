@@ -0,0 +1,24 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+// The render worker is its own bundle, since a worker cannot load the
+// chunks of the page.  It is served as `lab/renderworker.js`.
+module.exports = {
+  entry: './renderworker.js',
+  target: 'webworker',
+  output: {
+    path: __dirname + "/build",
+    filename: "renderworker.js"
+  },
+  node: {
+    fs: "empty"
+  },
+  debug: true,
+  bail: true,
+  devtool: 'source-map',
+  module: {
+    loaders: [
+      { test: /\.json$/, loader: 'json-loader' }
+    ]
+  }
+}
@@ -13,6 +13,8 @@ import os
 import sys
 import platform
 import shutil
+import gzip
+import json
 
 here = os.path.dirname(os.path.abspath(__file__))
 node_root = os.path.join(here, 'jupyterlab')
@@ -64,19 +66,102 @@ def update_package_data(distribution):
     build_py.finalize_options()
 
 
+# Built files worth precompressing, and the size below which we don't bother.
+COMPRESSIBLE = ('.js', '.css', '.map', '.json', '.html', '.svg', '.ttf', '.eot')
+MIN_COMPRESS_SIZE = 1024
+
+def compress_assets(build_dir):
+    """write .gz (and .br, if brotli is installed) siblings of built assets"""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        log.info('brotli not installed, skipping .br assets')
+    for dirpath, dirnames, filenames in os.walk(build_dir):
+        for filename in filenames:
+            if not filename.endswith(COMPRESSIBLE):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_COMPRESS_SIZE:
+                continue
+            # mtime=0 keeps the output reproducible across builds
+            with open(path + '.gz', 'wb') as f:
+                with gzip.GzipFile(filename='', mode='wb', fileobj=f,
+                                   compresslevel=9, mtime=0) as gz:
+                    gz.write(data)
+            if brotli is not None:
+                with open(path + '.br', 'wb') as f:
+                    f.write(brotli.compress(data))
+            log.info('compressed %s' % path)
+
+
+# Inputs of each stage of the js build.  A stage is skipped when the digest
+# of its inputs matches the one stored by its last successful run.
+BUILD_STAGES = [
+    # `npm install` in `node_root`, which also packs the root package (and so
+    # the compiled `src/`) into `node_modules/jupyterlab`.
+    ('install', [
+        'package.json',
+        'npm-shrinkwrap.json',
+        'src',
+        'typings',
+        'scripts/copyfiles.js',
+        'jupyterlab/package.json',
+        'jupyterlab/npm-shrinkwrap.json',
+    ]),
+    # `npm run build` in `node_root`, which webpacks the bundle.
+    ('build', [
+        'jupyterlab/index.js',
+        'jupyterlab/renderworker.js',
+        'jupyterlab/webpack.conf.js',
+        'jupyterlab/webpack.prod.conf.js',
+        'jupyterlab/webpack.worker.conf.js',
+    ]),
+]
+
+def hash_inputs(paths, digest=None):
+    """hash the contents of files and directory trees, relative to `here`"""
+    import hashlib
+    digest = digest or hashlib.sha256()
+    for path in paths:
+        full = os.path.join(here, path)
+        if os.path.isdir(full):
+            files = []
+            for dirpath, dirnames, filenames in os.walk(full):
+                dirnames[:] = [d for d in dirnames if d != 'node_modules']
+                files.extend(os.path.join(dirpath, f) for f in filenames)
+        else:
+            files = [full]
+        for f in sorted(files):
+            digest.update(os.path.relpath(f, here).replace(os.sep, '/').encode('utf-8'))
+            if not os.path.exists(f):
+                digest.update(b'\0missing')
+                continue
+            with open(f, 'rb') as fh:
+                digest.update(fh.read())
+    return digest
+
+
 class NPM(Command):
     description = 'install package.json dependencies using npm'
 
-    user_options = []
+    user_options = [
+        ('force', 'f', 'rebuild even if the build fingerprint is unchanged'),
+    ]
+    boolean_options = ['force']
 
     node_modules = os.path.join(node_root, 'node_modules')
 
+    fingerprint = os.path.join(node_modules, '.jupyterlab-fingerprint.json')
+
     targets = [
         os.path.join(here, 'jupyterlab', 'build', 'bundle.js'),
     ]
 
     def initialize_options(self):
-        pass
+        self.force = False
 
     def finalize_options(self):
         pass
@@ -88,10 +173,43 @@ class NPM(Command):
         except:
             return False
 
-    def should_run_npm_install(self):
-        package_json = os.path.join(node_root, 'package.json')
-        node_modules_exists = os.path.exists(self.node_modules)
-        return self.has_npm()
+    def load_fingerprint(self):
+        try:
+            with open(self.fingerprint) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def save_fingerprint(self, fingerprint):
+        with open(self.fingerprint, 'w') as f:
+            json.dump(fingerprint, f, indent=2, sort_keys=True)
+
+    def stage_digests(self):
+        """digest of each stage's inputs, chained so a stage is dirty when
+        any earlier stage is"""
+        import hashlib
+        digests = {}
+        digest = hashlib.sha256()
+        for name, paths in BUILD_STAGES:
+            hash_inputs(paths, digest)
+            digests[name] = digest.hexdigest()
+        return digests
+
+    def dirty_stages(self, digests):
+        """the stages whose inputs changed since they last ran"""
+        if self.force:
+            log.info('jsdeps: --force given, rebuilding all stages')
+            return [name for name, _ in BUILD_STAGES]
+        stored = self.load_fingerprint()
+        dirty = []
+        for name, _ in BUILD_STAGES:
+            if stored.get(name) != digests[name]:
+                dirty.append(name)
+        if not os.path.isdir(self.node_modules) and 'install' not in dirty:
+            dirty.insert(0, 'install')
+        if not all(os.path.exists(t) for t in self.targets) and 'build' not in dirty:
+            dirty.append('build')
+        return dirty
 
     def run(self):
         has_npm = self.has_npm()
@@ -101,13 +219,31 @@ class NPM(Command):
         env = os.environ.copy()
         env['PATH'] = npm_path
 
-        if self.should_run_npm_install():
-            log.info("Installing build dependencies with npm.  This may take a while...")
-            # remove just jupyterlab so that it is always updated
-            shutil.rmtree(os.path.join(self.node_modules, 'jupyterlab'), ignore_errors=True)
-            check_call(['npm', 'install'], cwd=node_root, stdout=sys.stdout, stderr=sys.stderr)
-            check_call(['npm', 'run', 'build'], cwd=node_root, stdout=sys.stdout, stderr=sys.stderr)
-            os.utime(self.node_modules, None)
+        if has_npm:
+            digests = self.stage_digests()
+            dirty = self.dirty_stages(digests)
+            for name, _ in BUILD_STAGES:
+                if name in dirty:
+                    log.info('jsdeps: %s inputs changed, rebuilding (%s)' % (name, digests[name][:12]))
+                else:
+                    log.info('jsdeps: %s is up to date, skipping (%s)' % (name, digests[name][:12]))
+
+            if 'install' in dirty:
+                log.info("Installing build dependencies with npm.  This may take a while...")
+                # remove just jupyterlab so that it is always updated
+                shutil.rmtree(os.path.join(self.node_modules, 'jupyterlab'), ignore_errors=True)
+                check_call(['npm', 'install'], cwd=node_root, stdout=sys.stdout, stderr=sys.stderr)
+                os.utime(self.node_modules, None)
+                fingerprint = self.load_fingerprint()
+                fingerprint['install'] = digests['install']
+                self.save_fingerprint(fingerprint)
+
+            if 'build' in dirty:
+                check_call(['npm', 'run', 'build'], cwd=node_root, stdout=sys.stdout, stderr=sys.stderr)
+                compress_assets(os.path.join(node_root, 'build'))
+                fingerprint = self.load_fingerprint()
+                fingerprint['build'] = digests['build']
+                self.save_fingerprint(fingerprint)
 
         for t in self.targets:
             if not os.path.exists(t):
@@ -119,7 +255,6 @@ class NPM(Command):
         # update package data in case this created new files
         update_package_data(self.distribution)
 
-import json
 with open(os.path.join(here, 'package.json')) as f:
     packagejson = json.load(f)
 
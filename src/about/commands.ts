@@ -0,0 +1,33 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * The id of the command showing the about page.
+ */
+export
+const SHOW_ID = 'about-jupyterlab:show';
+
+
+/**
+ * The ids of the commands of the about extension.
+ *
+ * #### Notes
+ * This module has no imports, so the application can declare the commands
+ * without loading the extension.
+ */
+export
+const commandIds = [SHOW_ID];
+
+
+/**
+ * The command palette items of the about extension.
+ */
+export
+const paletteItems = [
+  {
+    command: SHOW_ID,
+    text: 'About JupyterLab',
+    category: 'Help'
+  }
+];
@@ -9,6 +9,10 @@ import {
   Widget
 } from 'phosphor-widget';
 
+import {
+  SHOW_ID, paletteItems
+} from './commands';
+
 
 /**
  * The about page extension.
@@ -22,7 +26,6 @@ const aboutExtension = {
 
 function activateAbout(app: Application): void {
   let widget = new Widget();
-  let commandId = 'about-jupyterlab:show';
   widget.id = 'about-jupyterlab';
   widget.title.text = 'About';
   widget.title.closable = true;
@@ -58,16 +61,12 @@ function activateAbout(app: Application): void {
 `;
 
     app.commands.add([{
-      id: commandId,
+      id: SHOW_ID,
       handler: () => {
         if (!widget.isAttached) app.shell.addToMainArea(widget);
         app.shell.activateMain(widget.id);
       }
     }]);
 
-    app.palette.add([{
-      command: commandId,
-      text: 'About JupyterLab',
-      category: 'Help'
-    }]);
+    app.palette.add(paletteItems);
 }
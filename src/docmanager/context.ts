@@ -23,9 +23,25 @@ import {
 } from 'phosphor-widget';
 
 import {
-  IDocumentContext, IDocumentModel, IModelFactory
+  IDocumentContext, IDocumentLoader, IDocumentModel, IModelFactory
 } from './index';
 
+import {
+  createPatch, hashNotebook
+} from './patch';
+
+
+/**
+ * The url of the notebook patch api.
+ */
+const PATCH_URL = 'lab/api/patch';
+
+/**
+ * The largest patch, as a fraction of the whole document, worth sending
+ * instead of the document.
+ */
+const MAX_PATCH_RATIO = 0.5;
+
 
 /**
  * An implementation of a document context.
@@ -228,6 +244,9 @@ class ContextManager implements IDisposable {
     this._kernelspecids = null;
     for (let id in this._contexts) {
       let contextEx = this._contexts[id];
+      if (contextEx.loader) {
+        contextEx.loader.dispose();
+      }
       contextEx.context.dispose();
       contextEx.model.dispose();
       let session = contextEx.session;
@@ -249,10 +268,15 @@ class ContextManager implements IDisposable {
       context,
       path,
       model,
+      factory,
       modelName: factory.name,
       opts: factory.contentsOptions,
       contentsModel: null,
-      session: null
+      saved: null,
+      savedHash: null,
+      session: null,
+      loader: null,
+      loading: null
     };
     return id;
   }
@@ -301,6 +325,9 @@ class ContextManager implements IDisposable {
    */
   removeContext(id: string): void {
     let contextEx = this._contexts[id];
+    if (contextEx.loader) {
+      contextEx.loader.dispose();
+    }
     contextEx.model.dispose();
     contextEx.context.dispose();
     delete this._contexts[id];
@@ -398,9 +425,22 @@ class ContextManager implements IDisposable {
 
   /**
    * Save the document contents to disk.
+   *
+   * #### Notes
+   * A notebook is saved by sending a patch against the last saved
+   * revision when the server supports it and the patch is small enough,
+   * falling back to sending the whole notebook.  The patch carries a hash
+   * of the document it was made against, and the server refuses it if
+   * its copy of the notebook hashes differently.
+   *
+   * A document being loaded is saved once it is loaded, and a document
+   * which failed to load is not saved.
    */
   save(id: string): Promise<void> {
     let contextEx =  this._contexts[id];
+    if (contextEx.loading) {
+      return contextEx.loading.then(() => this.save(id));
+    }
     let opts = utils.copy(contextEx.opts);
     let path = contextEx.path;
     let model = contextEx.model;
@@ -412,10 +452,44 @@ class ContextManager implements IDisposable {
     } else {
       opts.content = model.toString();
     }
-    return this._contentsManager.save(path, opts).then(contents => {
-      contextEx.contentsModel = this._copyContentsModel(contents);
-      model.dirty = false;
-    });
+    let saved: any = null;
+    if (opts.type === 'notebook') {
+      // Keep a copy of what is saved, since the model may change it in
+      // place, to patch against next time.
+      let text = JSON.stringify(opts.content);
+      saved = JSON.parse(text);
+      if (this._patchSave && contextEx.saved && contextEx.contentsModel) {
+        let patch = createPatch(contextEx.saved, saved);
+        let revision = contextEx.contentsModel.last_modified;
+        if (!patch.length) {
+          model.dirty = false;
+          return Promise.resolve(void 0);
+        }
+        if (JSON.stringify(patch).length < text.length * MAX_PATCH_RATIO) {
+          if (!contextEx.savedHash) {
+            contextEx.savedHash = hashNotebook(contextEx.saved);
+          }
+          let hash = contextEx.savedHash;
+          return Private.savePatch(path, revision, hash, patch).then(contents => {
+            contextEx.contentsModel = this._copyContentsModel(contents);
+            this._setSaved(contextEx, saved);
+            model.dirty = false;
+          }, error => {
+            let status = error.xhr ? error.xhr.status : 0;
+            if (status === 0) {
+              throw error;
+            }
+            if (status === 404 || status === 405) {
+              // The server does not take patches.
+              this._patchSave = false;
+            }
+            // Conflicts and errors fall back to a full save.
+            return this._saveFull(contextEx, opts, saved);
+          });
+        }
+      }
+    }
+    return this._saveFull(contextEx, opts, saved);
   }
 
   /**
@@ -426,6 +500,7 @@ class ContextManager implements IDisposable {
   saveAs(id: string, newPath: string): Promise<void> {
     let contextEx = this._contexts[id];
     contextEx.path = newPath;
+    this._setSaved(contextEx, null);
     contextEx.context.pathChanged.emit(newPath);
     if (contextEx.session) {
       let options = {
@@ -447,13 +522,26 @@ class ContextManager implements IDisposable {
     let opts = contextEx.opts;
     let path = contextEx.path;
     let model = contextEx.model;
+    let factory = contextEx.factory;
+    let loader = factory.createLoader ? factory.createLoader(path, model) : null;
+    if (loader) {
+      return this._revertWithLoader(contextEx, loader);
+    }
     return this._contentsManager.get(path, opts).then(contents => {
+      // Patch against the notebook as the server has it, so a patch also
+      // carries the parts the model normalizes differently from the file.
+      // The copy is made first, since the model may keep the content.
+      let saved: any = null;
+      if (opts.type === 'notebook') {
+        saved = JSON.parse(JSON.stringify(contents.content));
+      }
       if (contents.format === 'json') {
         model.fromJSON(contents.content);
       } else {
         model.fromString(contents.content);
       }
       contextEx.contentsModel = this._copyContentsModel(contents);
+      this._setSaved(contextEx, saved);
       model.dirty = false;
     });
   }
@@ -498,6 +586,71 @@ class ContextManager implements IDisposable {
     });
   }
 
+  /**
+   * Revert a document with a loader of the model factory.
+   *
+   * #### Notes
+   * The returned promise resolves once the first part of the document is
+   * in the model, so it can be shown while the rest is loaded.
+   */
+  private _revertWithLoader(contextEx: Private.IContextEx, loader: IDocumentLoader): Promise<void> {
+    let model = contextEx.model;
+    if (contextEx.loader) {
+      contextEx.loader.dispose();
+    }
+    contextEx.loader = loader;
+    this._setSaved(contextEx, null);
+    contextEx.loading = loader.done.then(() => {
+      if (contextEx.loader !== loader) {
+        return;
+      }
+      loader.dispose();
+      contextEx.loader = null;
+      contextEx.loading = null;
+      // The file is not at hand, so patch against the model's form of the
+      // notebook.  If the server's copy differs, the hash check turns the
+      // first save into a full save.
+      if (contextEx.opts.type === 'notebook') {
+        this._setSaved(contextEx, JSON.parse(JSON.stringify(model.toJSON())));
+      }
+      model.initialize();
+    }, error => {
+      if (contextEx.loader !== loader) {
+        return;
+      }
+      // The partly loaded document stays unsaveable, so it cannot replace
+      // the file.
+      console.error(`Could not load ${contextEx.path}`, error);
+      throw new Error(`Could not load ${contextEx.path}: ${error.message}`);
+    });
+    return loader.ready.then(contents => {
+      contextEx.contentsModel = this._copyContentsModel(contents);
+      model.dirty = false;
+    });
+  }
+
+  /**
+   * Save the whole document.
+   */
+  private _saveFull(contextEx: Private.IContextEx, opts: IContentsOpts, saved: any): Promise<void> {
+    return this._contentsManager.save(contextEx.path, opts).then(contents => {
+      contextEx.contentsModel = this._copyContentsModel(contents);
+      this._setSaved(contextEx, saved);
+      contextEx.model.dirty = false;
+    });
+  }
+
+  /**
+   * Set the document the next patch is made against.
+   *
+   * #### Notes
+   * Its hash is computed when a patch is first made against it.
+   */
+  private _setSaved(contextEx: Private.IContextEx, saved: any): void {
+    contextEx.saved = saved;
+    contextEx.savedHash = null;
+  }
+
   /**
    * Copy the contents of a contents model, without the content.
    */
@@ -519,6 +672,7 @@ class ContextManager implements IDisposable {
   private _kernelspecids: IKernelSpecIds = null;
   private _contexts: { [key: string]: Private.IContextEx } = Object.create(null);
   private _opener: (id: string, widget: Widget) => IDisposable = null;
+  private _patchSave = true;
 }
 
 
@@ -538,6 +692,29 @@ namespace Private {
     path: string;
     contentsModel: IContentsModel;
     modelName: string;
+    saved: any;
+    savedHash: string;
+    factory: IModelFactory;
+    loader: IDocumentLoader;
+    loading: Promise<void>;
+  }
+
+  /**
+   * Save a notebook by sending a patch against a saved revision.
+   */
+  export
+  function savePatch(path: string, revision: string, hash: string, patch: any[]): Promise<IContentsModel> {
+    let parts = path.split('/').map(part => encodeURIComponent(part));
+    let url = utils.urlPathJoin(utils.getBaseUrl(), PATCH_URL, parts.join('/'));
+    let ajaxSettings: utils.IAjaxSettings = {
+      method: 'PATCH',
+      dataType: 'json',
+      contentType: 'application/json',
+      data: JSON.stringify({ revision, hash, patch })
+    };
+    return utils.ajaxRequest(url, ajaxSettings).then(success => {
+      return success.data as IContentsModel;
+    });
   }
 
   /**
@@ -21,9 +21,14 @@ import {
 } from 'phosphor-widget';
 
 import {
-  IDocumentModel, IWidgetFactory, IDocumentContext, IModelFactory
+  IDocumentModel, IWidgetFactory, IDocumentContext, IModelFactory,
+  IDocumentLoader
 } from './index';
 
+import {
+  TextLoader
+} from './lines';
+
 
 /**
  * The default implementation of a document model.
@@ -88,6 +93,24 @@ class DocumentModel implements IDocumentModel {
     this.stateChanged.emit({ name: 'readOnly', oldValue, newValue });
   }
 
+  /**
+   * Whether the document is too large to load, and is read in windows.
+   *
+   * #### Notes
+   * The content of a windowed model is empty, and the model is read-only.
+   */
+  get windowed(): boolean {
+    return this._windowed;
+  }
+  set windowed(newValue: boolean) {
+    if (newValue === this._windowed) {
+      return;
+    }
+    let oldValue = this._windowed;
+    this._windowed = newValue;
+    this.stateChanged.emit({ name: 'windowed', oldValue, newValue });
+  }
+
   /**
    * The default kernel name of the document.
    *
@@ -165,6 +188,7 @@ class DocumentModel implements IDocumentModel {
   private _defaultLang = '';
   private _dirty = false;
   private _readOnly = false;
+  private _windowed = false;
   private _isDisposed = false;
 }
 
@@ -219,6 +243,16 @@ class TextModelFactory implements IModelFactory {
     return new DocumentModel(languagePreference);
   }
 
+  /**
+   * Create a loader of a file, which leaves a large file on the server.
+   */
+  createLoader(path: string, model: IDocumentModel): IDocumentLoader {
+    if (!(model instanceof DocumentModel)) {
+      return null;
+    }
+    return new TextLoader(path, model as DocumentModel);
+  }
+
   /**
    * Get the preferred kernel language given an extension.
    */
@@ -257,6 +291,13 @@ class Base64ModelFactory extends TextModelFactory {
   get contentsOptions(): IContentsOpts {
     return { type: 'file', format: 'base64'};
   }
+
+  /**
+   * Base64 files are always loaded whole.
+   */
+  createLoader(path: string, model: IDocumentModel): IDocumentLoader {
+    return null;
+  }
 }
 
 
@@ -18,14 +18,22 @@ import {
   CodeMirrorWidget
 } from '../codemirror/widget';
 
+import {
+  okButton, showDialog
+} from '../dialog';
+
 import {
   IDocumentModel, IWidgetFactory, IDocumentContext
 } from './index';
 
 import {
-  ABCWidgetFactory
+  ABCWidgetFactory, DocumentModel
 } from './default';
 
+import {
+  LineWindow
+} from './lines';
+
 
 /**
  * The class name added to a dirty widget.
@@ -40,6 +48,11 @@ const EDITOR_CLASS = 'jp-EditorWidget';
 
 /**
  * A document widget for codemirrors.
+ *
+ * #### Notes
+ * A file too large to load is shown read-only in windows of lines.  Then
+ * `Ctrl-F` finds a regular expression, `Ctrl-G` finds it again, and
+ * `Ctrl-End` follows the end of the file as it grows.
  */
 export
 class EditorWidget extends CodeMirrorWidget {
@@ -62,13 +75,24 @@ class EditorWidget extends CodeMirrorWidget {
         } else {
           this.title.className = this.title.className.replace(DIRTY_CLASS, '');
         }
+      } else if (args.name === 'windowed') {
+        this._setWindowed(args.newValue as boolean);
       }
     });
     context.pathChanged.connect((c, path) => {
       loadModeByFileName(editor, path);
       this.title.text = path.split('/').pop();
+      if (this._window) {
+        this._window.path = path;
+      }
     });
     model.contentChanged.connect(() => {
+      if (this._window) {
+        this._window.refresh().catch(error => {
+          console.error(`Could not read ${this._context.path}`, error);
+        });
+        return;
+      }
       let old = doc.getValue();
       let text = model.toString();
       if (old !== text) {
@@ -76,11 +100,100 @@ class EditorWidget extends CodeMirrorWidget {
       }
     });
     CodeMirror.on(doc, 'change', (instance, change) => {
-      if (change.origin !== 'setValue') {
+      if (change.origin !== 'setValue' && !this._window) {
         model.fromString(instance.getValue());
       }
     });
+    this._context = context;
+    if (model instanceof DocumentModel && (model as DocumentModel).windowed) {
+      this._setWindowed(true);
+    }
+  }
+
+  /**
+   * Dispose of the resources held by the widget.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    this._setWindowed(false);
+    this._context = null;
+    super.dispose();
   }
+
+  /**
+   * Switch between editing the file and reading it in windows.
+   */
+  private _setWindowed(windowed: boolean): void {
+    if (this.isDisposed) {
+      return;
+    }
+    let editor = this.editor;
+    if (!windowed) {
+      if (this._window) {
+        this._window.dispose();
+        this._window = null;
+        editor.setOption('extraKeys', null);
+        editor.setOption('firstLineNumber', 1);
+        editor.setOption('readOnly', false);
+      }
+      return;
+    }
+    if (this._window) {
+      return;
+    }
+    let lines = this._window = new LineWindow(editor, this._context.path);
+    let follow = () => { lines.following = true; };
+    let top = () => { lines.showLine(0); };
+    let find = () => { this._find(); };
+    let findNext = () => { this._find(this._pattern); };
+    editor.setOption('extraKeys', {
+      'Ctrl-F': find, 'Cmd-F': find,
+      'Ctrl-G': findNext, 'Cmd-G': findNext, 'F3': findNext,
+      'Ctrl-End': follow, 'Cmd-End': follow,
+      'Ctrl-Home': top, 'Cmd-Home': top
+    });
+  }
+
+  /**
+   * Find the next line matching a pattern, asking for the pattern if none
+   * is given.
+   */
+  private _find(pattern?: string): void {
+    let lines = this._window;
+    if (!pattern) {
+      let input = document.createElement('input');
+      input.placeholder = 'Regular expression';
+      input.value = this._pattern;
+      showDialog({
+        title: 'Find in File',
+        body: input,
+        okText: 'FIND'
+      }).then(button => {
+        if (button && button.text === 'FIND' && input.value) {
+          this._find(input.value);
+        }
+      });
+      return;
+    }
+    this._pattern = pattern;
+    lines.find(pattern).then(found => {
+      if (!found && !this.isDisposed) {
+        showDialog({
+          title: 'Find in File',
+          body: `No more lines match "${pattern}"`,
+          buttons: [okButton]
+        });
+      }
+    }, error => {
+      console.error(`Could not search ${lines.path}`, error);
+    });
+  }
+
+  private _context: IDocumentContext = null;
+  private _window: LineWindow = null;
+  private _pattern = '';
 }
 
 
@@ -13,6 +13,10 @@ import {
   Widget
 } from 'phosphor-widget';
 
+import {
+  blobURLCache
+} from '../renderers';
+
 import {
   IDocumentModel, IWidgetFactory, IDocumentContext
 } from './index';
@@ -62,6 +66,7 @@ class ImageWidget extends Widget {
     if (this.isDisposed) {
       return;
     }
+    this._release();
     this._model = null;
     this._context = null;
     super.dispose();
@@ -75,11 +80,35 @@ class ImageWidget extends Widget {
     let node = this.node as HTMLImageElement;
     let content = this._model.toString();
     let model = this._context.contentsModel;
-    node.src = `data:${model.mimetype};${model.format},${content}`;
+    if (content === this._content) {
+      return;
+    }
+    this._release();
+    this._content = content;
+    if (model.format !== 'base64') {
+      node.src = `data:${model.mimetype};${model.format},${content}`;
+      return;
+    }
+    // Share the decoded image with outputs showing the same image.
+    this._url = blobURLCache.acquire(model.mimetype, content);
+    node.src = this._url;
+  }
+
+  /**
+   * Release the object url of the image.
+   */
+  private _release(): void {
+    if (this._url) {
+      blobURLCache.release(this._url);
+      this._url = null;
+    }
+    this._content = null;
   }
 
   private _model: IDocumentModel;
   private _context: IDocumentContext;
+  private _content: string = null;
+  private _url: string = null;
 }
 
 
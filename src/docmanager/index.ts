@@ -6,5 +6,6 @@ export * from './default';
 export * from './kernelselector';
 export * from './editor';
 export * from './images';
+export * from './lines';
 export * from './manager';
 export * from './registry';
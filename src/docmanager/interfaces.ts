@@ -316,6 +316,46 @@ interface IModelFactory extends IDisposable {
    * Get the preferred kernel language given an extension.
    */
   preferredLanguage(ext: string): string;
+
+  /**
+   * Create a loader of the contents of a path into a model.
+   *
+   * @param path - The path of the document.
+   *
+   * @param model - The model to load the contents into.
+   *
+   * @returns A document loader, or `null` to load the contents with the
+   *   contents manager.
+   *
+   * #### Notes
+   * This is optional.  A loader lets a large document be shown before it
+   * is completely loaded.
+   */
+  createLoader?(path: string, model: IDocumentModel): IDocumentLoader;
+}
+
+
+/**
+ * An object which loads the contents of a document into a model in parts.
+ */
+export
+interface IDocumentLoader extends IDisposable {
+  /**
+   * A promise resolved with the contents model, without its content, once
+   * the first part of the document is in the model.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  ready: Promise<IContentsModel>;
+
+  /**
+   * A promise resolved once the whole document is in the model.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  done: Promise<void>;
 }
 
 
@@ -0,0 +1,597 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import * as CodeMirror
+  from 'codemirror';
+
+import {
+  IContentsModel
+} from 'jupyter-js-services';
+
+import {
+  IAjaxSettings, ajaxRequest, getBaseUrl, urlPathJoin
+} from 'jupyter-js-utils';
+
+import {
+  IDisposable
+} from 'phosphor-disposable';
+
+import {
+  DocumentModel
+} from './default';
+
+import {
+  IDocumentLoader
+} from './interfaces';
+
+
+/**
+ * The size in bytes above which a text file is shown in windows of lines
+ * instead of being loaded into the editor.
+ */
+export
+const LARGE_FILE_SIZE = 8 * 1024 * 1024;
+
+/**
+ * The url of the line api.
+ */
+const LINES_URL = 'lab/api/lines';
+
+/**
+ * The number of lines in a window.
+ */
+const WINDOW_SIZE = 2000;
+
+/**
+ * The number of lines from the edge of a window at which the next window
+ * is loaded.
+ */
+const WINDOW_EDGE = 200;
+
+/**
+ * The time in ms between checks of a followed file for new lines.
+ */
+const FOLLOW_INTERVAL = 2000;
+
+
+/**
+ * A window of lines of a file.
+ */
+export
+interface ILinesReply {
+  /**
+   * The path of the file.
+   */
+  path: string;
+
+  /**
+   * The size of the file in bytes.
+   */
+  size: number;
+
+  /**
+   * The number of lines in the file.
+   */
+  total: number;
+
+  /**
+   * The number of the first line of the window.
+   */
+  start: number;
+
+  /**
+   * The lines of the window, without their line breaks.
+   */
+  lines: string[];
+
+  /**
+   * The numbers of the lines which were too long and were cut.
+   */
+  cut: number[];
+}
+
+
+/**
+ * The matches of a search of the lines of a file.
+ */
+export
+interface IGrepReply {
+  /**
+   * The path of the file.
+   */
+  path: string;
+
+  /**
+   * The size of the file in bytes.
+   */
+  size: number;
+
+  /**
+   * The number of lines in the file.
+   */
+  total: number;
+
+  /**
+   * The numbers of the matching lines.
+   */
+  matches: number[];
+
+  /**
+   * The line to search on from, or `null` if the end of the file was
+   * searched.
+   */
+  next: number;
+}
+
+
+/**
+ * A reader of the lines of a file through the line api.
+ *
+ * #### Notes
+ * The server indexes the line offsets of a file on the first read, and
+ * keeps the index while the file is unchanged.
+ */
+export
+class LineReader {
+  /**
+   * Construct a new line reader.
+   */
+  constructor(path: string) {
+    this.path = path;
+  }
+
+  /**
+   * The path of the file.
+   */
+  path: string;
+
+  /**
+   * Read a window of lines.
+   *
+   * @param start - The number of the first line.
+   *
+   * @param count - The number of lines.  With `0`, only the size and the
+   *   number of lines of the file are read.
+   */
+  read(start: number, count: number): Promise<ILinesReply> {
+    return this._request({ start: String(start), count: String(count) });
+  }
+
+  /**
+   * Find the lines matching a regular expression.
+   *
+   * @param pattern - A Python regular expression.
+   *
+   * @param start - The number of the line to search from.
+   *
+   * @param limit - The most matches to return.
+   *
+   * #### Notes
+   * The server searches a bounded part of the file per request, so a
+   * reply may have no matches but a line to search on from.
+   */
+  grep(pattern: string, start: number, limit: number): Promise<IGrepReply> {
+    return this._request({
+      grep: pattern,
+      start: String(start),
+      limit: String(limit)
+    });
+  }
+
+  /**
+   * Make a request to the line api.
+   */
+  private _request(params: { [key: string]: string }): Promise<any> {
+    let parts = this.path.split('/').map(part => encodeURIComponent(part));
+    let url = urlPathJoin(getBaseUrl(), LINES_URL, parts.join('/'));
+    let query = Object.keys(params).map(key => {
+      return `${encodeURIComponent(key)}=${encodeURIComponent(params[key])}`;
+    });
+    url += '?' + query.join('&');
+    let ajaxSettings: IAjaxSettings = {
+      method: 'GET',
+      dataType: 'json',
+      cache: false
+    };
+    return ajaxRequest(url, ajaxSettings).then(success => {
+      if (success.xhr.status !== 200) {
+        throw Error('Invalid Status: ' + success.xhr.status);
+      }
+      return success.data;
+    });
+  }
+}
+
+
+/**
+ * A loader of text files, which leaves large files on the server.
+ *
+ * #### Notes
+ * The size of the file is asked for first.  A small file is loaded into
+ * the model as usual.  A large file makes the model read-only and
+ * windowed, and its lines are read by the editor as they are shown.
+ */
+export
+class TextLoader implements IDocumentLoader {
+  /**
+   * Construct a new text loader.
+   *
+   * @param path - The path of the file.
+   *
+   * @param model - The model to load the file into.
+   */
+  constructor(path: string, model: DocumentModel) {
+    this._ready = Private.requestContents(path, false).then(contents => {
+      if (this.isDisposed) {
+        return Promise.resolve(contents);
+      }
+      // Older servers do not send the size, their files are loaded.
+      let size = (contents as any).size as number;
+      if (size > LARGE_FILE_SIZE) {
+        model.readOnly = true;
+        if (model.windowed) {
+          // Let the editor read the file again.
+          model.contentChanged.emit(void 0);
+        } else {
+          model.windowed = true;
+        }
+        return Promise.resolve(contents);
+      }
+      return Private.requestContents(path, true).then(full => {
+        if (!this.isDisposed) {
+          if (model.windowed) {
+            model.windowed = false;
+            model.readOnly = false;
+          }
+          model.fromString(full.content);
+        }
+        return full;
+      });
+    });
+    this._done = this._ready.then(() => { /* no-op */ });
+  }
+
+  /**
+   * A promise resolved with the contents model once the file is loaded,
+   * or is known to be large.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get ready(): Promise<IContentsModel> {
+    return this._ready;
+  }
+
+  /**
+   * A promise resolved once the file is loaded.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get done(): Promise<void> {
+    return this._done;
+  }
+
+  /**
+   * Get whether the loader is disposed.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isDisposed(): boolean {
+    return this._isDisposed;
+  }
+
+  /**
+   * Dispose of the loader, leaving the model as it is.
+   */
+  dispose(): void {
+    this._isDisposed = true;
+  }
+
+  private _ready: Promise<IContentsModel> = null;
+  private _done: Promise<void> = null;
+  private _isDisposed = false;
+}
+
+
+/**
+ * A window of the lines of a large file shown in a read-only editor.
+ *
+ * #### Notes
+ * The editor holds a window of `WINDOW_SIZE` lines, with the line numbers
+ * of the file.  When the view scrolls near the edge of the window, the
+ * window moves so the view stays in the middle of it.  A followed file
+ * shows its last lines as it grows.
+ */
+export
+class LineWindow implements IDisposable {
+  /**
+   * Construct a new line window.
+   *
+   * @param editor - The editor showing the window.
+   *
+   * @param path - The path of the file.
+   */
+  constructor(editor: CodeMirror.Editor, path: string) {
+    this._editor = editor;
+    this._reader = new LineReader(path);
+    editor.setOption('readOnly', true);
+    this._onScroll = this._onScroll.bind(this);
+    editor.on('scroll', this._onScroll);
+    this.refresh().catch(error => {
+      console.error(`Could not read ${path}`, error);
+    });
+  }
+
+  /**
+   * The path of the file.
+   */
+  get path(): string {
+    return this._reader.path;
+  }
+  set path(value: string) {
+    this._reader.path = value;
+  }
+
+  /**
+   * The number of lines in the file.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get total(): number {
+    return this._total;
+  }
+
+  /**
+   * Whether the last lines of the file are shown as it grows.
+   */
+  get following(): boolean {
+    return this._timer !== -1;
+  }
+  set following(value: boolean) {
+    if (value === this.following || this.isDisposed) {
+      return;
+    }
+    if (!value) {
+      clearInterval(this._timer);
+      this._timer = -1;
+      return;
+    }
+    this._timer = setInterval(() => { this._poll(); }, FOLLOW_INTERVAL);
+    this._showEnd();
+  }
+
+  /**
+   * Get whether the window is disposed.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isDisposed(): boolean {
+    return this._editor === null;
+  }
+
+  /**
+   * Dispose of the resources held by the window.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    this.following = false;
+    this._editor.off('scroll', this._onScroll);
+    this._editor = null;
+  }
+
+  /**
+   * Read the current window of the file again.
+   */
+  refresh(): Promise<void> {
+    return this._load(this._first, this._first + this._topLine());
+  }
+
+  /**
+   * Show a line of the file, and select it.
+   *
+   * @param line - The number of the line, from `0`.
+   */
+  showLine(line: number): Promise<void> {
+    this.following = false;
+    let promise: Promise<void>;
+    let index = line - this._first;
+    let count = this._editor.getDoc().lineCount();
+    if (index >= WINDOW_EDGE && index < count - WINDOW_EDGE) {
+      promise = Promise.resolve(void 0);
+    } else {
+      promise = this._load(line - WINDOW_SIZE / 2, line);
+    }
+    return promise.then(() => {
+      if (this.isDisposed) {
+        return;
+      }
+      let doc = this._editor.getDoc();
+      let index = Math.min(Math.max(line - this._first, 0), doc.lineCount() - 1);
+      let from = { line: index, ch: 0 };
+      let to = { line: index, ch: doc.getLine(index).length };
+      doc.setSelection(from, to);
+      this._editor.scrollIntoView({ from, to }, this._editor.getScrollInfo().clientHeight / 2);
+    });
+  }
+
+  /**
+   * Show the next line matching a regular expression.
+   *
+   * @param pattern - A Python regular expression.
+   *
+   * @returns A promise resolved with whether a line was found.
+   *
+   * #### Notes
+   * The search starts after the selected line, or the top line.
+   */
+  find(pattern: string): Promise<boolean> {
+    let doc = this._editor.getDoc();
+    let cursor = doc.getCursor();
+    let start = this._first + (doc.somethingSelected() ? cursor.line + 1 : this._topLine());
+    let search = (from: number): Promise<boolean> => {
+      return this._reader.grep(pattern, from, 1).then(reply => {
+        if (this.isDisposed) {
+          return Promise.resolve(false);
+        }
+        if (reply.matches.length) {
+          return this.showLine(reply.matches[0]).then(() => true);
+        }
+        if (reply.next === null) {
+          return Promise.resolve(false);
+        }
+        return search(reply.next);
+      });
+    };
+    return search(start);
+  }
+
+  /**
+   * Load the window starting at a line, keeping a line in place.
+   */
+  private _load(first: number, anchor: number): Promise<void> {
+    first = Math.floor(Math.max(first, 0));
+    let pending = this._reader.read(first, WINDOW_SIZE).then(reply => {
+      if (this.isDisposed || this._pending !== pending) {
+        return;
+      }
+      this._pending = null;
+      this._show(reply, anchor);
+    }, error => {
+      if (this._pending === pending) {
+        this._pending = null;
+      }
+      throw error;
+    });
+    this._pending = pending;
+    return pending;
+  }
+
+  /**
+   * Show a window of lines, keeping a line in place.
+   */
+  private _show(reply: ILinesReply, anchor: number): void {
+    let editor = this._editor;
+    let doc = editor.getDoc();
+    let offset = 0;
+    let old = anchor - this._first;
+    if (old >= 0 && old < doc.lineCount()) {
+      let top = editor.charCoords({ line: old, ch: 0 }, 'local').top;
+      offset = top - editor.getScrollInfo().top;
+    }
+    this._first = reply.start;
+    this._total = reply.total;
+    doc.setValue(reply.lines.join('\n'));
+    editor.setOption('firstLineNumber', reply.start + 1);
+    let index = Math.min(Math.max(anchor - reply.start, 0), doc.lineCount() - 1);
+    let top = editor.charCoords({ line: index, ch: 0 }, 'local').top;
+    editor.scrollTo(null, top - offset);
+  }
+
+  /**
+   * Show the last lines of the file.
+   */
+  private _showEnd(): Promise<void> {
+    return this._reader.read(0, 0).then(reply => {
+      if (this.isDisposed) {
+        return;
+      }
+      return this._load(reply.total - WINDOW_SIZE, reply.total).then(() => {
+        let info = this._editor.getScrollInfo();
+        this._editor.scrollTo(null, info.height);
+      });
+    });
+  }
+
+  /**
+   * Check a followed file for new lines.
+   */
+  private _poll(): void {
+    if (this._pending) {
+      return;
+    }
+    this._reader.read(0, 0).then(reply => {
+      if (this.following && reply.total !== this._total) {
+        return this._showEnd();
+      }
+    }).catch(error => {
+      console.error(`Could not follow ${this.path}`, error);
+    });
+  }
+
+  /**
+   * Get the index of the top line of the view in the window.
+   */
+  private _topLine(): number {
+    let top = this._editor.getScrollInfo().top;
+    return this._editor.coordsChar({ left: 0, top }, 'local').line;
+  }
+
+  /**
+   * Move the window when the view nears its edge.
+   */
+  private _onScroll(): void {
+    if (this._pending || this.isDisposed) {
+      return;
+    }
+    let info = this._editor.getScrollInfo();
+    let top = this._topLine();
+    let bottom = this._editor.coordsChar({
+      left: 0, top: info.top + info.clientHeight
+    }, 'local').line;
+    let count = this._editor.getDoc().lineCount();
+    let anchor = this._first + top;
+    let first = -1;
+    if (bottom > count - WINDOW_EDGE && this._first + count < this._total) {
+      first = anchor - WINDOW_SIZE / 4;
+    } else if (top < WINDOW_EDGE && this._first > 0) {
+      first = anchor - WINDOW_SIZE * 3 / 4;
+    }
+    if (first !== -1) {
+      this._load(first, anchor).catch(error => {
+        console.error(`Could not read ${this.path}`, error);
+      });
+    }
+  }
+
+  private _editor: CodeMirror.Editor = null;
+  private _reader: LineReader = null;
+  private _first = 0;
+  private _total = 0;
+  private _timer = -1;
+  private _pending: Promise<void> = null;
+}
+
+
+/**
+ * The namespace for the line api private data.
+ */
+namespace Private {
+  /**
+   * Request the contents model of a text file.
+   *
+   * @param content - Whether to include the content of the file.
+   */
+  export
+  function requestContents(path: string, content: boolean): Promise<IContentsModel> {
+    let parts = path.split('/').map(part => encodeURIComponent(part));
+    let url = urlPathJoin(getBaseUrl(), 'api/contents', parts.join('/'));
+    url += content ? '?type=file&format=text' : '?type=file&content=0';
+    let ajaxSettings: IAjaxSettings = {
+      method: 'GET',
+      dataType: 'json',
+      cache: false
+    };
+    return ajaxRequest(url, ajaxSettings).then(success => {
+      if (success.xhr.status !== 200) {
+        throw Error('Invalid Status: ' + success.xhr.status);
+      }
+      return success.data as IContentsModel;
+    });
+  }
+}
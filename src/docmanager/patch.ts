@@ -0,0 +1,321 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * An operation of a JSON patch (RFC 6902).
+ */
+export
+interface IPatchOperation {
+  /**
+   * The kind of operation.
+   */
+  op: 'add' | 'remove' | 'replace';
+
+  /**
+   * The JSON pointer to the target of the operation.
+   */
+  path: string;
+
+  /**
+   * The new value for `add` and `replace`.
+   */
+  value?: any;
+}
+
+
+/**
+ * Create a JSON patch turning one JSON value into another.
+ *
+ * @param source - The old value.
+ *
+ * @param target - The new value.
+ *
+ * @returns The operations of the patch, which only use `add`, `remove`
+ *   and `replace`.
+ *
+ * #### Notes
+ * Arrays are compared by their common head and tail, so inserting or
+ * removing cells in the middle of a notebook gives a patch touching only
+ * those cells.  Values that are identical objects are not compared.
+ */
+export
+function createPatch(source: any, target: any): IPatchOperation[] {
+  let ops: IPatchOperation[] = [];
+  Private.diff(source, target, '', ops);
+  return ops;
+}
+
+
+/**
+ * Hash a JSON value, to check that a patch is applied to the document it
+ * was made against.
+ *
+ * @param value - The JSON value.
+ *
+ * @returns The byte length and CRC-32 of the UTF-8 encoded canonical JSON
+ *   of the value, as `<length>:<crc>` with the CRC in eight hex digits.
+ *
+ * #### Notes
+ * The canonical JSON has the keys of objects sorted and no whitespace, as
+ * Python's `json.dumps(value, sort_keys=True, separators=(',', ':'),
+ * ensure_ascii=False)` writes it, so the server can hash its copy of the
+ * document the same way.  Values written differently by the two, such as
+ * floats with no fraction, only make the hashes differ.
+ */
+export
+function hashJSON(value: any): string {
+  return Private.hashText(Private.canonicalJSON(value));
+}
+
+
+/**
+ * Hash a notebook, to check that a patch is applied to the notebook it was
+ * made against.
+ *
+ * @param notebook - The JSON of the notebook.
+ *
+ * @returns The [[hashJSON]] of the notebook without the `trusted` metadata
+ *   of its cells.
+ *
+ * #### Notes
+ * The server marks every code cell as trusted or not when it reads a
+ * notebook, while the model only marks the cells it ran, so the marks are
+ * left out on both sides.  This matches `notebook_hash` on the server.
+ */
+export
+function hashNotebook(notebook: any): string {
+  let cells = notebook ? notebook.cells : null;
+  if (!Array.isArray(cells)) {
+    return hashJSON(notebook);
+  }
+  let stripped: any = {};
+  for (let key of Object.keys(notebook)) {
+    stripped[key] = notebook[key];
+  }
+  stripped.cells = (cells as any[]).map(cell => {
+    let metadata = cell ? cell.metadata : null;
+    if (!Private.isObject(metadata) || !metadata.hasOwnProperty('trusted')) {
+      return cell;
+    }
+    let copy: any = {};
+    for (let key of Object.keys(cell)) {
+      copy[key] = cell[key];
+    }
+    copy.metadata = {};
+    for (let key of Object.keys(metadata)) {
+      if (key !== 'trusted') {
+        copy.metadata[key] = metadata[key];
+      }
+    }
+    return copy;
+  });
+  return hashJSON(stripped);
+}
+
+
+/**
+ * The namespace for the patch private data.
+ */
+namespace Private {
+  /**
+   * Add the operations turning `source` into `target` at `path`.
+   */
+  export
+  function diff(source: any, target: any, path: string, ops: IPatchOperation[]): void {
+    if (source === target) {
+      return;
+    }
+    if (Array.isArray(source) && Array.isArray(target)) {
+      diffArrays(source, target, path, ops);
+    } else if (isObject(source) && isObject(target)) {
+      diffObjects(source, target, path, ops);
+    } else if (!equal(source, target)) {
+      ops.push({ op: 'replace', path, value: target });
+    }
+  }
+
+  /**
+   * Add the operations turning one object into another.
+   */
+  function diffObjects(source: any, target: any, path: string, ops: IPatchOperation[]): void {
+    for (let key of Object.keys(source)) {
+      if (!target.hasOwnProperty(key)) {
+        ops.push({ op: 'remove', path: `${path}/${escape(key)}` });
+      }
+    }
+    for (let key of Object.keys(target)) {
+      let keyPath = `${path}/${escape(key)}`;
+      if (!source.hasOwnProperty(key)) {
+        ops.push({ op: 'add', path: keyPath, value: target[key] });
+      } else {
+        diff(source[key], target[key], keyPath, ops);
+      }
+    }
+  }
+
+  /**
+   * Add the operations turning one array into another.
+   *
+   * #### Notes
+   * Items in the common head and tail are diffed in place.  Of the rest,
+   * items at the same offset are diffed in place and any extra items are
+   * removed or added.
+   */
+  function diffArrays(source: any[], target: any[], path: string, ops: IPatchOperation[]): void {
+    let head = 0;
+    let n = Math.min(source.length, target.length);
+    while (head < n && equal(source[head], target[head])) {
+      head++;
+    }
+    let tail = 0;
+    while (tail < n - head &&
+           equal(source[source.length - 1 - tail], target[target.length - 1 - tail])) {
+      tail++;
+    }
+    let sourceEnd = source.length - tail;
+    let targetEnd = target.length - tail;
+    let common = Math.min(sourceEnd, targetEnd) - head;
+    for (let i = head; i < head + common; i++) {
+      diff(source[i], target[i], `${path}/${i}`, ops);
+    }
+    // Remove from the end, so the indices of the other items hold.
+    for (let i = sourceEnd - 1; i >= head + common; i--) {
+      ops.push({ op: 'remove', path: `${path}/${i}` });
+    }
+    for (let i = head + common; i < targetEnd; i++) {
+      ops.push({ op: 'add', path: `${path}/${i}`, value: target[i] });
+    }
+  }
+
+  /**
+   * Test whether two JSON values are equal.
+   */
+  function equal(a: any, b: any): boolean {
+    if (a === b) {
+      return true;
+    }
+    if (Array.isArray(a) && Array.isArray(b)) {
+      if (a.length !== b.length) {
+        return false;
+      }
+      for (let i = 0; i < a.length; i++) {
+        if (!equal(a[i], b[i])) {
+          return false;
+        }
+      }
+      return true;
+    }
+    if (isObject(a) && isObject(b)) {
+      let keys = Object.keys(a);
+      if (keys.length !== Object.keys(b).length) {
+        return false;
+      }
+      for (let key of keys) {
+        if (!b.hasOwnProperty(key) || !equal(a[key], b[key])) {
+          return false;
+        }
+      }
+      return true;
+    }
+    return false;
+  }
+
+  /**
+   * Test whether a value is a non-array object.
+   */
+  export
+  function isObject(value: any): boolean {
+    return value !== null && typeof value === 'object' && !Array.isArray(value);
+  }
+
+  /**
+   * Escape a key for use in a JSON pointer.
+   */
+  function escape(key: string): string {
+    return key.replace(/~/g, '~0').replace(/\//g, '~1');
+  }
+
+  /**
+   * Write a JSON value with sorted keys and no whitespace.
+   */
+  export
+  function canonicalJSON(value: any): string {
+    if (Array.isArray(value)) {
+      let items = (value as any[]).map(item => {
+        return item === void 0 ? 'null' : canonicalJSON(item);
+      });
+      return `[${items.join(',')}]`;
+    }
+    if (isObject(value)) {
+      let items: string[] = [];
+      for (let key of Object.keys(value).sort()) {
+        if (value[key] !== void 0) {
+          items.push(`${JSON.stringify(key)}:${canonicalJSON(value[key])}`);
+        }
+      }
+      return `{${items.join(',')}}`;
+    }
+    return JSON.stringify(value);
+  }
+
+  /**
+   * Hash the UTF-8 encoding of a string.
+   */
+  export
+  function hashText(text: string): string {
+    let crc = 0xFFFFFFFF;
+    let length = 0;
+    let table = crcTable();
+    let update = (byte: number) => {
+      crc = table[(crc ^ byte) & 0xFF] ^ (crc >>> 8);
+      length++;
+    };
+    for (let i = 0; i < text.length; i++) {
+      let code = text.charCodeAt(i);
+      if (code >= 0xD800 && code < 0xDC00 && i + 1 < text.length) {
+        let next = text.charCodeAt(i + 1);
+        if (next >= 0xDC00 && next < 0xE000) {
+          code = 0x10000 + ((code - 0xD800) << 10) + (next - 0xDC00);
+          i++;
+        }
+      }
+      if (code < 0x80) {
+        update(code);
+      } else if (code < 0x800) {
+        update(0xC0 | (code >> 6));
+        update(0x80 | (code & 0x3F));
+      } else if (code < 0x10000) {
+        update(0xE0 | (code >> 12));
+        update(0x80 | ((code >> 6) & 0x3F));
+        update(0x80 | (code & 0x3F));
+      } else {
+        update(0xF0 | (code >> 18));
+        update(0x80 | ((code >> 12) & 0x3F));
+        update(0x80 | ((code >> 6) & 0x3F));
+        update(0x80 | (code & 0x3F));
+      }
+    }
+    let hex = ((crc ^ 0xFFFFFFFF) >>> 0).toString(16);
+    return `${length}:${'00000000'.slice(hex.length)}${hex}`;
+  }
+
+  /**
+   * The table of the CRC-32 of each byte, made on first use.
+   */
+  function crcTable(): number[] {
+    if (!crcs) {
+      crcs = [];
+      for (let n = 0; n < 256; n++) {
+        let c = n;
+        for (let k = 0; k < 8; k++) {
+          c = (c & 1) ? (0xEDB88320 ^ (c >>> 1)) : (c >>> 1);
+        }
+        crcs.push(c >>> 0);
+      }
+    }
+    return crcs;
+  }
+
+  let crcs: number[] = null;
+}
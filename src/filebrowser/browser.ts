@@ -65,6 +65,12 @@ const LISTING_CLASS = 'jp-FileBrowser-listing';
  */
 const REFRESH_DURATION = 30000;
 
+/**
+ * The duration of the auto-refresh of the running sessions in ms, while
+ * the server pushes the changes to the listing.
+ */
+const SESSION_REFRESH_DURATION = 60000;
+
 
 /**
  * An interface for a widget opener.
@@ -302,10 +308,23 @@ class FileBrowserWidget extends Widget {
 
   /**
    * Handle a model refresh.
+   *
+   * #### Notes
+   * The listing is only polled while the server is not pushing changes.
+   * The server does not push the running sessions, so they are still
+   * polled, less often.
    */
   private _handleRefresh(): void {
     clearTimeout(this._timeoutId);
-    this._timeoutId = setTimeout(() => this.refresh(), REFRESH_DURATION);
+    if (!this._model.isWatching) {
+      this._timeoutId = setTimeout(() => this.refresh(), REFRESH_DURATION);
+      return;
+    }
+    this._timeoutId = setTimeout(() => {
+      this._model.refreshSessions().catch(error => {
+        console.error(error);
+      });
+    }, SESSION_REFRESH_DURATION);
   }
 
   private _model: FileBrowserModel = null;
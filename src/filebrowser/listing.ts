@@ -16,11 +16,11 @@ import {
 } from 'phosphor-dragdrop';
 
 import {
-  Message
+  Message, sendMessage
 } from 'phosphor-messaging';
 
 import {
-  Widget
+  ResizeMessage, Widget
 } from 'phosphor-widget';
 
 import {
@@ -167,6 +167,16 @@ const DRAG_THRESHOLD = 5;
  */
 const FACTORY_MIME = 'application/x-phosphor-widget-factory';
 
+/**
+ * The row height in pixels assumed until a row has been measured.
+ */
+const DEFAULT_ROW_HEIGHT = 24;
+
+/**
+ * The number of rows rendered above and below the visible rows.
+ */
+const OVERSCAN_ROWS = 20;
+
 
 /**
  * A widget which hosts a file list area.
@@ -510,7 +520,7 @@ class DirListing extends Widget {
       let name = selected[selected.length - 1];
       index = arrays.findIndex(items, (value, index) => value.name === name);
       index += 1;
-      if (index === this._items.length) index = 0;
+      if (index === items.length) index = 0;
     } else if (selected.length === 0) {
       // Select the first item.
       index = 0;
@@ -536,10 +546,10 @@ class DirListing extends Widget {
       let name = selected[0];
       index = arrays.findIndex(items, (value, index) => value.name === name);
       index -= 1;
-      if (index === -1) index = this._items.length - 1;
+      if (index === -1) index = items.length - 1;
     } else if (selected.length === 0) {
       // Select the last item.
-      index = this._items.length - 1;
+      index = items.length - 1;
     } else {
       // Select the first selected item.
       let name = selected[0];
@@ -634,12 +644,33 @@ class DirListing extends Widget {
     document.removeEventListener('mouseup', this, true);
   }
 
+  /**
+   * A message handler invoked on an `'after-show'` message.
+   */
+  protected onAfterShow(msg: Message): void {
+    super.onAfterShow(msg);
+    this.update();
+  }
+
+  /**
+   * A message handler invoked on a `'resize'` message.
+   */
+  protected onResize(msg: ResizeMessage): void {
+    super.onResize(msg);
+    this.update();
+  }
+
   /**
    * A handler invoked on an `'update-request'` message.
+   *
+   * #### Notes
+   * Only the rows in and near the visible part of the listing have item
+   * nodes; the content node is padded to the height of the other rows.
    */
   protected onUpdateRequest(msg: Message): void {
     // Fetch common variables.
     let items = this._model.sortedItems;
+    let total = this._model.totalItems;
     let nodes = this._items;
     let content = utils.findElement(this.node, CONTENT_CLASS);
     let subtype = this.constructor as typeof DirListing;
@@ -647,23 +678,43 @@ class DirListing extends Widget {
     this.removeClass(MULTI_SELECTED_CLASS);
     this.removeClass(SELECTED_CLASS);
 
+    // Find the window of rows to render.
+    let rowHeight = this._rowHeight || DEFAULT_ROW_HEIGHT;
+    let visible = Math.ceil(content.clientHeight / rowHeight);
+    let first = Math.floor(content.scrollTop / rowHeight) - OVERSCAN_ROWS;
+    let last = first + visible + 2 * OVERSCAN_ROWS;
+    first = Math.max(0, first);
+    last = Math.min(total, last);
+
+    // Fetch the items of the window if they are not available yet.
+    if (last > items.length) {
+      this._model.fetchItems(last + OVERSCAN_ROWS).catch(error => {
+        utils.showErrorMessage(this, 'Directory listing', error);
+      });
+    }
+    first = Math.min(first, items.length);
+    last = Math.min(last, items.length);
+    this._first = first;
+
     // Remove any excess item nodes.
-    while (nodes.length > items.length) {
+    while (nodes.length > last - first) {
       let node = nodes.pop();
       content.removeChild(node);
     }
 
     // Add any missing item nodes.
-    while (nodes.length < items.length) {
+    while (nodes.length < last - first) {
       let node = subtype.createItemNode();
       nodes.push(node);
       content.appendChild(node);
     }
 
     // Update the node states to match the model contents.
-    for (let i = 0, n = items.length; i < n; ++i) {
-      subtype.updateItemNode(nodes[i], items[i]);
-      if (this._model.isSelected(items[i].name)) {
+    for (let i = 0, n = nodes.length; i < n; ++i) {
+      let item = items[first + i];
+      subtype.updateItemNode(nodes[i], item);
+      nodes[i].title = '';
+      if (this._model.isSelected(item.name)) {
         nodes[i].classList.add(SELECTED_CLASS);
         if (this._isCut && this._model.path === this._prevPath) {
           nodes[i].classList.add(CUT_CLASS);
@@ -671,6 +722,17 @@ class DirListing extends Widget {
       }
     }
 
+    // Pad the content so that it scrolls as if every row were rendered.
+    content.style.paddingTop = `${first * rowHeight}px`;
+    content.style.paddingBottom = `${(total - last) * rowHeight}px`;
+
+    // Measure the real row height once there is a row to measure.
+    if (nodes.length && nodes[0].offsetHeight &&
+        nodes[0].offsetHeight !== this._rowHeight) {
+      this._rowHeight = nodes[0].offsetHeight;
+      this.update();
+    }
+
     // Handle the selectors on the widget node.
     let selectedNames = this._model.getSelected();
     if (selectedNames.length > 1) {
@@ -685,7 +747,10 @@ class DirListing extends Widget {
     let specs = this._model.kernelspecs;
     for (let sessionId of this._model.sessionIds) {
       let index = paths.indexOf(sessionId.notebook.path);
-      let node = this._items[index];
+      let node = this._nodeAt(index);
+      if (!node) {
+        continue;
+      }
       node.classList.add(RUNNING_CLASS);
       node.title = specs.kernelspecs[sessionId.kernel.name].spec.display_name;
     }
@@ -757,6 +822,7 @@ class DirListing extends Widget {
    */
   private _evtScroll(event: MouseEvent): void {
     this.headerNode.scrollLeft = this.contentNode.scrollLeft;
+    this.update();
   }
 
   /**
@@ -779,7 +845,7 @@ class DirListing extends Widget {
       }
     }
 
-    let index = utils.hitTestNodes(this._items, event.clientX, event.clientY);
+    let index = this._hitTest(event.clientX, event.clientY);
     if (index === -1) {
       return;
     }
@@ -889,7 +955,7 @@ class DirListing extends Widget {
       return;
     }
 
-    let item = this._model.sortedItems[i];
+    let item = this._model.sortedItems[this._first + i];
     if (item.type === 'directory') {
       this._model.cd(item.name).catch(error =>
         showErrorMessage(this, 'Open directory', error)
@@ -912,12 +978,12 @@ class DirListing extends Widget {
    */
   private _evtDragEnter(event: IDragEvent): void {
     if (event.mimeData.hasData(utils.CONTENTS_MIME)) {
-      let index = utils.hitTestNodes(this._items, event.clientX, event.clientY);
+      let index = this._hitTest(event.clientX, event.clientY);
       if (index === -1) {
         return;
       }
       let item = this._model.sortedItems[index];
-      let target = this._items[index];
+      let target = this._nodeAt(index);
       if (!target.classList.contains(FOLDER_TYPE_CLASS)) {
         return;
       }
@@ -949,8 +1015,8 @@ class DirListing extends Widget {
     event.dropAction = event.proposedAction;
     let dropTarget = utils.findElement(this.node, utils.DROP_TARGET_CLASS);
     if (dropTarget) dropTarget.classList.remove(utils.DROP_TARGET_CLASS);
-    let index = utils.hitTestNodes(this._items, event.clientX, event.clientY);
-    this._items[index].classList.add(utils.DROP_TARGET_CLASS);
+    let node = this._nodeAt(this._hitTest(event.clientX, event.clientY));
+    if (node) node.classList.add(utils.DROP_TARGET_CLASS);
   }
 
   /**
@@ -980,8 +1046,11 @@ class DirListing extends Widget {
 
     // Get the path based on the target node.
     let index = this._items.indexOf(target);
+    if (index === -1) {
+      return;
+    }
     let items = this._model.sortedItems;
-    let path = items[index].name + '/';
+    let path = items[this._first + index].name + '/';
 
     // Move all of the items.
     let promises: Promise<IContentsModel>[] = [];
@@ -1020,7 +1089,10 @@ class DirListing extends Widget {
    */
   private _startDrag(index: number, clientX: number, clientY: number): void {
     let selectedNames = this._model.getSelected();
-    let source = this._items[index];
+    let source = this._nodeAt(index);
+    if (!source) {
+      return;
+    }
     let items = this._model.sortedItems;
     let item: IContentsModel = null;
 
@@ -1075,7 +1147,7 @@ class DirListing extends Widget {
   private _handleFileSelect(event: MouseEvent): void {
     // Fetch common variables.
     let items = this._model.sortedItems;
-    let index = utils.hitTestNodes(this._items, event.clientX, event.clientY);
+    let index = this._hitTest(event.clientX, event.clientY);
 
     clearTimeout(this._selectTimer);
 
@@ -1120,7 +1192,7 @@ class DirListing extends Widget {
     // Find the "nearest selected".
     let items = this._model.sortedItems;
     let nearestIndex = -1;
-    for (let i = 0; i < this._items.length; i++) {
+    for (let i = 0; i < items.length; i++) {
       if (i === index) {
         continue;
       }
@@ -1142,7 +1214,7 @@ class DirListing extends Widget {
     }
 
     // Select the rows between the current and the nearest selected.
-    for (let i = 0; i < this._items.length; i++) {
+    for (let i = 0; i < items.length; i++) {
       if (nearestIndex >= i && index <= i ||
           nearestIndex <= i && index >= i) {
         this._model.select(items[i].name);
@@ -1196,7 +1268,16 @@ class DirListing extends Widget {
     let items = this._model.sortedItems;
     let name = this._softSelection || this._model.getSelected()[0];
     let index = arrays.findIndex(items, (value, index) => value.name === name);
-    let row = this._items[index];
+    let row = this._nodeAt(index);
+    if (!row && index !== -1) {
+      // Render the row before editing it.
+      this._scrollToItem(index);
+      sendMessage(this, Widget.MsgUpdateRequest);
+      row = this._nodeAt(index);
+    }
+    if (!row) {
+      return Promise.resolve(name);
+    }
     let text = utils.findElement(row, ITEM_TEXT_CLASS);
     let original = text.textContent;
 
@@ -1250,10 +1331,49 @@ class DirListing extends Widget {
     }
     let name = items[index].name;
     this._model.select(name);
-    Private.scrollIfNeeded(this.contentNode, this._items[index]);
+    this._scrollToItem(index);
     this._isCut = false;
   }
 
+  /**
+   * Get the index of the item at a client position, or `-1`.
+   */
+  private _hitTest(clientX: number, clientY: number): number {
+    let index = utils.hitTestNodes(this._items, clientX, clientY);
+    return index === -1 ? -1 : this._first + index;
+  }
+
+  /**
+   * Get the node rendering the item at an index, or `null` if the item
+   * is outside of the rendered rows.
+   */
+  private _nodeAt(index: number): HTMLElement {
+    let i = index - this._first;
+    if (index === -1 || i < 0 || i >= this._items.length) {
+      return null;
+    }
+    return this._items[i];
+  }
+
+  /**
+   * Scroll an item into view, whether or not its row is rendered.
+   */
+  private _scrollToItem(index: number): void {
+    let content = this.contentNode;
+    let node = this._nodeAt(index);
+    if (node) {
+      Private.scrollIfNeeded(content, node);
+      return;
+    }
+    let rowHeight = this._rowHeight || DEFAULT_ROW_HEIGHT;
+    let top = index * rowHeight;
+    if (top < content.scrollTop) {
+      content.scrollTop = top;
+    } else if (top + rowHeight > content.scrollTop + content.clientHeight) {
+      content.scrollTop = top + rowHeight - content.clientHeight;
+    }
+  }
+
   /**
    * Handle the `refreshed` signal from the model.
    */
@@ -1271,6 +1391,8 @@ class DirListing extends Widget {
   private _model: FileBrowserModel = null;
   private _editNode: HTMLInputElement = null;
   private _items: HTMLElement[] = [];
+  private _first = 0;
+  private _rowHeight = 0;
   private _drag: Drag = null;
   private _dragData: { pressX: number, pressY: number, index: number } = null;
   private _selectTimer = -1;
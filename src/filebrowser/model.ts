@@ -7,9 +7,12 @@ import {
 } from 'jupyter-js-services';
 
 import {
-  PromiseDelegate
+  IAjaxSettings, PromiseDelegate, ajaxRequest, getBaseUrl, urlPathJoin
 } from 'jupyter-js-utils';
 
+import * as arrays
+  from 'phosphor-arrays';
+
 import {
   IDisposable
 } from 'phosphor-disposable';
@@ -22,6 +25,43 @@ import {
   ISignal, Signal, clearSignalData
 } from 'phosphor-signaling';
 
+import {
+  revalidate, takeBootstrap
+} from '../services/bootstrap';
+
+import {
+  SessionManager
+} from '../services/sessions';
+
+import {
+  IUploadProgress, uploadChunked
+} from './upload';
+
+import {
+  DirectoryWatcher, IDirectoryChange, IListingDelta
+} from './watch';
+
+
+/**
+ * The number of items fetched per page of a paged listing.
+ */
+const PAGE_SIZE = 500;
+
+/**
+ * The url of the paged directory listing api.
+ */
+const LISTING_URL = 'lab/api/listing';
+
+/**
+ * The url of the directory sessions api.
+ */
+const SESSIONS_URL = 'lab/api/sessions';
+
+/**
+ * The time in ms that the sessions of a directory are cached.
+ */
+const SESSION_CACHE_AGE = 30000;
+
 
 /**
  * An implementation of a file browser view model.
@@ -40,6 +80,12 @@ class FileBrowserModel implements IDisposable {
     this._sessionManager = sessionManager;
     this._specs = specs;
     this._model = { path: '', name: '/', type: 'directory', content: [] };
+    this._watcher = new DirectoryWatcher();
+    this._watcher.changed.connect(this._onDirectoryChanged, this);
+    this._watcher.connectionChanged.connect(this._onWatchConnection, this);
+    if (sessionManager instanceof SessionManager) {
+      sessionManager.runningChanged.connect(this._onRunningChanged, this);
+    }
     this.cd();
   }
 
@@ -57,6 +103,13 @@ class FileBrowserModel implements IDisposable {
     return Private.fileChangedSignal.bind(this);
   }
 
+  /**
+   * Get the upload progress signal.
+   */
+  get uploadProgress(): ISignal<FileBrowserModel, IUploadProgress> {
+    return Private.uploadProgressSignal.bind(this);
+  }
+
   /**
    * Get the current path.
    *
@@ -81,6 +134,20 @@ class FileBrowserModel implements IDisposable {
     return this._model === null;
   }
 
+  /**
+   * Get whether changes to the current directory are pushed by the server.
+   *
+   * #### Notes
+   * While this is `true` there is no need to poll with [[refresh]].  The
+   * running sessions are not pushed, so they are still polled with
+   * [[refreshSessions]].
+   *
+   * This is a read-only property.
+   */
+  get isWatching(): boolean {
+    return this._paged && this._watcher !== null && this._watcher.isConnected;
+  }
+
   /**
    * Get the session ids for active notebooks.
    *
@@ -110,7 +177,7 @@ class FileBrowserModel implements IDisposable {
    */
   set sortAscending(value: boolean) {
     this._ascending = value;
-    this._sort();
+    this._resort();
   }
 
   /**
@@ -125,7 +192,7 @@ class FileBrowserModel implements IDisposable {
    */
   set sortKey(value: string) {
     this._sortKey = value;
-    this._sort();
+    this._resort();
   }
 
   /**
@@ -133,11 +200,31 @@ class FileBrowserModel implements IDisposable {
    *
    * #### Notes
    * This is a read-only property and should be treated as immutable.
+   *
+   * For a paged listing this holds the items fetched so far, which are
+   * always the first items of the sorted listing.  See [[totalItems]] and
+   * [[fetchItems]].
    */
   get sortedItems(): IContentsModel[] {
     return this._model.content;
   }
 
+  /**
+   * Get the total number of items in the current directory.
+   *
+   * #### Notes
+   * This can be larger than the length of [[sortedItems]] when the
+   * listing is paged.
+   *
+   * This is a read-only property.
+   */
+  get totalItems(): number {
+    if (this._paged) {
+      return Math.max(this._total, this._model.content.length);
+    }
+    return this._model.content.length;
+  }
+
   /**
    * Select an item by name.
    *
@@ -193,6 +280,10 @@ class FileBrowserModel implements IDisposable {
    * Dispose of the resources held by the view model.
    */
   dispose(): void {
+    if (this._watcher) {
+      this._watcher.dispose();
+      this._watcher = null;
+    }
     this._model = null;
     this._contentsManager = null;
     this._selection = null;
@@ -215,7 +306,7 @@ class FileBrowserModel implements IDisposable {
       previous = Object.create(null);
     }
     let selection = Object.create(null);
-    return this._contentsManager.get(path, {}).then(contents => {
+    return this._getListing(path).then(contents => {
       this._model = contents;
       let content = contents.content as IContentsModel[];
       let names = content.map((value, index) => value.name);
@@ -225,9 +316,10 @@ class FileBrowserModel implements IDisposable {
         }
       }
       this._unsortedNames = content.map((value, index) => value.name);
-      if (this._sortKey !== 'name' || !this._ascending) {
+      if (!this._paged && (this._sortKey !== 'name' || !this._ascending)) {
         this._sort();
       }
+      this._watch();
       return this._findSessions();
     }).then(() => {
       this.selectionChanged.emit(void 0);
@@ -235,11 +327,74 @@ class FileBrowserModel implements IDisposable {
     });
   }
 
+  /**
+   * Fetch more items of a paged listing.
+   *
+   * @param count - The number of items that should be available in
+   *   [[sortedItems]].
+   *
+   * @returns A promise which resolves when the items are fetched.
+   *
+   * #### Notes
+   * This is a no-op if the items are already available.
+   */
+  fetchItems(count: number): Promise<void> {
+    if (!this._paged) {
+      return Promise.resolve(void 0);
+    }
+    count = Math.min(count, this._total);
+    if (this._fetching) {
+      return this._fetching.then(() => this.fetchItems(count));
+    }
+    let content = this._model.content as IContentsModel[];
+    if (content.length >= count) {
+      return Promise.resolve(void 0);
+    }
+    let path = this._model.path;
+    let token = this._token;
+    let limit = Math.max(count - content.length, PAGE_SIZE);
+    this._fetching = this._fetchPage(path, content.length, limit, token).then(page => {
+      this._fetching = null;
+      if (this.isDisposed || this._model.path !== path) {
+        return;
+      }
+      if (page.token !== this._token) {
+        // The directory changed between pages, start over.
+        this._pendingChanges = [];
+        return this.cd('.');
+      }
+      for (let item of page.content as IContentsModel[]) {
+        content.push(item);
+        this._unsortedNames.push(item.name);
+      }
+      this._applyPendingChanges();
+      return this._findSessions().then(() => {
+        this.refreshed.emit(void 0);
+      });
+    }, error => {
+      this._fetching = null;
+      this._applyPendingChanges();
+      throw error;
+    });
+    return this._fetching;
+  }
+
   /**
    * Refresh the current directory.
+   *
+   * #### Notes
+   * A paged listing only fetches the changes since the last listing.
+   * The running sessions are always looked up again.
    */
   refresh(): Promise<void> {
-    return this.cd('.').catch(error => {
+    this._sessionCache = null;
+    let promise: Promise<void>;
+    if (this._paged && this._token) {
+      promise = this._refreshDelta();
+    } else {
+      promise = this.cd('.');
+    }
+    return promise.catch(error => {
       console.error(error);
       let msg = 'Unable to refresh the directory listing due to ';
       msg += 'lost server connection.';
@@ -248,6 +403,22 @@ class FileBrowserModel implements IDisposable {
     });
   }
 
+  /**
+   * Look up the running sessions of the current directory again.
+   *
+   * #### Notes
+   * Emits [[refreshed]] once the sessions are in.
+   */
+  refreshSessions(): Promise<void> {
+    if (this.isDisposed) {
+      return Promise.resolve(void 0);
+    }
+    this._sessionCache = null;
+    return this._findSessions().then(() => {
+      this.refreshed.emit(void 0);
+    });
+  }
+
   /**
    * Copy a file.
    *
@@ -371,27 +542,17 @@ class FileBrowserModel implements IDisposable {
    * @returns A promise containing the new file contents model.
    *
    * #### Notes
-   * This will fail to upload files that are too big to be sent in one
-   * request to the server.
+   * Files other than notebooks are sent in binary chunks, reporting
+   * progress with [[uploadProgress]].  Notebooks, and all files if the
+   * server cannot take chunked uploads, are sent in one request, which
+   * fails for files that are too big.
    */
   upload(file: File, overwrite?: boolean): Promise<IContentsModel> {
-    // Skip large files with a warning.
-    if (file.size > this._maxUploadSizeMb * 1024 * 1024) {
-      let msg = `Cannot upload file (>${this._maxUploadSizeMb} MB) `;
-      msg += `"${file.name}"`;
-      console.warn(msg);
-      return Promise.reject<IContentsModel>(new Error(msg));
-    }
-
-    if (overwrite) {
-      return this._upload(file);
+    let isNotebook = file.name.indexOf('.ipynb') !== -1;
+    if (this._chunkedUploads && !isNotebook) {
+      return this._uploadChunked(file, overwrite);
     }
-
-    return this._contentsManager.get(file.name, {}).then(() => {
-      return Private.typedThrow<IContentsModel>(`"${file.name}" already exists`);
-    }, () => {
-      return this._upload(file);
-    });
+    return this._uploadWhole(file, overwrite);
   }
 
   /**
@@ -400,6 +561,8 @@ class FileBrowserModel implements IDisposable {
   shutdown(sessionId: ISessionId): Promise<void> {
     return this._sessionManager.connectTo(sessionId.id).then(session => {
       return session.shutdown();
+    }).then(() => {
+      this._sessionCache = null;
     });
   }
 
@@ -410,6 +573,65 @@ class FileBrowserModel implements IDisposable {
     return this._sessionManager.startNew({
       notebookPath: path,
       kernelName: kernel
+    }).then(session => {
+      this._sessionCache = null;
+      return session;
+    });
+  }
+
+  /**
+   * Upload a file in chunks.
+   */
+  private _uploadChunked(file: File, overwrite?: boolean): Promise<IContentsModel> {
+    let path = this._model.path;
+    path = path ? path + '/' + file.name : file.name;
+    let options = {
+      overwrite: !!overwrite,
+      onProgress: (progress: IUploadProgress) => {
+        this.uploadProgress.emit(progress);
+      }
+    };
+    return uploadChunked(path, file, options).then(contents => {
+      this.fileChanged.emit({
+        name: 'file',
+        oldValue: void 0,
+        newValue: contents.path
+      });
+      return contents;
+    }, error => {
+      let status = error.xhr ? error.xhr.status : 0;
+      if (status === 409) {
+        return Private.typedThrow<IContentsModel>(`"${file.name}" already exists`);
+      }
+      if (status === 404 || status === 501) {
+        // The server cannot take chunked uploads.
+        this._chunkedUploads = false;
+        return this._uploadWhole(file, overwrite);
+      }
+      throw error;
+    });
+  }
+
+  /**
+   * Upload a file in one request.
+   */
+  private _uploadWhole(file: File, overwrite?: boolean): Promise<IContentsModel> {
+    // Skip large files with a warning.
+    if (file.size > this._maxUploadSizeMb * 1024 * 1024) {
+      let msg = `Cannot upload file (>${this._maxUploadSizeMb} MB) `;
+      msg += `"${file.name}"`;
+      console.warn(msg);
+      return Promise.reject<IContentsModel>(new Error(msg));
+    }
+
+    if (overwrite) {
+      return this._upload(file);
+    }
+
+    return this._contentsManager.get(file.name, {}).then(() => {
+      return Private.typedThrow<IContentsModel>(`"${file.name}" already exists`);
+    }, () => {
+      return this._upload(file);
     });
   }
 
@@ -442,6 +664,231 @@ class FileBrowserModel implements IDisposable {
     this._model.content = items;
   }
 
+  /**
+   * Re-apply the sort order after a change of sort key or direction.
+   */
+  private _resort(): void {
+    if (!this._paged) {
+      this._sort();
+      return;
+    }
+    // A paged listing is sorted by the server, refetch the first page.
+    this.cd('.').catch(error => {
+      console.error(error);
+    });
+  }
+
+  /**
+   * Get a directory model with its first page of items.
+   *
+   * #### Notes
+   * Falls back to the contents API for the full listing if the server
+   * does not provide paged listings.
+   */
+  private _getListing(path: string): Promise<IContentsModel> {
+    if (!this._paged) {
+      return this._contentsManager.get(path, {});
+    }
+    if (path === '') {
+      let listing = this._takeBootstrap();
+      if (listing) {
+        return Promise.resolve(listing);
+      }
+    }
+    return this._fetchPage(path, 0, PAGE_SIZE).then(page => {
+      this._token = page.token;
+      this._total = page.total;
+      return page as IContentsModel;
+    }, error => {
+      if (error.xhr && error.xhr.status === 404) {
+        // Either the path does not exist or the server does not have the
+        // listing handler; the contents API can tell the difference.
+        return this._contentsManager.get(path, {}).then(contents => {
+          this._paged = false;
+          return contents;
+        });
+      }
+      throw error;
+    });
+  }
+
+  /**
+   * Take the root directory listing and sessions inlined in the page.
+   *
+   * #### Notes
+   * Returns `null` if the page has no listing, or the listing is not in
+   * the current order.  The listing and sessions are refreshed once
+   * startup is done.
+   */
+  private _takeBootstrap(): IContentsModel {
+    let page = takeBootstrap<Private.IListingPage>('listing');
+    let sessions = takeBootstrap<ISessionId[]>('sessions');
+    if (!page || this._sortKey !== 'name' || !this._ascending) {
+      return null;
+    }
+    this._token = page.token;
+    this._total = page.total;
+    if (sessions) {
+      let now = new Date().getTime();
+      let promise = Promise.resolve(sessions);
+      this._sessionCache = { path: '', time: now, promise };
+    }
+    revalidate(() => this.isDisposed ? Promise.resolve(void 0) : this.refresh());
+    return page;
+  }
+
+  /**
+   * Fetch one sorted page of a directory listing.
+   */
+  private _fetchPage(path: string, start: number, limit: number, token?: string): Promise<Private.IListingPage> {
+    let params: { [key: string]: string } = {
+      start: String(start),
+      limit: String(limit),
+      sort: this._sortKey,
+      reverse: this._ascending ? '0' : '1'
+    };
+    if (token) {
+      params['token'] = token;
+    }
+    return Private.requestListing(path, params).then(page => {
+      if (page.type !== 'directory') {
+        throw new Error(`"${path}" is not a directory`);
+      }
+      return page;
+    });
+  }
+
+  /**
+   * Apply the changes to the current directory since the last listing.
+   */
+  private _refreshDelta(): Promise<void> {
+    let path = this._model.path;
+    return Private.requestListing(path, { since: this._token }).then(reply => {
+      if (this.isDisposed || this._model.path !== path) {
+        return;
+      }
+      return this._applyDelta(reply.token, reply.total, reply.delta);
+    });
+  }
+
+  /**
+   * Apply the changes from the current listing to a newer listing.
+   */
+  private _applyDelta(token: string, total: number, delta: IListingDelta): Promise<void> {
+    if (!delta) {
+      // The server no longer knows our listing.
+      return this.cd('.');
+    }
+    let content = this._model.content as IContentsModel[];
+    let complete = content.length >= this._total;
+    this._token = token;
+    this._total = total;
+    if (!delta.added.length && !delta.removed.length && !delta.modified.length) {
+      return Promise.resolve(void 0);
+    }
+    let changed = Object.create(null);
+    for (let name of delta.removed) {
+      changed[name] = true;
+      this.deselect(name);
+    }
+    for (let item of delta.modified) {
+      changed[item.name] = true;
+    }
+    content = content.filter(item => !changed[item.name]);
+    let cmp = Private.compareItems(this._sortKey, this._ascending);
+    for (let item of delta.added.concat(delta.modified)) {
+      let index = arrays.upperBound(content, item, cmp);
+      // Items sorting after the last fetched item belong to a page that
+      // has not been fetched yet.
+      if (index < content.length || complete) {
+        content.splice(index, 0, item);
+      }
+    }
+    this._model.content = content;
+    this._unsortedNames = content.map(item => item.name);
+    return this._findSessions().then(() => {
+      this.refreshed.emit(void 0);
+    });
+  }
+
+  /**
+   * Watch the current directory for changes pushed by the server.
+   */
+  private _watch(): void {
+    if (!this._watcher) {
+      return;
+    }
+    if (!this._paged) {
+      // The server does not have the lab api.
+      this._watcher.dispose();
+      this._watcher = null;
+      return;
+    }
+    this._watcher.watch(this._model.path, this._token);
+  }
+
+  /**
+   * Handle a change to a watched directory.
+   */
+  private _onDirectoryChanged(sender: DirectoryWatcher, change: IDirectoryChange): void {
+    if (this.isDisposed || change.path !== this._model.path) {
+      return;
+    }
+    if (this._fetching) {
+      // The page being fetched is from the current listing, so the change
+      // applies once the page is in.
+      this._pendingChanges.push(change);
+      return;
+    }
+    if (change.token === this._token) {
+      return;
+    }
+    let promise: Promise<void>;
+    if (change.token && change.since === this._token) {
+      promise = this._applyDelta(change.token, change.total, change.delta);
+    } else {
+      promise = this.refresh();
+    }
+    promise.catch(error => {
+      console.error(error);
+    });
+  }
+
+  /**
+   * Apply the changes pushed while a page was being fetched.
+   */
+  private _applyPendingChanges(): void {
+    let changes = this._pendingChanges;
+    this._pendingChanges = [];
+    for (let change of changes) {
+      this._onDirectoryChanged(this._watcher, change);
+    }
+  }
+
+  /**
+   * Handle the watch connection opening or closing.
+   */
+  private _onWatchConnection(sender: DirectoryWatcher, connected: boolean): void {
+    if (this.isDisposed) {
+      return;
+    }
+    if (connected) {
+      this._watch();
+      return;
+    }
+    // Let the owners of the model go back to polling.
+    this.refreshed.emit(void 0);
+  }
+
+  /**
+   * Handle a change to the running sessions.
+   */
+  private _onRunningChanged(): void {
+    this.refreshSessions().catch(error => {
+      console.error(error);
+    });
+  }
+
   /**
    * Perform the actual upload.
    */
@@ -497,20 +944,54 @@ class FileBrowserModel implements IDisposable {
       return Promise.resolve(void 0);
     }
 
-    return this._sessionManager.listRunning().then(sessionIds => {
-      if (!sessionIds.length) {
-        return;
+    return this._listSessions(this._model.path).then(sessionIds => {
+      let paths: { [key: string]: boolean } = Object.create(null);
+      for (let notebook of notebooks) {
+        paths[notebook.path] = true;
       }
-      let paths = notebooks.map((notebook: IContentsModel) => {
-        return notebook.path;
+      this._sessionIds = sessionIds.filter(sessionId => {
+        return sessionId.notebook && paths[sessionId.notebook.path] === true;
       });
-      for (let sessionId of sessionIds) {
-        let index = paths.indexOf(sessionId.notebook.path);
-        if (index !== -1) {
-          this._sessionIds.push(sessionId);
+    });
+  }
+
+  /**
+   * Get the running sessions of a directory.
+   *
+   * #### Notes
+   * The sessions are cached for the current directory until a session is
+   * started or shut down through the model or a [[SessionManager]], the
+   * model is refreshed, or the cache is older than `SESSION_CACHE_AGE`.
+   *
+   * Falls back to the list of all sessions if the server does not
+   * provide the sessions of a directory.
+   */
+  private _listSessions(path: string): Promise<ISessionId[]> {
+    let cache = this._sessionCache;
+    let now = new Date().getTime();
+    if (cache && cache.path === path && now - cache.time < SESSION_CACHE_AGE) {
+      return cache.promise;
+    }
+    let promise: Promise<ISessionId[]>;
+    if (this._directorySessions) {
+      promise = Private.requestSessions(path).catch(error => {
+        if (error.xhr && error.xhr.status === 404) {
+          this._directorySessions = false;
+          return this._sessionManager.listRunning();
         }
+        throw error;
+      });
+    } else {
+      promise = this._sessionManager.listRunning();
+    }
+    cache = this._sessionCache = { path, time: now, promise };
+    promise.catch(() => {
+      // Do not keep failures.
+      if (this._sessionCache === cache) {
+        this._sessionCache = null;
       }
     });
+    return promise;
   }
 
   private _maxUploadSizeMb = 15;
@@ -523,6 +1004,15 @@ class FileBrowserModel implements IDisposable {
   private _ascending = true;
   private _unsortedNames: string[] = [];
   private _specs: IKernelSpecIds = null;
+  private _paged = true;
+  private _token = '';
+  private _total = 0;
+  private _fetching: Promise<void> = null;
+  private _pendingChanges: IDirectoryChange[] = [];
+  private _watcher: DirectoryWatcher = null;
+  private _chunkedUploads = true;
+  private _directorySessions = true;
+  private _sessionCache: Private.ISessionCache = null;
 }
 
 
@@ -548,6 +1038,142 @@ namespace Private {
   export
   const selectionChangedSignal = new Signal<FileBrowserModel, void>();
 
+  /**
+   * A signal emitted when an upload makes progress.
+   */
+  export
+  const uploadProgressSignal = new Signal<FileBrowserModel, IUploadProgress>();
+
+  /**
+   * A page of a directory listing.
+   */
+  export
+  interface IListingPage extends IContentsModel {
+    /**
+     * The token of the listing snapshot the page was taken from.
+     */
+    token: string;
+
+    /**
+     * The total number of items in the directory.
+     */
+    total: number;
+
+    /**
+     * The changes since the requested token, or `null` if unknown.
+     */
+    delta?: IListingDelta;
+  }
+
+  /**
+   * The cached running sessions of a directory.
+   */
+  export
+  interface ISessionCache {
+    /**
+     * The path of the directory.
+     */
+    path: string;
+
+    /**
+     * The time of the request in ms.
+     */
+    time: number;
+
+    /**
+     * The promise of the sessions.
+     */
+    promise: Promise<ISessionId[]>;
+  }
+
+  /**
+   * Request the running sessions of the files in a directory.
+   */
+  export
+  function requestSessions(path: string): Promise<ISessionId[]> {
+    let parts = path.split('/').map(part => encodeURIComponent(part));
+    let url = urlPathJoin(getBaseUrl(), SESSIONS_URL, parts.join('/'));
+    let ajaxSettings: IAjaxSettings = {
+      method: 'GET',
+      dataType: 'json',
+      cache: false
+    };
+    return ajaxRequest(url, ajaxSettings).then(success => {
+      if (success.xhr.status !== 200) {
+        throw Error('Invalid Status: ' + success.xhr.status);
+      }
+      return success.data as ISessionId[];
+    });
+  }
+
+  /**
+   * Request a page or a delta of a directory listing.
+   */
+  export
+  function requestListing(path: string, params: { [key: string]: string }): Promise<IListingPage> {
+    let parts = path.split('/').map(part => encodeURIComponent(part));
+    let url = urlPathJoin(getBaseUrl(), LISTING_URL, parts.join('/'));
+    let query = Object.keys(params).map(key => {
+      return `${encodeURIComponent(key)}=${encodeURIComponent(params[key])}`;
+    });
+    if (query.length) {
+      url += '?' + query.join('&');
+    }
+    let ajaxSettings: IAjaxSettings = {
+      method: 'GET',
+      dataType: 'json',
+      cache: false
+    };
+    return ajaxRequest(url, ajaxSettings).then(success => {
+      if (success.xhr.status !== 200) {
+        throw Error('Invalid Status: ' + success.xhr.status);
+      }
+      return success.data as IListingPage;
+    });
+  }
+
+  /**
+   * The rank of a content type in the name order.
+   */
+  const typeOrder: { [key: string]: number } = {
+    directory: 0,
+    notebook: 1,
+    file: 2
+  };
+
+  /**
+   * Compare two items by the name order of the contents api.
+   */
+  function compareNames(a: IContentsModel, b: IContentsModel): number {
+    let typeA = a.type in typeOrder ? typeOrder[a.type] : 9;
+    let typeB = b.type in typeOrder ? typeOrder[b.type] : 9;
+    if (typeA !== typeB) {
+      return typeA - typeB;
+    }
+    let lowerA = a.name.toLowerCase();
+    let lowerB = b.name.toLowerCase();
+    if (lowerA !== lowerB) {
+      return lowerA < lowerB ? -1 : 1;
+    }
+    return a.name === b.name ? 0 : (a.name < b.name ? -1 : 1);
+  }
+
+  /**
+   * Create a comparison function matching the server's listing order.
+   */
+  export
+  function compareItems(sortKey: string, ascending: boolean): (a: IContentsModel, b: IContentsModel) => number {
+    let cmp = compareNames;
+    if (sortKey === 'last_modified') {
+      cmp = (a: IContentsModel, b: IContentsModel) => {
+        let valA = new Date(a.last_modified).getTime();
+        let valB = new Date(b.last_modified).getTime();
+        return (valB - valA) || compareNames(a, b);
+      };
+    }
+    return ascending ? cmp : (a, b) => cmp(b, a);
+  }
+
   /**
    * Parse the content of a `FileReader`.
    *
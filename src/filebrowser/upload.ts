@@ -0,0 +1,198 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IContentsModel
+} from 'jupyter-js-services';
+
+import {
+  IAjaxSettings, ajaxRequest, getBaseUrl, urlPathJoin
+} from 'jupyter-js-utils';
+
+
+/**
+ * The url of the chunked upload api.
+ */
+const UPLOADS_URL = 'lab/api/uploads';
+
+/**
+ * The size of an upload chunk in bytes.
+ */
+const CHUNK_SIZE = 4 * 1024 * 1024;
+
+/**
+ * The number of chunks sent at the same time.
+ */
+const CONCURRENCY = 4;
+
+/**
+ * The number of times a chunk is retried before the upload fails.
+ */
+const MAX_RETRIES = 5;
+
+/**
+ * The delay before the first retry of a chunk, in ms.
+ */
+const RETRY_DELAY = 1000;
+
+
+/**
+ * The progress of an upload.
+ */
+export
+interface IUploadProgress {
+  /**
+   * The path of the uploaded file.
+   */
+  path: string;
+
+  /**
+   * The number of bytes the server has received.
+   */
+  loaded: number;
+
+  /**
+   * The size of the file in bytes.
+   */
+  total: number;
+}
+
+
+/**
+ * The options used to upload a file in chunks.
+ */
+export
+interface IChunkedUploadOptions {
+  /**
+   * Whether to overwrite an existing file.
+   */
+  overwrite?: boolean;
+
+  /**
+   * A callback invoked when a chunk has been received by the server.
+   */
+  onProgress?: (progress: IUploadProgress) => void;
+
+  /**
+   * The base url of the server.
+   */
+  baseUrl?: string;
+}
+
+
+/**
+ * Upload a file in binary chunks.
+ *
+ * @param path - The path of the file on the server.
+ *
+ * @param file - The file to upload.
+ *
+ * @param options - The upload options.
+ *
+ * @returns A promise which resolves with the contents model of the file.
+ *
+ * #### Notes
+ * The file is never read into memory as a whole; each chunk is a slice of
+ * the file sent as it is.  Failed chunks are retried, and uploading the
+ * same file again after a failure only sends the chunks the server does
+ * not have yet.
+ *
+ * The promise is rejected with an `xhr` with status `409` if the file
+ * exists and `overwrite` is not set, and with status `404` or `501` if
+ * the server cannot take chunked uploads.
+ */
+export
+function uploadChunked(path: string, file: File, options?: IChunkedUploadOptions): Promise<IContentsModel> {
+  options = options || {};
+  let url = urlPathJoin(options.baseUrl || getBaseUrl(), UPLOADS_URL);
+  let onProgress = options.onProgress || ((progress: IUploadProgress) => { /* no-op */ });
+  let request = {
+    path,
+    size: file.size,
+    key: `${file.name}:${file.lastModifiedDate ? file.lastModifiedDate.getTime() : ''}`,
+    chunk_size: CHUNK_SIZE,
+    overwrite: !!options.overwrite
+  };
+  return Private.requestJSON(url, 'POST', JSON.stringify(request)).then(upload => {
+    let uploadUrl = urlPathJoin(url, upload.id);
+    let received = Object.create(null);
+    for (let index of upload.received) {
+      received[index] = true;
+    }
+    let pending: number[] = [];
+    for (let index = 0; index < upload.chunks; index++) {
+      if (!received[index]) {
+        pending.push(index);
+      }
+    }
+    let loaded = Math.min(upload.received.length * upload.chunk_size, file.size);
+    onProgress({ path, loaded, total: file.size });
+
+    // Each worker sends the next pending chunk until there are none left.
+    let next = (): Promise<void> => {
+      if (!pending.length) {
+        return Promise.resolve(void 0);
+      }
+      let index = pending.shift();
+      let start = index * upload.chunk_size;
+      let blob = file.slice(start, Math.min(start + upload.chunk_size, file.size));
+      return Private.sendChunk(urlPathJoin(uploadUrl, String(index)), blob).then(() => {
+        loaded += blob.size;
+        onProgress({ path, loaded, total: file.size });
+        return next();
+      });
+    };
+    let workers: Promise<void>[] = [];
+    for (let i = 0; i < Math.min(CONCURRENCY, pending.length); i++) {
+      workers.push(next());
+    }
+    return Promise.all(workers).then(() => {
+      return Private.requestJSON(uploadUrl, 'POST');
+    });
+  });
+}
+
+
+/**
+ * The namespace for the chunked upload private data.
+ */
+namespace Private {
+  /**
+   * Make a request with a JSON reply.
+   */
+  export
+  function requestJSON(url: string, method: string, data?: string): Promise<any> {
+    let ajaxSettings: IAjaxSettings = {
+      method,
+      dataType: 'json',
+      contentType: 'application/json',
+      data
+    };
+    return ajaxRequest(url, ajaxSettings).then(success => success.data);
+  }
+
+  /**
+   * Send a chunk, retrying with a growing delay on failure.
+   *
+   * #### Notes
+   * Client errors other than a timeout are not retried.
+   */
+  export
+  function sendChunk(url: string, blob: Blob, attempt = 0): Promise<void> {
+    let ajaxSettings: IAjaxSettings = {
+      method: 'PUT',
+      contentType: 'application/octet-stream',
+      data: blob
+    };
+    return ajaxRequest(url, ajaxSettings).then(() => void 0, error => {
+      let status = error.xhr ? error.xhr.status : 0;
+      let retry = status === 0 || status === 408 || status >= 500;
+      if (!retry || attempt >= MAX_RETRIES) {
+        throw error;
+      }
+      return new Promise<void>(resolve => {
+        setTimeout(resolve, RETRY_DELAY * Math.pow(2, attempt));
+      }).then(() => sendChunk(url, blob, attempt + 1));
+    });
+  }
+}
@@ -0,0 +1,241 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IContentsModel
+} from 'jupyter-js-services';
+
+import {
+  getWsUrl, urlPathJoin
+} from 'jupyter-js-utils';
+
+import {
+  IDisposable
+} from 'phosphor-disposable';
+
+import {
+  ISignal, Signal, clearSignalData
+} from 'phosphor-signaling';
+
+
+/**
+ * The url of the directory watch websocket.
+ */
+const WATCH_URL = 'lab/api/watch';
+
+/**
+ * The initial delay before reconnecting a closed socket, in ms.
+ */
+const RECONNECT_DELAY = 1000;
+
+/**
+ * The longest delay before reconnecting a closed socket, in ms.
+ */
+const MAX_RECONNECT_DELAY = 60000;
+
+
+/**
+ * The changes to a directory between two listings.
+ */
+export
+interface IListingDelta {
+  /**
+   * The models of the new items.
+   */
+  added: IContentsModel[];
+
+  /**
+   * The names of the removed items.
+   */
+  removed: string[];
+
+  /**
+   * The new models of the changed items.
+   */
+  modified: IContentsModel[];
+}
+
+
+/**
+ * A change to a watched directory pushed by the server.
+ */
+export
+interface IDirectoryChange {
+  /**
+   * The path of the directory.
+   */
+  path: string;
+
+  /**
+   * The token of the new listing, or `null` if the directory is gone.
+   */
+  token: string;
+
+  /**
+   * The number of items in the new listing.
+   */
+  total?: number;
+
+  /**
+   * The token of the listing the delta applies to.
+   */
+  since: string;
+
+  /**
+   * The changes since that listing, or `null` if they are not known.
+   */
+  delta: IListingDelta;
+}
+
+
+/**
+ * A websocket client of the server's directory watch service.
+ *
+ * #### Notes
+ * A watcher watches at most one directory at a time and reconnects with
+ * a growing delay when the connection is lost.
+ */
+export
+class DirectoryWatcher implements IDisposable {
+  /**
+   * Construct a new directory watcher.
+   *
+   * @param baseUrl - The base websocket url of the server.
+   */
+  constructor(baseUrl?: string) {
+    this._url = urlPathJoin(baseUrl || getWsUrl(), WATCH_URL);
+    this._connect();
+  }
+
+  /**
+   * A signal emitted when a watched directory changes.
+   */
+  get changed(): ISignal<DirectoryWatcher, IDirectoryChange> {
+    return Private.changedSignal.bind(this);
+  }
+
+  /**
+   * A signal emitted when the connection opens or closes.
+   */
+  get connectionChanged(): ISignal<DirectoryWatcher, boolean> {
+    return Private.connectionChangedSignal.bind(this);
+  }
+
+  /**
+   * Get whether the watcher is connected to the server.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isConnected(): boolean {
+    return this._ws !== null && this._ws.readyState === WebSocket.OPEN;
+  }
+
+  /**
+   * Get whether the watcher is disposed.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isDisposed(): boolean {
+    return this._url === null;
+  }
+
+  /**
+   * Watch a directory, replacing the directory watched before.
+   *
+   * @param path - The path of the directory.
+   *
+   * @param token - The token of the listing held by the caller.  Changes
+   *   since this listing are pushed right away.
+   */
+  watch(path: string, token: string): void {
+    this.unwatch();
+    this._path = path;
+    this._send({ action: 'watch', path, token });
+  }
+
+  /**
+   * Stop watching the current directory.
+   */
+  unwatch(): void {
+    if (this._path !== null) {
+      this._send({ action: 'unwatch', path: this._path });
+      this._path = null;
+    }
+  }
+
+  /**
+   * Dispose of the resources held by the watcher.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    this._url = null;
+    clearTimeout(this._timer);
+    if (this._ws) {
+      this._ws.onclose = null;
+      this._ws.close();
+      this._ws = null;
+    }
+    clearSignalData(this);
+  }
+
+  /**
+   * Open the websocket.
+   */
+  private _connect(): void {
+    let ws = this._ws = new WebSocket(this._url);
+    ws.onopen = () => {
+      this._delay = RECONNECT_DELAY;
+      this.connectionChanged.emit(true);
+    };
+    ws.onmessage = (event: MessageEvent) => {
+      this.changed.emit(JSON.parse(event.data) as IDirectoryChange);
+    };
+    ws.onclose = () => {
+      this._ws = null;
+      this.connectionChanged.emit(false);
+      this._timer = setTimeout(() => this._connect(), this._delay);
+      this._delay = Math.min(2 * this._delay, MAX_RECONNECT_DELAY);
+    };
+  }
+
+  /**
+   * Send a message if the socket is open.
+   *
+   * #### Notes
+   * The owner re-sends its watch on `connectionChanged`, so messages
+   * sent while disconnected can be dropped.
+   */
+  private _send(msg: any): void {
+    if (this.isConnected) {
+      this._ws.send(JSON.stringify(msg));
+    }
+  }
+
+  private _url: string;
+  private _ws: WebSocket = null;
+  private _path: string = null;
+  private _timer = -1;
+  private _delay = RECONNECT_DELAY;
+}
+
+
+/**
+ * The namespace for the directory watcher private data.
+ */
+namespace Private {
+  /**
+   * A signal emitted when a watched directory changes.
+   */
+  export
+  const changedSignal = new Signal<DirectoryWatcher, IDirectoryChange>();
+
+  /**
+   * A signal emitted when the connection opens or closes.
+   */
+  export
+  const connectionChangedSignal = new Signal<DirectoryWatcher, boolean>();
+}
@@ -0,0 +1,77 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * The id of the command showing the help panel.
+ */
+export
+const ACTIVATE_ID = 'help-doc:activate';
+
+/**
+ * The id of the command hiding the help panel.
+ */
+export
+const HIDE_ID = 'help-doc:hide';
+
+/**
+ * The id of the command toggling the help panel.
+ */
+export
+const TOGGLE_ID = 'help-doc:toggle';
+
+
+/**
+ * The documents opened by the commands of the help extension.
+ */
+export
+const HELP_DOCS = [
+  {
+    text: 'Scipy Lecture Notes',
+    id: 'help-doc:scipy-lecture-notes',
+    url: 'http://www.scipy-lectures.org/'
+  },
+  {
+    text: 'Numpy Reference',
+    id: 'help-doc:numpy-reference',
+    url: 'http://docs.scipy.org/doc/numpy/reference/'
+  },
+  {
+    text: 'Scipy Reference',
+    id: 'help-doc:scipy-reference',
+    url: 'http://docs.scipy.org/doc/scipy/reference/'
+  },
+  {
+    text: 'Notebook Tutorial',
+    id: 'help-doc:notebook-tutorial',
+    url: 'http://nbviewer.jupyter.org/github/jupyter/notebook/' +
+      'blob/master/docs/source/examples/Notebook/Notebook Basics.ipynb'
+  }
+];
+
+
+/**
+ * The ids of the commands of the help extension.
+ *
+ * #### Notes
+ * This module has no imports, so the application can declare the commands
+ * without loading the extension.
+ */
+export
+const commandIds = HELP_DOCS.map(doc => doc.id).concat([
+  ACTIVATE_ID, HIDE_ID, TOGGLE_ID
+]);
+
+
+/**
+ * The command palette items of the help extension.
+ */
+export
+const paletteItems = HELP_DOCS.map(doc => {
+  return {
+    command: doc.id,
+    text: doc.text,
+    caption: `Open ${doc.text}`,
+    category: 'Help'
+  };
+});
@@ -5,6 +5,10 @@ import {
   Application
 } from 'phosphide/lib/core/application';
 
+import {
+  ACTIVATE_ID, HELP_DOCS, HIDE_ID, TOGGLE_ID, paletteItems
+} from './commands';
+
 import {
   IFrame
 } from './iframe';
@@ -16,34 +20,6 @@ import {
 const HELP_CLASS = 'jp-Help';
 
 
-/**
- * A list of commands to add to the help widget.
- */
-const COMMANDS = [
-  {
-    text: 'Scipy Lecture Notes',
-    id: 'help-doc:scipy-lecture-notes',
-    url: 'http://www.scipy-lectures.org/'
-  },
-  {
-    text: 'Numpy Reference',
-    id: 'help-doc:numpy-reference',
-    url: 'http://docs.scipy.org/doc/numpy/reference/'
-  },
-  {
-    text: 'Scipy Reference',
-    id: 'help-doc:scipy-reference',
-    url: 'http://docs.scipy.org/doc/scipy/reference/'
-  },
-  {
-    text: 'Notebook Tutorial',
-    id: 'help-doc:notebook-tutorial',
-    url: 'http://nbviewer.jupyter.org/github/jupyter/notebook/' +
-      'blob/master/docs/source/examples/Notebook/Notebook Basics.ipynb'
-  }
-];
-
-
 /**
  * The help handler extension.
  */
@@ -67,7 +43,7 @@ function activateHelpHandler(app: Application): Promise<void> {
   widget.title.text = 'Help';
   widget.id = 'help-doc';
 
-  let helpCommandItems = COMMANDS.map(command => {
+  let helpCommandItems = HELP_DOCS.map(command => {
     return {
       id: command.id,
       handler: () => {
@@ -82,29 +58,20 @@ function activateHelpHandler(app: Application): Promise<void> {
 
   app.commands.add([
     {
-      id: 'help-doc:activate',
+      id: ACTIVATE_ID,
       handler: showHelp
     },
     {
-      id: 'help-doc:hide',
+      id: HIDE_ID,
       handler: hideHelp
     },
     {
-      id: 'help-doc:toggle',
+      id: TOGGLE_ID,
       handler: toggleHelp
     }
   ]);
 
-  let helpPaletteItems = COMMANDS.map(command => {
-    return {
-      command: command.id,
-      text: command.text,
-      caption: `Open ${command.text}`,
-      category: 'Help'
-    };
-  });
-
-  app.palette.add(helpPaletteItems);
+  app.palette.add(paletteItems);
 
   return Promise.resolve(void 0);
 
@@ -0,0 +1,95 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IAjaxSettings, ajaxRequest, getBaseUrl, getConfigOption, urlPathJoin
+} from 'jupyter-js-utils';
+
+
+/**
+ * The delay before reporting marks, so marks close in time are batched.
+ */
+const REPORT_DELAY = 1000;
+
+
+/**
+ * Record a page load timing mark.
+ *
+ * @param name - The name of the mark, such as `'app_run'`.
+ *
+ * #### Notes
+ * Only the first mark of a name is recorded, as the seconds since the
+ * start of the page load.  Marks are reported to the server if it has
+ * metrics enabled, and are otherwise ignored.
+ */
+export
+function mark(name: string): void {
+  if (name in Private.marked || !Private.metricsUrl()) {
+    return;
+  }
+  let perf = window.performance;
+  let now = perf && perf.now ? perf.now() : Date.now() - Private.loadStart;
+  Private.marked[name] = true;
+  Private.pending[name] = now / 1000;
+  if (Private.timer === -1) {
+    Private.timer = setTimeout(Private.report, REPORT_DELAY);
+  }
+}
+
+
+/**
+ * The namespace for the metrics private data.
+ */
+namespace Private {
+  /**
+   * The fallback start of the page load, without `performance.now`.
+   */
+  export
+  const loadStart = Date.now();
+
+  /**
+   * The names of the recorded marks.
+   */
+  export
+  const marked: { [name: string]: boolean } = Object.create(null);
+
+  /**
+   * The marks not yet reported, in seconds.
+   */
+  export
+  let pending: { [name: string]: number } = Object.create(null);
+
+  /**
+   * The pending report timer.
+   */
+  export
+  let timer = -1;
+
+  /**
+   * The url of the metrics endpoint relative to the base url, or an empty
+   * string if metrics are not enabled.
+   */
+  export
+  function metricsUrl(): string {
+    return getConfigOption('metricsUrl') || '';
+  }
+
+  /**
+   * Report the pending marks.
+   */
+  export
+  function report(): void {
+    let marks = pending;
+    pending = Object.create(null);
+    timer = -1;
+    let ajaxSettings: IAjaxSettings = {
+      method: 'POST',
+      contentType: 'application/json',
+      data: JSON.stringify({ marks })
+    };
+    let url = urlPathJoin(getBaseUrl(), metricsUrl());
+    ajaxRequest(url, ajaxSettings).catch(error => {
+      console.warn('Could not report timing marks', error);
+    });
+  }
+}
@@ -161,14 +161,30 @@ class CellEditorWidget extends CodeMirrorWidget {
   }
 
   /**
-   * Get the cell model used by the editor.
+   * The cell model used by the editor.
    *
    * #### Notes
-   * This is a read-only property.
+   * Setting a new model replaces the text and clears the undo history,
+   * so an editor can be reused for another cell.
    */
   get model(): ICellModel {
     return this._model;
   }
+  set model(value: ICellModel) {
+    if (value === this._model) {
+      return;
+    }
+    if (this._model) {
+      this._model.stateChanged.disconnect(this.onModelChanged, this);
+    }
+    this._model = value;
+    let doc = this.editor.getDoc();
+    doc.setValue(value ? value.source || '' : '');
+    doc.clearHistory();
+    if (value) {
+      value.stateChanged.connect(this.onModelChanged, this);
+    }
+  }
 
   /**
    * Dispose of the resources held by the editor.
@@ -1,6 +1,10 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
+import {
+  IKernel
+} from 'jupyter-js-services';
+
 import * as utils
  from 'jupyter-js-utils';
 
@@ -29,7 +33,7 @@ import {
 } from '../common/metadata';
 
 import {
-  ObservableOutputs
+  ObservableOutputs, executeCode
 } from '../output-area';
 
 
@@ -101,6 +105,14 @@ interface ICodeCellModel extends ICellModel {
    */
   executionCount: number;
 
+  /**
+   * Whether the cell is being executed.
+   *
+   * #### Notes
+   * This is not part of the notebook format.
+   */
+  executing: boolean;
+
   /**
    * The cell outputs.
    */
@@ -345,6 +357,21 @@ class CodeCellModel extends CellModel implements ICodeCellModel {
     this.stateChanged.emit({ name: 'executionCount', oldValue, newValue });
   }
 
+  /**
+   * Whether the cell is being executed.
+   */
+  get executing(): boolean {
+    return this._executing;
+  }
+  set executing(newValue: boolean) {
+    if (newValue === this._executing) {
+      return;
+    }
+    let oldValue = this._executing;
+    this._executing = newValue;
+    this.stateChanged.emit({ name: 'executing', oldValue, newValue });
+  }
+
   /**
    * The cell outputs.
    *
@@ -383,6 +410,40 @@ class CodeCellModel extends CellModel implements ICodeCellModel {
 
   private _outputs: ObservableOutputs = null;
   private _executionCount: number = null;
+  private _executing = false;
+}
+
+
+/**
+ * Execute a code cell on a kernel.
+ *
+ * @param model - The model of the cell.
+ *
+ * @param kernel - The kernel to execute the source of the cell on.
+ *
+ * @returns A promise which resolves when the cell is executed, and rejects
+ *   if the execution request fails.
+ *
+ * #### Notes
+ * The cell is marked as trusted, and as executing until the promise is
+ * settled.  A cell with no code is not executed.
+ */
+export
+function executeCell(model: ICodeCellModel, kernel: IKernel): Promise<void> {
+  let code = model.source;
+  model.executionCount = null;
+  if (!code.trim()) {
+    return Promise.resolve(void 0);
+  }
+  model.getMetadata('trusted').setValue(true);
+  model.executing = true;
+  return executeCode(code, kernel, model.outputs).then(reply => {
+    model.executing = false;
+    model.executionCount = reply.execution_count;
+  }, error => {
+    model.executing = false;
+    throw error;
+  });
 }
 
 
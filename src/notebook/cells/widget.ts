@@ -25,6 +25,10 @@ import {
   IChangedArgs
 } from 'phosphor-properties';
 
+import {
+  clearSignalData
+} from 'phosphor-signaling';
+
 import {
   Widget
 } from 'phosphor-widget';
@@ -34,7 +38,7 @@ import {
 } from '../notebook/nbformat';
 
 import {
-  OutputAreaWidget, ObservableOutputs, executeCode
+  OutputAreaWidget, ObservableOutputs
 } from '../output-area';
 
 import {
@@ -50,7 +54,7 @@ import {
 } from './editor';
 
 import {
-  ICodeCellModel, ICellModel
+  ICodeCellModel, ICellModel, executeCell
 } from './model';
 
 
@@ -114,6 +118,11 @@ const RENDERED_CLASS = 'jp-mod-rendered';
  */
 const DEFAULT_MARKDOWN_TEXT = 'Type Markdown and LaTeX: $ α^2 $';
 
+/**
+ * The maximum number of recycled editors kept for reuse.
+ */
+const MAX_POOLED_EDITORS = 50;
+
 
 /**
  * A base cell widget.
@@ -122,8 +131,16 @@ export
 class BaseCellWidget extends Widget {
   /**
    * Create a new cell editor for the widget.
+   *
+   * #### Notes
+   * An editor released by [[recycle]] is reused if there is one.
    */
   static createCellEditor(model: ICellModel): CellEditorWidget {
+    let editor = Private.editorPool.pop();
+    if (editor) {
+      editor.model = model;
+      return editor;
+    }
     return new CellEditorWidget(model);
   }
 
@@ -244,6 +261,31 @@ class BaseCellWidget extends Widget {
     }
   }
 
+  /**
+   * Dispose of the widget, keeping its editor for reuse by a new cell.
+   *
+   * #### Notes
+   * Creating a CodeMirror instance is the most expensive part of creating
+   * a cell, so a notebook which creates and disposes of cells as they
+   * scroll in and out of view uses this instead of [[dispose]].
+   */
+  recycle(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    let editor = this._editor;
+    editor.parent = null;
+    clearSignalData(editor);
+    editor.model = null;
+    editor.editor.setOption('lineNumbers', false);
+    if (Private.editorPool.length < MAX_POOLED_EDITORS) {
+      Private.editorPool.push(editor);
+    } else {
+      editor.dispose();
+    }
+    this.dispose();
+  }
+
   /**
    * Dispose of the resources held by the widget.
    */
@@ -326,7 +368,7 @@ class CodeCellWidget extends BaseCellWidget {
     (this.layout as PanelLayout).addChild(this._output);
     this._collapsedCursor = model.getMetadata('collapsed');
     this._scrolledCursor = model.getMetadata('scrolled');
-    this.setPrompt(String(model.executionCount));
+    this.setPrompt(model.executing ? '*' : String(model.executionCount));
     model.stateChanged.connect(this.onModelChanged, this);
   }
 
@@ -348,19 +390,7 @@ class CodeCellWidget extends BaseCellWidget {
    * Execute the cell given a kernel.
    */
   execute(kernel: IKernel): Promise<void> {
-    let model = this.model as ICodeCellModel;
-    let code = model.source;
-    if (!code.trim()) {
-      model.executionCount = null;
-      return Promise.resolve(void 0);
-    }
-    model.executionCount = null;
-    this.setPrompt('*');
-    this.trusted = true;
-    let outputs = model.outputs;
-    return executeCode(code, kernel, outputs).then(reply => {
-      model.executionCount = reply.execution_count;
-    });
+    return executeCell(this.model as ICodeCellModel, kernel);
   }
 
   /**
@@ -381,6 +411,9 @@ class CodeCellWidget extends BaseCellWidget {
     case 'executionCount':
       this.setPrompt(String(model.executionCount));
       break;
+    case 'executing':
+      this.setPrompt(model.executing ? '*' : String(model.executionCount));
+      break;
     default:
       break;
     }
@@ -541,3 +574,15 @@ class InputAreaWidget extends Widget {
     prompt.node.textContent = text;
   }
 }
+
+
+/**
+ * A namespace for private data.
+ */
+namespace Private {
+  /**
+   * The editors released by recycled cells.
+   */
+  export
+  const editorPool: CellEditorWidget[] = [];
+}
@@ -6,6 +6,17 @@ import {
 } from 'phosphor-observablelist';
 
 
+/**
+ * The default maximum number of undo entries.
+ */
+const DEFAULT_MAX_DEPTH = 500;
+
+/**
+ * The default maximum size of the undo history, in bytes.
+ */
+const DEFAULT_MAX_SIZE = 64 * 1024 * 1024;
+
+
 /**
  * An object which is JSON-able.
  */
@@ -18,17 +29,46 @@ interface IJSONable {
 }
 
 
+/**
+ * The options used to create an undoable list.
+ */
+export
+interface IUndoableListOptions {
+  /**
+   * The maximum number of undo entries.
+   *
+   * The default is `500`.
+   */
+  maxDepth?: number;
+
+  /**
+   * The maximum size of the undo history, in bytes.
+   *
+   * The default is 64MB.
+   */
+  maxSize?: number;
+}
+
+
 /**
  * An observable list that supports undo/redo.
+ *
+ * #### Notes
+ * The history keeps the JSON of the changed values in a store where each
+ * distinct field value is kept once, so a change which leaves the outputs
+ * of a cell alone does not copy them again.  The oldest entries are
+ * evicted when the history is over its depth or size budget.
  */
 export
 class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
   /**
    * Construct a new undoable observable list.
    */
-  constructor(factory: (value: any) => T) {
+  constructor(factory: (value: any) => T, options: IUndoableListOptions = {}) {
     super();
     this._factory = factory;
+    this._maxDepth = options.maxDepth || DEFAULT_MAX_DEPTH;
+    this._maxSize = options.maxSize || DEFAULT_MAX_SIZE;
     this.changed.connect(this._onListChanged, this);
   }
 
@@ -52,6 +92,50 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
     return this._index >= 0;
   }
 
+  /**
+   * The maximum number of undo entries.
+   */
+  get maxDepth(): number {
+    return this._maxDepth;
+  }
+  set maxDepth(value: number) {
+    this._maxDepth = Math.max(value, 1);
+    this._evict();
+  }
+
+  /**
+   * The maximum size of the undo history, in bytes.
+   */
+  get maxSize(): number {
+    return this._maxSize;
+  }
+  set maxSize(value: number) {
+    this._maxSize = Math.max(value, 0);
+    this._evict();
+  }
+
+  /**
+   * The number of entries in the undo history.
+   *
+   * #### Notes
+   * This includes the entries which can be redone.
+   *
+   * This is a read-only property.
+   */
+  get undoDepth(): number {
+    return this._stack.length;
+  }
+
+  /**
+   * The approximate size of the undo history, in bytes.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get undoSize(): number {
+    return this._store.size;
+  }
+
   /**
    * Get whether the object is disposed.
    *
@@ -72,15 +156,19 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
     }
     this._factory = null;
     this._stack = null;
+    this._store.clear();
   }
 
   /**
    * Begin a compound operation.
+   *
+   * #### Notes
+   * The changes until [[endCompoundOperation]] are one undo entry, in
+   * which changes to the same item are coalesced.
    */
   beginCompoundOperation(isUndoAble?: boolean): void {
     this._inCompound = true;
     this._isUndoable = (isUndoAble !== false);
-    this._madeCompoundChange = false;
   }
 
   /**
@@ -89,8 +177,17 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
   endCompoundOperation(): void {
     this._inCompound = false;
     this._isUndoable = true;
-    if (this._madeCompoundChange) {
+    let changes = this._compound;
+    this._compound = null;
+    if (!changes) {
+      return;
+    }
+    if (changes.length) {
       this._index++;
+      this._evict();
+    } else {
+      // The changes cancelled each other out.
+      this._stack.pop();
     }
   }
 
@@ -103,7 +200,7 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
     }
     let changes = this._stack[this._index];
     this._isUndoable = false;
-    for (let change of changes.reverse()) {
+    for (let change of changes.slice().reverse()) {
       this._undoChange(change);
     }
     this._isUndoable = true;
@@ -132,6 +229,8 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
   clearUndo(): void {
     this._index = -1;
     this._stack = [];
+    this._compound = null;
+    this._store.clear();
   }
 
   /**
@@ -141,47 +240,113 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
     if (!this._isUndoable) {
       return;
     }
-    // Clear everything after this position.
-    this._stack = this._stack.slice(0, this._index + 1);
-    // Copy the change.
-    let evt = this._copyChange(change);
-    // Put the change in the stack.
-    if (this._stack[this._index + 1]) {
-      this._stack[this._index + 1].push(evt);
-    } else {
-      this._stack.push([evt]);
+    let changes = this._compound;
+    if (!changes) {
+      // Clear everything after this position.
+      this._truncate(this._index + 1);
+      // Start a new entry in the stack.
+      changes = [];
+      this._stack.push(changes);
+      if (this._inCompound) {
+        this._compound = changes;
+      }
+    }
+    if (!this._inCompound || !this._coalesce(changes, change)) {
+      changes.push(this._copyChange(change));
     }
     // If not in a compound operation, increase index.
     if (!this._inCompound) {
       this._index++;
-    } else {
-      this._madeCompoundChange = true;
+      this._evict();
+    }
+  }
+
+  /**
+   * Merge a change into the last change of a compound operation.
+   *
+   * @returns Whether the change was merged.
+   */
+  private _coalesce(changes: Private.IEntry[], change: IListChangedArgs<T>): boolean {
+    let last = changes[changes.length - 1];
+    if (!last) {
+      return false;
+    }
+    let store = this._store;
+    if (last.type === ListChangeType.Set && change.type === ListChangeType.Set &&
+        last.newIndex === change.newIndex) {
+      // Keep the first old value and the last new value.
+      store.release(last.newValue as Private.ISnapshot);
+      last.newValue = store.snapshot(change.newValue as T);
+      return true;
+    }
+    if (last.type === ListChangeType.Add && change.type === ListChangeType.Remove &&
+        last.newIndex === change.oldIndex) {
+      // An item which was added and removed again.
+      store.release(last.newValue as Private.ISnapshot);
+      changes.pop();
+      return true;
+    }
+    return false;
+  }
+
+  /**
+   * Remove the entries from an index on.
+   */
+  private _truncate(index: number): void {
+    let removed = this._stack.splice(index, this._stack.length - index);
+    for (let changes of removed) {
+      this._releaseEntries(changes);
+    }
+  }
+
+  /**
+   * Evict the oldest entries until the history is within its budget.
+   *
+   * #### Notes
+   * Only entries which can be undone are evicted, and the last one is
+   * always kept.
+   */
+  private _evict(): void {
+    while (this._index > 0 && (this._stack.length > this._maxDepth ||
+           this._store.size > this._maxSize)) {
+      this._releaseEntries(this._stack.shift());
+      this._index--;
+    }
+  }
+
+  /**
+   * Release the values of a list of entries.
+   */
+  private _releaseEntries(changes: Private.IEntry[]): void {
+    for (let change of changes) {
+      this._store.releaseAll(change.oldValue);
+      this._store.releaseAll(change.newValue);
     }
   }
 
   /**
    * Undo a change event.
    */
-  private _undoChange(change: IListChangedArgs<any>): void {
+  private _undoChange(change: Private.IEntry): void {
     let value: T;
     switch (change.type) {
     case ListChangeType.Add:
       this.removeAt(change.newIndex);
       break;
     case ListChangeType.Set:
-      value = this._createValue(change.oldValue as any);
+      value = this._createValue(change.oldValue as Private.ISnapshot);
       this.set(change.oldIndex, value);
       break;
     case ListChangeType.Remove:
-      value = this._createValue(change.oldValue as any);
+      value = this._createValue(change.oldValue as Private.ISnapshot);
       this.insert(change.oldIndex, value);
       break;
     case ListChangeType.Move:
       this.move(change.newIndex, change.oldIndex);
       break;
     case ListChangeType.Replace:
-      let len = (change.newValue as any[]).length;
-      let values = this._createValues(change.oldValue as any[]);
+      let len = (change.newValue as Private.ISnapshot[]).length;
+      let values = this._createValues(change.oldValue as Private.ISnapshot[]);
       this.replace(change.oldIndex, len, values);
       break;
     default:
@@ -192,15 +357,15 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
   /**
    * Redo a change event.
    */
-  private _redoChange(change: IListChangedArgs<any>): void {
+  private _redoChange(change: Private.IEntry): void {
     let value: T;
     switch (change.type) {
     case ListChangeType.Add:
-      value = this._createValue(change.newValue as any);
+      value = this._createValue(change.newValue as Private.ISnapshot);
       this.insert(change.newIndex, value);
       break;
     case ListChangeType.Set:
-      value = this._createValue(change.newValue as any);
+      value = this._createValue(change.newValue as Private.ISnapshot);
       this.set(change.newIndex, value);
       break;
     case ListChangeType.Remove:
@@ -210,8 +375,8 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
       this.move(change.oldIndex, change.newIndex);
       break;
     case ListChangeType.Replace:
-      let len = (change.oldValue as any[]).length;
-      let cells = this._createValues(change.newValue as any[]);
+      let len = (change.oldValue as Private.ISnapshot[]).length;
+      let cells = this._createValues(change.newValue as Private.ISnapshot[]);
       this.replace(change.oldIndex, len, cells);
       break;
     default:
@@ -220,49 +385,49 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
   }
 
   /**
-   * Create a value from JSON.
+   * Create a value from a snapshot.
    */
-  private _createValue(data: any): T {
+  private _createValue(snapshot: Private.ISnapshot): T {
     let factory = this._factory;
-    return factory(data);
+    return factory(this._store.restore(snapshot));
   }
 
   /**
-   * Create a list of cell models from JSON.
+   * Create a list of values from snapshots.
    */
-  private _createValues(bundles: any[]): T[] {
+  private _createValues(snapshots: Private.ISnapshot[]): T[] {
     let values: T[] = [];
-    for (let bundle of bundles) {
-      values.push(this._createValue(bundle));
+    for (let snapshot of snapshots) {
+      values.push(this._createValue(snapshot));
     }
     return values;
   }
 
   /**
-   * Copy a change as JSON.
+   * Copy a change as snapshots.
    */
-  private _copyChange(change: IListChangedArgs<T>): IListChangedArgs<any> {
-    if (change.type === ListChangeType.Replace) {
-      return this._copyReplace(change);
-    }
-    let oldValue: any = null;
-    let newValue: any = null;
+  private _copyChange(change: IListChangedArgs<T>): Private.IEntry {
+    let store = this._store;
+    let oldValue: Private.ISnapshot | Private.ISnapshot[] = null;
+    let newValue: Private.ISnapshot | Private.ISnapshot[] = null;
     switch (change.type) {
     case ListChangeType.Add:
     case ListChangeType.Set:
     case ListChangeType.Remove:
       if (change.oldValue) {
-        oldValue = (change.oldValue as T).toJSON();
+        oldValue = store.snapshot(change.oldValue as T);
       }
       if (change.newValue) {
-        newValue = (change.newValue as T).toJSON();
+        newValue = store.snapshot(change.newValue as T);
       }
       break;
-    case ListChangeType.Move:
-      // Only need the indices.
+    case ListChangeType.Replace:
+      oldValue = (change.oldValue as T[]).map(value => store.snapshot(value));
+      newValue = (change.newValue as T[]).map(value => store.snapshot(value));
       break;
     default:
-      return;
+      // Moves only need the indices.
+      break;
     }
     return {
       type: change.type,
@@ -273,31 +438,220 @@ class OberservableUndoableList<T extends IJSONable> extends ObservableList<T> {
     };
   }
 
+  private _inCompound = false;
+  private _isUndoable = true;
+  private _index = -1;
+  private _maxDepth = DEFAULT_MAX_DEPTH;
+  private _maxSize = DEFAULT_MAX_SIZE;
+  private _stack: Private.IEntry[][] = [];
+  private _compound: Private.IEntry[] = null;
+  private _store = new Private.SnapshotStore();
+  private _factory: (value: any) => T = null;
+}
+
+
+/**
+ * The namespace for the undo private data.
+ */
+namespace Private {
   /**
-   * Copy a replace change as JSON.
+   * The stored JSON of a value.
+   *
+   * #### Notes
+   * The fields of an object map to the keys of their values in the store,
+   * and any other value is stored whole under `value`.
    */
-  private _copyReplace(change: IListChangedArgs<T>): IListChangedArgs<any> {
-    let oldValue: any[] = [];
-    for (let value of (change.oldValue as T[])) {
-      oldValue.push(value.toJSON());
+  export
+  interface ISnapshot {
+    /**
+     * The keys of the fields of an object.
+     */
+    fields?: { [name: string]: string };
+
+    /**
+     * The key of a value which is not an object.
+     */
+    value?: string;
+  }
+
+  /**
+   * An undo entry for a list change.
+   */
+  export
+  interface IEntry {
+    /**
+     * The type of the change.
+     */
+    type: ListChangeType;
+
+    /**
+     * The old index of the change.
+     */
+    oldIndex: number;
+
+    /**
+     * The new index of the change.
+     */
+    newIndex: number;
+
+    /**
+     * The snapshot(s) of the old value(s).
+     */
+    oldValue: ISnapshot | ISnapshot[];
+
+    /**
+     * The snapshot(s) of the new value(s).
+     */
+    newValue: ISnapshot | ISnapshot[];
+  }
+
+  /**
+   * An item of the snapshot store.
+   */
+  interface IStoreItem {
+    /**
+     * The serialized value.
+     */
+    text: string;
+
+    /**
+     * The number of snapshots using the value.
+     */
+    refs: number;
+  }
+
+  /**
+   * A reference counted store of serialized JSON values, by content hash.
+   */
+  export
+  class SnapshotStore {
+    /**
+     * The approximate size of the stored values, in bytes.
+     */
+    get size(): number {
+      return this._size;
     }
-    let newValue: any[] = [];
-    for (let value of (change.newValue as T[])) {
-      newValue.push(value.toJSON());
+
+    /**
+     * Store the JSON of a value.
+     */
+    snapshot(value: IJSONable): ISnapshot {
+      let data = value.toJSON();
+      if (data === null || typeof data !== 'object' || Array.isArray(data)) {
+        return { value: this._intern(data) };
+      }
+      let fields: { [name: string]: string } = Object.create(null);
+      for (let name of Object.keys(data)) {
+        fields[name] = this._intern(data[name]);
+      }
+      return { fields };
     }
-    return {
-      type: ListChangeType.Replace,
-      oldIndex: change.oldIndex,
-      newIndex: change.newIndex,
-      oldValue,
-      newValue
-    };
+
+    /**
+     * Get a new copy of the JSON of a snapshot.
+     */
+    restore(snapshot: ISnapshot): any {
+      if (!snapshot.fields) {
+        return this._get(snapshot.value);
+      }
+      let data: any = {};
+      for (let name in snapshot.fields) {
+        data[name] = this._get(snapshot.fields[name]);
+      }
+      return data;
+    }
+
+    /**
+     * Release the values of a snapshot.
+     */
+    release(snapshot: ISnapshot): void {
+      if (!snapshot.fields) {
+        this._release(snapshot.value);
+        return;
+      }
+      for (let name in snapshot.fields) {
+        this._release(snapshot.fields[name]);
+      }
+    }
+
+    /**
+     * Release the values of a snapshot or a list of snapshots.
+     */
+    releaseAll(value: ISnapshot | ISnapshot[]): void {
+      if (!value) {
+        return;
+      }
+      if (Array.isArray(value)) {
+        for (let snapshot of value as ISnapshot[]) {
+          this.release(snapshot);
+        }
+      } else {
+        this.release(value as ISnapshot);
+      }
+    }
+
+    /**
+     * Remove all of the values.
+     */
+    clear(): void {
+      this._items = Object.create(null);
+      this._size = 0;
+    }
+
+    /**
+     * Add a reference to a value, and get its key.
+     */
+    private _intern(value: any): string {
+      let text = JSON.stringify(value === void 0 ? null : value);
+      let hash = hashString(text);
+      // Probe past the rare values with the same hash.
+      for (let i = 0; ; i++) {
+        let key = `${hash}:${i}`;
+        let item = this._items[key];
+        if (!item) {
+          this._items[key] = { text, refs: 1 };
+          this._size += 2 * text.length;
+          return key;
+        }
+        if (item.text === text) {
+          item.refs++;
+          return key;
+        }
+      }
+    }
+
+    /**
+     * Get a new copy of a value.
+     */
+    private _get(key: string): any {
+      return JSON.parse(this._items[key].text);
+    }
+
+    /**
+     * Remove a reference to a value.
+     */
+    private _release(key: string): void {
+      let item = this._items[key];
+      if (item && --item.refs === 0) {
+        this._size -= 2 * item.text.length;
+        delete this._items[key];
+      }
+    }
+
+    private _items: { [key: string]: IStoreItem } = Object.create(null);
+    private _size = 0;
   }
 
-  private _inCompound = false;
-  private _isUndoable = true;
-  private _madeCompoundChange = false;
-  private _index = -1;
-  private _stack: IListChangedArgs<any>[][] = [];
-  private _factory: (value: any) => T = null;
+  /**
+   * Compute the 32 bit FNV-1a hash of a string.
+   */
+  function hashString(text: string): number {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+      hash ^= text.charCodeAt(i);
+      // Multiply by the FNV prime, 2^24 + 2^8 + 0x93, in 32 bits.
+      hash += (hash << 1) + (hash << 4) + (hash << 7) + (hash << 8) + (hash << 24);
+    }
+    return hash >>> 0;
+  }
 }
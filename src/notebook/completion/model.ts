@@ -15,26 +15,9 @@ import {
 
 
 /**
- * A filtered completion menu matching result.
+ * The number of options from which the options are filtered in a worker.
  */
-interface ICompletionMatch {
-  /**
-   * The raw text of a completion match.
-   */
-  raw: string;
-
-  /**
-   * A score which indicates the strength of the match.
-   *
-   * A lower score is better. Zero is the best possible score.
-   */
-  score: number;
-
-  /**
-   * The highlighted text of a completion match.
-   */
-  text: string;
-}
+const WORKER_MIN_OPTIONS = 10000;
 
 
 /**
@@ -113,6 +96,11 @@ interface ICompletionModel extends IDisposable {
    */
   items: ICompletionItem[];
 
+  /**
+   * The number of visible items in the completion menu.
+   */
+  itemCount: number;
+
   /**
    * The unfiltered list of all available options in a completion menu.
    */
@@ -128,6 +116,11 @@ interface ICompletionModel extends IDisposable {
    */
   createPatch(patch: string): ICompletionPatch;
 
+  /**
+   * Get a range of the visible items in the completion menu.
+   */
+  itemsAt(start: number, stop: number): ICompletionItem[];
+
   /**
    * Reset the state of the model.
    */
@@ -168,25 +161,53 @@ class CompletionModel implements ICompletionModel {
    * The list of visible items in the completion menu.
    *
    * #### Notes
+   * This highlights every item, so a menu should use [[itemsAt]] for
+   * the items it shows.
+   *
    * This is a read-only property.
    */
   get items(): ICompletionItem[] {
-    return this._filter();
+    return this.itemsAt(0, this.itemCount);
+  }
+
+  /**
+   * The number of visible items in the completion menu.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get itemCount(): number {
+    return this._matches ? this._matches.length : 0;
   }
 
   /**
    * The unfiltered list of all available options in a completion menu.
+   *
+   * #### Notes
+   * The options are indexed once when they are set, and then filtered
+   * in a worker if there are many of them.
    */
   get options(): string[] {
     return this._options;
   }
   set options(newValue: string[]) {
-    if (newValue) {
-      this._options = [];
-      this._options.push(...newValue);
+    // The indices in a pending reply of the worker are of the old options.
+    ++this._pending;
+    this._options = newValue ? newValue.slice() : null;
+    this._matches = null;
+    let options = this._options || [];
+    if (options.length >= WORKER_MIN_OPTIONS && Private.canUseWorker()) {
+      if (!this._worker) {
+        this._worker = Private.createWorker();
+        this._worker.onmessage = (event: MessageEvent) => {
+          this._onFilterResult(event.data);
+        };
+      }
+      this._worker.postMessage({ type: 'options', options });
     } else {
-      this._options = null;
+      this._filter.setOptions(options);
     }
+    this._refilter();
     this.stateChanged.emit(void 0);
   }
 
@@ -229,6 +250,7 @@ class CompletionModel implements ICompletionModel {
       let ending = originalLine.substring(end);
       query = query.substring(0, query.lastIndexOf(ending));
       this._query = query;
+      this._refilter();
     }
     this.stateChanged.emit(void 0);
   }
@@ -273,6 +295,35 @@ class CompletionModel implements ICompletionModel {
     return { position, text };
   }
 
+  /**
+   * Get a range of the visible items in the completion menu.
+   *
+   * @param start - The index of the first item.
+   *
+   * @param stop - The index after the last item.
+   *
+   * #### Notes
+   * Only the items in the range are highlighted.
+   */
+  itemsAt(start: number, stop: number): ICompletionItem[] {
+    let options = this._options;
+    let matches = this._matches;
+    if (!options || !matches) {
+      return [];
+    }
+    let query = this._query;
+    let items: ICompletionItem[] = [];
+    stop = Math.min(stop, matches.length);
+    for (let i = Math.max(start, 0); i < stop; i++) {
+      let raw = options[matches[i]];
+      let match = query ? StringSearch.sumOfSquares(raw, query) : null;
+      // The matches of a worker may be for an earlier query.
+      let text = match ? StringSearch.highlight(raw, match.indices) : raw;
+      items.push({ raw, text });
+    }
+    return items;
+  }
+
   /**
    * Dispose of the resources held by the model.
    */
@@ -281,6 +332,10 @@ class CompletionModel implements ICompletionModel {
     if (this.isDisposed) {
       return;
     }
+    if (this._worker) {
+      this._worker.terminate();
+      this._worker = null;
+    }
     clearSignalData(this);
     this._isDisposed = true;
   }
@@ -296,31 +351,43 @@ class CompletionModel implements ICompletionModel {
   }
 
   /**
-   * Apply the query to the complete options list to return the matching subset.
+   * Apply the query to the options to find the matching subset.
+   *
+   * #### Notes
+   * With a worker, the current matches stay until the worker replies.
    */
-  private _filter(): ICompletionItem[] {
-    let options = this._options || [];
-    let query = this._query;
-    if (!query) {
-      return options.map(option => ({ raw: option, text: option }));
+  private _refilter(): void {
+    let options = this._options;
+    if (!options) {
+      this._matches = null;
+      return;
     }
-    let results: ICompletionMatch[] = [];
-    for (let option of options) {
-      let match = StringSearch.sumOfSquares(option, query);
-      if (match) {
-        results.push({
-          raw: option,
-          score: match.score,
-          text: StringSearch.highlight(option, match.indices)
-        });
-      }
+    if (options.length >= WORKER_MIN_OPTIONS && this._worker) {
+      let id = ++this._pending;
+      this._worker.postMessage({ type: 'filter', id, query: this._query });
+      return;
     }
-    return results.sort((a, b) => { return a.score - b.score; })
-      .map(result => ({ text: result.text, raw: result.raw }));
+    this._matches = this._filter.filter(this._query);
+  }
+
+  /**
+   * Handle the matches from the filter worker.
+   */
+  private _onFilterResult(data: { id: number, matches: number[] }): void {
+    // Drop the results of superseded queries.
+    if (this.isDisposed || data.id !== this._pending || !this._options) {
+      return;
+    }
+    this._matches = data.matches;
+    this.stateChanged.emit(void 0);
   }
 
   private _isDisposed = false;
   private _options: string[] = null;
+  private _matches: number[] = null;
+  private _filter = Private.createFilter();
+  private _worker: Worker = null;
+  private _pending = 0;
   private _original: ICompletionRequest = null;
   private _current: ITextChange = null;
   private _query = '';
@@ -337,6 +404,151 @@ namespace Private {
    */
   export
   const stateChangedSignal = new Signal<ICompletionModel, void>();
+
+  /**
+   * An object which filters completion options.
+   */
+  export
+  interface IOptionFilter {
+    /**
+     * Set and index the options.
+     */
+    setOptions(options: string[]): void;
+
+    /**
+     * Get the indices of the options matching a query, best match first.
+     */
+    filter(query: string): number[];
+  }
+
+  /**
+   * Create a completion option filter.
+   *
+   * #### Notes
+   * This function is also the source of the filter worker, so it must not
+   * refer to anything outside of its body.  It scores like
+   * `StringSearch.sumOfSquares`, which it cannot call.
+   *
+   * An index of the options containing each character is built once per
+   * set of options; a query is matched against the options under its
+   * rarest character.  A query which extends the previous one is only
+   * matched against the previous matches.
+   */
+  export
+  function createFilter(): IOptionFilter {
+    let options: string[] = [];
+    let index: { [ch: string]: number[] } = Object.create(null);
+    let lastQuery: string = null;
+    let lastMatches: number[] = null;
+
+    function setOptions(values: string[]): void {
+      options = values;
+      index = Object.create(null);
+      lastQuery = null;
+      lastMatches = null;
+      for (let i = 0; i < options.length; i++) {
+        let option = options[i];
+        let seen: { [ch: string]: boolean } = Object.create(null);
+        for (let j = 0; j < option.length; j++) {
+          let ch = option[j];
+          if (!seen[ch]) {
+            seen[ch] = true;
+            (index[ch] || (index[ch] = [])).push(i);
+          }
+        }
+      }
+    }
+
+    function candidates(query: string): number[] {
+      if (lastMatches && query.indexOf(lastQuery) === 0) {
+        return lastMatches;
+      }
+      let best: number[] = null;
+      for (let i = 0; i < query.length; i++) {
+        let list = index[query[i]];
+        if (!list) {
+          return [];
+        }
+        if (!best || list.length < best.length) {
+          best = list;
+        }
+      }
+      return best;
+    }
+
+    function filter(query: string): number[] {
+      if (!query) {
+        lastQuery = null;
+        lastMatches = null;
+        let all: number[] = [];
+        for (let i = 0; i < options.length; i++) {
+          all.push(i);
+        }
+        return all;
+      }
+      let matches: number[] = [];
+      let scores: { [i: number]: number } = Object.create(null);
+      let list = candidates(query);
+      for (let k = 0; k < list.length; k++) {
+        let text = options[list[k]];
+        let score = 0;
+        for (let i = 0, j = 0; i < query.length; ++i, ++j) {
+          j = text.indexOf(query[i], j);
+          if (j === -1) {
+            score = -1;
+            break;
+          }
+          score += j * j;
+        }
+        if (score !== -1) {
+          matches.push(list[k]);
+          scores[list[k]] = score;
+        }
+      }
+      // Keep the matches in option order for narrowing the next query.
+      lastQuery = query;
+      lastMatches = matches;
+      return matches.slice().sort(function(a, b) {
+        return (scores[a] - scores[b]) || (a - b);
+      });
+    }
+
+    return { setOptions, filter };
+  }
+
+  /**
+   * Test whether options can be filtered in a worker.
+   */
+  export
+  function canUseWorker(): boolean {
+    return typeof Worker !== 'undefined' && typeof Blob !== 'undefined' &&
+      typeof URL !== 'undefined' && !!URL.createObjectURL;
+  }
+
+  /**
+   * Create a worker which filters completion options.
+   *
+   * #### Notes
+   * The worker takes `{type: 'options', options}` and
+   * `{type: 'filter', id, query}` messages, and replies to the latter
+   * with `{id, matches}`.
+   */
+  export
+  function createWorker(): Worker {
+    let source = `
+      var filter = (${createFilter.toString()})();
+      self.onmessage = function(event) {
+        var data = event.data;
+        if (data.type === 'options') {
+          filter.setOptions(data.options);
+        } else {
+          self.postMessage({ id: data.id, matches: filter.filter(data.query) });
+        }
+      };
+    `;
+    let url = URL.createObjectURL(new Blob([source], { type: 'text/javascript' }));
+    return new Worker(url);
+  }
 }
 
 
@@ -37,6 +37,11 @@ const ACTIVE_CLASS = 'jp-mod-active';
  */
 const MAX_HEIGHT = 250;
 
+/**
+ * The number of items added to the menu at a time.
+ */
+const PAGE_SIZE = 50;
+
 
 /**
  * A widget that enables text completion.
@@ -178,21 +183,18 @@ class CompletionWidget extends Widget {
    */
   protected onUpdateRequest(msg: Message): void {
     let node = this.node;
-    let items = this._model.items;
-    let constructor = this.constructor as typeof CompletionWidget;
     node.textContent = '';
 
     // All repaints reset the index back to 0.
     this._activeIndex = 0;
+    this._rendered = 0;
 
-    if (!items || !items.length) {
+    if (!this._model.itemCount) {
       this.hide();
       return;
     }
 
-    for (let item of items) {
-      node.appendChild(constructor.createItemNode(item));
-    }
+    this._renderPage();
 
     let active = node.querySelectorAll(`.${ITEM_CLASS}`)[this._activeIndex];
     active.classList.add(ACTIVE_CLASS);
@@ -288,6 +290,9 @@ class CompletionWidget extends Widget {
           event.preventDefault();
           event.stopPropagation();
           event.stopImmediatePropagation();
+          if (event.keyCode === 40 && this._activeIndex === this._rendered - 1) {
+            this._renderPage();
+          }
           let items = this.node.querySelectorAll(`.${ITEM_CLASS}`);
           active = node.querySelector(`.${ACTIVE_CLASS}`) as HTMLElement;
           active.classList.remove(ACTIVE_CLASS);
@@ -320,6 +325,10 @@ class CompletionWidget extends Widget {
     while (target !== document.documentElement) {
       // If the scroll event happened in the completion widget, allow it.
       if (target === this.node) {
+        let node = this.node;
+        if (node.scrollTop + node.clientHeight >= node.scrollHeight - node.clientHeight) {
+          this._renderPage();
+        }
         return;
       }
       target = target.parentElement;
@@ -327,7 +336,25 @@ class CompletionWidget extends Widget {
     this.hide();
   }
 
+  /**
+   * Add the next page of items to the menu.
+   *
+   * #### Notes
+   * Items are only fetched, and highlighted by the model, as the menu is
+   * scrolled or navigated to them.
+   */
+  private _renderPage(): void {
+    let constructor = this.constructor as typeof CompletionWidget;
+    let start = this._rendered;
+    let items = this._model.itemsAt(start, start + PAGE_SIZE);
+    for (let item of items) {
+      this.node.appendChild(constructor.createItemNode(item));
+    }
+    this._rendered += items.length;
+  }
+
   private _activeIndex = 0;
+  private _rendered = 0;
   private _model: ICompletionModel = null;
   private _reference: Widget = null;
 }
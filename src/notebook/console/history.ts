@@ -14,6 +14,42 @@ import {
 } from 'jupyter-js-services';
 
 
+/**
+ * The maximum number of history entries stored for a kernel spec.
+ */
+const MAX_ENTRIES = 10000;
+
+/**
+ * The number of entries requested from a kernel without stored history.
+ */
+const INITIAL_SYNC = 500;
+
+/**
+ * The number of entries first requested from a kernel with stored history.
+ *
+ * #### Notes
+ * The request grows until it overlaps the stored history, up to
+ * [[INITIAL_SYNC]] entries.
+ */
+const SYNC_PAGE = 50;
+
+/**
+ * The length of the prefixes in the prefix index.
+ */
+const PREFIX_LENGTH = 2;
+
+/**
+ * The length of the substrings in the substring index.
+ */
+const GRAM_LENGTH = 3;
+
+/**
+ * Entries longer than this are not in the substring index, and are
+ * searched directly instead.
+ */
+const MAX_INDEXED_LENGTH = 2000;
+
+
 /**
  * The definition of a console history manager object.
  */
@@ -27,17 +63,39 @@ interface IConsoleHistory extends IDisposable {
   /**
    * Get the previous item in the console history.
    *
+   * @param prefix - The text the items must start with.  It only applies
+   *   when starting to navigate from the bottom of history, and holds until
+   *   the navigation returns to the bottom.
+   *
    * @returns A Promise for console command text or `undefined` if unavailable.
    */
-  back(): Promise<string>;
+  back(prefix?: string): Promise<string>;
 
   /**
    * Get the next item in the console history.
    *
    * @returns A Promise for console command text or `undefined` if unavailable.
+   *   At the bottom of history, the navigation prefix is returned if there
+   *   is one.
    */
   forward(): Promise<string>;
 
+  /**
+   * Search backward through history for an item containing some text.
+   *
+   * @param query - The text to search for.
+   *
+   * @returns A Promise for the matching item or `undefined` if there is no
+   *   match.
+   *
+   * #### Notes
+   * Searching again for the same query finds the next older match, and
+   * searching for an extension of the last query continues from the last
+   * match, so the search is incremental.  Back and forward navigation
+   * continues from the last match.
+   */
+  search(query: string): Promise<string>;
+
   /**
    * Add a new item to the bottom of history.
    *
@@ -56,6 +114,11 @@ interface IConsoleHistory extends IDisposable {
 
 /**
  * A console history manager object.
+ *
+ * #### Notes
+ * The history of a kernel spec is kept in IndexedDB, where available, and
+ * synced with the kernel incrementally by session and line number.  Only
+ * the entries the kernel has added since the last sync are requested.
  */
 export
 class ConsoleHistory implements IConsoleHistory {
@@ -79,25 +142,35 @@ class ConsoleHistory implements IConsoleHistory {
     if (newValue === this._kernel) {
       return;
     }
-    let contents = Private.initialRequest;
     this._kernel = newValue;
-    this._kernel.history(contents).then((value: IHistoryReply) => {
-      this._history = [];
-      let last = '';
-      let current = '';
-      for (let i = 0; i < value.history.length; i++) {
-        // History entries have the shape:
-        // [session: number, line: number, input: string]
-        // Contiguous duplicates are stripped out of the API response.
-        current = value.history[i][2];
-        if (current !== last) {
-          this._history.push(last = current);
-        }
+    this._entries = [];
+    this._setHistory([]);
+    let sync = ++this._sync;
+    let name = newValue.name;
+    let store: Private.HistoryStore = null;
+    Private.openStore().then(value => {
+      store = value;
+      return store ? store.load(name) : Promise.resolve([]);
+    }).then(entries => {
+      if (sync !== this._sync) {
+        return null;
       }
-      // Reset the history navigation cursor back to the bottom.
-      this._cursor = this._history.length;
+      this._setEntries(entries);
+      return Private.fetchNew(newValue, entries[entries.length - 1]);
+    }).then(fresh => {
+      if (sync !== this._sync || !fresh || !fresh.length) {
+        return null;
+      }
+      let entries = this._entries.concat(fresh);
+      let excess = Math.max(entries.length - MAX_ENTRIES, 0);
+      this._setEntries(entries.slice(excess));
+      if (store) {
+        return store.add(name, fresh, excess);
+      }
+      return null;
+    }).catch(error => {
+      console.error('Could not sync the console history', error);
     });
-
   }
 
   /**
@@ -113,12 +186,25 @@ class ConsoleHistory implements IConsoleHistory {
   /**
    * Get the previous item in the console history.
    *
+   * @param prefix - The text the items must start with.  It only applies
+   *   when starting to navigate from the bottom of history, and holds until
+   *   the navigation returns to the bottom.
+   *
    * @returns A Promise for console command text or `undefined` if unavailable.
    */
-  back(): Promise<string> {
-    let content = this._history[--this._cursor];
-    this._cursor = Math.max(0, this._cursor);
-    return Promise.resolve(content);
+  back(prefix = ''): Promise<string> {
+    if (this._cursor === this._history.length) {
+      this._prefix = prefix;
+    }
+    let current = this._history[this._cursor];
+    let index = this._scanBack(this._prefixCandidates(this._prefix), item => {
+      return item !== current && item.indexOf(this._prefix) === 0;
+    });
+    if (index === -1) {
+      return Promise.resolve(void 0);
+    }
+    this._cursor = index;
+    return Promise.resolve(this._history[index]);
   }
 
   /**
@@ -129,19 +215,51 @@ class ConsoleHistory implements IConsoleHistory {
       return;
     }
     clearSignalData(this);
+    ++this._sync;
     this._history.length = 0;
     this._history = null;
+    this._entries = null;
+    this._prefixes = null;
+    this._grams = null;
+    this._long = null;
   }
 
   /**
    * Get the next item in the console history.
    *
    * @returns A Promise for console command text or `undefined` if unavailable.
+   *   At the bottom of history, the navigation prefix is returned if there
+   *   is one.
    */
   forward(): Promise<string> {
-    let content = this._history[++this._cursor];
-    this._cursor = Math.min(this._history.length, this._cursor);
-    return Promise.resolve(content);
+    let current = this._history[this._cursor];
+    let candidates = this._prefixCandidates(this._prefix);
+    let index = -1;
+    let start = this._cursor + 1;
+    if (candidates) {
+      for (let i = Private.lowerBound(candidates, start); i < candidates.length; i++) {
+        let item = this._history[candidates[i]];
+        if (item !== current && item.indexOf(this._prefix) === 0) {
+          index = candidates[i];
+          break;
+        }
+      }
+    } else {
+      for (let i = start; i < this._history.length; i++) {
+        let item = this._history[i];
+        if (item !== current && item.indexOf(this._prefix) === 0) {
+          index = i;
+          break;
+        }
+      }
+    }
+    if (index === -1) {
+      // Back at the bottom, restore the text the navigation started with.
+      this._cursor = this._history.length;
+      return Promise.resolve(this._prefix || void 0);
+    }
+    this._cursor = index;
+    return Promise.resolve(this._history[index]);
   }
 
   /**
@@ -155,18 +273,187 @@ class ConsoleHistory implements IConsoleHistory {
    * so that the console's history will consist of no contiguous repetitions.
    * This behavior varies from some shells, but the Jupyter Qt Console is
    * implemented this way.
+   *
+   * The item is not stored, since the kernel's history has it the next time
+   * the history is synced.
    */
   push(item: string): void {
     if (item && item !== this._history[this._history.length - 1]) {
-      this._history.push(item);
+      this._append(item);
     }
     // Reset the history navigation cursor back to the bottom.
     this._cursor = this._history.length;
+    this._prefix = '';
+    this._query = null;
+  }
+
+  /**
+   * Search backward through history for an item containing some text.
+   *
+   * @param query - The text to search for.
+   *
+   * @returns A Promise for the matching item or `undefined` if there is no
+   *   match.
+   *
+   * #### Notes
+   * Searching again for the same query finds the next older match, and
+   * searching for an extension of the last query continues from the last
+   * match, so the search is incremental.  Back and forward navigation
+   * continues from the last match.
+   */
+  search(query: string): Promise<string> {
+    let start = this._history.length;
+    if (this._query !== null && query === this._query) {
+      start = this._match;
+    } else if (this._query !== null && query.indexOf(this._query) === 0) {
+      start = this._match + 1;
+    }
+    this._query = query;
+    if (!query) {
+      return Promise.resolve(void 0);
+    }
+    let cursor = this._cursor;
+    this._cursor = start;
+    let index = this._scanBack(this._gramCandidates(query), item => {
+      return item.indexOf(query) !== -1;
+    });
+    this._cursor = cursor;
+    if (index === -1) {
+      return Promise.resolve(void 0);
+    }
+    this._match = this._cursor = index;
+    this._prefix = '';
+    return Promise.resolve(this._history[index]);
+  }
+
+  /**
+   * Replace the synced entries, keeping the items pushed since.
+   */
+  private _setEntries(entries: Private.IHistoryEntry[]): void {
+    let pushed = this._history.slice(this._synced);
+    let items: string[] = [];
+    let last = '';
+    for (let entry of entries) {
+      // Contiguous duplicates are stripped out.
+      if (entry.source && entry.source !== last) {
+        items.push(last = entry.source);
+      }
+    }
+    this._entries = entries;
+    this._setHistory(items);
+    this._synced = items.length;
+    for (let item of pushed) {
+      if (item !== this._history[this._history.length - 1]) {
+        this._append(item);
+      }
+    }
+    // Reset the history navigation cursor back to the bottom.
+    this._cursor = this._history.length;
+    this._query = null;
+  }
+
+  /**
+   * Replace the history items and rebuild their indices.
+   */
+  private _setHistory(items: string[]): void {
+    this._history = [];
+    this._prefixes = Object.create(null);
+    this._grams = Object.create(null);
+    this._long = [];
+    this._synced = 0;
+    for (let item of items) {
+      this._append(item);
+    }
+    this._cursor = this._history.length;
+  }
+
+  /**
+   * Append a history item and index it.
+   */
+  private _append(item: string): void {
+    let index = this._history.length;
+    this._history.push(item);
+    if (item.length >= PREFIX_LENGTH) {
+      Private.addPosting(this._prefixes, item.substring(0, PREFIX_LENGTH), index);
+    }
+    if (item.length > MAX_INDEXED_LENGTH) {
+      this._long.push(index);
+      return;
+    }
+    for (let i = 0; i + GRAM_LENGTH <= item.length; i++) {
+      Private.addPosting(this._grams, item.substr(i, GRAM_LENGTH), index);
+    }
+  }
+
+  /**
+   * Get the ascending indices of the items which may start with a prefix,
+   * or `null` if every item may.
+   */
+  private _prefixCandidates(prefix: string): number[] {
+    if (prefix.length < PREFIX_LENGTH) {
+      return null;
+    }
+    return this._prefixes[prefix.substring(0, PREFIX_LENGTH)] || [];
+  }
+
+  /**
+   * Get the ascending indices of the items which may contain a query, or
+   * `null` if every item may.
+   */
+  private _gramCandidates(query: string): number[] {
+    if (query.length < GRAM_LENGTH) {
+      return null;
+    }
+    // The rarest substring of the query has the fewest candidates.
+    let best: number[] = null;
+    for (let i = 0; i + GRAM_LENGTH <= query.length; i++) {
+      let postings = this._grams[query.substr(i, GRAM_LENGTH)];
+      if (!postings) {
+        best = [];
+        break;
+      }
+      if (!best || postings.length < best.length) {
+        best = postings;
+      }
+    }
+    return this._long.length ? Private.merge(best, this._long) : best;
+  }
+
+  /**
+   * Find the last item before the cursor passing a test.
+   *
+   * @returns The index of the item, or `-1` if there is none.
+   */
+  private _scanBack(candidates: number[], test: (item: string) => boolean): number {
+    let cursor = this._cursor;
+    if (candidates) {
+      for (let i = Private.lowerBound(candidates, cursor) - 1; i >= 0; i--) {
+        if (test(this._history[candidates[i]])) {
+          return candidates[i];
+        }
+      }
+      return -1;
+    }
+    for (let i = cursor - 1; i >= 0; i--) {
+      if (test(this._history[i])) {
+        return i;
+      }
+    }
+    return -1;
   }
 
   private _cursor = 0;
   private _history: string[] = null;
   private _kernel: IKernel = null;
+  private _entries: Private.IHistoryEntry[] = [];
+  private _synced = 0;
+  private _sync = 0;
+  private _prefix = '';
+  private _query: string = null;
+  private _match = 0;
+  private _prefixes: { [prefix: string]: number[] } = Object.create(null);
+  private _grams: { [gram: string]: number[] } = Object.create(null);
+  private _long: number[] = [];
 }
 
 
@@ -174,11 +461,235 @@ class ConsoleHistory implements IConsoleHistory {
  * A namespace for private data.
  */
 namespace Private {
+  /**
+   * The name of the history database.
+   */
+  const DB_NAME = 'jupyterlab-console-history';
+
+  /**
+   * The name of the history entry store.
+   */
+  const STORE_NAME = 'entries';
+
+  /**
+   * A stored history entry.
+   */
+  export
+  interface IHistoryEntry {
+    /**
+     * The name of the kernel spec.
+     */
+    kernel: string;
+
+    /**
+     * The kernel's history session number.
+     */
+    session: number;
+
+    /**
+     * The line number in the session.
+     */
+    line: number;
+
+    /**
+     * The input.
+     */
+    source: string;
+  }
+
+  /**
+   * The history entries of kernel specs in IndexedDB.
+   */
+  export
+  class HistoryStore {
+    /**
+     * Construct a new history store.
+     */
+    constructor(db: IDBDatabase) {
+      this._db = db;
+    }
+
+    /**
+     * Load the entries of a kernel spec, oldest first.
+     */
+    load(kernel: string): Promise<IHistoryEntry[]> {
+      return new Promise<IHistoryEntry[]>((resolve, reject) => {
+        let entries: IHistoryEntry[] = [];
+        let transaction = this._db.transaction(STORE_NAME, 'readonly');
+        let request = transaction.objectStore(STORE_NAME).openCursor(range(kernel));
+        request.onsuccess = () => {
+          let cursor = request.result as IDBCursorWithValue;
+          if (cursor) {
+            entries.push(cursor.value);
+            cursor.continue();
+          }
+        };
+        transaction.oncomplete = () => { resolve(entries); };
+        transaction.onerror = () => { reject(transaction.error); };
+      });
+    }
+
+    /**
+     * Add the entries of a kernel spec, evicting its oldest entries.
+     *
+     * @param kernel - The name of the kernel spec.
+     *
+     * @param entries - The new entries.
+     *
+     * @param evict - The number of the oldest entries to remove.
+     */
+    add(kernel: string, entries: IHistoryEntry[], evict: number): Promise<void> {
+      return new Promise<void>((resolve, reject) => {
+        let transaction = this._db.transaction(STORE_NAME, 'readwrite');
+        let store = transaction.objectStore(STORE_NAME);
+        for (let entry of entries) {
+          store.put(entry);
+        }
+        if (evict > 0) {
+          let request = store.openCursor(range(kernel));
+          request.onsuccess = () => {
+            let cursor = request.result as IDBCursorWithValue;
+            if (cursor && evict-- > 0) {
+              cursor.delete();
+              cursor.continue();
+            }
+          };
+        }
+        transaction.oncomplete = () => { resolve(void 0); };
+        transaction.onerror = () => { reject(transaction.error); };
+      });
+    }
+
+    private _db: IDBDatabase;
+  }
+
+  /**
+   * The opened history store, or `null` if IndexedDB is not available.
+   */
+  let storePromise: Promise<HistoryStore> = null;
+
+  /**
+   * Open the history store.
+   */
+  export
+  function openStore(): Promise<HistoryStore> {
+    if (storePromise) {
+      return storePromise;
+    }
+    storePromise = new Promise<HistoryStore>(resolve => {
+      let request: IDBOpenDBRequest;
+      try {
+        request = window.indexedDB.open(DB_NAME, 1);
+      } catch (error) {
+        // IndexedDB is missing or disabled, as in some private modes.
+        resolve(null);
+        return;
+      }
+      request.onupgradeneeded = () => {
+        request.result.createObjectStore(STORE_NAME, {
+          keyPath: ['kernel', 'session', 'line']
+        });
+      };
+      request.onsuccess = () => { resolve(new HistoryStore(request.result)); };
+      request.onerror = () => { resolve(null); };
+      request.onblocked = () => { resolve(null); };
+    });
+    return storePromise;
+  }
+
+  /**
+   * Fetch the entries a kernel added to its history after an entry.
+   *
+   * #### Notes
+   * Without a last entry, the tail of the history is fetched.  Otherwise
+   * the tail is fetched in growing pages until it overlaps the entry.
+   */
+  export
+  function fetchNew(kernel: IKernel, last: IHistoryEntry, n = SYNC_PAGE): Promise<IHistoryEntry[]> {
+    let request: IHistoryRequest = {
+      output: false,
+      raw: true,
+      hist_access_type: 'tail',
+      n: last ? n : INITIAL_SYNC
+    };
+    return kernel.history(request).then((reply: IHistoryReply) => {
+      // History entries have the shape:
+      // [session: number, line: number, input: string]
+      let entries: IHistoryEntry[] = (reply.history || []).map(item => {
+        return { kernel: kernel.name, session: item[0], line: item[1], source: item[2] };
+      });
+      if (!last) {
+        return entries;
+      }
+      let fresh = entries.filter(entry => {
+        return entry.session > last.session ||
+          (entry.session === last.session && entry.line > last.line);
+      });
+      let overlaps = fresh.length < entries.length || entries.length < n;
+      if (!overlaps && n < INITIAL_SYNC) {
+        return fetchNew(kernel, last, Math.min(n * 4, INITIAL_SYNC));
+      }
+      return fresh;
+    });
+  }
+
+  /**
+   * Add a position to the posting list of a key.
+   */
   export
-  const initialRequest: IHistoryRequest = {
-    output: false,
-    raw: true,
-    hist_access_type: 'tail',
-    n: 500
-  };
+  function addPosting(index: { [key: string]: number[] }, key: string, position: number): void {
+    let postings = index[key];
+    if (!postings) {
+      index[key] = [position];
+    } else if (postings[postings.length - 1] !== position) {
+      postings.push(position);
+    }
+  }
+
+  /**
+   * Find the first index of a sorted array with a value not less than a
+   * value.
+   */
+  export
+  function lowerBound(values: number[], value: number): number {
+    let lo = 0;
+    let hi = values.length;
+    while (lo < hi) {
+      let mid = (lo + hi) >> 1;
+      if (values[mid] < value) {
+        lo = mid + 1;
+      } else {
+        hi = mid;
+      }
+    }
+    return lo;
+  }
+
+  /**
+   * Merge two sorted arrays of distinct values.
+   */
+  export
+  function merge(a: number[], b: number[]): number[] {
+    let result: number[] = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length || j < b.length) {
+      if (j >= b.length || (i < a.length && a[i] < b[j])) {
+        result.push(a[i++]);
+      } else {
+        result.push(b[j++]);
+      }
+    }
+    return result;
+  }
+
+  /**
+   * The key range of the entries of a kernel spec.
+   *
+   * #### Notes
+   * Arrays sort after numbers, so `[kernel, []]` follows every entry.
+   */
+  function range(kernel: string): IDBKeyRange {
+    return IDBKeyRange.bound([kernel], [kernel, []] as any);
+  }
 }
@@ -1,6 +1,9 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
+import * as CodeMirror
+  from 'codemirror';
+
 import {
   IKernel, INotebookSession, KernelStatus
 } from 'jupyter-js-services';
@@ -73,6 +76,17 @@ const CONSOLE_PANEL = 'jp-Console-panel';
  */
 const BANNER_CLASS = 'jp-Console-banner';
 
+/**
+ * The key code for the up arrow key.
+ */
+const UP_ARROW = 38;
+
+/**
+ * The key code for the R key, which starts a reverse history search with
+ * the control key.
+ */
+const R_KEY = 82;
+
 
 /**
  * A panel which contains a toolbar and a console.
@@ -322,6 +336,7 @@ class ConsoleWidget extends Widget {
     let prompt = this.prompt;
     prompt.trusted = true;
     this._history.push(prompt.model.source);
+    this._searchQuery = null;
     return prompt.execute(this._session.kernel).then(
       () => this.newPrompt(),
       () => this.newPrompt()
@@ -392,6 +407,11 @@ class ConsoleWidget extends Widget {
     editor.textChanged.connect(this.onTextChange, this);
     editor.completionRequested.connect(this.onCompletionRequest, this);
     editor.edgeRequested.connect(this.onEdgeRequest, this);
+    CodeMirror.on(editor.editor, 'keydown', (instance: CodeMirror.Editor, event: KeyboardEvent) => {
+      if (!this.isDisposed && this.prompt && editor === this.prompt.editor) {
+        this.onPromptKeydown(editor, event);
+      }
+    });
 
     prompt.focus();
   }
@@ -413,6 +433,10 @@ class ConsoleWidget extends Widget {
    * Handle a text changed signal from an editor.
    */
   protected onTextChange(editor: CellEditorWidget, change: ITextChange): void {
+    // Editing the text ends a history search.
+    if (!this._settingHistory) {
+      this._searchQuery = null;
+    }
     let line = change.newValue.split('\n')[change.line];
     let lastChar = change.ch - 1;
     let model = this._completion.model;
@@ -540,25 +564,72 @@ class ConsoleWidget extends Widget {
    * Handle an edge requested signal.
    */
   protected onEdgeRequest(editor: CellEditorWidget, location: EdgeLocation): void {
-    let doc = editor.editor.getDoc();
+    this._searchQuery = null;
     if (location === 'top') {
       this._history.back().then(value => {
         if (!value) {
           return;
         }
-        doc.setValue(value);
-        doc.setCursor(doc.posFromIndex(0));
+        this.setHistoryText(editor, value, 0);
       });
     } else {
       this._history.forward().then(value => {
         // If at the bottom end of history, then clear the prompt.
         let text = value || '';
-        doc.setValue(text);
-        doc.setCursor(doc.posFromIndex(text.length));
+        this.setHistoryText(editor, text, text.length);
       });
     }
   }
 
+  /**
+   * Handle keydown events from the prompt editor.
+   *
+   * #### Notes
+   * Control-R searches backward through history for the prompt text, and
+   * pressed again finds older matches.  Up at the end of a single line
+   * prompt navigates through the history items starting with the line.
+   */
+  protected onPromptKeydown(editor: CellEditorWidget, event: KeyboardEvent): void {
+    let doc = editor.editor.getDoc();
+    if (event.keyCode === R_KEY && event.ctrlKey && !event.altKey && !event.metaKey) {
+      event.preventDefault();
+      let query = this._searchQuery === null ? doc.getValue() : this._searchQuery;
+      this._searchQuery = query;
+      this._history.search(query).then(value => {
+        if (value && this._searchQuery === query) {
+          this.setHistoryText(editor, value, value.indexOf(query) + query.length);
+        }
+      });
+      return;
+    }
+    let cursor = doc.getCursor();
+    let text = doc.getValue();
+    if (event.keyCode === UP_ARROW && doc.lineCount() === 1 &&
+        cursor.ch > 0 && cursor.ch === text.length) {
+      event.preventDefault();
+      this._searchQuery = null;
+      this._history.back(text).then(value => {
+        if (value) {
+          this.setHistoryText(editor, value, value.length);
+        }
+      });
+    }
+  }
+
+  /**
+   * Replace the prompt text with a history item.
+   */
+  protected setHistoryText(editor: CellEditorWidget, text: string, position: number): void {
+    let doc = editor.editor.getDoc();
+    this._settingHistory = true;
+    try {
+      doc.setValue(text);
+    } finally {
+      this._settingHistory = false;
+    }
+    doc.setCursor(doc.posFromIndex(position));
+  }
+
   /**
    * Handle a completion selected signal from the completion widget.
    */
@@ -577,6 +648,8 @@ class ConsoleWidget extends Widget {
   private _session: INotebookSession = null;
   private _pendingComplete = 0;
   private _pendingInspect = 0;
+  private _searchQuery: string = null;
+  private _settingHistory = false;
 }
 
 
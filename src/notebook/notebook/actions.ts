@@ -10,8 +10,7 @@ import {
 } from 'phosphor-dragdrop';
 
 import {
-  ICellModel, CodeCellModel,
-  CodeCellWidget, BaseCellWidget, MarkdownCellWidget
+  ICellModel, CodeCellModel, MarkdownCellWidget, executeCell
 } from '../cells';
 
 import {
@@ -75,32 +74,32 @@ namespace NotebookActions {
     let cells = model.cells;
     let index = widget.activeCellIndex;
     let primary = widget.childAt(widget.activeCellIndex);
-    let child: BaseCellWidget;
+    let cell: ICellModel;
     if (!primary) {
       return;
     }
 
     // Get the other cells to merge.
-    for (let i = 0; i < widget.childCount(); i++) {
+    for (let i = 0; i < cells.length; i++) {
       if (i === index) {
         continue;
       }
-      child = widget.childAt(i);
-      if (widget.isSelected(child)) {
-        toMerge.push(child.model.source);
-        toDelete.push(child.model);
+      cell = cells.get(i);
+      if (widget.isSelected(cell)) {
+        toMerge.push(cell.source);
+        toDelete.push(cell);
       }
     }
 
     // Make sure there are cells to merge and select cells.
     if (!toMerge.length) {
       // Choose the cell after the active cell.
-      child = widget.childAt(cells.length - 1);
-      if (!child) {
+      cell = cells.get(cells.length - 1);
+      if (!cell) {
         return;
       }
-      toMerge.push(child.model.source);
-      toDelete.push(child.model);
+      toMerge.push(cell.source);
+      toDelete.push(cell);
     }
     Private.deselectCells(widget);
 
@@ -133,14 +132,11 @@ namespace NotebookActions {
   function deleteCells(widget: ActiveNotebook): void {
     let model = widget.model;
     let cells = model.cells;
+    let toDelete = Private.selectedCells(widget);
     // Delete the cells as one undo event.
     model.cells.beginCompoundOperation();
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      if (widget.isSelected(child)) {
-        let cell = cells.get(i);
-        cells.remove(cell);
-      }
+    for (let cell of toDelete) {
+      cells.remove(cell);
     }
     if (!model.cells.length) {
       let cell = model.createCodeCell();
@@ -177,29 +173,29 @@ namespace NotebookActions {
   function changeCellType(widget: ActiveNotebook, value: string): void {
     let model = widget.model;
     model.cells.beginCompoundOperation();
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      if (!widget.isSelected(child)) {
+    for (let i = 0; i < model.cells.length; i++) {
+      let cell = model.cells.get(i);
+      if (!widget.isSelected(cell)) {
         continue;
       }
-      if (child.model.type === value) {
+      if (cell.type === value) {
         continue;
       }
       let newCell: ICellModel;
       switch (value) {
       case 'code':
-        newCell = model.createCodeCell(child.model.toJSON());
+        newCell = model.createCodeCell(cell.toJSON());
         break;
       case 'markdown':
-        newCell = model.createMarkdownCell(child.model.toJSON());
+        newCell = model.createMarkdownCell(cell.toJSON());
         break;
       default:
-        newCell = model.createRawCell(child.model.toJSON());
+        newCell = model.createRawCell(cell.toJSON());
       }
       model.cells.replace(i, 1, [newCell]);
       if (value === 'markdown') {
         // Fetch the new widget and unrender it.
-        child = widget.childAt(i);
+        let child = widget.childAt(i);
         (child as MarkdownCellWidget).rendered = false;
       }
     }
@@ -212,15 +208,15 @@ namespace NotebookActions {
    */
   export
   function run(widget: ActiveNotebook, kernel?: IKernel): void {
-    let selected: BaseCellWidget[] = [];
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      if (widget.isSelected(child)) {
-        selected.push(child);
+    let cells = widget.model.cells;
+    let selected: number[] = [];
+    for (let i = 0; i < cells.length; i++) {
+      if (widget.isSelected(cells.get(i))) {
+        selected.push(i);
       }
     }
-    for (let child of selected) {
-      Private.runCell(child, kernel);
+    for (let index of selected) {
+      Private.runCell(widget, index, kernel);
     }
     if (widget.mode === 'command') {
       widget.node.focus();
@@ -272,7 +268,7 @@ namespace NotebookActions {
   export
   function runAll(widget: ActiveNotebook, kernel?: IKernel): void {
     for (let i = 0; i < widget.childCount(); i++) {
-      Private.runCell(widget.childAt(i), kernel);
+      Private.runCell(widget, i, kernel);
     }
     widget.mode = 'command';
     widget.activeCellIndex = widget.childCount() - 1;
@@ -314,12 +310,13 @@ namespace NotebookActions {
       return;
     }
     widget.mode = 'command';
-    let current = widget.childAt(widget.activeCellIndex);
-    let prev = widget.childAt(widget.activeCellIndex - 1);
+    let cells = widget.model.cells;
+    let current = cells.get(widget.activeCellIndex);
+    let prev = cells.get(widget.activeCellIndex - 1);
     if (widget.isSelected(prev)) {
       widget.deselect(current);
       if (widget.activeCellIndex >= 1) {
-        let prevPrev = widget.childAt(widget.activeCellIndex - 1);
+        let prevPrev = cells.get(widget.activeCellIndex - 1);
         if (!widget.isSelected(prevPrev)) {
           widget.deselect(prev);
         }
@@ -342,12 +339,13 @@ namespace NotebookActions {
       return;
     }
     widget.mode = 'command';
-    let current = widget.childAt(widget.activeCellIndex);
-    let next = widget.childAt(widget.activeCellIndex + 1);
+    let cells = widget.model.cells;
+    let current = cells.get(widget.activeCellIndex);
+    let next = cells.get(widget.activeCellIndex + 1);
     if (widget.isSelected(next)) {
       widget.deselect(current);
       if (widget.activeCellIndex < widget.childCount() - 1) {
-        let nextNext = widget.childAt(widget.activeCellIndex + 1);
+        let nextNext = cells.get(widget.activeCellIndex + 1);
         if (!widget.isSelected(nextNext)) {
           widget.deselect(next);
         }
@@ -367,11 +365,8 @@ namespace NotebookActions {
   function copy(widget: ActiveNotebook, clipboard: IClipboard): void {
     clipboard.clear();
     let data: nbformat.IBaseCell[] = [];
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      if (widget.isSelected(child)) {
-        data.push(child.model.toJSON());
-      }
+    for (let cell of Private.selectedCells(widget)) {
+      data.push(cell.toJSON());
     }
     clipboard.setData(JUPYTER_CELL_MIME, data);
     Private.deselectCells(widget);
@@ -386,14 +381,12 @@ namespace NotebookActions {
     let data: nbformat.IBaseCell[] = [];
     let model = widget.model;
     let cells = model.cells;
+    let toCut = Private.selectedCells(widget);
     // Preserve the history as one undo event.
     model.cells.beginCompoundOperation();
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      if (widget.isSelected(child)) {
-        data.push(child.model.toJSON());
-        cells.remove(child.model);
-      }
+    for (let cell of toCut) {
+      data.push(cell.toJSON());
+      cells.remove(cell);
     }
     if (!model.cells.length) {
       let cell = model.createCodeCell();
@@ -459,10 +452,10 @@ namespace NotebookActions {
     let cell = widget.childAt(widget.activeCellIndex);
     let editor = cell.editor.editor;
     let lineNumbers = editor.getOption('lineNumbers');
-    for (let i = 0; i < widget.childCount(); i++) {
-      cell = widget.childAt(i);
-      if (widget.isSelected(cell)) {
-        editor = cell.editor.editor;
+    let cells = widget.model.cells;
+    for (let i = 0; i < cells.length; i++) {
+      if (widget.isSelected(cells.get(i))) {
+        editor = widget.childAt(i).editor.editor;
         editor.setOption('lineNumbers', !lineNumbers);
       }
     }
@@ -470,6 +463,10 @@ namespace NotebookActions {
 
   /**
    * Toggle the line number of all cells.
+   *
+   * #### Notes
+   * Only the rendered cells are changed, so a large notebook is not
+   * rendered in full.
    */
   export
   function toggleAllLineNumbers(widget: ActiveNotebook): void {
@@ -477,6 +474,9 @@ namespace NotebookActions {
     let editor = cell.editor.editor;
     let lineNumbers = editor.getOption('lineNumbers');
     for (let i = 0; i < widget.childCount(); i++) {
+      if (!widget.isRendered(i)) {
+        continue;
+      }
       cell = widget.childAt(i);
       editor = cell.editor.editor;
       editor.setOption('lineNumbers', !lineNumbers);
@@ -491,8 +491,7 @@ namespace NotebookActions {
     let cells = widget.model.cells;
     for (let i = 0; i < cells.length; i++) {
       let cell = cells.get(i) as CodeCellModel;
-      let child = widget.childAt(i);
-      if (widget.isSelected(child) && cell.type === 'code') {
+      if (widget.isSelected(cell) && cell.type === 'code') {
         cell.outputs.clear();
         cell.executionCount = null;
       }
@@ -525,10 +524,26 @@ namespace Private {
    */
   export
   function deselectCells(widget: ActiveNotebook): void {
-    for (let i = 0; i < widget.childCount(); i++) {
-      let child = widget.childAt(i);
-      widget.deselect(child);
+    let cells = widget.model.cells;
+    for (let i = 0; i < cells.length; i++) {
+      widget.deselect(cells.get(i));
+    }
+  }
+
+  /**
+   * Get the selected cells, including the active cell.
+   */
+  export
+  function selectedCells(widget: ActiveNotebook): ICellModel[] {
+    let cells = widget.model.cells;
+    let selected: ICellModel[] = [];
+    for (let i = 0; i < cells.length; i++) {
+      let cell = cells.get(i);
+      if (widget.isSelected(cell)) {
+        selected.push(cell);
+      }
     }
+    return selected;
   }
 
   /**
@@ -548,18 +563,29 @@ namespace Private {
 
   /**
    * Run a cell.
+   *
+   * #### Notes
+   * Code cells are run through their model, which their widgets follow,
+   * so running many cells does not render them.
    */
   export
-  function runCell(widget: BaseCellWidget, kernel?: IKernel): void {
-    switch (widget.model.type) {
+  function runCell(widget: ActiveNotebook, index: number, kernel?: IKernel): void {
+    let cell = widget.model.cells.get(index);
+    let rendered = widget.isRendered(index);
+    switch (cell.type) {
     case 'markdown':
-      (widget as MarkdownCellWidget).rendered = true;
+      // New markdown cell widgets start out rendered.
+      if (rendered) {
+        (widget.childAt(index) as MarkdownCellWidget).rendered = true;
+      }
       break;
     case 'code':
       if (kernel) {
-        (widget as CodeCellWidget).execute(kernel);
+        executeCell(cell as CodeCellModel, kernel).catch(error => {
+          console.error('Could not execute the cell', error);
+        });
       } else {
-        (widget.model as CodeCellModel).executionCount = null;
+        (cell as CodeCellModel).executionCount = null;
       }
       break;
     default:
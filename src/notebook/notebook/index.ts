@@ -3,6 +3,7 @@
 
 export * from './actions';
 export * from './default-toolbar';
+export * from './loader';
 export * from './model';
 export * from './modelfactory';
 export * from './nbformat';
@@ -0,0 +1,629 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IAjaxSettings, IContentsModel
+} from 'jupyter-js-services';
+
+import * as utils
+ from 'jupyter-js-utils';
+
+import {
+  IDocumentLoader
+} from '../../docmanager';
+
+import {
+  INotebookModel
+} from './model';
+
+import {
+  nbformat
+} from './nbformat';
+
+
+/**
+ * The number of cells in the first batch, which is shown at once.
+ */
+const FIRST_BATCH = 25;
+
+/**
+ * The number of cells in the following batches.
+ */
+const BATCH_SIZE = 100;
+
+/**
+ * The number of characters after which a batch is sent early.
+ */
+const MAX_BATCH_LENGTH = 4 * 1024 * 1024;
+
+/**
+ * The number of characters of an output text sent as a transferred buffer
+ * instead of being cloned.
+ */
+const LARGE_OUTPUT = 64 * 1024;
+
+
+/**
+ * A loader of notebooks which parses them off the main thread.
+ *
+ * #### Notes
+ * A web worker fetches and parses the notebook, then sends its cells in
+ * batches.  The first batch is added to the model at once, so the top of
+ * the notebook can be shown, and the other batches are added between
+ * frames.  Large output texts are sent as transferred UTF-8 buffers.
+ *
+ * The model is read-only until the notebook is loaded, and the loaded
+ * cells are not undoable.
+ */
+export
+class NotebookLoader implements IDocumentLoader {
+  /**
+   * Test whether notebooks can be loaded off the main thread.
+   */
+  static isAvailable(): boolean {
+    let win = window as any;
+    return !!(win.Worker && win.Blob && win.URL && win.URL.createObjectURL);
+  }
+
+  /**
+   * Construct a new notebook loader.
+   *
+   * @param path - The path of the notebook.
+   *
+   * @param model - The model to load the notebook into.
+   *
+   * @param ajaxSettings - The settings of the contents api requests, of
+   *   which the headers, credentials and timeout are used.
+   */
+  constructor(path: string, model: INotebookModel, ajaxSettings?: IAjaxSettings) {
+    this._model = model;
+    this._ready = new Promise<IContentsModel>((resolve, reject) => {
+      this._resolveReady = resolve;
+      this._rejectReady = reject;
+    });
+    this._done = new Promise<void>((resolve, reject) => {
+      this._resolveDone = resolve;
+      this._rejectDone = reject;
+    });
+    let Decoder = (window as any).TextDecoder;
+    this._decoder = Decoder ? new Decoder('utf-8') : null;
+    try {
+      this._worker = new Worker(Private.workerUrl());
+    } catch (error) {
+      // Workers may be refused, such as by a content security policy.
+      this._fail(error);
+      return;
+    }
+    this._worker.onmessage = (event: MessageEvent) => {
+      this._onMessage(event.data as Private.WorkerMessage);
+    };
+    this._worker.onerror = (event: ErrorEvent) => {
+      this._fail(new Error(event.message));
+    };
+    ajaxSettings = ajaxSettings || {};
+    let request: Private.IWorkerRequest = {
+      url: Private.contentsUrl(path),
+      requestHeaders: ajaxSettings.requestHeaders || {},
+      withCredentials: !!ajaxSettings.withCredentials,
+      user: ajaxSettings.user || null,
+      password: ajaxSettings.password || null,
+      timeout: ajaxSettings.timeout || 0,
+      firstBatch: FIRST_BATCH,
+      batchSize: BATCH_SIZE,
+      maxBatchLength: MAX_BATCH_LENGTH,
+      largeOutput: this._decoder ? LARGE_OUTPUT : 0
+    };
+    this._worker.postMessage(request);
+  }
+
+  /**
+   * A promise resolved with the contents model, without its content, once
+   * the first cells are in the model.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get ready(): Promise<IContentsModel> {
+    return this._ready;
+  }
+
+  /**
+   * A promise resolved once all of the cells are in the model.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get done(): Promise<void> {
+    return this._done;
+  }
+
+  /**
+   * Get whether the loader is disposed.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isDisposed(): boolean {
+    return this._model === null;
+  }
+
+  /**
+   * Dispose of the resources held by the loader.
+   *
+   * #### Notes
+   * A loader disposed before the notebook is loaded rejects its promises.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    this._fail(new Error('Loading was cancelled'));
+    this._model = null;
+    this._batches = null;
+  }
+
+  /**
+   * Handle a message from the worker.
+   */
+  private _onMessage(message: Private.WorkerMessage): void {
+    if (this.isDisposed || this._failed) {
+      return;
+    }
+    switch (message.type) {
+    case 'contents':
+      let model = this._model;
+      this._contents = (message as Private.IContentsMessage).contents;
+      this._wasReadOnly = model.readOnly;
+      model.readOnly = true;
+      model.fromJSON((message as Private.IContentsMessage).notebook);
+      break;
+    case 'cells':
+      this._batches.push(message as Private.ICellsMessage);
+      this._schedule();
+      break;
+    case 'done':
+      this._received = true;
+      this._schedule();
+      break;
+    case 'error':
+      this._fail(new Error((message as Private.IErrorMessage).message));
+      break;
+    default:
+      break;
+    }
+  }
+
+  /**
+   * Add the next batch of cells, deferring the rest.
+   */
+  private _schedule(): void {
+    if (this._timer !== -1) {
+      return;
+    }
+    // The first batch is added at once, so it can be shown.
+    if (!this._readyResolved) {
+      this._next();
+      return;
+    }
+    this._timer = setTimeout(() => {
+      this._timer = -1;
+      this._next();
+    }, 0);
+  }
+
+  /**
+   * Add a batch of cells to the model.
+   */
+  private _next(): void {
+    if (this.isDisposed || this._failed) {
+      return;
+    }
+    let batch = this._batches.shift();
+    if (batch) {
+      this._addCells(batch);
+    }
+    if (!this._readyResolved && (batch || this._received)) {
+      this._readyResolved = true;
+      this._resolveReady(this._contents);
+    }
+    if (this._batches.length) {
+      this._schedule();
+    } else if (this._received) {
+      this._finish();
+    }
+  }
+
+  /**
+   * Add the cells of a batch, decoding their large outputs.
+   */
+  private _addCells(batch: Private.ICellsMessage): void {
+    for (let large of batch.large) {
+      let cell = batch.cells[large.cell] as nbformat.ICodeCell;
+      let output = cell.outputs[large.output] as any;
+      let owner = large.inData ? output.data : output;
+      owner[large.key] = this._decoder.decode(new Uint8Array(large.buffer));
+    }
+    let model = this._model;
+    // Loading is not an edit to undo.
+    model.cells.beginCompoundOperation(false);
+    try {
+      for (let data of batch.cells) {
+        switch (data.cell_type) {
+        case 'code':
+          model.cells.add(model.createCodeCell(data));
+          break;
+        case 'markdown':
+          model.cells.add(model.createMarkdownCell(data));
+          break;
+        case 'raw':
+          model.cells.add(model.createRawCell(data));
+          break;
+        default:
+          continue;
+        }
+      }
+    } finally {
+      model.cells.endCompoundOperation();
+    }
+  }
+
+  /**
+   * Finish loading the notebook.
+   */
+  private _finish(): void {
+    this._terminate();
+    this._model.readOnly = this._wasReadOnly;
+    this._resolveDone(void 0);
+  }
+
+  /**
+   * Stop loading the notebook after an error.
+   *
+   * #### Notes
+   * The model is left read-only, since it may be missing cells.
+   */
+  private _fail(error: Error): void {
+    if (this._failed || this.isDisposed) {
+      return;
+    }
+    this._failed = true;
+    this._terminate();
+    this._rejectReady(error);
+    this._rejectDone(error);
+  }
+
+  /**
+   * Stop the worker and any deferred batch.
+   */
+  private _terminate(): void {
+    if (this._timer !== -1) {
+      clearTimeout(this._timer);
+      this._timer = -1;
+    }
+    if (this._worker) {
+      this._worker.terminate();
+      this._worker = null;
+    }
+  }
+
+  private _model: INotebookModel = null;
+  private _worker: Worker = null;
+  private _decoder: any = null;
+  private _contents: IContentsModel = null;
+  private _batches: Private.ICellsMessage[] = [];
+  private _received = false;
+  private _failed = false;
+  private _wasReadOnly = false;
+  private _timer = -1;
+  private _ready: Promise<IContentsModel> = null;
+  private _done: Promise<void> = null;
+  private _readyResolved = false;
+  private _resolveReady: (contents: IContentsModel) => void = null;
+  private _rejectReady: (error: Error) => void = null;
+  private _resolveDone: (value: void) => void = null;
+  private _rejectDone: (error: Error) => void = null;
+}
+
+
+/**
+ * The namespace for the notebook loader private data.
+ */
+namespace Private {
+  /**
+   * The request sent to the worker.
+   */
+  export
+  interface IWorkerRequest {
+    /**
+     * The absolute url of the notebook in the contents api.
+     */
+    url: string;
+
+    /**
+     * The headers of the request.
+     */
+    requestHeaders: { [key: string]: string };
+
+    /**
+     * Whether the request is made with credentials.
+     */
+    withCredentials: boolean;
+
+    /**
+     * The user name of the request, or `null`.
+     */
+    user: string;
+
+    /**
+     * The password of the request, or `null`.
+     */
+    password: string;
+
+    /**
+     * The timeout of the request in milliseconds, or `0` for none.
+     */
+    timeout: number;
+
+    /**
+     * The number of cells in the first batch.
+     */
+    firstBatch: number;
+
+    /**
+     * The number of cells in the following batches.
+     */
+    batchSize: number;
+
+    /**
+     * The number of characters after which a batch is sent early.
+     */
+    maxBatchLength: number;
+
+    /**
+     * The length of an output text sent as a buffer, or `0` to clone them.
+     */
+    largeOutput: number;
+  }
+
+  /**
+   * A message with the notebook's contents model and metadata.
+   */
+  export
+  interface IContentsMessage {
+    type: string;
+
+    /**
+     * The contents model, without its content.
+     */
+    contents: IContentsModel;
+
+    /**
+     * The notebook, without its cells.
+     */
+    notebook: nbformat.INotebookContent;
+  }
+
+  /**
+   * An output text sent as a buffer.
+   */
+  export
+  interface ILargeOutput {
+    /**
+     * The index of the cell in its batch.
+     */
+    cell: number;
+
+    /**
+     * The index of the output in the cell.
+     */
+    output: number;
+
+    /**
+     * The key of the text in the output or its data.
+     */
+    key: string;
+
+    /**
+     * Whether the key is in the data of the output.
+     */
+    inData: boolean;
+
+    /**
+     * The UTF-8 encoded text.
+     */
+    buffer: ArrayBuffer;
+  }
+
+  /**
+   * A message with a batch of cells.
+   */
+  export
+  interface ICellsMessage {
+    type: string;
+
+    /**
+     * The cells, with their large output texts emptied.
+     */
+    cells: nbformat.IBaseCell[];
+
+    /**
+     * The large output texts of the cells.
+     */
+    large: ILargeOutput[];
+  }
+
+  /**
+   * A message with an error.
+   */
+  export
+  interface IErrorMessage {
+    type: string;
+
+    /**
+     * The description of the error.
+     */
+    message: string;
+  }
+
+  /**
+   * A message from the worker.
+   */
+  export
+  type WorkerMessage = IContentsMessage | ICellsMessage | IErrorMessage;
+
+  /**
+   * The object url of the worker script.
+   */
+  let url: string = null;
+
+  /**
+   * Get the object url of the worker script.
+   */
+  export
+  function workerUrl(): string {
+    if (!url) {
+      let source = `(${workerMain.toString()})();`;
+      let blob = new Blob([source], { type: 'application/javascript' });
+      url = URL.createObjectURL(blob);
+    }
+    return url;
+  }
+
+  /**
+   * Get the absolute contents api url of a notebook.
+   *
+   * #### Notes
+   * The worker runs from an object url, so its urls must be absolute.
+   */
+  export
+  function contentsUrl(path: string): string {
+    let parts = path.split('/').map(part => encodeURIComponent(part));
+    let anchor = document.createElement('a');
+    anchor.href = utils.urlPathJoin(utils.getBaseUrl(), 'api/contents',
+                                    parts.join('/'));
+    return `${anchor.href}?type=notebook&content=1&_=${Date.now()}`;
+  }
+
+  /**
+   * The worker script.
+   *
+   * #### Notes
+   * This runs in the worker from its source text, so it may not refer to
+   * anything outside of itself.
+   */
+  function workerMain(): void {
+    let scope: any = self;
+
+    // The text of a multiline string, or `null` if it is not one.
+    let textOf = (value: any): string => {
+      if (typeof value === 'string') {
+        return value;
+      }
+      if (Array.isArray(value)) {
+        for (let i = 0; i < value.length; i++) {
+          if (typeof value[i] !== 'string') {
+            return null;
+          }
+        }
+        return value.join('');
+      }
+      return null;
+    };
+
+    scope.onmessage = (event: MessageEvent) => {
+      let request = event.data as IWorkerRequest;
+      let xhr = new XMLHttpRequest();
+      xhr.open('GET', request.url, true, request.user, request.password);
+      for (let name in request.requestHeaders) {
+        xhr.setRequestHeader(name, request.requestHeaders[name]);
+      }
+      xhr.withCredentials = request.withCredentials;
+      xhr.timeout = request.timeout;
+      xhr.onerror = () => {
+        scope.postMessage({ type: 'error', message: 'Could not load the notebook' });
+      };
+      xhr.ontimeout = () => {
+        scope.postMessage({ type: 'error', message: 'Loading the notebook timed out' });
+      };
+      xhr.onload = () => {
+        if (xhr.status !== 200) {
+          scope.postMessage({
+            type: 'error',
+            message: `Could not load the notebook: ${xhr.status} ${xhr.statusText}`
+          });
+          return;
+        }
+        let contents: any;
+        try {
+          contents = JSON.parse(xhr.responseText);
+        } catch (error) {
+          scope.postMessage({ type: 'error', message: `Invalid notebook: ${error.message}` });
+          return;
+        }
+        let notebook = contents.content || {};
+        let cells: any[] = notebook.cells || [];
+        contents.content = null;
+        notebook.cells = [];
+        notebook.metadata = notebook.metadata || {};
+        scope.postMessage({ type: 'contents', contents, notebook });
+
+        let Encoder = scope.TextEncoder;
+        let encoder = request.largeOutput && Encoder ? new Encoder() : null;
+        let batch: any[] = [];
+        let large: ILargeOutput[] = [];
+        let transfer: ArrayBuffer[] = [];
+        let length = 0;
+        let limit = request.firstBatch;
+
+        let take = (owner: any, key: string, inData: boolean, output: number) => {
+          let text = textOf(owner[key]);
+          if (text === null) {
+            return;
+          }
+          length += text.length;
+          if (encoder && text.length >= request.largeOutput) {
+            let buffer = encoder.encode(text).buffer;
+            owner[key] = '';
+            large.push({ cell: batch.length, output, key, inData, buffer });
+            transfer.push(buffer);
+          }
+        };
+
+        for (let i = 0; i < cells.length; i++) {
+          let cell = cells[i];
+          cells[i] = null;
+          let source = textOf(cell.source);
+          length += source ? source.length : 0;
+          let outputs: any[] = cell.outputs || [];
+          for (let j = 0; j < outputs.length; j++) {
+            let output = outputs[j];
+            if (output.output_type === 'stream') {
+              take(output, 'text', false, j);
+            } else if (output.output_type === 'error') {
+              let traceback = textOf(output.traceback || []);
+              length += traceback ? traceback.length : 0;
+            } else if (output.data) {
+              for (let key in output.data) {
+                take(output.data, key, true, j);
+              }
+            }
+          }
+          batch.push(cell);
+          if (batch.length >= limit || length >= request.maxBatchLength) {
+            scope.postMessage({ type: 'cells', cells: batch, large }, transfer);
+            batch = [];
+            large = [];
+            transfer = [];
+            length = 0;
+            limit = request.batchSize;
+          }
+        }
+        if (batch.length) {
+          scope.postMessage({ type: 'cells', cells: batch, large }, transfer);
+        }
+        scope.postMessage({ type: 'done' });
+      };
+      xhr.send();
+    };
+  }
+}
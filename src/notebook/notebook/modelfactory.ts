@@ -2,13 +2,17 @@
 // Distributed under the terms of the Modified BSD License.
 
 import {
-  IContentsOpts
+  IAjaxSettings, IContentsOpts
 } from 'jupyter-js-services';
 
 import {
-  IModelFactory
+  IDocumentLoader, IModelFactory
 } from '../../docmanager';
 
+import {
+  NotebookLoader
+} from './loader';
+
 import {
   INotebookModel, NotebookModel
 } from './model';
@@ -19,6 +23,16 @@ import {
  */
 export
 class NotebookModelFactory implements IModelFactory {
+  /**
+   * Construct a new notebook model factory.
+   *
+   * @param ajaxSettings - The settings of the contents api requests made
+   *   by the loaders of the factory.
+   */
+  constructor(ajaxSettings?: IAjaxSettings) {
+    this._ajaxSettings = ajaxSettings || null;
+  }
+
   /**
    * The name of the model.
    *
@@ -74,5 +88,20 @@ class NotebookModelFactory implements IModelFactory {
     return '';
   }
 
+  /**
+   * Create a loader of a notebook into a model.
+   *
+   * #### Notes
+   * Notebooks are parsed off the main thread where web workers are
+   * available, and are otherwise loaded with the contents manager.
+   */
+  createLoader(path: string, model: INotebookModel): IDocumentLoader {
+    if (!NotebookLoader.isAvailable()) {
+      return null;
+    }
+    return new NotebookLoader(path, model, this._ajaxSettings);
+  }
+
   private _disposed = false;
+  private _ajaxSettings: IAjaxSettings = null;
 }
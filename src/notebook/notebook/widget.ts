@@ -5,6 +5,10 @@ import {
   IKernelLanguageInfo
 } from 'jupyter-js-services';
 
+import {
+  mark
+} from '../../metrics';
+
 import {
   RenderMime
 } from '../../rendermime';
@@ -30,7 +34,7 @@ import {
 } from 'phosphor-signaling';
 
 import {
-  Widget
+  ResizeMessage, Widget
 } from 'phosphor-widget';
 
 import {
@@ -95,6 +99,41 @@ const SELECTED_CLASS = 'jp-mod-selected';
  */
 const OTHER_SELECTED_CLASS = 'jp-mod-multiSelected';
 
+/**
+ * The class name added to the placeholders of cells which are not rendered.
+ */
+const PLACEHOLDER_CLASS = 'jp-Notebook-placeholder';
+
+/**
+ * The number of cells up to which a notebook renders all of its cells.
+ */
+const WINDOW_MIN_CELLS = 50;
+
+/**
+ * The distance in viewports around the view in which cells are rendered.
+ */
+const RENDER_MARGIN = 1;
+
+/**
+ * The distance in viewports around the view beyond which cells are recycled.
+ */
+const RECYCLE_MARGIN = 3;
+
+/**
+ * The estimated height of a line of code or text, in px.
+ */
+const LINE_HEIGHT = 17;
+
+/**
+ * The estimated height of a cell without its lines, in px.
+ */
+const CELL_PADDING = 30;
+
+/**
+ * The estimated height of an output, in px.
+ */
+const OUTPUT_HEIGHT = 40;
+
 /**
  * The interactivity modes for the notebook.
  */
@@ -142,13 +181,10 @@ class NotebookRenderer extends Widget {
       let cell = model.createCodeCell();
       model.cells.add(cell);
     }
+    // Cells are rendered when they are first needed.
     let layout = this.layout as PanelLayout;
-    let constructor = this.constructor as typeof NotebookRenderer;
-    let factory = constructor.createCell;
     for (let i = 0; i < model.cells.length; i++) {
-      let widget = factory(model.cells.get(i), rendermime);
-      this.initializeCellWidget(widget);
-      layout.addChild(widget);
+      layout.addChild(Private.createPlaceholder(model.cells.get(i)));
     }
 
     model.cells.changed.connect(this.onCellsChanged, this);
@@ -175,12 +211,38 @@ class NotebookRenderer extends Widget {
     return this._rendermime;
   }
 
+  /**
+   * Whether only the cells near the view are rendered.
+   *
+   * #### Notes
+   * The default is `true`.  Notebooks with up to 50 cells are always
+   * rendered in full.
+   */
+  get windowed(): boolean {
+    return this._windowed;
+  }
+  set windowed(value: boolean) {
+    if (value === this._windowed) {
+      return;
+    }
+    this._windowed = value;
+    this.update();
+  }
+
   /**
    * Get the child widget at the specified index.
+   *
+   * #### Notes
+   * A cell which is not rendered is rendered by this call, so callers
+   * which only need the cell models should use the notebook model.
    */
   childAt(index: number): BaseCellWidget {
     let layout = this.layout as PanelLayout;
-    return layout.childAt(index) as BaseCellWidget;
+    let child = layout.childAt(index);
+    if (!child || child instanceof BaseCellWidget) {
+      return child as BaseCellWidget;
+    }
+    return this._render(index);
   }
 
   /**
@@ -191,6 +253,34 @@ class NotebookRenderer extends Widget {
     return layout.childCount();
   }
 
+  /**
+   * Whether the cell at the specified index is rendered.
+   */
+  isRendered(index: number): boolean {
+    let layout = this.layout as PanelLayout;
+    return layout.childAt(index) instanceof BaseCellWidget;
+  }
+
+  /**
+   * Handle the DOM events for the widget.
+   *
+   * @param event - The DOM event sent to the widget.
+   *
+   * #### Notes
+   * This method implements the DOM `EventListener` interface and is
+   * called in response to events on the widget's node and the scroll
+   * area. It should not be called directly by user code.
+   */
+  handleEvent(event: Event): void {
+    switch (event.type) {
+    case 'scroll':
+      this._evtScroll(event);
+      break;
+    default:
+      break;
+    }
+  }
+
   /**
    * Dispose of the resources held by the widget.
    */
@@ -199,6 +289,10 @@ class NotebookRenderer extends Widget {
     if (this.isDisposed) {
       return;
     }
+    if (this._frame !== -1) {
+      cancelAnimationFrame(this._frame);
+      this._frame = -1;
+    }
     this._langInfoCursor = null;
     this._model.dispose();
     this._model = null;
@@ -216,7 +310,8 @@ class NotebookRenderer extends Widget {
     // Then find the corresponding child and select it.
     let layout = this.layout as PanelLayout;
     while (node && node !== this.node) {
-      if (node.classList.contains(NB_CELL_CLASS)) {
+      if (node.classList.contains(NB_CELL_CLASS) ||
+          node.classList.contains(PLACEHOLDER_CLASS)) {
         for (let i = 0; i < layout.childCount(); i++) {
           if (layout.childAt(i).node === node) {
             return i;
@@ -229,6 +324,124 @@ class NotebookRenderer extends Widget {
     return -1;
   }
 
+  /**
+   * Handle `after_attach` messages for the widget.
+   */
+  protected onAfterAttach(msg: Message): void {
+    this._scrollArea = this.parent ? this.parent.node : null;
+    if (this._scrollArea) {
+      this._scrollArea.addEventListener('scroll', this);
+    }
+    this.update();
+  }
+
+  /**
+   * Handle `before_detach` messages for the widget.
+   */
+  protected onBeforeDetach(msg: Message): void {
+    if (this._scrollArea) {
+      this._scrollArea.removeEventListener('scroll', this);
+      this._scrollArea = null;
+    }
+  }
+
+  /**
+   * Handle `after_show` messages for the widget.
+   */
+  protected onAfterShow(msg: Message): void {
+    this.updateWindow();
+  }
+
+  /**
+   * Handle `resize` messages for the widget.
+   */
+  protected onResize(msg: ResizeMessage): void {
+    this.updateWindow();
+  }
+
+  /**
+   * Handle `update-request` messages sent to the widget.
+   */
+  protected onUpdateRequest(msg: Message): void {
+    this.updateWindow();
+    if (this.isVisible && (this.layout as PanelLayout).childCount() > 0) {
+      mark('first_notebook_render');
+    }
+  }
+
+  /**
+   * Render the cells near the view and recycle the cells far from it.
+   *
+   * #### Notes
+   * A cell which is not rendered is a placeholder with the height it had
+   * when it was last rendered, or an estimate from its source and
+   * outputs, so the scroll height stays close to that of the full
+   * notebook.  Rendering the cells above the view keeps the first
+   * visible cell in place.
+   */
+  protected updateWindow(): void {
+    let layout = this.layout as PanelLayout;
+    let count = layout.childCount();
+    let area = this._scrollArea;
+    if (!this._windowed || count <= WINDOW_MIN_CELLS) {
+      for (let i = 0; i < count; i++) {
+        this.childAt(i);
+      }
+      return;
+    }
+    if (!area || !this.isVisible) {
+      return;
+    }
+
+    // The view in the coordinates of the notebook node.
+    let height = area.clientHeight;
+    let top = area.scrollTop - this.node.offsetTop;
+    let bottom = top + height;
+    let first = Private.findChild(layout, top);
+    let anchor = layout.childAt(first).node;
+    let anchorTop = anchor.offsetTop;
+
+    // Render the cells near the view.
+    let start = Private.findChild(layout, top - RENDER_MARGIN * height);
+    let end = Private.findChild(layout, bottom + RENDER_MARGIN * height);
+    for (let i = start; i <= end; i++) {
+      this.childAt(i);
+    }
+
+    // Recycle the cells far from the view.
+    start = Private.findChild(layout, top - RECYCLE_MARGIN * height);
+    end = Private.findChild(layout, bottom + RECYCLE_MARGIN * height);
+    for (let i = 0; i < count; i++) {
+      if (i >= start && i <= end) {
+        continue;
+      }
+      let child = layout.childAt(i);
+      if (child instanceof BaseCellWidget && this.canRecycle(i, child)) {
+        this._recycle(i);
+      }
+    }
+
+    // Rendered cells may differ in height from their placeholders.
+    let delta = anchor.offsetTop - anchorTop;
+    if (delta !== 0 && anchor.parentNode === this.node) {
+      area.scrollTop += delta;
+    }
+  }
+
+  /**
+   * Whether a rendered cell far from the view can be recycled.
+   *
+   * #### Notes
+   * The default implementation keeps unrendered markdown cells, whose
+   * state is not in the model, and the cell with the focus.
+   */
+  protected canRecycle(index: number, widget: BaseCellWidget): boolean {
+    if (widget instanceof MarkdownCellWidget && !widget.rendered) {
+      return false;
+    }
+    return !widget.node.contains(document.activeElement);
+  }
+
   /**
    * Handle changes to the notebook model.
    */
@@ -245,47 +458,36 @@ class NotebookRenderer extends Widget {
 
   /**
    * Handle a change cells event.
+   *
+   * #### Notes
+   * New cells are added as placeholders, which are rendered by the
+   * next update if they are near the view.
    */
   protected onCellsChanged(sender: IObservableList<ICellModel>, args: IListChangedArgs<ICellModel>) {
     let layout = this.layout as PanelLayout;
-    let constructor = this.constructor as typeof NotebookRenderer;
-    let factory = constructor.createCell;
-    let widget: BaseCellWidget;
     switch (args.type) {
     case ListChangeType.Add:
-      widget = factory(args.newValue as ICellModel, this._rendermime);
-      this.initializeCellWidget(widget);
-      layout.insertChild(args.newIndex, widget);
+      layout.insertChild(args.newIndex, Private.createPlaceholder(args.newValue as ICellModel));
       break;
     case ListChangeType.Move:
       layout.insertChild(args.newIndex, layout.childAt(args.oldIndex));
       break;
     case ListChangeType.Remove:
-      widget = layout.childAt(args.oldIndex) as BaseCellWidget;
-      layout.removeChild(widget);
-      widget.dispose();
+      this._remove(args.oldIndex);
       break;
     case ListChangeType.Replace:
       let oldValues = args.oldValue as ICellModel[];
       for (let i = 0; i < oldValues.length; i++) {
-        widget = layout.childAt(args.oldIndex) as BaseCellWidget;
-        layout.removeChild(widget);
-        widget.dispose();
+        this._remove(args.oldIndex);
       }
       let newValues = args.newValue as ICellModel[];
       for (let i = newValues.length; i > 0; i--) {
-        widget = factory(newValues[i - 1], this._rendermime);
-        this.initializeCellWidget(widget);
-        layout.insertChild(args.newIndex, widget);
+        layout.insertChild(args.newIndex, Private.createPlaceholder(newValues[i - 1]));
       }
       break;
     case ListChangeType.Set:
-      widget = layout.childAt(args.newIndex) as BaseCellWidget;
-      layout.removeChild(widget);
-      widget.dispose();
-      widget = factory(args.newValue as ICellModel, this._rendermime);
-      layout.insertChild(args.newIndex, widget);
-      this.initializeCellWidget(widget);
+      this._remove(args.newIndex);
+      layout.insertChild(args.newIndex, Private.createPlaceholder(args.newValue as ICellModel));
       break;
     default:
       return;
@@ -328,10 +530,72 @@ class NotebookRenderer extends Widget {
     }
   }
 
+  /**
+   * Replace the placeholder at the specified index with a cell widget.
+   */
+  private _render(index: number): BaseCellWidget {
+    let layout = this.layout as PanelLayout;
+    let placeholder = layout.childAt(index);
+    let constructor = this.constructor as typeof NotebookRenderer;
+    let widget = constructor.createCell(this._model.cells.get(index), this._rendermime);
+    this.initializeCellWidget(widget);
+    layout.removeChild(placeholder);
+    placeholder.dispose();
+    layout.insertChild(index, widget);
+    return widget;
+  }
+
+  /**
+   * Replace the cell widget at the specified index with a placeholder.
+   */
+  private _recycle(index: number): void {
+    let layout = this.layout as PanelLayout;
+    let widget = layout.childAt(index) as BaseCellWidget;
+    let model = widget.model;
+    Private.heightProperty.set(model, widget.node.offsetHeight);
+    layout.removeChild(widget);
+    widget.recycle();
+    layout.insertChild(index, Private.createPlaceholder(model));
+  }
+
+  /**
+   * Remove the child at the specified index.
+   */
+  private _remove(index: number): void {
+    let layout = this.layout as PanelLayout;
+    let child = layout.childAt(index);
+    layout.removeChild(child);
+    if (child instanceof BaseCellWidget) {
+      child.recycle();
+    } else {
+      child.dispose();
+    }
+  }
+
+  /**
+   * Handle the `'scroll'` event for the scroll area.
+   *
+   * #### Notes
+   * The window is updated once per animation frame, and without the
+   * rest of an update, which would scroll back to the active cell.
+   */
+  private _evtScroll(event: Event): void {
+    if (this._frame !== -1) {
+      return;
+    }
+    this._frame = requestAnimationFrame(() => {
+      this._frame = -1;
+      this.updateWindow();
+    });
+  }
+
   private _model: INotebookModel = null;
   private _rendermime: RenderMime<Widget> = null;
   private _mimetype = 'text/plain';
   private _langInfoCursor: IMetadataCursor = null;
+  private _windowed = true;
+  private _scrollArea: HTMLElement = null;
+  private _frame = -1;
 }
 
 
@@ -361,10 +625,9 @@ class ActiveNotebook extends NotebookRenderer {
     this._mode = newValue;
     // Edit mode deselects all cells.
     if (newValue === 'edit') {
-      let layout = this.layout as PanelLayout;
-      for (let i = 0; i < layout.childCount(); i++) {
-        let widget = layout.childAt(i) as BaseCellWidget;
-        this.deselect(widget);
+      let cells = this.model.cells;
+      for (let i = 0; i < cells.length; i++) {
+        Private.selectedProperty.set(cells.get(i), false);
       }
     }
     this.stateChanged.emit({ name: 'mode', oldValue, newValue });
@@ -385,7 +648,7 @@ class ActiveNotebook extends NotebookRenderer {
     }
     let oldValue = this._activeCellIndex;
     this._activeCellIndex = newValue;
-    let widget = (this.layout as PanelLayout).childAt(newValue);
+    let widget = this.childAt(newValue);
     if (widget instanceof MarkdownCellWidget) {
       if (this.mode === 'edit') {
         widget.rendered = false;
@@ -396,33 +659,36 @@ class ActiveNotebook extends NotebookRenderer {
   }
 
   /**
-   * Select a cell widget.
+   * Select a cell.
+   *
+   * #### Notes
+   * The selection is kept by cell model, so cells which are not rendered
+   * can be selected.
    */
-  select(widget: BaseCellWidget): void {
-    Private.selectedProperty.set(widget, true);
+  select(cell: ICellModel): void {
+    Private.selectedProperty.set(cell, true);
     this.update();
   }
 
   /**
-   * Deselect a cell widget.
+   * Deselect a cell.
    *
    * #### Notes
    * This has no effect on the "active" cell.
    */
-  deselect(widget: BaseCellWidget): void {
-    Private.selectedProperty.set(widget, false);
+  deselect(cell: ICellModel): void {
+    Private.selectedProperty.set(cell, false);
     this.update();
   }
 
   /**
    * Whether a cell is selected or is the active cell.
    */
-  isSelected(widget: BaseCellWidget): boolean {
-    let layout = this.layout as PanelLayout;
-    if (layout.childAt(this._activeCellIndex) === widget) {
+  isSelected(cell: ICellModel): boolean {
+    if (this.model.cells.get(this._activeCellIndex) === cell) {
       return true;
     }
-    return Private.selectedProperty.get(widget);
+    return Private.selectedProperty.get(cell);
   }
 
   /**
@@ -444,6 +710,7 @@ class ActiveNotebook extends NotebookRenderer {
       this._evtDblClick(event as MouseEvent);
       break;
     default:
+      super.handleEvent(event);
       break;
     }
   }
@@ -454,7 +721,7 @@ class ActiveNotebook extends NotebookRenderer {
   protected onAfterAttach(msg: Message): void {
     this.node.addEventListener('click', this);
     this.node.addEventListener('dblclick', this);
-    this.update();
+    super.onAfterAttach(msg);
   }
 
   /**
@@ -463,15 +730,14 @@ class ActiveNotebook extends NotebookRenderer {
   protected onBeforeDetach(msg: Message): void {
     this.node.removeEventListener('click', this);
     this.node.removeEventListener('dblclick', this);
+    super.onBeforeDetach(msg);
   }
 
   /**
    * Handle `update-request` messages sent to the widget.
    */
   protected onUpdateRequest(msg: Message): void {
-    // Set the appropriate classes on the cells.
-    let layout = this.layout as PanelLayout;
-    let widget = layout.childAt(this.activeCellIndex) as BaseCellWidget;
+    let widget = this.childAt(this.activeCellIndex);
     if (this.mode === 'edit') {
       this.addClass(EDIT_CLASS);
       this.removeClass(COMMAND_CLASS);
@@ -487,28 +753,49 @@ class ActiveNotebook extends NotebookRenderer {
       this.node.focus();
     }
     if (widget) {
-      widget.addClass(ACTIVE_CLASS);
       Private.scrollIfNeeded(this.parent.node, widget.node);
     }
+    super.onUpdateRequest(msg);
+  }
+
+  /**
+   * Render the cells near the view and set their classes.
+   */
+  protected updateWindow(): void {
+    super.updateWindow();
+    // Set the appropriate classes on the cells.
+    let layout = this.layout as PanelLayout;
+    let cells = this.model.cells;
     let count = 0;
-    for (let i = 0; i < layout.childCount(); i++) {
-      widget = layout.childAt(i) as BaseCellWidget;
-      if (i !== this.activeCellIndex) {
-        widget.removeClass(ACTIVE_CLASS);
-      }
-      widget.removeClass(OTHER_SELECTED_CLASS);
-      if (this.isSelected(widget)) {
-        widget.addClass(SELECTED_CLASS);
+    for (let i = 0; i < cells.length; i++) {
+      if (this.isSelected(cells.get(i))) {
         count++;
-      } else {
-        widget.removeClass(SELECTED_CLASS);
       }
     }
-    if (count > 1) {
-      widget = layout.childAt(this.activeCellIndex) as BaseCellWidget;
-      widget.addClass(OTHER_SELECTED_CLASS);
+    for (let i = 0; i < layout.childCount(); i++) {
+      let widget = layout.childAt(i);
+      if (!(widget instanceof BaseCellWidget)) {
+        continue;
+      }
+      let active = i === this.activeCellIndex;
+      let selected = this.isSelected(cells.get(i));
+      widget.toggleClass(ACTIVE_CLASS, active);
+      widget.toggleClass(SELECTED_CLASS, selected);
+      widget.toggleClass(OTHER_SELECTED_CLASS, active && count > 1);
     }
+  }
 
+  /**
+   * Whether a rendered cell far from the view can be recycled.
+   *
+   * #### Notes
+   * The active cell is never recycled.
+   */
+  protected canRecycle(index: number, widget: BaseCellWidget): boolean {
+    if (index === this.activeCellIndex) {
+      return false;
+    }
+    return super.canRecycle(index, widget);
   }
 
   /**
@@ -559,7 +846,7 @@ class ActiveNotebook extends NotebookRenderer {
       return;
     }
     let cell = model.cells.get(i) as MarkdownCellModel;
-    let widget = (this.layout as PanelLayout).childAt(i) as MarkdownCellWidget;
+    let widget = this.childAt(i) as MarkdownCellWidget;
     if (cell.type !== 'markdown' || !widget.rendered) {
       return;
     }
@@ -581,11 +868,72 @@ namespace Private {
    * An attached property for the selected state of a cell.
    */
   export
-  const selectedProperty = new Property<BaseCellWidget, boolean>({
+  const selectedProperty = new Property<ICellModel, boolean>({
     name: 'selected',
     value: false
   });
 
+  /**
+   * An attached property for the height of a cell when it was last rendered.
+   */
+  export
+  const heightProperty = new Property<ICellModel, number>({
+    name: 'height',
+    value: 0
+  });
+
+  /**
+   * Create the placeholder of a cell which is not rendered.
+   */
+  export
+  function createPlaceholder(cell: ICellModel): Widget {
+    let placeholder = new Widget();
+    placeholder.addClass(PLACEHOLDER_CLASS);
+    let height = heightProperty.get(cell) || estimateHeight(cell);
+    placeholder.node.style.height = `${height}px`;
+    return placeholder;
+  }
+
+  /**
+   * Estimate the height of a cell which has not been rendered.
+   */
+  function estimateHeight(cell: ICellModel): number {
+    let lines = (cell.source || '').split('\n').length;
+    let height = CELL_PADDING + lines * LINE_HEIGHT;
+    if (cell.type === 'code') {
+      height += (cell as CodeCellModel).outputs.length * OUTPUT_HEIGHT;
+    }
+    return height;
+  }
+
+  /**
+   * Find the index of the last child starting at or above a position.
+   *
+   * @param layout - The layout of the notebook.
+   *
+   * @param position - The position in the coordinates of the notebook.
+   *
+   * @returns The index of the child, which is `0` for a position above
+   *   the first child.
+   *
+   * #### Notes
+   * This is a binary search, so only a few nodes are measured.
+   */
+  export
+  function findChild(layout: PanelLayout, position: number): number {
+    let lo = 0;
+    let hi = layout.childCount() - 1;
+    while (lo < hi) {
+      let mid = Math.ceil((lo + hi) / 2);
+      if (layout.childAt(mid).node.offsetTop <= position) {
+        lo = mid;
+      } else {
+        hi = mid - 1;
+      }
+    }
+    return lo;
+  }
+
   /**
    * A signal emitted when the state changes on the notebook.
    */
@@ -14,11 +14,82 @@ import {
 } from '../notebook/nbformat';
 
 
+/**
+ * The default maximum number of characters kept of the stream outputs of
+ * an output area.
+ */
+const DEFAULT_MAX_CHARS = 1000000;
+
+/**
+ * The default maximum number of lines kept of the stream outputs of an
+ * output area.
+ */
+const DEFAULT_MAX_LINES = 20000;
+
+
+/**
+ * The amount of text omitted from a stream output by the cap.
+ */
+export
+interface IOmittedText {
+  /**
+   * The number of characters omitted.
+   */
+  chars: number;
+
+  /**
+   * The number of lines omitted.
+   */
+  lines: number;
+}
+
+
 /**
  * An observable list that handles output area data.
+ *
+ * #### Notes
+ * The stream outputs of the list are capped at [[maxChars]] characters
+ * and [[maxLines]] lines in all, so interleaved stdout and stderr keep no
+ * more text than a single stream.  A stream output gets the part of the
+ * cap left by the stream outputs before it.  Past its cap, the
+ * text of the output is the head of the stream, a line noting how many
+ * lines were omitted, and a rolling tail.  The omitted middle is kept in
+ * blobs outside the model, so it is neither saved nor held as a string,
+ * and [[fullText]] reads it back.
+ *
+ * Display data and execute results are not counted, since each is a
+ * single message which is kept whole.
  */
 export
 class ObservableOutputs extends ObservableList<nbformat.IOutput> {
+  /**
+   * The maximum number of characters kept of the stream outputs.
+   *
+   * #### Notes
+   * A change applies to the text appended after it.
+   */
+  get maxChars(): number {
+    return this._maxChars;
+  }
+  set maxChars(value: number) {
+    this._maxChars = value;
+    this._updateLimits();
+  }
+
+  /**
+   * The maximum number of lines kept of the stream outputs.
+   *
+   * #### Notes
+   * A change applies to the text appended after it.
+   */
+  get maxLines(): number {
+    return this._maxLines;
+  }
+  set maxLines(value: number) {
+    this._maxLines = value;
+    this._updateLimits();
+  }
+
   /**
    * Add an output, which may be combined with previous output
    * (e.g. for streams).
@@ -38,14 +109,17 @@ class ObservableOutputs extends ObservableList<nbformat.IOutput> {
         && output.name === lastOutput.name) {
       // In order to get a list change event, we add the previous
       // text to the current item and replace the previous item.
-      // This also replaces the metadata of the last item.
-      let text: string = output.text;
-      output.text = lastOutput.text as string + text;
-      this.set(index, output);
+      let buffer = this._bufferFor(lastOutput);
+      buffer.append(output.text);
+      this.set(index, buffer.createOutput());
       return index;
     } else {
       switch (output.output_type) {
       case 'stream':
+        let stream = output as nbformat.IStream;
+        let buffer = this._createBuffer(stream.name);
+        buffer.append(stream.text);
+        return super.add(buffer.createOutput());
       case 'execute_result':
       case 'display_data':
       case 'error':
@@ -67,10 +141,109 @@ class ObservableOutputs extends ObservableList<nbformat.IOutput> {
       this._clearNext = true;
       return [];
     }
+    this._buffer = null;
+    this._capped = [];
+    this._usedChars = 0;
+    this._usedLines = 0;
     return super.clear();
   }
 
+  /**
+   * Get how much of a stream output was omitted by the cap.
+   *
+   * @param output - An output of the list.
+   *
+   * @returns The number of characters and lines omitted, or `null` if
+   *   the whole text of the output is in the model.
+   */
+  omitted(output: nbformat.IOutput): IOmittedText {
+    let buffer = this._findBuffer(output);
+    if (!buffer || !buffer.omittedChars) {
+      return null;
+    }
+    return { chars: buffer.omittedChars, lines: buffer.omittedLines };
+  }
+
+  /**
+   * Get the full text of a stream output.
+   *
+   * @param output - A stream output of the list.
+   *
+   * @returns A promise resolving with the text of the output, including
+   *   the text omitted by the cap.
+   */
+  fullText(output: nbformat.IStream): Promise<string> {
+    let buffer = this._findBuffer(output);
+    if (!buffer) {
+      return Promise.resolve(output.text);
+    }
+    return buffer.fullText();
+  }
+
+  /**
+   * Get the buffer holding the text of a stream output.
+   */
+  private _bufferFor(output: nbformat.IStream): Private.StreamBuffer {
+    let buffer = this._buffer;
+    if (!buffer || buffer.output !== output) {
+      // The output was not added through this method, e.g. it was loaded.
+      buffer = this._createBuffer(output.name);
+      buffer.append(output.text);
+    }
+    return buffer;
+  }
+
+  /**
+   * Create the buffer of the last stream output.
+   */
+  private _createBuffer(name: 'stdout' | 'stderr'): Private.StreamBuffer {
+    let old = this._buffer;
+    if (old) {
+      // The earlier output is done, so its text counts against the cap.
+      this._usedChars += old.chars;
+      this._usedLines += old.lines;
+      if (old.omittedChars) {
+        // Keep the omitted text of the earlier output readable.
+        this._capped.push(old);
+      }
+    }
+    this._buffer = new Private.StreamBuffer(name, 0, 0);
+    this._updateLimits();
+    return this._buffer;
+  }
+
+  /**
+   * Give the last stream output the part of the cap which is left.
+   */
+  private _updateLimits(): void {
+    if (this._buffer) {
+      this._buffer.setLimits(Math.max(0, this._maxChars - this._usedChars),
+                             Math.max(0, this._maxLines - this._usedLines));
+    }
+  }
+
+  /**
+   * Find the buffer holding the text of an output.
+   */
+  private _findBuffer(output: nbformat.IOutput): Private.StreamBuffer {
+    if (this._buffer && this._buffer.output === output) {
+      return this._buffer;
+    }
+    for (let buffer of this._capped) {
+      if (buffer.output === output) {
+        return buffer;
+      }
+    }
+    return null;
+  }
+
   private _clearNext = false;
+  private _maxChars = DEFAULT_MAX_CHARS;
+  private _maxLines = DEFAULT_MAX_LINES;
+  private _buffer: Private.StreamBuffer = null;
+  private _capped: Private.StreamBuffer[] = [];
+  private _usedChars = 0;
+  private _usedLines = 0;
 }
 
 
@@ -89,15 +262,329 @@ function executeCode(code: string, kernel: IKernel, outputs: ObservableOutputs):
   outputs.clear();
   return new Promise<IExecuteReply>((resolve, reject) => {
     let future = kernel.execute(exRequest);
+    let batch = new Private.OutputBatch(outputs);
     future.onIOPub = (msg => {
       let model = msg.content;
       if (model !== void 0) {
         model.output_type = msg.header.msg_type as nbformat.OutputType;
-        outputs.add(model);
+        batch.push(model);
       }
     });
     future.onReply = (msg => {
+      batch.flush();
       resolve(msg.content as IExecuteReply);
     });
   });
 }
+
+
+/**
+ * The namespace for output area model private data.
+ */
+namespace Private {
+  /**
+   * The text of a stream output.
+   *
+   * #### Notes
+   * Appended text is concatenated to the tail, which engines keep as a
+   * rope until it is read, so appending is linear in the size of the
+   * appended text.  Once the stream passes the cap, the lines up to half of
+   * the cap are kept as the head.  When the tail passes the other half of
+   * the cap, its front is moved to a blob until it is a quarter of the
+   * cap, so the text is copied once per quarter of the cap appended.
+   *
+   * The text is cut at the ends of lines, unless a single line is longer
+   * than the cap, and a note line of the omitted text is put between the
+   * head and the tail.  The note is not counted in the cap.
+   */
+  export
+  class StreamBuffer {
+    /**
+     * Construct a new stream buffer.
+     */
+    constructor(name: 'stdout' | 'stderr', maxChars: number, maxLines: number) {
+      this._name = name;
+      this._maxChars = maxChars;
+      this._maxLines = maxLines;
+    }
+
+    /**
+     * The output holding the text of the buffer.
+     *
+     * #### Notes
+     * This is a read-only property.
+     */
+    get output(): nbformat.IStream {
+      return this._output;
+    }
+
+    /**
+     * The number of characters of the text kept in the output.
+     *
+     * #### Notes
+     * This is a read-only property.
+     */
+    get chars(): number {
+      return this._head.length + this._note.length + this._tail.length;
+    }
+
+    /**
+     * The number of lines of the text kept in the output.
+     *
+     * #### Notes
+     * This is a read-only property.
+     */
+    get lines(): number {
+      return this._headLines + (this._note ? 1 : 0) + this._lines;
+    }
+
+    /**
+     * The number of characters omitted from the text.
+     *
+     * #### Notes
+     * This is a read-only property.
+     */
+    get omittedChars(): number {
+      return this._omittedChars;
+    }
+
+    /**
+     * The number of lines omitted from the text.
+     *
+     * #### Notes
+     * This is a read-only property.
+     */
+    get omittedLines(): number {
+      return this._omittedLines;
+    }
+
+    /**
+     * Set the cap of the stream, for the text appended next.
+     */
+    setLimits(maxChars: number, maxLines: number): void {
+      this._maxChars = maxChars;
+      this._maxLines = maxLines;
+    }
+
+    /**
+     * Append text to the stream.
+     */
+    append(text: string): void {
+      this._tail += text;
+      this._lines += countLines(text, 0, text.length);
+      this._trim();
+    }
+
+    /**
+     * Create the output holding the current text of the stream.
+     */
+    createOutput(): nbformat.IStream {
+      this._output = {
+        output_type: 'stream',
+        name: this._name,
+        text: this._head + this._note + this._tail
+      };
+      return this._output;
+    }
+
+    /**
+     * Get the text of the stream, including the omitted text.
+     */
+    fullText(): Promise<string> {
+      let head = this._head;
+      let tail = this._tail;
+      if (!this._spilled.length) {
+        return Promise.resolve(head + tail);
+      }
+      return readBlob(new Blob(this._spilled)).then(middle => {
+        return head + middle + tail;
+      });
+    }
+
+    /**
+     * Enforce the cap.
+     */
+    private _trim(): void {
+      let maxChars = this._maxChars;
+      let maxLines = this._maxLines;
+      if (!this._split) {
+        let text = this._tail;
+        if (text.length <= maxChars && this._lines <= maxLines) {
+          return;
+        }
+        // Keep the whole lines of the head of the stream.
+        let head = lineEnd(text, 0, Math.floor(maxLines / 2));
+        let limit = Math.floor(maxChars / 2);
+        if (head > limit) {
+          head = limit > 0 ? text.lastIndexOf('\n', limit - 1) + 1 : 0;
+        }
+        this._head = text.slice(0, head);
+        this._headLines = countLines(text, 0, head);
+        this._tail = text.slice(head);
+        this._lines -= this._headLines;
+        this._split = true;
+      }
+      let tail = this._tail;
+      if (tail.length <= maxChars / 2 && this._lines <= maxLines / 2) {
+        return;
+      }
+      // Move the front of the tail to a blob, up to the end of a line.
+      let end = Math.max(0, tail.length - Math.floor(maxChars / 4));
+      let lines = this._lines - Math.floor(maxLines / 4);
+      if (lines > 0) {
+        end = Math.max(end, lineEnd(tail, 0, lines));
+      }
+      if (end > 0 && tail.charAt(end - 1) !== '\n') {
+        let index = tail.indexOf('\n', end);
+        end = index === -1 ? charBoundary(tail, end) : index + 1;
+      }
+      let omittedLines = countLines(tail, 0, end);
+      this._spilled.push(new Blob([tail.slice(0, end)]));
+      this._omittedChars += end;
+      this._omittedLines += omittedLines;
+      this._lines -= omittedLines;
+      this._tail = tail.slice(end);
+      this._note = omittedNote(this._omittedChars, this._omittedLines);
+    }
+
+    private _name: 'stdout' | 'stderr';
+    private _maxChars: number;
+    private _maxLines: number;
+    private _output: nbformat.IStream = null;
+    private _split = false;
+    private _head = '';
+    private _headLines = 0;
+    private _note = '';
+    private _tail = '';
+    private _lines = 0;
+    private _spilled: Blob[] = [];
+    private _omittedChars = 0;
+    private _omittedLines = 0;
+  }
+
+  /**
+   * Create the note line of the text omitted from a stream.
+   */
+  function omittedNote(chars: number, lines: number): string {
+    if (lines) {
+      return `... ${lines} lines omitted ...\n`;
+    }
+    return `... ${chars} characters omitted ...\n`;
+  }
+
+  /**
+   * Count the newlines in part of a string.
+   */
+  function countLines(text: string, start: number, end: number): number {
+    let count = 0;
+    let index = text.indexOf('\n', start);
+    while (index !== -1 && index < end) {
+      count++;
+      index = text.indexOf('\n', index + 1);
+    }
+    return count;
+  }
+
+  /**
+   * Find the end of a number of lines of a string.
+   *
+   * @returns The index after the `count`th newline from `start`, or the
+   *   length of the string if it has fewer newlines.
+   */
+  function lineEnd(text: string, start: number, count: number): number {
+    let index = start;
+    for (let i = 0; i < count; i++) {
+      index = text.indexOf('\n', index);
+      if (index === -1) {
+        return text.length;
+      }
+      index++;
+    }
+    return index;
+  }
+
+  /**
+   * Move an index of a string off the middle of a surrogate pair, which
+   * would not survive the encoding of a blob.
+   */
+  function charBoundary(text: string, index: number): number {
+    let code = text.charCodeAt(index - 1);
+    if (index > 0 && index < text.length && code >= 0xD800 && code < 0xDC00) {
+      return index + 1;
+    }
+    return index;
+  }
+
+  /**
+   * Read the text of a blob.
+   */
+  function readBlob(blob: Blob): Promise<string> {
+    return new Promise<string>((resolve, reject) => {
+      let reader = new FileReader();
+      reader.onload = () => { resolve(reader.result as string); };
+      reader.onerror = () => { reject(reader.error); };
+      reader.readAsText(blob);
+    });
+  }
+
+  /**
+   * A queue of outputs added to an output list once per animation frame.
+   *
+   * #### Notes
+   * Consecutive stream messages of the same stream are joined before they
+   * are added, so a busy stream changes the list once per frame.
+   */
+  export
+  class OutputBatch {
+    /**
+     * Construct a new output batch.
+     */
+    constructor(outputs: ObservableOutputs) {
+      this._outputs = outputs;
+    }
+
+    /**
+     * Queue an output.
+     */
+    push(output: nbformat.IOutput): void {
+      let queue = this._queue;
+      let last = queue[queue.length - 1] as nbformat.IStream;
+      if (last && nbformat.isStream(output) && nbformat.isStream(last) &&
+          output.name === last.name) {
+        // Join into a new output, leaving the messages as they are.
+        queue[queue.length - 1] = {
+          output_type: 'stream',
+          name: last.name,
+          text: last.text + output.text
+        } as nbformat.IStream;
+      } else {
+        queue.push(output);
+      }
+      if (this._frame === -1) {
+        this._frame = requestAnimationFrame(() => {
+          this._frame = -1;
+          this.flush();
+        });
+      }
+    }
+
+    /**
+     * Add the queued outputs now.
+     */
+    flush(): void {
+      if (this._frame !== -1) {
+        cancelAnimationFrame(this._frame);
+        this._frame = -1;
+      }
+      let queue = this._queue;
+      this._queue = [];
+      for (let output of queue) {
+        this._outputs.add(output);
+      }
+    }
+
+    private _outputs: ObservableOutputs;
+    private _queue: nbformat.IOutput[] = [];
+    private _frame = -1;
+  }
+}
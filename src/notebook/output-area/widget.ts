@@ -21,16 +21,12 @@ import {
   Widget
 } from 'phosphor-widget';
 
-import {
-  sanitize
-} from 'sanitizer';
-
 import {
   nbformat
 } from '../notebook/nbformat';
 
 import {
-  ObservableOutputs
+  IOmittedText, ObservableOutputs
 } from './model';
 
 
@@ -89,6 +85,26 @@ const PROMPT_CLASS = 'jp-OutputArea-prompt';
  */
 const RESULT_CLASS = 'jp-OutputArea-result';
 
+/**
+ * The class name added to outputs of which only the tail is rendered.
+ */
+const TRUNCATED_CLASS = 'jp-mod-truncated';
+
+/**
+ * The class name added to the button showing the full output.
+ */
+const SHOW_FULL_CLASS = 'jp-OutputArea-showFull';
+
+/**
+ * The number of lines rendered of the tail of a stream output.
+ */
+const TAIL_LINES = 1000;
+
+/**
+ * The number of characters rendered of the tail of a stream output.
+ */
+const TAIL_CHARS = 100000;
+
 
 /**
  * A list of outputs considered safe.
@@ -114,13 +130,13 @@ class OutputAreaWidget extends Widget {
     super();
     this.addClass(OUTPUT_AREA_CLASS);
     this._rendermime = rendermime;
+    this._outputs = outputs;
     this.layout = new PanelLayout();
     for (let i = 0; i < outputs.length; i++) {
       let widget = this.createOutput(outputs.get(i));
       (this.layout as PanelLayout).addChild(widget);
     }
     outputs.changed.connect(this.outputsChanged, this);
-    this._outputs = outputs;
   }
 
   /**
@@ -136,15 +152,27 @@ class OutputAreaWidget extends Widget {
     this._trusted = value;
     // Re-render only if necessary.
     if ((this._sanitized && value) || (!value)) {
-      let layout = this.layout as PanelLayout;
-      for (let i = 0; i < layout.childCount(); i++) {
-        layout.childAt(0).dispose();
-      }
-      let outputs = this._outputs;
-      for (let i = 0; i < outputs.length; i++) {
-        layout.addChild(this.createOutput(outputs.get(i)));
-      }
+      this._renderAll();
+    }
+  }
+
+  /**
+   * Whether stream outputs are rendered in full.
+   *
+   * #### Notes
+   * By default only the tail of a long stream output is rendered, with a
+   * button to render all of its text, including the text omitted from the
+   * model by its cap.
+   */
+  get showFull(): boolean {
+    return this._showFull;
+  }
+  set showFull(value: boolean) {
+    if (this._showFull === value) {
+      return;
     }
+    this._showFull = value;
+    this._renderAll();
   }
 
   /**
@@ -195,6 +223,7 @@ class OutputAreaWidget extends Widget {
     let widget = new Panel();
     widget.addClass(OUTPUT_CLASS);
     let bundle: nbformat.MimeBundle;
+    let full: Promise<string> = null;
     this._sanitized = false;
     switch (output.output_type) {
     case 'execute_result':
@@ -211,7 +240,21 @@ class OutputAreaWidget extends Widget {
       widget.addClass(DISPLAY_CLASS);
       break;
     case 'stream':
-      bundle = {'application/vnd.jupyter.console-text': (output as nbformat.IStream).text};
+      let text = (output as nbformat.IStream).text;
+      let omitted = this._outputs.omitted(output);
+      if (this._showFull) {
+        if (omitted) {
+          full = this._outputs.fullText(output as nbformat.IStream);
+        }
+      } else {
+        let start = Private.tailStart(text, TAIL_LINES, TAIL_CHARS);
+        if (start > 0 || omitted) {
+          text = text.slice(start);
+          widget.addClass(TRUNCATED_CLASS);
+          widget.addChild(this._createShowFull(omitted));
+        }
+      }
+      bundle = {'application/vnd.jupyter.console-text': text};
       if ((output as nbformat.IStream).name === 'stdout') {
         widget.addClass(STDOUT_CLASS);
       } else {
@@ -230,6 +273,7 @@ class OutputAreaWidget extends Widget {
     }
 
     // Sanitize outputs as needed.
+    let sanitize: string[] = [];
     if (!this.trusted) {
       let keys = Object.keys(bundle);
       for (let key of keys) {
@@ -239,7 +283,7 @@ class OutputAreaWidget extends Widget {
           this._sanitized = true;
           let out = bundle[key];
           if (typeof out === 'string') {
-            bundle[key] = sanitize(out);
+            sanitize.push(key);
           } else {
             console.log('Ignoring unsanitized ' + key + ' output; could not sanitize because output is not a string.');
             delete bundle[key];
@@ -253,16 +297,77 @@ class OutputAreaWidget extends Widget {
       }
     }
 
-    if (bundle) {
-      let child = this._rendermime.render(bundle);
-      if (child) {
+    if (full) {
+      full.then(text => {
+        if (!widget.isDisposed) {
+          bundle = {'application/vnd.jupyter.console-text': text};
+          this._renderBundle(widget, bundle, sanitize);
+        }
+      }).catch(error => {
+        console.error('Could not load the full output', error);
+      });
+    } else if (bundle) {
+      this._renderBundle(widget, bundle, sanitize);
+    }
+    return widget;
+  }
+
+  /**
+   * Render a mime bundle into an output node.
+   */
+  private _renderBundle(widget: Panel, bundle: nbformat.MimeBundle, sanitize: string[]): void {
+    // Render off the main thread where possible, visible outputs first.
+    let task = this._rendermime.renderAsync(bundle, {
+      priority: () => Private.viewportDistance(widget),
+      sanitize
+    });
+    widget.disposed.connect(() => { task.cancel(); });
+    task.promise.then(child => {
+      if (widget.isDisposed) {
+        if (child) {
+          child.dispose();
+        }
+      } else if (child) {
         child.addClass(RESULT_CLASS);
         widget.addChild(child);
       } else {
         console.log('Did not find renderer for output mimebundle.');
         console.log(bundle);
       }
+    }).catch(error => {
+      console.error('Could not render the output', error);
+    });
+  }
+
+  /**
+   * Re-render all of the outputs.
+   */
+  private _renderAll(): void {
+    let layout = this.layout as PanelLayout;
+    while (layout.childCount()) {
+      layout.childAt(0).dispose();
+    }
+    let outputs = this._outputs;
+    for (let i = 0; i < outputs.length; i++) {
+      layout.addChild(this.createOutput(outputs.get(i)));
+    }
+  }
+
+  /**
+   * Create the button rendering the full text of the stream outputs.
+   */
+  private _createShowFull(omitted: IOmittedText): Widget {
+    let widget = new Widget();
+    let button = document.createElement('button');
+    button.className = SHOW_FULL_CLASS;
+    if (omitted) {
+      button.textContent = `Load the full output (${omitted.lines} lines ` +
+                           `omitted)`;
+    } else {
+      button.textContent = 'Show the full output';
     }
+    button.onclick = () => { this.showFull = true; };
+    widget.node.appendChild(button);
     return widget;
   }
 
@@ -330,6 +435,54 @@ class OutputAreaWidget extends Widget {
   private _trusted = false;
   private _fixedHeight = false;
   private _collapsed = false;
+  private _showFull = false;
   private _outputs: ObservableOutputs = null;
   private _rendermime: RenderMime<Widget> = null;
 }
+
+
+/**
+ * The namespace for output area widget private data.
+ */
+namespace Private {
+  /**
+   * Find where the rendered tail of a text starts.
+   *
+   * @returns The index of the start of the last `maxLines` lines, or of
+   *   the last `maxChars` characters if that is later.
+   */
+  export
+  function tailStart(text: string, maxLines: number, maxChars: number): number {
+    let start = Math.max(0, text.length - maxChars);
+    // Skip a trailing newline, which does not start a line.
+    let index = text.length - 2;
+    for (let i = 0; i < maxLines; i++) {
+      index = text.lastIndexOf('\n', index);
+      if (index < start) {
+        return start;
+      }
+      index--;
+    }
+    return index + 2;
+  }
+
+  /**
+   * Get the distance of a widget from the viewport, in pixels.
+   *
+   * #### Notes
+   * The distance is `0` for a widget in the viewport, and infinite for a
+   * widget which is not visible.
+   */
+  export
+  function viewportDistance(widget: Widget): number {
+    if (!widget.isVisible) {
+      return Infinity;
+    }
+    let rect = widget.node.getBoundingClientRect();
+    let height = window.innerHeight || document.documentElement.clientHeight;
+    if (rect.bottom < 0) {
+      return -rect.bottom;
+    }
+    return Math.max(rect.top - height, 0);
+  }
+}
@@ -26,10 +26,6 @@ import {
   MimeData as IClipboard
 } from 'phosphor-dragdrop';
 
-import {
-  ISignal, Signal
-} from 'phosphor-signaling';
-
 import {
   Widget
 } from 'phosphor-widget';
@@ -38,6 +34,15 @@ import {
   JupyterServices
 } from '../services/plugin';
 
+import {
+  activeNotebookProvider
+} from './tracker';
+
+
+export {
+  ActiveNotebook, activeNotebookProvider
+} from './tracker';
+
 
 /**
  * The map of command ids used by the notebook.
@@ -90,82 +95,6 @@ const notebookHandlerExtension = {
 };
 
 
-/**
- * An interface exposing the current active notebook.
- */
-export
-class ActiveNotebook {
-  /**
-   * Construct a new active notebook tracker.
-   */
-  constructor() {
-    // Temporary notebook focus follower.
-    document.body.addEventListener('focus', event => {
-      for (let widget of this._widgets) {
-        let target = event.target as HTMLElement;
-        if (widget.isAttached && widget.isVisible) {
-          if (widget.node.contains(target)) {
-            this.activeNotebook = widget;
-            return;
-          }
-        }
-      }
-    }, true);
-  }
-
-  /**
-   * A signal emitted when the active notebook changes.
-   */
-  get activeNotebookChanged(): ISignal<ActiveNotebook, NotebookPanel> {
-    return Private.activeNotebookChangedSignal.bind(this);
-  }
-
-  /**
-   * The current active notebook.
-   */
-  get activeNotebook(): NotebookPanel {
-    return this._activeWidget;
-  }
-  set activeNotebook(widget: NotebookPanel) {
-    if (this._activeWidget === widget) {
-      return;
-    }
-    if (this._widgets.indexOf(widget) !== -1) {
-      this._activeWidget = widget;
-      this.activeNotebookChanged.emit(widget);
-      return;
-    }
-    if (widget === null) {
-      return;
-    }
-    this._widgets.push(widget);
-    widget.disposed.connect(() => {
-      let index = this._widgets.indexOf(widget);
-      this._widgets.splice(index, 1);
-      if (this._activeWidget === widget) {
-        this.activeNotebook = null;
-      }
-    });
-  }
-
-  private _activeWidget: NotebookPanel = null;
-  private _widgets: NotebookPanel[] = [];
-}
-
-
-/**
- * A service tracking the active notebook widget.
- */
-export
-const activeNotebookProvider = {
-  id: 'jupyter.services.activeNotebook',
-  provides: ActiveNotebook,
-  resolve: () => {
-    return Private.notebookTracker;
-  }
-};
-
-
 /**
  * A version of the notebook widget factory that uses the notebook tracker.
  */
@@ -175,7 +104,7 @@ class TrackingNotebookWidgetFactory extends NotebookWidgetFactory {
    */
   createNew(model: INotebookModel, context: IDocumentContext, kernel?: IKernelId): NotebookPanel {
     let widget = super.createNew(model, context, kernel);
-    Private.notebookTracker.activeNotebook = widget;
+    activeNotebookProvider.resolve().activeNotebook = widget;
     return widget;
   }
 }
@@ -187,7 +116,7 @@ class TrackingNotebookWidgetFactory extends NotebookWidgetFactory {
 function activateNotebookHandler(app: Application, registry: DocumentRegistry, services: JupyterServices, rendermime: RenderMime<Widget>, clipboard: IClipboard): Promise<void> {
 
   let widgetFactory = new TrackingNotebookWidgetFactory(rendermime, clipboard);
-  registry.registerModelFactory(new NotebookModelFactory());
+  registry.registerModelFactory(new NotebookModelFactory(services.ajaxSettings));
   registry.registerWidgetFactory(widgetFactory,
   {
     fileExtensions: ['.ipynb'],
@@ -218,7 +147,7 @@ function activateNotebookHandler(app: Application, registry: DocumentRegistry, s
     });
   }
 
-  let tracker = Private.notebookTracker;
+  let tracker = activeNotebookProvider.resolve();
   app.commands.add([
   {
     id: cmdIds['runAndAdvance'],
@@ -678,20 +607,3 @@ function activateNotebookHandler(app: Application, registry: DocumentRegistry, s
   return Promise.resolve(void 0);
 }
 
-
-/**
- * A namespace for notebook plugin private data.
- */
-namespace Private {
-  /**
-   * A signal emitted when the active notebook changes.
-   */
-  export
-  const activeNotebookChangedSignal = new Signal<ActiveNotebook, NotebookPanel>();
-
-  /**
-   * A singleton notebook tracker instance.
-   */
-  export
-  const notebookTracker = new ActiveNotebook();
-}
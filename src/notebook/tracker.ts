@@ -0,0 +1,104 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  ISignal, Signal
+} from 'phosphor-signaling';
+
+import {
+  NotebookPanel
+} from './notebook/panel';
+
+
+/**
+ * An interface exposing the current active notebook.
+ */
+export
+class ActiveNotebook {
+  /**
+   * Construct a new active notebook tracker.
+   */
+  constructor() {
+    // Temporary notebook focus follower.
+    document.body.addEventListener('focus', event => {
+      for (let widget of this._widgets) {
+        let target = event.target as HTMLElement;
+        if (widget.isAttached && widget.isVisible) {
+          if (widget.node.contains(target)) {
+            this.activeNotebook = widget;
+            return;
+          }
+        }
+      }
+    }, true);
+  }
+
+  /**
+   * A signal emitted when the active notebook changes.
+   */
+  get activeNotebookChanged(): ISignal<ActiveNotebook, NotebookPanel> {
+    return Private.activeNotebookChangedSignal.bind(this);
+  }
+
+  /**
+   * The current active notebook.
+   */
+  get activeNotebook(): NotebookPanel {
+    return this._activeWidget;
+  }
+  set activeNotebook(widget: NotebookPanel) {
+    if (this._activeWidget === widget) {
+      return;
+    }
+    if (this._widgets.indexOf(widget) !== -1) {
+      this._activeWidget = widget;
+      this.activeNotebookChanged.emit(widget);
+      return;
+    }
+    if (widget === null) {
+      return;
+    }
+    this._widgets.push(widget);
+    widget.disposed.connect(() => {
+      let index = this._widgets.indexOf(widget);
+      this._widgets.splice(index, 1);
+      if (this._activeWidget === widget) {
+        this.activeNotebook = null;
+      }
+    });
+  }
+
+  private _activeWidget: NotebookPanel = null;
+  private _widgets: NotebookPanel[] = [];
+}
+
+
+/**
+ * A service tracking the active notebook widget.
+ */
+export
+const activeNotebookProvider = {
+  id: 'jupyter.services.activeNotebook',
+  provides: ActiveNotebook,
+  resolve: () => {
+    return Private.notebookTracker;
+  }
+};
+
+
+/**
+ * A namespace for notebook tracker private data.
+ */
+namespace Private {
+  /**
+   * A signal emitted when the active notebook changes.
+   */
+  export
+  const activeNotebookChangedSignal = new Signal<ActiveNotebook, NotebookPanel>();
+
+  /**
+   * A singleton notebook tracker instance.
+   */
+  export
+  const notebookTracker = new ActiveNotebook();
+}
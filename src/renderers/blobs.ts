@@ -0,0 +1,150 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * A reference counted cache of object urls of base64 encoded data.
+ *
+ * #### Notes
+ * The data is decoded once into a `Blob`, and identical data shares the
+ * blob and its url.  Entries are keyed by the mimetype, the length and two
+ * hashes of the data, so the encoded data need not be kept.  A url is
+ * revoked when its last reference is released.
+ */
+export
+class BlobURLCache {
+  /**
+   * The number of cached urls.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get count(): number {
+    return Object.keys(this._entries).length;
+  }
+
+  /**
+   * The total size of the cached blobs, in bytes.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get size(): number {
+    return this._size;
+  }
+
+  /**
+   * Get an object url of base64 encoded data, adding a reference to it.
+   *
+   * @param mimetype - The mimetype of the data.
+   *
+   * @param data - The base64 encoded data.
+   *
+   * @returns An object url, to be released with [[release]].
+   *
+   * @throws An error if the data is not valid base64.
+   */
+  acquire(mimetype: string, data: string): string {
+    // Line breaks in the encoding do not make a different image.
+    if (/\s/.test(data)) {
+      data = data.replace(/\s/g, '');
+    }
+    let key = Private.keyFor(mimetype, data);
+    let entry = this._entries[key];
+    if (!entry) {
+      let blob = Private.decode(mimetype, data);
+      entry = { url: URL.createObjectURL(blob), size: blob.size, count: 0 };
+      this._entries[key] = entry;
+      this._keys[entry.url] = key;
+      this._size += entry.size;
+    }
+    entry.count++;
+    return entry.url;
+  }
+
+  /**
+   * Release a reference to an object url.
+   *
+   * #### Notes
+   * The url is revoked when its last reference is released.  Urls not
+   * from the cache are ignored.
+   */
+  release(url: string): void {
+    let key = this._keys[url];
+    if (!key) {
+      return;
+    }
+    let entry = this._entries[key];
+    if (--entry.count > 0) {
+      return;
+    }
+    URL.revokeObjectURL(url);
+    delete this._entries[key];
+    delete this._keys[url];
+    this._size -= entry.size;
+  }
+
+  private _entries: { [key: string]: Private.IEntry } = Object.create(null);
+  private _keys: { [url: string]: string } = Object.create(null);
+  private _size = 0;
+}
+
+
+/**
+ * The namespace for the blob url cache private data.
+ */
+namespace Private {
+  /**
+   * A cached object url.
+   */
+  export
+  interface IEntry {
+    /**
+     * The object url.
+     */
+    url: string;
+
+    /**
+     * The size of the blob, in bytes.
+     */
+    size: number;
+
+    /**
+     * The number of references to the url.
+     */
+    count: number;
+  }
+
+  /**
+   * Decode base64 data into a blob.
+   */
+  export
+  function decode(mimetype: string, data: string): Blob {
+    let binary = atob(data);
+    let bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+      bytes[i] = binary.charCodeAt(i);
+    }
+    return new Blob([bytes], { type: mimetype });
+  }
+
+  /**
+   * Get the cache key of data.
+   *
+   * #### Notes
+   * The key combines the FNV-1a hash and the djb2 hash of the data, which
+   * makes collisions between different images in a page negligible.
+   */
+  export
+  function keyFor(mimetype: string, data: string): string {
+    let fnv = 0x811c9dc5;
+    let djb = 5381;
+    for (let i = 0; i < data.length; i++) {
+      let code = data.charCodeAt(i);
+      fnv ^= code;
+      fnv += (fnv << 1) + (fnv << 4) + (fnv << 7) + (fnv << 8) + (fnv << 24);
+      djb = ((djb << 5) + djb + code) | 0;
+    }
+    return `${mimetype}:${data.length}:${fnv >>> 0}:${djb >>> 0}`;
+  }
+}
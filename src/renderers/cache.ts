@@ -0,0 +1,170 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * The default maximum size of a render cache, in bytes.
+ */
+const DEFAULT_MAX_SIZE = 16 * 1024 * 1024;
+
+
+/**
+ * A least recently used cache of rendered HTML, by renderer and source.
+ *
+ * #### Notes
+ * Entries are keyed by a hash of the mimetype and the source, and keep
+ * the source to rule out collisions.  The least recently used entries
+ * are evicted when the cache is over its size budget.
+ */
+export
+class RenderCache {
+  /**
+   * Construct a new render cache.
+   *
+   * @param maxSize - The maximum size of the cache, in bytes.
+   */
+  constructor(maxSize = DEFAULT_MAX_SIZE) {
+    this._maxSize = maxSize;
+  }
+
+  /**
+   * The maximum size of the cache, in bytes.
+   */
+  get maxSize(): number {
+    return this._maxSize;
+  }
+  set maxSize(value: number) {
+    this._maxSize = Math.max(value, 0);
+    this._evict();
+  }
+
+  /**
+   * The approximate size of the cached entries, in bytes.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get size(): number {
+    return this._size;
+  }
+
+  /**
+   * Get the rendered HTML of a source.
+   *
+   * @returns The HTML, or `null` if it is not cached.
+   */
+  get(mimetype: string, source: string): string {
+    let key = Private.keyFor(mimetype, source);
+    let entry = this._entries[key];
+    if (!entry || entry.mimetype !== mimetype || entry.source !== source) {
+      return null;
+    }
+    // Move the entry to the end of the iteration order.
+    delete this._entries[key];
+    this._entries[key] = entry;
+    return entry.html;
+  }
+
+  /**
+   * Set the rendered HTML of a source.
+   */
+  set(mimetype: string, source: string, html: string): void {
+    let key = Private.keyFor(mimetype, source);
+    this._remove(key);
+    let size = 2 * (source.length + html.length);
+    if (size > this._maxSize) {
+      return;
+    }
+    this._entries[key] = { mimetype, source, html, size };
+    this._size += size;
+    this._evict();
+  }
+
+  /**
+   * Remove all of the entries.
+   */
+  clear(): void {
+    this._entries = Object.create(null);
+    this._size = 0;
+  }
+
+  /**
+   * Remove an entry.
+   */
+  private _remove(key: string): void {
+    let entry = this._entries[key];
+    if (entry) {
+      this._size -= entry.size;
+      delete this._entries[key];
+    }
+  }
+
+  /**
+   * Evict the least recently used entries until the cache is in budget.
+   *
+   * #### Notes
+   * The keys are not integers, so they iterate in insertion order.
+   */
+  private _evict(): void {
+    for (let key in this._entries) {
+      if (this._size <= this._maxSize) {
+        return;
+      }
+      this._remove(key);
+    }
+  }
+
+  private _entries: { [key: string]: Private.IEntry } = Object.create(null);
+  private _maxSize = DEFAULT_MAX_SIZE;
+  private _size = 0;
+}
+
+
+/**
+ * The namespace for the render cache private data.
+ */
+namespace Private {
+  /**
+   * An entry of a render cache.
+   */
+  export
+  interface IEntry {
+    /**
+     * The mimetype of the source.
+     */
+    mimetype: string;
+
+    /**
+     * The source.
+     */
+    source: string;
+
+    /**
+     * The rendered HTML.
+     */
+    html: string;
+
+    /**
+     * The approximate size of the entry, in bytes.
+     */
+    size: number;
+  }
+
+  /**
+   * Get the cache key of a source.
+   *
+   * #### Notes
+   * This is the 32 bit FNV-1a hash of the mimetype and the source, with
+   * a prefix so the key is never an integer.
+   */
+  export
+  function keyFor(mimetype: string, source: string): string {
+    let text = `${mimetype}\n${source}`;
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < text.length; i++) {
+      hash ^= text.charCodeAt(i);
+      hash += (hash << 1) + (hash << 4) + (hash << 7) + (hash << 8) + (hash << 24);
+    }
+    return `h${hash >>> 0}`;
+  }
+}
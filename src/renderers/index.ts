@@ -1,11 +1,8 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
-import * as marked
-  from 'marked';
-
 import {
-  IRenderer
+  IRenderContext, IRenderer, markdownToHTML
 } from '../rendermime';
 
 import {
@@ -21,16 +18,72 @@ import {
 } from 'phosphor-messaging';
 
 import {
-  typeset, removeMath, replaceMath
+  typeset
 } from './latex';
 
+import {
+  BlobURLCache
+} from './blobs';
+
+import {
+  RenderCache
+} from './cache';
+
+export {
+  BlobURLCache
+} from './blobs';
+
+export {
+  RenderCache
+} from './cache';
+
+
+/**
+ * The cache of typeset output shared by the renderers.
+ */
+export
+const renderCache = new RenderCache();
+
+
+/**
+ * The cache of the object urls of images and documents.
+ */
+export
+const blobURLCache = new BlobURLCache();
+
+
+/**
+ * The options used to create an HTML widget.
+ */
+export
+interface IHTMLWidgetOptions {
+  /**
+   * The mimetype of the source the HTML was rendered from.
+   *
+   * #### Notes
+   * The typeset HTML is added to the render cache under the mimetype and
+   * the source, if both are given, without the ids and scripts of MathJax.
+   */
+  mimetype?: string;
+
+  /**
+   * The source the HTML was rendered from.
+   */
+  source?: string;
+
+  /**
+   * Whether the HTML needs typesetting.  The default is `true`.
+   */
+  typeset?: boolean;
+}
+
 
 /**
  * A widget for displaying HTML and rendering math.
  */
 export
 class HTMLWidget extends Widget {
-  constructor(html: string) {
+  constructor(html: string, options: IHTMLWidgetOptions = {}) {
     super();
     try {
       var range = document.createRange();
@@ -40,17 +93,42 @@ class HTMLWidget extends Widget {
                    'createContextualFragment, falling back on innerHTML');
       this.node.innerHTML = html;
     }
+    this._typeset = options.typeset === false;
+    this._mimetype = options.mimetype || null;
+    this._source = options.source === void 0 ? null : options.source;
+    this._derived = this._source !== null && this._source !== html;
   }
 
   /**
    * A message handler invoked on an `'after-attach'` message.
    *
    * ####Notes
-   * If the node is visible, it is typeset.
+   * The node is typeset once, right away if it is in view and when the
+   * browser is idle otherwise.
    */
   onAfterAttach(msg: Message) {
-    typeset(this.node);
+    if (this._typeset) {
+      return;
+    }
+    this._typeset = true;
+    let before = this._source === null ? null : this.node.innerHTML;
+    Private.scheduleTypeset(this, () => {
+      if (this._source === null) {
+        return;
+      }
+      // Only cache output that typesetting changed, unless the source
+      // is not the HTML itself and the cache also saves rendering it.
+      let html = Private.cacheableHTML(this.node);
+      if (this._derived || html !== before) {
+        Private.cache(this._mimetype, this._source, html);
+      }
+    }, () => { this._typeset = false; });
   }
+
+  private _typeset = false;
+  private _derived = false;
+  private _mimetype: string = null;
+  private _source: string = null;
 }
 
 /**
@@ -60,6 +138,13 @@ export
 class LatexWidget extends Widget {
   constructor(text: string) {
     super();
+    let html = renderCache.get('text/latex', text);
+    if (html !== null) {
+      this.node.innerHTML = html;
+      this._typeset = true;
+      return;
+    }
+    this._source = text;
     text = text.replace(/<br>|\$\$|^\$|\$$|\\\(|\\\)|\\\[|\\\]/g, '');
     this.node.innerHTML = text;
   }
@@ -68,11 +153,131 @@ class LatexWidget extends Widget {
    * A message handler invoked on an `'after-attach'` message.
    *
    * ####Notes
-   * If the node is visible, it is typeset.
+   * The node is typeset once, right away if it is in view and when the
+   * browser is idle otherwise.
+   */
+  onAfterAttach(msg: Message) {
+    if (this._typeset) {
+      return;
+    }
+    this._typeset = true;
+    Private.scheduleTypeset(this, () => {
+      Private.cache('text/latex', this._source, Private.cacheableHTML(this.node));
+    }, () => { this._typeset = false; });
+  }
+
+  private _typeset = false;
+  private _source: string = null;
+}
+
+
+/**
+ * A widget for displaying a base64 encoded image.
+ *
+ * #### Notes
+ * The image is shown through an object url from the [[blobURLCache]],
+ * which is released when the widget is disposed.  Where intersection
+ * observers are available, the data is only decoded once the widget is
+ * near the viewport.
+ */
+export
+class BlobImageWidget extends Widget {
+  constructor(mimetype: string, data: string) {
+    super();
+    this._mimetype = mimetype;
+    this._data = data;
+    this._img = document.createElement('img');
+    this._img.setAttribute('loading', 'lazy');
+    this._img.setAttribute('decoding', 'async');
+  }
+
+  /**
+   * Dispose of the resources held by the widget.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    this._disconnect();
+    if (this._url) {
+      blobURLCache.release(this._url);
+      this._url = null;
+    }
+    this._data = null;
+    this._img = null;
+    super.dispose();
+  }
+
+  /**
+   * A message handler invoked on an `'after-attach'` message.
    */
   onAfterAttach(msg: Message) {
-    typeset(this.node);
+    if (this._data === null) {
+      return;
+    }
+    let Observer = (window as any).IntersectionObserver;
+    if (!Observer) {
+      this._load();
+      return;
+    }
+    this._observer = new Observer((entries: any[]) => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        this._load();
+      }
+    }, { rootMargin: `${Private.NEAR_VIEWPORT}px` });
+    this._observer.observe(this.node);
+  }
+
+  /**
+   * A message handler invoked on a `'before-detach'` message.
+   */
+  onBeforeDetach(msg: Message) {
+    this._disconnect();
   }
+
+  /**
+   * Decode the image and show it once it is decoded.
+   */
+  private _load(): void {
+    this._disconnect();
+    let img = this._img;
+    try {
+      this._url = blobURLCache.acquire(this._mimetype, this._data);
+    } catch (error) {
+      console.error(`Could not decode the ${this._mimetype} image`, error);
+      return;
+    } finally {
+      this._data = null;
+    }
+    img.src = this._url;
+    let show = () => {
+      if (!this.isDisposed) {
+        this.node.appendChild(img);
+      }
+    };
+    let decoding = (img as any).decode ? (img as any).decode() as Promise<void> : null;
+    if (decoding) {
+      decoding.then(show, show);
+    } else {
+      show();
+    }
+  }
+
+  /**
+   * Stop observing the widget.
+   */
+  private _disconnect(): void {
+    if (this._observer) {
+      this._observer.disconnect();
+      this._observer = null;
+    }
+  }
+
+  private _mimetype = '';
+  private _data: string = null;
+  private _img: HTMLImageElement = null;
+  private _url: string = null;
+  private _observer: any = null;
 }
 
 /**
@@ -83,7 +288,11 @@ class HTMLRenderer implements IRenderer<Widget> {
   mimetypes = ['text/html'];
 
   render(mimetype: string, data: string): Widget {
-    return new HTMLWidget(data);
+    let html = renderCache.get(mimetype, data);
+    if (html !== null) {
+      return new HTMLWidget(html, { typeset: false });
+    }
+    return new HTMLWidget(data, { mimetype, source: data });
   }
 }
 
@@ -96,11 +305,7 @@ class ImageRenderer implements IRenderer<Widget> {
   mimetypes = ['image/png', 'image/jpeg', 'image/gif'];
 
   render(mimetype: string, data: string): Widget {
-    let w = new Widget();
-    let img = document.createElement('img');
-    img.src = `data:${mimetype};base64,${data}`;
-    w.node.appendChild(img);
-    return w;
+    return new BlobImageWidget(mimetype, data);
   }
 }
 
@@ -172,7 +377,23 @@ class PDFRenderer implements IRenderer<Widget> {
     let a = document.createElement('a');
     a.target = '_blank';
     a.textContent = "View PDF";
-    a.href = 'data:application/pdf;base64,' + data;
+    // The document is decoded when the link is first used.
+    let url: string = null;
+    let acquire = () => {
+      if (url === null) {
+        url = a.href = blobURLCache.acquire(mimetype, data);
+        data = null;
+      }
+    };
+    a.href = '#';
+    a.addEventListener('mousedown', acquire);
+    a.addEventListener('focus', acquire);
+    a.addEventListener('click', acquire);
+    w.disposed.connect(() => {
+      if (url !== null) {
+        blobURLCache.release(url);
+      }
+    });
     w.node.appendChild(a);
     return w;
   }
@@ -200,8 +421,135 @@ class MarkdownRenderer implements IRenderer<Widget> {
   mimetypes = ['text/markdown'];
 
   render(mimetype: string, text: string): Widget {
-    let data = removeMath(text);
-    let html = marked(data['text']);
-    return new HTMLWidget(replaceMath(html, data['math']));
+    let html = renderCache.get(mimetype, text);
+    if (html !== null) {
+      return new HTMLWidget(html, { typeset: false });
+    }
+    return new HTMLWidget(markdownToHTML(text), { mimetype, source: text });
+  }
+
+  renderAsync(mimetype: string, text: string, context: IRenderContext): Promise<Widget> {
+    let html = renderCache.get(mimetype, text);
+    if (html !== null) {
+      return Promise.resolve(new HTMLWidget(html, { typeset: false }));
+    }
+    return context.transform('markdown', text).then(value => {
+      return new HTMLWidget(value, { mimetype, source: text });
+    });
+  }
+}
+
+
+/**
+ * The namespace for the renderers private data.
+ */
+namespace Private {
+  /**
+   * The longest time to wait for the browser to be idle, in ms.
+   */
+  const IDLE_TIMEOUT = 1000;
+
+  /**
+   * The distance from the viewport within which images are decoded, in px.
+   */
+  export
+  const NEAR_VIEWPORT = 1000;
+
+  /**
+   * The pattern of the ids MathJax numbers per page.
+   */
+  const MATHJAX_ID = /^(MathJax-|MJXc-)/;
+
+  /**
+   * The selector of the math scripts and previews MathJax leaves behind.
+   */
+  const MATHJAX_INPUT = 'script[type^="math/"], .MathJax_Preview';
+
+  /**
+   * Typeset a widget, deferring it to idle time if it is not in view.
+   *
+   * @param widget - The attached widget to typeset.
+   *
+   * @param done - Called after the widget is typeset.
+   *
+   * @param cancel - Called instead if the widget is detached or disposed
+   *   before it is typeset.
+   */
+  export
+  function scheduleTypeset(widget: Widget, done: () => void, cancel: () => void): void {
+    let run = () => {
+      if (widget.isDisposed || !widget.isAttached) {
+        cancel();
+        return;
+      }
+      typeset(widget.node, () => {
+        if (!widget.isDisposed) {
+          done();
+        }
+      });
+    };
+    if (isInView(widget)) {
+      run();
+      return;
+    }
+    let w = window as any;
+    if (w.requestIdleCallback) {
+      w.requestIdleCallback(run, { timeout: IDLE_TIMEOUT });
+    } else {
+      setTimeout(run, 0);
+    }
+  }
+
+  /**
+   * Add typeset HTML to the render cache.
+   *
+   * #### Notes
+   * Sources with scripts are not cached, since reusing their output would
+   * not run the scripts.
+   */
+  export
+  function cache(mimetype: string, source: string, html: string): void {
+    if (mimetype && source.indexOf('<script') === -1) {
+      renderCache.set(mimetype, source, html);
+    }
+  }
+
+  /**
+   * Get the HTML of a typeset node for the render cache.
+   *
+   * #### Notes
+   * The ids MathJax gives its output are numbered per page, so reusing the
+   * HTML would duplicate them, and they are removed.  The math scripts are
+   * removed too: they lose their MathJax state in the HTML, and a later
+   * typeset of an ancestor would typeset them again.
+   */
+  export
+  function cacheableHTML(node: HTMLElement): string {
+    let clone = node.cloneNode(true) as HTMLElement;
+    let inputs = clone.querySelectorAll(MATHJAX_INPUT);
+    for (let i = 0; i < inputs.length; i++) {
+      let input = inputs[i];
+      input.parentNode.removeChild(input);
+    }
+    let elements = clone.querySelectorAll('[id]');
+    for (let i = 0; i < elements.length; i++) {
+      let element = elements[i];
+      if (MATHJAX_ID.test(element.id)) {
+        element.removeAttribute('id');
+      }
+    }
+    return clone.innerHTML;
+  }
+
+  /**
+   * Test whether a widget is visible and in the viewport.
+   */
+  function isInView(widget: Widget): boolean {
+    if (!widget.isVisible) {
+      return false;
+    }
+    let rect = widget.node.getBoundingClientRect();
+    let height = window.innerHeight || document.documentElement.clientHeight;
+    return rect.bottom >= 0 && rect.top <= height;
   }
 }
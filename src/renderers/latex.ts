@@ -141,15 +141,27 @@ function replaceMath(text: string, math: string[]): string {
 
 /**
  * Typeset the math in a node.
+ *
+ * @param node - The node to typeset.
+ *
+ * @param callback - An optional function called once the node is typeset,
+ *   or right away if MathJax is not available.
  */
 export
-function typeset(node: HTMLElement): void {
+function typeset(node: HTMLElement, callback?: () => void): void {
   if (!initialized) {
     init();
     initialized = true;
   }
-  if ((window as any).MathJax) {
-    MathJax.Hub.Queue(['Typeset', MathJax.Hub, node]);
+  if (!(window as any).MathJax) {
+    if (callback) {
+      callback();
+    }
+    return;
+  }
+  MathJax.Hub.Queue(['Typeset', MathJax.Hub, node]);
+  if (callback) {
+    MathJax.Hub.Queue(callback);
   }
 }
 
@@ -158,7 +170,8 @@ function typeset(node: HTMLElement): void {
  * Initialize latex handling.
  */
 function init() {
-  if (!(window as any).MathJax) {
+  // Markdown may be converted in a web worker, without a window.
+  if (typeof window === 'undefined' || !(window as any).MathJax) {
     return;
   }
   MathJax.Hub.Config({
@@ -1,6 +1,24 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
+import {
+  ITransformTask, TransformPool
+} from './pool';
+
+import {
+  defaultTransforms
+} from './transforms';
+
+export * from './pool';
+export * from './transforms';
+
+
+/**
+ * The name of the transform which sanitizes HTML.
+ */
+const SANITIZE_TRANSFORM = 'sanitize';
+
+
 /**
  * The interface for a renderer.
  */
@@ -14,6 +32,19 @@ interface IRenderer<T> {
    */
   render(mimetype: string, data: string): T;
 
+  /**
+   * Render a mimebundle, with its expensive steps off the main thread.
+   *
+   * @param mimetype - the mimetype for the data
+   * @param data - the data to render
+   * @param context - the context running transforms in the worker pool
+   *
+   * #### Notes
+   * This is optional.  Only the steps that need the DOM should be done on
+   * the main thread.  Renderers without it are rendered with `render`.
+   */
+  renderAsync?(mimetype: string, data: string, context: IRenderContext): Promise<T>;
+
   /**
    * The mimetypes this renderer accepts.
    */
@@ -21,6 +52,64 @@ interface IRenderer<T> {
 }
 
 
+/**
+ * The context of an asynchronous render.
+ */
+export
+interface IRenderContext {
+  /**
+   * Run a named transform of the worker pool on data.
+   *
+   * #### Notes
+   * The transform has the priority of the render, and is cancelled with
+   * the render.
+   */
+  transform(name: string, data: string): Promise<string>;
+}
+
+
+/**
+ * The options used to render a mimebundle asynchronously.
+ */
+export
+interface IRenderOptions {
+  /**
+   * A function giving the current priority of the render.
+   *
+   * #### Notes
+   * Lower priorities run first, such as the distance of an output from
+   * the viewport.
+   */
+  priority?: () => number;
+
+  /**
+   * The mimetypes whose data is sanitized before it is rendered.
+   */
+  sanitize?: string[];
+}
+
+
+/**
+ * An asynchronous render of a mimebundle.
+ */
+export
+interface IRenderTask<T> {
+  /**
+   * A promise resolved with the rendered result, or `undefined` if there
+   * is no renderer for the mimebundle.
+   *
+   * #### Notes
+   * The promise of a cancelled render is never settled.
+   */
+  promise: Promise<T>;
+
+  /**
+   * Cancel the render and its queued transforms.
+   */
+  cancel(): void;
+}
+
+
 /**
  * A map of mimetypes to types.
  */
@@ -46,13 +135,26 @@ class RenderMime<T> {
    *
    * @param renderers - a map of mimetypes to renderers.
    * @param order - a list of mimetypes in order of precedence (earliest one has precedence).
+   * @param pool - the pool running the transforms of asynchronous renders.
+   *   The default runs the default transforms on the main thread.
    */
-  constructor(renderers: MimeMap<IRenderer<T>>, order: string[]) {
+  constructor(renderers: MimeMap<IRenderer<T>>, order: string[], pool?: TransformPool) {
     this._renderers = {};
     for (let i in renderers) {
       this._renderers[i] = renderers[i];
     }
     this._order = order.slice();
+    this._pool = pool || new TransformPool({ transforms: defaultTransforms });
+  }
+
+  /**
+   * The pool running the transforms of asynchronous renders.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get pool(): TransformPool {
+    return this._pool;
   }
 
   /**
@@ -67,6 +169,62 @@ class RenderMime<T> {
     }
   }
 
+  /**
+   * Render a mimebundle asynchronously.
+   *
+   * @param bundle - the mimebundle to render.
+   * @param options - the options for the render.
+   *
+   * #### Notes
+   * Sanitizing, and the transforms of renderers with `renderAsync`, run in
+   * the worker pool by priority.  Renderers without `renderAsync` render
+   * as soon as their data is ready.
+   */
+  renderAsync(bundle: MimeMap<string>, options: IRenderOptions = {}): IRenderTask<T> {
+    let tasks: ITransformTask[] = [];
+    let cancelled = false;
+    let context: IRenderContext = {
+      transform: (name: string, data: string) => {
+        if (cancelled) {
+          return Private.never<string>();
+        }
+        let task = this._pool.run(name, data, { priority: options.priority });
+        tasks.push(task);
+        return task.promise;
+      }
+    };
+    let mimetype = this.preferredMimetype(bundle);
+    let promise: Promise<T>;
+    if (!mimetype) {
+      promise = Promise.resolve(void 0);
+    } else {
+      let renderer = this._renderers[mimetype];
+      let data = bundle[mimetype];
+      let sanitize = options.sanitize && options.sanitize.indexOf(mimetype) !== -1;
+      let ready = sanitize ? context.transform(SANITIZE_TRANSFORM, data) : Promise.resolve(data);
+      promise = ready.then(value => {
+        if (cancelled) {
+          return Private.never<T>();
+        }
+        if (renderer.renderAsync) {
+          return renderer.renderAsync(mimetype, value, context);
+        }
+        return Promise.resolve(renderer.render(mimetype, value));
+      });
+    }
+    return {
+      promise: promise.then(value => {
+        return cancelled ? Private.never<T>() : Promise.resolve(value);
+      }),
+      cancel: () => {
+        cancelled = true;
+        for (let task of tasks) {
+          task.cancel();
+        }
+      }
+    };
+  }
+
   /**
    * Find the preferred mimetype in a mimebundle.
    *
@@ -82,9 +240,12 @@ class RenderMime<T> {
 
   /**
    * Clone the rendermime instance with shallow copies of data.
+   *
+   * #### Notes
+   * The clone shares the worker pool.
    */
   clone(): RenderMime<T> {
-    return new RenderMime<T>(this._renderers, this.order);
+    return new RenderMime<T>(this._renderers, this.order, this._pool);
   }
 
   /**
@@ -142,4 +303,19 @@ class RenderMime<T> {
 
   private _renderers: MimeMap<IRenderer<T>>;
   private _order: string[];
+  private _pool: TransformPool;
+}
+
+
+/**
+ * The namespace for the rendermime private data.
+ */
+namespace Private {
+  /**
+   * A promise which is never settled, for cancelled renders.
+   */
+  export
+  function never<T>(): Promise<T> {
+    return new Promise<T>(() => { /* never settled */ });
+  }
 }
@@ -2,7 +2,11 @@
 // Distributed under the terms of the Modified BSD License.
 
 import {
-  RenderMime, MimeMap, IRenderer
+  getBaseUrl, urlPathJoin
+} from 'jupyter-js-utils';
+
+import {
+  RenderMime, MimeMap, IRenderer, TransformPool, defaultTransforms
 } from './index';
 
 import {
@@ -15,6 +19,12 @@ import {
 } from 'phosphor-widget';
 
 
+/**
+ * The url of the render worker script, relative to the base url.
+ */
+const WORKER_URL = 'lab/renderworker.js';
+
+
 /**
  * The default rendermime provider.
  */
@@ -40,6 +50,10 @@ const renderMimeProvider = {
         order.push(m);
       }
     }
-    return new RenderMime<Widget>(renderers, order);
+    let pool = new TransformPool({
+      transforms: defaultTransforms,
+      url: urlPathJoin(getBaseUrl(), WORKER_URL)
+    });
+    return new RenderMime<Widget>(renderers, order, pool);
   }
 };
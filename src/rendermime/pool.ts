@@ -0,0 +1,501 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  IDisposable
+} from 'phosphor-disposable';
+
+
+/**
+ * The length of data transformed at once on the main thread, since it is
+ * not worth a round trip to a worker.
+ */
+const INLINE_LENGTH = 10000;
+
+/**
+ * The most workers in a pool.
+ */
+const MAX_WORKERS = 4;
+
+
+/**
+ * A map of names to transforms of data.
+ */
+export
+type TransformMap = { [name: string]: (data: string) => string };
+
+
+/**
+ * The options used to run a transform.
+ */
+export
+interface ITransformOptions {
+  /**
+   * A function giving the current priority of the transform.
+   *
+   * #### Notes
+   * Lower priorities run first.  The priorities of the queued transforms
+   * are asked for when a worker is free, at most once per animation frame,
+   * so they can follow the visibility of an output.  Transforms of equal
+   * priority run in the order they were queued.  The default priority is
+   * `0`.
+   */
+  priority?: () => number;
+}
+
+
+/**
+ * A transform queued or running in a pool.
+ */
+export
+interface ITransformTask {
+  /**
+   * A promise resolved with the transformed data.
+   *
+   * #### Notes
+   * The promise of a cancelled task is never settled.
+   */
+  promise: Promise<string>;
+
+  /**
+   * Cancel the transform.
+   *
+   * #### Notes
+   * A queued transform is removed from the queue, and the result of a
+   * running transform is dropped.
+   */
+  cancel(): void;
+}
+
+
+/**
+ * The options used to create a transform pool.
+ */
+export
+interface ITransformPoolOptions {
+  /**
+   * The transforms, used on the main thread when workers are unavailable.
+   */
+  transforms: TransformMap;
+
+  /**
+   * The url of the worker script, which serves the same transforms with
+   * [[serveTransforms]].
+   *
+   * #### Notes
+   * Without a url, the transforms run on the main thread, one at a time
+   * between tasks.
+   */
+  url?: string;
+
+  /**
+   * The number of workers.  The default is one less than the number of
+   * processors, up to four.
+   */
+  size?: number;
+}
+
+
+/**
+ * A pool of web workers running named transforms by priority.
+ *
+ * #### Notes
+ * Workers are started as transforms are queued.  If the worker script
+ * cannot be loaded, the pool falls back to running the transforms on the
+ * main thread.
+ */
+export
+class TransformPool implements IDisposable {
+  /**
+   * Construct a new transform pool.
+   */
+  constructor(options: ITransformPoolOptions) {
+    this._transforms = options.transforms;
+    this._url = options.url || '';
+    let processors = (navigator as any).hardwareConcurrency || 2;
+    this._size = Math.max(options.size || Math.min(processors - 1, MAX_WORKERS), 1);
+    if (!(window as any).Worker) {
+      this._url = '';
+    }
+  }
+
+  /**
+   * Whether the transforms run in workers.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get usesWorkers(): boolean {
+    return !!this._url;
+  }
+
+  /**
+   * Get whether the pool is disposed.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get isDisposed(): boolean {
+    return this._queue === null;
+  }
+
+  /**
+   * Dispose of the resources held by the pool.
+   *
+   * #### Notes
+   * Queued and running transforms are never settled.
+   */
+  dispose(): void {
+    if (this.isDisposed) {
+      return;
+    }
+    for (let worker of this._workers) {
+      worker.worker.terminate();
+    }
+    if (this._timer !== -1) {
+      clearTimeout(this._timer);
+    }
+    if (this._frame !== -1) {
+      cancelAnimationFrame(this._frame);
+    }
+    this._workers = null;
+    this._queue = null;
+    this._transforms = null;
+  }
+
+  /**
+   * Run a named transform on data.
+   *
+   * @param name - The name of the transform.
+   *
+   * @param data - The data to transform.
+   *
+   * @param options - The options for the transform.
+   *
+   * @returns A task whose promise resolves with the transformed data, or
+   *   rejects with the error of the transform.
+   */
+  run(name: string, data: string, options: ITransformOptions = {}): ITransformTask {
+    if (data.length < INLINE_LENGTH) {
+      let promise: Promise<string>;
+      try {
+        promise = Promise.resolve(this._transform(name, data));
+      } catch (error) {
+        promise = Promise.reject(error);
+      }
+      return { promise, cancel: () => { /* no-op */ } };
+    }
+    let job: Private.IJob = {
+      id: ++this._ids,
+      name,
+      data,
+      priority: options.priority || Private.defaultPriority,
+      cancelled: false,
+      resolve: null,
+      reject: null
+    };
+    let promise = new Promise<string>((resolve, reject) => {
+      job.resolve = resolve;
+      job.reject = reject;
+    });
+    this._queue.push(job);
+    this._ranked = false;
+    this._pump();
+    return {
+      promise,
+      cancel: () => {
+        job.cancelled = true;
+        job.data = null;
+        let index = this._queue ? this._queue.indexOf(job) : -1;
+        if (index !== -1) {
+          this._queue.splice(index, 1);
+        }
+      }
+    };
+  }
+
+  /**
+   * Run a transform on the main thread.
+   */
+  private _transform(name: string, data: string): string {
+    let transform = this._transforms[name];
+    if (!transform) {
+      throw new Error(`Unknown transform: ${name}`);
+    }
+    return transform(data);
+  }
+
+  /**
+   * Start queued transforms on free workers.
+   */
+  private _pump(): void {
+    if (this.isDisposed || !this._queue.length) {
+      return;
+    }
+    if (!this._url) {
+      if (this._timer === -1) {
+        // Run one transform per task, so rendering and input go between.
+        this._timer = setTimeout(() => {
+          this._timer = -1;
+          this._runNext();
+        }, 0);
+      }
+      return;
+    }
+    while (this._queue.length) {
+      let worker = this._freeWorker();
+      if (!worker) {
+        return;
+      }
+      let job = this._takeNext();
+      worker.job = job;
+      worker.worker.postMessage({ id: job.id, name: job.name, data: job.data });
+    }
+  }
+
+  /**
+   * Run the next transform on the main thread.
+   */
+  private _runNext(): void {
+    if (this.isDisposed || !this._queue.length) {
+      return;
+    }
+    let job = this._takeNext();
+    try {
+      job.resolve(this._transform(job.name, job.data));
+    } catch (error) {
+      job.reject(error);
+    }
+    job.data = null;
+    this._pump();
+  }
+
+  /**
+   * Remove the queued transform with the lowest priority.
+   */
+  private _takeNext(): Private.IJob {
+    if (!this._ranked) {
+      this._rank();
+    }
+    return this._queue.shift();
+  }
+
+  /**
+   * Sort the queue by priority.
+   *
+   * #### Notes
+   * Each priority is asked for once, and the order is kept until a
+   * transform is queued or the next animation frame, when the layout the
+   * priorities follow may have changed.
+   */
+  private _rank(): void {
+    let ranks = this._queue.map((job, index) => {
+      return { job, index, priority: job.priority() };
+    });
+    ranks.sort((a, b) => a.priority - b.priority || a.index - b.index);
+    this._queue = ranks.map(rank => rank.job);
+    this._ranked = true;
+    if (this._frame === -1) {
+      this._frame = requestAnimationFrame(() => {
+        this._frame = -1;
+        this._ranked = false;
+      });
+    }
+  }
+
+  /**
+   * Find a free worker, starting one if the pool is not full.
+   */
+  private _freeWorker(): Private.IWorker {
+    for (let worker of this._workers) {
+      if (!worker.job) {
+        return worker;
+      }
+    }
+    if (this._workers.length >= this._size) {
+      return null;
+    }
+    let state: Private.IWorker = { worker: null, job: null, loaded: false };
+    try {
+      state.worker = new Worker(this._url);
+    } catch (error) {
+      this._fallBack();
+      return null;
+    }
+    state.worker.onmessage = (event: MessageEvent) => {
+      this._onMessage(state, event.data as Private.IResponse);
+    };
+    state.worker.onerror = (event: ErrorEvent) => {
+      event.preventDefault();
+      this._onError(state, event);
+    };
+    this._workers.push(state);
+    return state;
+  }
+
+  /**
+   * Handle a response from a worker.
+   */
+  private _onMessage(state: Private.IWorker, response: Private.IResponse): void {
+    let job = state.job;
+    state.loaded = true;
+    state.job = null;
+    if (job) {
+      job.data = null;
+    }
+    if (job && !job.cancelled) {
+      if (response.error !== void 0) {
+        job.reject(new Error(response.error));
+      } else {
+        job.resolve(response.result);
+      }
+    }
+    this._pump();
+  }
+
+  /**
+   * Handle an uncaught error in a worker.
+   */
+  private _onError(state: Private.IWorker, event: ErrorEvent): void {
+    if (this.isDisposed) {
+      return;
+    }
+    if (!state.loaded) {
+      // The worker script could not be loaded.
+      console.warn('Render workers are unavailable, rendering on the main thread');
+      this._fallBack();
+      return;
+    }
+    state.worker.terminate();
+    this._workers.splice(this._workers.indexOf(state), 1);
+    let job = state.job;
+    if (job && !job.cancelled) {
+      job.reject(new Error(event.message));
+    }
+    this._pump();
+  }
+
+  /**
+   * Stop the workers and run their transforms on the main thread.
+   */
+  private _fallBack(): void {
+    this._url = '';
+    for (let state of this._workers) {
+      state.worker.terminate();
+      if (state.job && !state.job.cancelled) {
+        this._queue.push(state.job);
+        this._ranked = false;
+      }
+    }
+    this._workers = [];
+    this._pump();
+  }
+
+  private _transforms: TransformMap = null;
+  private _url = '';
+  private _size = 1;
+  private _ids = 0;
+  private _timer = -1;
+  private _frame = -1;
+  private _ranked = false;
+  private _queue: Private.IJob[] = [];
+  private _workers: Private.IWorker[] = [];
+}
+
+
+/**
+ * Serve transforms to a transform pool from a web worker.
+ *
+ * @param transforms - The transforms, which should match the transforms
+ *   given to the pool.
+ *
+ * #### Notes
+ * This is called by the worker script.
+ */
+export
+function serveTransforms(transforms: TransformMap): void {
+  let scope: any = self;
+  scope.onmessage = (event: MessageEvent) => {
+    let request = event.data as Private.IRequest;
+    let transform = transforms[request.name];
+    let response: Private.IResponse = { id: request.id };
+    try {
+      if (!transform) {
+        throw new Error(`Unknown transform: ${request.name}`);
+      }
+      response.result = transform(request.data);
+    } catch (error) {
+      response.error = String(error && error.message || error);
+    }
+    scope.postMessage(response);
+  };
+}
+
+
+/**
+ * The namespace for the transform pool private data.
+ */
+namespace Private {
+  /**
+   * A queued or running transform.
+   */
+  export
+  interface IJob {
+    id: number;
+    name: string;
+    data: string;
+    priority: () => number;
+    cancelled: boolean;
+    resolve: (result: string) => void;
+    reject: (error: Error) => void;
+  }
+
+  /**
+   * A worker of a pool.
+   */
+  export
+  interface IWorker {
+    /**
+     * The web worker.
+     */
+    worker: Worker;
+
+    /**
+     * The running transform, or `null` if the worker is free.
+     */
+    job: IJob;
+
+    /**
+     * Whether the worker has answered, so its script was loaded.
+     */
+    loaded: boolean;
+  }
+
+  /**
+   * A request to a worker.
+   */
+  export
+  interface IRequest {
+    id: number;
+    name: string;
+    data: string;
+  }
+
+  /**
+   * A response from a worker.
+   */
+  export
+  interface IResponse {
+    id: number;
+    result?: string;
+    error?: string;
+  }
+
+  /**
+   * The default priority of a transform.
+   */
+  export
+  function defaultPriority(): number {
+    return 0;
+  }
+}
@@ -0,0 +1,41 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import * as marked
+  from 'marked';
+
+import {
+  sanitize
+} from 'sanitizer';
+
+import {
+  removeMath, replaceMath
+} from '../renderers/latex';
+
+import {
+  TransformMap
+} from './pool';
+
+
+/**
+ * Convert Markdown to HTML, keeping its math for typesetting.
+ */
+export
+function markdownToHTML(text: string): string {
+  let data = removeMath(text);
+  let html = marked(data['text']);
+  return replaceMath(html, data['math']);
+}
+
+
+/**
+ * The transforms run off the main thread by the default renderers.
+ *
+ * #### Notes
+ * The transforms do not use the DOM, so they can run in a web worker.
+ */
+export
+const defaultTransforms: TransformMap = {
+  'markdown': markdownToHTML,
+  'sanitize': (html: string) => sanitize(html)
+};
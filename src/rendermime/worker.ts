@@ -0,0 +1,16 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+// The entry of the render worker, which runs the default transforms of a
+// transform pool.
+
+import {
+  serveTransforms
+} from './pool';
+
+import {
+  defaultTransforms
+} from './transforms';
+
+
+serveTransforms(defaultTransforms);
@@ -0,0 +1,77 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  getConfigOption
+} from 'jupyter-js-utils';
+
+
+/**
+ * The delay in ms before startup data is revalidated with the server.
+ */
+const REVALIDATE_DELAY = 1000;
+
+
+/**
+ * Take an item of the startup data inlined in the page.
+ *
+ * @param name - The name of the item, one of `'kernelspecs'`, `'listing'`
+ *   (the first page of the root directory listing) or `'sessions'` (the
+ *   running sessions of the root directory).
+ *
+ * @returns The item, or `undefined` if the page has no such item or it
+ *   was already taken.
+ *
+ * #### Notes
+ * Each item is only returned once, since it is only current while the
+ * page starts.  Later callers should request the data from the server.
+ */
+export
+function takeBootstrap<T>(name: string): T {
+  let data = Private.getData();
+  let value = data[name] as T;
+  delete data[name];
+  return value;
+}
+
+
+/**
+ * Revalidate startup data in the background.
+ *
+ * @param update - A function which requests the current data from the
+ *   server and applies it.
+ *
+ * #### Notes
+ * The update runs once startup is done, so it does not compete with the
+ * requests of the page.  Failures are logged, the startup data stays.
+ */
+export
+function revalidate(update: () => Promise<any>): void {
+  setTimeout(() => {
+    update().catch(error => {
+      console.error('Could not revalidate the startup data', error);
+    });
+  }, REVALIDATE_DELAY);
+}
+
+
+/**
+ * The namespace for the bootstrap private data.
+ */
+namespace Private {
+  /**
+   * The startup data not yet taken.
+   */
+  let data: { [name: string]: any } = null;
+
+  /**
+   * Get the startup data of the page.
+   */
+  export
+  function getData(): { [name: string]: any } {
+    if (data === null) {
+      data = (getConfigOption('bootstrap') as any) || {};
+    }
+    return data;
+  }
+}
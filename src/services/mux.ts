@@ -0,0 +1,674 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+/**
+ * The kernel websocket path, relative to the websocket url.
+ */
+const KERNEL_PATH = /^api\/kernels\/([^\/?]+)\/channels(?:\?(.*))?$/;
+
+/**
+ * The flow-controlled terminal websocket path, relative to the websocket url.
+ */
+const TERMINAL_PATH = /^lab\/api\/terminals\/websocket\/(\w+)$/;
+
+/**
+ * The time in ms spent handing messages to channels before yielding.
+ */
+const DISPATCH_BUDGET = 10;
+
+/**
+ * The ready states of a websocket.
+ */
+const CONNECTING = 0;
+const OPEN = 1;
+const CLOSING = 2;
+const CLOSED = 3;
+
+
+/**
+ * Set the multiplexer carrying the kernel connections of the page.
+ *
+ * @param multiplexer - The multiplexer, or `null` for a websocket per
+ *   kernel connection.
+ *
+ * #### Notes
+ * This is used by [[KernelSocket]], so it should be set before kernels
+ * are connected.
+ */
+export
+function setKernelMultiplexer(multiplexer: Multiplexer): void {
+  Private.kernelMultiplexer = multiplexer;
+}
+
+
+/**
+ * The websocket constructor used by kernel connections.
+ *
+ * #### Notes
+ * jupyter-js-services creates the websockets of kernels with the
+ * `WebSocket` in scope of its kernel module, which the lab build binds to
+ * this constructor.  Other websockets of the page are not affected.
+ *
+ * This returns a [[MuxSocket]] if a kernel multiplexer is set and carries
+ * the url, and a native websocket otherwise.
+ */
+export
+const KernelSocket: any = function(url: string, protocols?: string | string[]): any {
+  let multiplexer = Private.kernelMultiplexer;
+  let socket = multiplexer && protocols === void 0 ? multiplexer.connect(url) : null;
+  if (socket) {
+    return socket;
+  }
+  return protocols === void 0 ? new WebSocket(url) : new WebSocket(url, protocols);
+};
+KernelSocket.CONNECTING = CONNECTING;
+KernelSocket.OPEN = OPEN;
+KernelSocket.CLOSING = CLOSING;
+KernelSocket.CLOSED = CLOSED;
+
+
+/**
+ * A websocket carrying many kernel and terminal connections as channels.
+ *
+ * #### Notes
+ * The socket is opened with the first channel, and opened again for new
+ * channels if it closes.  If it cannot be opened the first time, channels
+ * fall back to a native websocket each.
+ *
+ * Kernel connections use the multiplexer set with
+ * [[setKernelMultiplexer]], and terminals the multiplexer in their
+ * options.
+ *
+ * Messages received are handed to the channels in turn, for at most
+ * `DISPATCH_BUDGET` ms at a time, and acknowledged to the server as they
+ * are, so a kernel flooding output waits for the page instead of holding
+ * up the other channels.  Terminals acknowledge their own output.
+ */
+export
+class Multiplexer {
+  /**
+   * Construct a new multiplexer.
+   *
+   * @param wsUrl - The websocket url of the server.
+   *
+   * @param path - The path of the multiplexed websocket, relative to the
+   *   websocket url.
+   */
+  constructor(wsUrl: string, path: string) {
+    this._prefix = wsUrl.replace(/\/+$/, '') + '/';
+    this._path = path;
+  }
+
+  /**
+   * Whether channels are multiplexed.
+   *
+   * #### Notes
+   * This is `false` once the socket failed to open the first time.
+   *
+   * This is a read-only property.
+   */
+  get isAvailable(): boolean {
+    return !this._unavailable;
+  }
+
+  /**
+   * Connect a websocket url through the multiplexer.
+   *
+   * @param url - The url of a kernel channels or terminal websocket.
+   *
+   * @returns A socket for the connection, or `null` if the url is not
+   *   multiplexed or the multiplexer is unavailable.
+   */
+  connect(url: string): MuxSocket {
+    let route = this._unavailable ? null : this._route(url);
+    if (!route) {
+      return null;
+    }
+    let id = ++this._ids;
+    let socket = new MuxSocket(this, url, id);
+    this._channels[id] = { socket, route, queue: [], unacked: 0 };
+    if (this._open) {
+      this._sendOpen(id);
+    } else {
+      this._start();
+    }
+    return socket;
+  }
+
+  /**
+   * Send a message on a channel.
+   *
+   * @param channel - The id of the channel.
+   *
+   * @param data - A string, or an array buffer or view for a binary
+   *   message.
+   */
+  send(channel: number, data: any): void {
+    if (!this._open || !(channel in this._channels)) {
+      return;
+    }
+    if (typeof data === 'string') {
+      this._ws.send(`${channel}:${data}`);
+      return;
+    }
+    let bytes = (data instanceof ArrayBuffer ? new Uint8Array(data) :
+                 new Uint8Array(data.buffer, data.byteOffset, data.byteLength));
+    let frame = new Uint8Array(bytes.length + 4);
+    new DataView(frame.buffer).setUint32(0, channel);
+    frame.set(bytes, 4);
+    this._ws.send(frame.buffer);
+  }
+
+  /**
+   * Close a channel.
+   *
+   * @param channel - The id of the channel.
+   */
+  close(channel: number): void {
+    if (!(channel in this._channels)) {
+      return;
+    }
+    delete this._channels[channel];
+    if (this._open) {
+      this._sendControl({ op: 'close', channel });
+    }
+  }
+
+  /**
+   * Find the kernel or terminal a websocket url connects to.
+   */
+  private _route(url: string): Private.IRoute {
+    if (url.indexOf(this._prefix) !== 0) {
+      return null;
+    }
+    let path = url.slice(this._prefix.length);
+    let match = path.match(KERNEL_PATH);
+    if (match) {
+      let sessionId = Private.queryParam(match[2] || '', 'session_id');
+      return { kind: 'kernel', id: decodeURIComponent(match[1]), sessionId };
+    }
+    match = path.match(TERMINAL_PATH);
+    if (match) {
+      return { kind: 'terminal', id: match[1], sessionId: '' };
+    }
+    return null;
+  }
+
+  /**
+   * Open the multiplexed socket, if it is not opening already.
+   */
+  private _start(): void {
+    if (this._ws) {
+      return;
+    }
+    let ws = this._ws = new WebSocket(this._prefix + this._path);
+    ws.binaryType = 'arraybuffer';
+    ws.onopen = () => {
+      this._open = true;
+      this._wasOpen = true;
+      for (let id in this._channels) {
+        this._sendOpen(Number(id));
+      }
+    };
+    ws.onmessage = (event: MessageEvent) => {
+      this._onMessage(event.data);
+    };
+    ws.onclose = () => {
+      this._onClose();
+    };
+  }
+
+  /**
+   * Handle the close of the multiplexed socket.
+   */
+  private _onClose(): void {
+    let channels = this._channels;
+    let fallBack = !this._wasOpen;
+    this._ws = null;
+    this._open = false;
+    this._channels = Object.create(null);
+    this._ready = [];
+    if (fallBack) {
+      console.warn('Could not connect the websocket multiplexer');
+      this._unavailable = true;
+    }
+    for (let id in channels) {
+      let socket = channels[id].socket;
+      if (fallBack) {
+        socket.fallBack();
+      } else {
+        socket.handleClose(1006, 'The multiplexed socket closed', false);
+      }
+    }
+  }
+
+  /**
+   * Handle a frame of the multiplexed socket.
+   */
+  private _onMessage(data: any): void {
+    let channel: number;
+    let entry: Private.IEntry;
+    if (typeof data === 'string') {
+      if (data.charAt(0) === '{') {
+        this._onControl(JSON.parse(data));
+        return;
+      }
+      let index = data.indexOf(':');
+      channel = Number(data.slice(0, index));
+      entry = { data: data.slice(index + 1), size: data.length - index - 1 };
+    } else {
+      channel = new DataView(data).getUint32(0);
+      entry = { data: data.slice(4), size: data.byteLength - 4 };
+    }
+    this._enqueue(channel, entry);
+  }
+
+  /**
+   * Handle a control message of the multiplexed socket.
+   */
+  private _onControl(msg: Private.IControl): void {
+    let record = this._channels[msg.channel];
+    if (!record) {
+      return;
+    }
+    if (msg.op === 'opened') {
+      record.socket.handleOpen();
+    } else if (msg.op === 'closed') {
+      // Messages received before the close are handed out first.
+      this._enqueue(msg.channel, { data: null, size: 0, reason: msg.reason || '' });
+    }
+  }
+
+  /**
+   * Queue a message for a channel.
+   */
+  private _enqueue(channel: number, entry: Private.IEntry): void {
+    let record = this._channels[channel];
+    if (!record) {
+      return;
+    }
+    record.queue.push(entry);
+    if (record.queue.length === 1) {
+      this._ready.push(channel);
+    }
+    if (this._timer === -1) {
+      this._timer = setTimeout(() => {
+        this._timer = -1;
+        this._dispatch();
+      }, 0);
+    }
+  }
+
+  /**
+   * Hand queued messages to the channels in turn.
+   */
+  private _dispatch(): void {
+    let start = Date.now();
+    while (this._ready.length && Date.now() - start < DISPATCH_BUDGET) {
+      let id = this._ready.shift();
+      let record = this._channels[id];
+      if (!record) {
+        continue;
+      }
+      let entry = record.queue.shift();
+      if (record.queue.length) {
+        this._ready.push(id);
+      }
+      if (entry.reason !== void 0) {
+        delete this._channels[id];
+        record.socket.handleClose(1000, entry.reason, true);
+        continue;
+      }
+      if (record.route.kind === 'kernel') {
+        record.unacked += entry.size;
+      }
+      try {
+        record.socket.handleMessage(entry.data);
+      } catch (error) {
+        console.error(error);
+      }
+    }
+    for (let id in this._channels) {
+      let record = this._channels[id];
+      if (record.unacked && this._open) {
+        this._sendControl({ op: 'ack', channel: Number(id), bytes: record.unacked });
+        record.unacked = 0;
+      }
+    }
+    if (this._ready.length && this._timer === -1) {
+      this._timer = setTimeout(() => {
+        this._timer = -1;
+        this._dispatch();
+      }, 0);
+    }
+  }
+
+  /**
+   * Ask the server to open a channel.
+   */
+  private _sendOpen(id: number): void {
+    let route = this._channels[id].route;
+    this._sendControl({
+      op: 'open',
+      channel: id,
+      kind: route.kind,
+      id: route.id,
+      session_id: route.sessionId
+    });
+  }
+
+  /**
+   * Send a control message.
+   */
+  private _sendControl(msg: Private.IControl): void {
+    this._ws.send(JSON.stringify(msg));
+  }
+
+  private _prefix = '';
+  private _path = '';
+  private _ws: WebSocket = null;
+  private _open = false;
+  private _wasOpen = false;
+  private _unavailable = false;
+  private _ids = 0;
+  private _timer = -1;
+  private _channels: { [id: string]: Private.IChannel } = Object.create(null);
+  private _ready: number[] = [];
+}
+
+
+/**
+ * A websocket connection carried by a multiplexer.
+ *
+ * #### Notes
+ * This has the interface of a websocket, with `on<type>` handlers and
+ * event listeners.  Binary messages are received as array buffers.
+ */
+export
+class MuxSocket {
+  /**
+   * Construct a new multiplexed socket.
+   *
+   * @param multiplexer - The multiplexer carrying the socket.
+   *
+   * @param url - The url of the websocket.
+   *
+   * @param channel - The id of the channel of the socket.
+   */
+  constructor(multiplexer: Multiplexer, url: string, channel: number) {
+    this._multiplexer = multiplexer;
+    this._channel = channel;
+    this._url = url;
+  }
+
+  /**
+   * The url of the socket.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get url(): string {
+    return this._url;
+  }
+
+  /**
+   * The state of the socket, one of the `WebSocket` ready states.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get readyState(): number {
+    return this._native ? this._native.readyState : this._readyState;
+  }
+
+  /**
+   * The type of binary data received.
+   */
+  binaryType = 'arraybuffer';
+
+  /**
+   * The handlers of the socket events.
+   */
+  onopen: (event: any) => void = null;
+  onmessage: (event: any) => void = null;
+  onclose: (event: any) => void = null;
+  onerror: (event: any) => void = null;
+
+  /**
+   * Add a listener for an event of the socket.
+   */
+  addEventListener(type: string, listener: (event: any) => void): void {
+    let listeners = this._listeners[type] || (this._listeners[type] = []);
+    if (listeners.indexOf(listener) === -1) {
+      listeners.push(listener);
+    }
+  }
+
+  /**
+   * Remove a listener for an event of the socket.
+   */
+  removeEventListener(type: string, listener: (event: any) => void): void {
+    let listeners = this._listeners[type];
+    let index = listeners ? listeners.indexOf(listener) : -1;
+    if (index !== -1) {
+      listeners.splice(index, 1);
+    }
+  }
+
+  /**
+   * Dispatch an event to the handler and listeners of its type.
+   *
+   * @returns Whether the event was not cancelled, which is always `true`.
+   */
+  dispatchEvent(event: any): boolean {
+    if (!event.target) {
+      event.target = this;
+    }
+    let handler = (this as any)['on' + event.type] as (event: any) => void;
+    if (handler) {
+      handler.call(this, event);
+    }
+    let listeners = this._listeners[event.type];
+    if (listeners) {
+      for (let listener of listeners.slice()) {
+        listener.call(this, event);
+      }
+    }
+    return true;
+  }
+
+  /**
+   * Send a message.
+   *
+   * #### Notes
+   * Like a websocket, this throws an error until the socket is open, and
+   * drops the message once it is closed.
+   */
+  send(data: any): void {
+    if (this._native) {
+      this._native.send(data);
+      return;
+    }
+    if (this._readyState === CONNECTING) {
+      throw new Error('The websocket is not open yet');
+    }
+    if (this._readyState === OPEN) {
+      this._multiplexer.send(this._channel, data);
+    }
+  }
+
+  /**
+   * Close the socket.
+   */
+  close(code?: number, reason?: string): void {
+    if (this._native) {
+      this._native.close(code, reason);
+      return;
+    }
+    if (this._readyState >= CLOSING) {
+      return;
+    }
+    this._readyState = CLOSING;
+    this._multiplexer.close(this._channel);
+    setTimeout(() => {
+      this.handleClose(code || 1000, reason || '', true);
+    }, 0);
+  }
+
+  /**
+   * Handle the opening of the channel.
+   *
+   * #### Notes
+   * This is called by the multiplexer.
+   */
+  handleOpen(): void {
+    if (this._readyState !== CONNECTING) {
+      return;
+    }
+    this._readyState = OPEN;
+    this.dispatchEvent({ type: 'open' });
+  }
+
+  /**
+   * Handle a message of the channel.
+   *
+   * #### Notes
+   * This is called by the multiplexer.
+   */
+  handleMessage(data: any): void {
+    if (this._readyState === OPEN) {
+      this.dispatchEvent({ type: 'message', data });
+    }
+  }
+
+  /**
+   * Handle the close of the channel.
+   *
+   * #### Notes
+   * This is called by the multiplexer.  A channel which did not open
+   * emits an error first, as a websocket which cannot connect does.
+   */
+  handleClose(code: number, reason: string, wasClean: boolean): void {
+    if (this._readyState === CLOSED) {
+      return;
+    }
+    if (this._readyState === CONNECTING) {
+      wasClean = false;
+      code = 1006;
+      this.dispatchEvent({ type: 'error' });
+    }
+    this._readyState = CLOSED;
+    this.dispatchEvent({ type: 'close', code, reason, wasClean });
+  }
+
+  /**
+   * Connect with a native websocket instead of the multiplexer.
+   *
+   * #### Notes
+   * This is called by the multiplexer while the socket is connecting.
+   */
+  fallBack(): void {
+    if (this._readyState !== CONNECTING) {
+      return;
+    }
+    let ws = this._native = new WebSocket(this._url);
+    ws.binaryType = this.binaryType;
+    ws.onopen = (event: Event) => { this.dispatchEvent(event); };
+    ws.onmessage = (event: MessageEvent) => { this.dispatchEvent(event); };
+    ws.onclose = (event: CloseEvent) => { this.dispatchEvent(event); };
+    ws.onerror = (event: Event) => { this.dispatchEvent(event); };
+  }
+
+  private _multiplexer: Multiplexer = null;
+  private _channel = -1;
+  private _url = '';
+  private _readyState = CONNECTING;
+  private _native: WebSocket = null;
+  private _listeners: { [type: string]: ((event: any) => void)[] } = Object.create(null);
+}
+
+
+/**
+ * The namespace for the multiplexer private data.
+ */
+namespace Private {
+  /**
+   * The multiplexer of kernel connections.
+   */
+  export
+  let kernelMultiplexer: Multiplexer = null;
+
+  /**
+   * The kernel or terminal a channel connects to.
+   */
+  export
+  interface IRoute {
+    kind: string;
+    id: string;
+    sessionId: string;
+  }
+
+  /**
+   * A received message, or the close of a channel if it has a reason.
+   */
+  export
+  interface IEntry {
+    data: any;
+    size: number;
+    reason?: string;
+  }
+
+  /**
+   * The state of a channel.
+   */
+  export
+  interface IChannel {
+    /**
+     * The socket of the channel.
+     */
+    socket: MuxSocket;
+
+    /**
+     * What the channel connects to.
+     */
+    route: IRoute;
+
+    /**
+     * The messages received but not handed to the socket.
+     */
+    queue: IEntry[];
+
+    /**
+     * The size of the messages handed to the socket but not acknowledged.
+     */
+    unacked: number;
+  }
+
+  /**
+   * A control message of the multiplexed socket.
+   */
+  export
+  interface IControl {
+    op: string;
+    channel: number;
+    kind?: string;
+    id?: string;
+    session_id?: string;
+    bytes?: number;
+    reason?: string;
+  }
+
+  /**
+   * Get a parameter of a query string.
+   */
+  export
+  function queryParam(query: string, name: string): string {
+    for (let part of query.split('&')) {
+      let index = part.indexOf('=');
+      if (index !== -1 && part.slice(0, index) === name) {
+        return decodeURIComponent(part.slice(index + 1));
+      }
+    }
+    return '';
+  }
+}
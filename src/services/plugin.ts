@@ -2,15 +2,27 @@
 // Distributed under the terms of the Modified BSD License.
 
 import {
-  getBaseUrl, getConfigOption
+  getBaseUrl, getConfigOption, getWsUrl
 } from 'jupyter-js-utils';
 
 import {
   IKernelManager, INotebookSessionManager, IContentsManager,
-  ContentsManager, KernelManager, NotebookSessionManager,
+  ContentsManager, KernelManager,
   getKernelSpecs, IKernelSpecIds, IAjaxSettings
 } from 'jupyter-js-services';
 
+import {
+  revalidate, takeBootstrap
+} from './bootstrap';
+
+import {
+  Multiplexer, setKernelMultiplexer
+} from './mux';
+
+import {
+  SessionManager
+} from './sessions';
+
 
 /**
  * An implementation of a services provider.
@@ -20,12 +32,20 @@ class JupyterServices {
 
   /**
    * Construct a new services provider.
+   *
+   * @param multiplexer - The multiplexer carrying the kernel and terminal
+   *   connections, or `null` for a websocket per connection.
    */
-  constructor(baseUrl: string, ajaxSettings: IAjaxSettings, specs: IKernelSpecIds) {
+  constructor(baseUrl: string, ajaxSettings: IAjaxSettings, specs: IKernelSpecIds,
+              multiplexer: Multiplexer = null) {
     let options = { baseUrl, ajaxSettings };
+    this._options = options;
     this._kernelspecs = specs;
+    this._multiplexer = multiplexer;
+    // Set before the managers connect any kernel.
+    setKernelMultiplexer(multiplexer);
     this._kernelManager = new KernelManager(options);
-    this._sessionManager = new NotebookSessionManager(options);
+    this._sessionManager = new SessionManager(options);
     this._contentsManager = new ContentsManager(baseUrl, ajaxSettings);
   }
 
@@ -36,6 +56,23 @@ class JupyterServices {
     return this._kernelspecs;
   }
 
+  /**
+   * Fetch the kernel specs from the server.
+   *
+   * @returns A promise which resolves with the updated [[kernelspecs]].
+   *
+   * #### Notes
+   * The specs are updated in place, so everything holding [[kernelspecs]]
+   * sees the current specs.
+   */
+  refreshKernelSpecs(): Promise<IKernelSpecIds> {
+    return getKernelSpecs(this._options).then(specs => {
+      this._kernelspecs.default = specs.default;
+      this._kernelspecs.kernelspecs = specs.kernelspecs;
+      return this._kernelspecs;
+    });
+  }
+
   /**
    * Get kernel manager instance.
    *
@@ -50,6 +87,9 @@ class JupyterServices {
    * Get the session manager instance.
    *
    * #### Notes
+   * The manager is a [[SessionManager]], which signals the sessions it
+   * starts and the deaths of the sessions it connects to.
+   *
    * This is a read-only property.
    */
   get notebookSessionManager(): INotebookSessionManager {
@@ -66,10 +106,34 @@ class JupyterServices {
     return this._contentsManager;
   }
 
+  /**
+   * Get the settings of the ajax requests to the server.
+   *
+   * #### Notes
+   * This is a read-only property.
+   */
+  get ajaxSettings(): IAjaxSettings {
+    return this._options.ajaxSettings;
+  }
+
+  /**
+   * Get the multiplexer of the kernel and terminal connections.
+   *
+   * #### Notes
+   * This is `null` unless the server enables multiplexing.
+   *
+   * This is a read-only property.
+   */
+  get multiplexer(): Multiplexer {
+    return this._multiplexer;
+  }
+
   private _kernelManager: IKernelManager = null;
   private _sessionManager: INotebookSessionManager = null;
   private _contentsManager: IContentsManager = null;
   private _kernelspecs: IKernelSpecIds = null;
+  private _multiplexer: Multiplexer = null;
+  private _options: { baseUrl: string, ajaxSettings: IAjaxSettings } = null;
 }
 
 
@@ -84,8 +148,17 @@ const servicesProvider = {
     let baseUrl = getBaseUrl();
     let ajaxSettings = getConfigOption('ajaxSettings');
     let options = { baseUrl, ajaxSettings };
+    let muxUrl = getConfigOption('muxUrl');
+    let multiplexer = muxUrl ? new Multiplexer(getWsUrl(), muxUrl) : null;
+    let specs = takeBootstrap<IKernelSpecIds>('kernelspecs');
+    if (specs) {
+      // Start from the specs inlined in the page, and check them later.
+      let services = new JupyterServices(baseUrl, ajaxSettings, specs, multiplexer);
+      revalidate(() => services.refreshKernelSpecs());
+      return Promise.resolve(services);
+    }
     return getKernelSpecs(options).then(specs => {
-      return new JupyterServices(baseUrl, ajaxSettings, specs);
+      return new JupyterServices(baseUrl, ajaxSettings, specs, multiplexer);
     });
   }
 };
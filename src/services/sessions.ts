@@ -0,0 +1,68 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import {
+  INotebookSession, ISessionOptions, NotebookSessionManager
+} from 'jupyter-js-services';
+
+import {
+  ISignal, Signal
+} from 'phosphor-signaling';
+
+
+/**
+ * A notebook session manager which signals changes to the running sessions.
+ *
+ * #### Notes
+ * Only the sessions started or connected to through the manager are seen,
+ * so the running sessions may still change on the server without a signal.
+ */
+export
+class SessionManager extends NotebookSessionManager {
+  /**
+   * A signal emitted when a session is started or dies.
+   */
+  get runningChanged(): ISignal<SessionManager, void> {
+    return Private.runningChangedSignal.bind(this);
+  }
+
+  /**
+   * Start a new session.
+   */
+  startNew(options: ISessionOptions): Promise<INotebookSession> {
+    return super.startNew(options).then(session => {
+      session.sessionDied.connect(this._onSessionDied, this);
+      this.runningChanged.emit(void 0);
+      return session;
+    });
+  }
+
+  /**
+   * Connect to a running session.
+   */
+  connectTo(id: string, options?: ISessionOptions): Promise<INotebookSession> {
+    return super.connectTo(id, options).then(session => {
+      session.sessionDied.connect(this._onSessionDied, this);
+      return session;
+    });
+  }
+
+  /**
+   * Handle the death of a session.
+   */
+  private _onSessionDied(): void {
+    this.runningChanged.emit(void 0);
+  }
+}
+
+
+/**
+ * The namespace for the session manager private data.
+ */
+namespace Private {
+  /**
+   * A signal emitted when a session is started or dies.
+   */
+  export
+  const runningChangedSignal = new Signal<SessionManager, void>();
+}
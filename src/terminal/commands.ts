@@ -0,0 +1,34 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+
+/**
+ * The id of the command starting a new terminal.
+ */
+export
+const CREATE_NEW_ID = 'terminal:create-new';
+
+
+/**
+ * The ids of the commands of the terminal extension.
+ *
+ * #### Notes
+ * This module has no imports, so the application can declare the commands
+ * without loading the extension.
+ */
+export
+const commandIds = [CREATE_NEW_ID];
+
+
+/**
+ * The command palette items of the terminal extension.
+ */
+export
+const paletteItems = [
+  {
+    command: CREATE_NEW_ID,
+    category: 'Terminal',
+    text: 'New Terminal',
+    caption: 'Start a new terminal session'
+  }
+];
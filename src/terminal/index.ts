@@ -19,6 +19,10 @@ import {
 
 import * as Terminal from 'xterm';
 
+import {
+  Multiplexer
+} from '../services/mux';
+
 
 /**
  * The class name added to a terminal widget.
@@ -40,6 +44,35 @@ const DUMMY_ROWS = 24;
  */
 const DUMMY_COLS = 80;
 
+/**
+ * The path of the flow-controlled terminal websockets.
+ */
+const FLOW_WS_PATH = 'lab/api/terminals/websocket/';
+
+/**
+ * The path of the plain terminal websockets.
+ */
+const PLAIN_WS_PATH = 'terminals/websocket/';
+
+/**
+ * The default size of the scrollback buffer, in lines.
+ */
+const DEFAULT_SCROLLBACK = 1000;
+
+/**
+ * The maximum number of characters written to the terminal per frame.
+ */
+const MAX_FRAME_WRITE = 256 * 1024;
+
+/**
+ * The maximum number of characters waiting to be written.
+ *
+ * #### Notes
+ * This only binds without flow control, where the server does not wait
+ * for the terminal to keep up.
+ */
+const MAX_PENDING = 4 * 1024 * 1024;
+
 
 /**
  * Options for the terminal widget.
@@ -51,6 +84,14 @@ interface ITerminalOptions {
    */
   baseUrl?: string;
 
+  /**
+   * The multiplexer carrying the terminal connection.
+   *
+   * #### Notes
+   * Without a multiplexer, the terminal has a websocket of its own.
+   */
+  multiplexer?: Multiplexer;
+
   /**
    * The font size of the terminal in pixels.
    */
@@ -83,6 +124,8 @@ interface ITerminalOptions {
 
   /**
    * The size of the scrollback buffer in the terminal.
+   *
+   * The default is `1000` lines.
    */
   scrollback?: number;
 }
@@ -111,8 +154,6 @@ class TerminalWidget extends Widget {
     let baseUrl = options.baseUrl || getWsUrl();
 
     TerminalWidget.nterms += 1;
-    let url = baseUrl + 'terminals/websocket/' + TerminalWidget.nterms;
-    this._ws = new WebSocket(url);
     this.id = `jp-TerminalWidget-${TerminalWidget.nterms}`;
 
     // Set the default title.
@@ -122,13 +163,7 @@ class TerminalWidget extends Widget {
 
     this._dummyTerm = createDummyTerm();
 
-    this._ws.onopen = (event: MessageEvent) => {
-      this._createTerm(options);
-    };
-
-    this._ws.onmessage = (event: MessageEvent) => {
-      this._handleWSMessage(event);
-    };
+    this._connect(baseUrl, TerminalWidget.nterms, options);
 
     this._sheet = document.createElement('style');
     this.node.appendChild(this._sheet);
@@ -229,8 +264,15 @@ class TerminalWidget extends Widget {
     if (this.isDisposed) {
       return;
     }
+    if (this._frame !== -1) {
+      cancelAnimationFrame(this._frame);
+      this._frame = -1;
+    }
+    this._pending = null;
     this._ws.close();
-    this._term.destroy();
+    if (this._term) {
+      this._term.destroy();
+    }
     this._sheet = null;
     this._ws = null;
     this._term = null;
@@ -311,6 +353,41 @@ class TerminalWidget extends Widget {
     sendMessage(this, resize);
   }
 
+  /**
+   * Open the websocket of the terminal.
+   *
+   * #### Notes
+   * The flow-controlled websocket of the lab server extension is used if
+   * it is there, and the plain notebook one otherwise.  The flow-controlled
+   * connection is carried by the multiplexer of the options, if any.
+   */
+  private _connect(baseUrl: string, name: number, options: ITerminalOptions, flowControl = true): void {
+    let path = flowControl ? FLOW_WS_PATH : PLAIN_WS_PATH;
+    let url = baseUrl + path + name;
+    let opened = false;
+    let socket: any = null;
+    if (flowControl && options.multiplexer) {
+      socket = options.multiplexer.connect(url);
+    }
+    this._ws = socket || new WebSocket(url);
+    this._flowControl = flowControl;
+
+    this._ws.onopen = (event: MessageEvent) => {
+      opened = true;
+      this._createTerm(options);
+    };
+
+    this._ws.onclose = (event: CloseEvent) => {
+      if (!opened && flowControl && !this.isDisposed) {
+        this._connect(baseUrl, name, options, false);
+      }
+    };
+
+    this._ws.onmessage = (event: MessageEvent) => {
+      this._handleWSMessage(event);
+    };
+  }
+
   /**
    * Create the terminal object.
    */
@@ -340,14 +417,68 @@ class TerminalWidget extends Widget {
     let json_msg = JSON.parse(event.data);
     switch (json_msg[0]) {
     case 'stdout':
-      this._term.write(json_msg[1]);
+      this._write(json_msg[1]);
       break;
     case 'disconnect':
-      this._term.write('\r\n\r\n[Finished... Term Session]\r\n');
+      this._write('\r\n\r\n[Finished... Term Session]\r\n');
       break;
     }
   }
 
+  /**
+   * Queue text to be written to the terminal in the next frame.
+   *
+   * #### Notes
+   * Without flow control, the oldest queued output is dropped past
+   * `MAX_PENDING` characters, from a line break on.
+   */
+  private _write(text: string): void {
+    this._pending.push(text);
+    this._pendingSize += text.length;
+    if (!this._flowControl) {
+      while (this._pendingSize > MAX_PENDING && this._pending.length > 1) {
+        this._pendingSize -= this._pending.shift().length;
+      }
+      if (this._pendingSize > MAX_PENDING) {
+        let head = this._pending[0];
+        let start = head.indexOf('\n', head.length - MAX_PENDING);
+        this._pending[0] = head.slice(start === -1 ? head.length - MAX_PENDING : start + 1);
+        this._pendingSize = this._pending[0].length;
+      }
+    }
+    if (this._frame === -1) {
+      this._frame = requestAnimationFrame(() => this._flush());
+    }
+  }
+
+  /**
+   * Write the queued text to the terminal.
+   *
+   * #### Notes
+   * At most `MAX_FRAME_WRITE` characters are written per frame, so a
+   * flood of output does not block the page.  With flow control, the
+   * written characters are acknowledged to the server, which stops
+   * reading from the terminal while too many are not.
+   */
+  private _flush(): void {
+    this._frame = -1;
+    if (!this._term || !this._pending.length) {
+      return;
+    }
+    let text = this._pending.join('');
+    let chunk = text.slice(0, MAX_FRAME_WRITE);
+    let rest = text.slice(chunk.length);
+    this._pending = rest ? [rest] : [];
+    this._pendingSize = rest.length;
+    this._term.write(chunk);
+    if (this._flowControl && this._ws.readyState === WebSocket.OPEN) {
+      this._ws.send(JSON.stringify(['ack', chunk.length]));
+    }
+    if (rest) {
+      this._frame = requestAnimationFrame(() => this._flush());
+    }
+  }
+
   /**
    * Use the dummy terminal to measure the row and column sizes.
    */
@@ -402,6 +533,10 @@ class TerminalWidget extends Widget {
   private _background = '';
   private _color = '';
   private _box: IBoxSizing = null;
+  private _flowControl = false;
+  private _pending: string[] = [];
+  private _pendingSize = 0;
+  private _frame = -1;
 }
 
 
@@ -423,6 +558,8 @@ function getConfig(options: ITerminalOptions): ITerminalConfig {
   }
   if (options.scrollback !== void 0) {
     config.scrollback = options.scrollback;
+  } else {
+    config.scrollback = DEFAULT_SCROLLBACK;
   }
   return config;
 }
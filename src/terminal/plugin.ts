@@ -1,6 +1,10 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
+import {
+  CREATE_NEW_ID, paletteItems
+} from './commands';
+
 import {
   TerminalWidget
 } from './index';
@@ -13,6 +17,10 @@ import {
   TabPanel
 } from 'phosphor-tabs';
 
+import {
+  JupyterServices
+} from '../services/plugin';
+
 
 /**
  * The default terminal extension.
@@ -20,18 +28,16 @@ import {
 export
 const terminalExtension = {
   id: 'jupyter.extensions.terminal',
+  requires: [JupyterServices],
   activate: activateTerminal
 };
 
 
-function activateTerminal(app: Application): Promise<void> {
-
-  let newTerminalId = 'terminal:create-new';
-
+function activateTerminal(app: Application, services: JupyterServices): Promise<void> {
   app.commands.add([{
-    id: newTerminalId,
+    id: CREATE_NEW_ID,
     handler: () => {
-      let term = new TerminalWidget();
+      let term = new TerminalWidget({ multiplexer: services.multiplexer });
       term.color = 'black';
       term.background = 'white';
       term.title.closable = true;
@@ -46,14 +52,7 @@ function activateTerminal(app: Application): Promise<void> {
       }
     }
   }]);
-  app.palette.add([
-    {
-      command: newTerminalId,
-      category: 'Terminal',
-      text: 'New Terminal',
-      caption: 'Start a new terminal session'
-    }
-  ]);
+  app.palette.add(paletteItems);
 
   return Promise.resolve(void 0);
 }
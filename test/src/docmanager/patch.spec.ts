@@ -0,0 +1,111 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import expect = require('expect.js');
+
+import {
+  createPatch, hashJSON, hashNotebook
+} from '../../../lib/docmanager/patch';
+
+
+/**
+ * Create a notebook with a code cell and a markdown cell.
+ */
+function notebook(): any {
+  return {
+    cells: [
+      {
+        cell_type: 'code',
+        metadata: {},
+        source: 'a',
+        outputs: [],
+        execution_count: null
+      },
+      { cell_type: 'markdown', metadata: {}, source: '# b' }
+    ],
+    metadata: {},
+    nbformat: 4,
+    nbformat_minor: 0
+  };
+}
+
+
+describe('docmanager/patch', () => {
+
+  describe('hashJSON()', () => {
+
+    // The hashes are those of `content_hash` in `jupyterlab/patch.py`,
+    // which the server checks a patch against.
+
+    it('should hash an empty object as the server does', () => {
+      expect(hashJSON({})).to.be('2:a3a6bf43');
+    });
+
+    it('should sort the keys as the server does', () => {
+      let value = { b: [1, 2.5, null, true], a: { d: 'x', c: false } };
+      expect(hashJSON(value)).to.be('47:a29a6580');
+    });
+
+    it('should hash the UTF-8 of the text as the server does', () => {
+      let value = { text: 'café ✓ 𝄞\n\t"quoted"\\' };
+      expect(hashJSON(value)).to.be('41:dba488a5');
+    });
+
+  });
+
+  describe('hashNotebook()', () => {
+
+    it('should hash a notebook as the server does', () => {
+      expect(hashNotebook(notebook())).to.be('195:c1aa3bb8');
+    });
+
+    it('should ignore the trusted marks of the cells', () => {
+      let value = notebook();
+      value.cells[0].metadata.trusted = false;
+      expect(hashNotebook(value)).to.be('195:c1aa3bb8');
+      value.cells[0].metadata.trusted = true;
+      expect(hashNotebook(value)).to.be('195:c1aa3bb8');
+      expect(value.cells[0].metadata.trusted).to.be(true);
+    });
+
+  });
+
+  describe('createPatch()', () => {
+
+    it('should be empty for equal values', () => {
+      expect(createPatch(notebook(), notebook())).to.eql([]);
+    });
+
+    it('should only touch the changed cells', () => {
+      let source = notebook();
+      let target = notebook();
+      target.cells[0].source = 'c';
+      target.cells[0].metadata.trusted = true;
+      expect(createPatch(source, target)).to.eql([
+        { op: 'add', path: '/cells/0/metadata/trusted', value: true },
+        { op: 'replace', path: '/cells/0/source', value: 'c' }
+      ]);
+    });
+
+    it('should insert and remove cells in the middle', () => {
+      let source = notebook();
+      let target = notebook();
+      let cell = { cell_type: 'raw', metadata: {}, source: 'r' };
+      target.cells.splice(1, 0, cell);
+      expect(createPatch(source, target)).to.eql([
+        { op: 'add', path: '/cells/1', value: cell }
+      ]);
+      expect(createPatch(target, source)).to.eql([
+        { op: 'remove', path: '/cells/1' }
+      ]);
+    });
+
+    it('should escape the keys in the paths', () => {
+      expect(createPatch({ 'a/b~': 1 }, { 'a/b~': 2 })).to.eql([
+        { op: 'replace', path: '/a~1b~0', value: 2 }
+      ]);
+    });
+
+  });
+
+});
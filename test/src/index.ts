@@ -2,6 +2,9 @@
 // Distributed under the terms of the Modified BSD License.
 
 import './dialog/dialog.spec';
+import './docmanager/patch.spec';
 import './renderers/renderers.spec';
 import './rendermime/rendermime.spec';
+import './rendermime/pool.spec';
 import './renderers/latex.spec';
+import './notebook';
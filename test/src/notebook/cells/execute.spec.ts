@@ -0,0 +1,116 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import expect = require('expect.js');
+
+import {
+  IKernel
+} from 'jupyter-js-services';
+
+import {
+  CodeCellModel, executeCell
+} from '../../../../lib/notebook/cells/model';
+
+
+/**
+ * A kernel which answers execute requests when told to.
+ */
+class FakeKernel {
+  /**
+   * The number of execute requests.
+   */
+  requests = 0;
+
+  /**
+   * Whether execute requests fail.
+   */
+  fail = false;
+
+  /**
+   * Send an execute request.
+   */
+  execute(content: any): any {
+    if (this.fail) {
+      throw new Error('The kernel is dead');
+    }
+    this.requests++;
+    this._future = { onIOPub: null, onReply: null };
+    return this._future;
+  }
+
+  /**
+   * Reply to the last execute request.
+   */
+  reply(count: number): void {
+    this._future.onReply({
+      content: { status: 'ok', execution_count: count }
+    });
+  }
+
+  private _future: any = null;
+}
+
+
+/**
+ * Create a code cell model with source.
+ */
+function createCell(source: string): CodeCellModel {
+  let cell = new CodeCellModel();
+  cell.source = source;
+  return cell;
+}
+
+
+describe('notebook/cells/model', () => {
+
+  describe('executeCell()', () => {
+
+    it('should mark the cell as executing until the reply', (done) => {
+      let kernel = new FakeKernel();
+      let cell = createCell('a = 1');
+      let names: string[] = [];
+      cell.stateChanged.connect((sender, args) => { names.push(args.name); });
+      let promise = executeCell(cell, kernel as any as IKernel);
+      expect(cell.executing).to.be(true);
+      expect(cell.executionCount).to.be(null);
+      kernel.reply(3);
+      promise.then(() => {
+        expect(cell.executing).to.be(false);
+        expect(cell.executionCount).to.be(3);
+        expect(names.indexOf('executing')).to.not.be(-1);
+      }).then(done, done);
+    });
+
+    it('should mark the cell as trusted', () => {
+      let kernel = new FakeKernel();
+      let cell = createCell('a = 1');
+      executeCell(cell, kernel as any as IKernel);
+      expect(cell.getMetadata('trusted').getValue()).to.be(true);
+    });
+
+    it('should not execute a cell without code', (done) => {
+      let kernel = new FakeKernel();
+      let cell = createCell('  \n');
+      cell.executionCount = 1;
+      executeCell(cell, kernel as any as IKernel).then(() => {
+        expect(kernel.requests).to.be(0);
+        expect(cell.executing).to.be(false);
+        expect(cell.executionCount).to.be(null);
+      }).then(done, done);
+    });
+
+    it('should reject and clear the executing state if the request fails', (done) => {
+      let kernel = new FakeKernel();
+      kernel.fail = true;
+      let cell = createCell('a = 1');
+      executeCell(cell, kernel as any as IKernel).then(() => {
+        throw new Error('The execution should fail');
+      }, error => {
+        expect(error.message).to.be('The kernel is dead');
+        expect(cell.executing).to.be(false);
+      }).then(done, done);
+    });
+
+  });
+
+});
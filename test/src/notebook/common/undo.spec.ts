@@ -0,0 +1,300 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import expect = require('expect.js');
+
+import {
+  OberservableUndoableList
+} from '../../../../lib/notebook/common/undo';
+
+
+/**
+ * A JSON-able value for the list.
+ */
+class Value {
+  constructor(data: any) {
+    this.data = data;
+  }
+
+  toJSON(): any {
+    return this.data;
+  }
+
+  data: any;
+}
+
+
+/**
+ * Create an undoable list of values.
+ */
+function createList(maxDepth?: number, maxSize?: number): OberservableUndoableList<Value> {
+  return new OberservableUndoableList<Value>(data => new Value(data), {
+    maxDepth, maxSize
+  });
+}
+
+
+/**
+ * Get the data of the values of a list.
+ */
+function data(list: OberservableUndoableList<Value>): any[] {
+  let result: any[] = [];
+  for (let i = 0; i < list.length; i++) {
+    result.push(list.get(i).data);
+  }
+  return result;
+}
+
+
+describe('notebook/common/undo', () => {
+
+  describe('OberservableUndoableList', () => {
+
+    describe('#constructor()', () => {
+
+      it('should create a list with nothing to undo', () => {
+        let list = createList();
+        expect(list.canUndo).to.be(false);
+        expect(list.canRedo).to.be(false);
+        expect(list.undoDepth).to.be(0);
+        expect(list.undoSize).to.be(0);
+      });
+
+    });
+
+    describe('#undo()', () => {
+
+      it('should undo an add', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.undo();
+        expect(data(list)).to.eql([]);
+        expect(list.canUndo).to.be(false);
+        expect(list.canRedo).to.be(true);
+      });
+
+      it('should undo a set', () => {
+        let list = createList();
+        list.add(new Value({ source: 'a' }));
+        list.set(0, new Value({ source: 'b' }));
+        list.undo();
+        expect(data(list)).to.eql([{ source: 'a' }]);
+      });
+
+      it('should undo a remove', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.removeAt(0);
+        list.undo();
+        expect(data(list)).to.eql([1, 2]);
+      });
+
+      it('should undo a move', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.move(0, 1);
+        list.undo();
+        expect(data(list)).to.eql([1, 2]);
+      });
+
+      it('should undo a replace', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.replace(0, 2, [new Value(3)]);
+        list.undo();
+        expect(data(list)).to.eql([1, 2]);
+      });
+
+      it('should restore a copy of the value', () => {
+        let list = createList();
+        let value = new Value({ source: 'a' });
+        list.add(value);
+        list.removeAt(0);
+        list.undo();
+        expect(list.get(0)).to.not.be(value);
+        expect(list.get(0).data).to.eql({ source: 'a' });
+      });
+
+    });
+
+    describe('#redo()', () => {
+
+      it('should redo an undone change', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.set(0, new Value(2));
+        list.undo();
+        list.redo();
+        expect(data(list)).to.eql([2]);
+        expect(list.canRedo).to.be(false);
+      });
+
+      it('should drop the undone changes after a new change', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.undo();
+        list.add(new Value(3));
+        expect(list.canRedo).to.be(false);
+        expect(list.undoDepth).to.be(2);
+        list.undo();
+        expect(data(list)).to.eql([1]);
+      });
+
+    });
+
+    describe('#beginCompoundOperation()', () => {
+
+      it('should make the changes until the end one entry', () => {
+        let list = createList();
+        list.beginCompoundOperation();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.endCompoundOperation();
+        expect(list.undoDepth).to.be(1);
+        list.undo();
+        expect(data(list)).to.eql([]);
+        list.redo();
+        expect(data(list)).to.eql([1, 2]);
+      });
+
+      it('should coalesce the sets of one item', () => {
+        let list = createList();
+        list.add(new Value('a'));
+        list.beginCompoundOperation();
+        list.set(0, new Value('b'));
+        list.set(0, new Value('c'));
+        list.set(0, new Value('d'));
+        list.endCompoundOperation();
+        expect(list.undoDepth).to.be(2);
+        list.undo();
+        expect(data(list)).to.eql(['a']);
+        list.redo();
+        expect(data(list)).to.eql(['d']);
+      });
+
+      it('should drop an item added and removed again', () => {
+        let list = createList();
+        list.beginCompoundOperation();
+        list.add(new Value(1));
+        list.removeAt(0);
+        list.endCompoundOperation();
+        expect(list.undoDepth).to.be(0);
+        expect(list.undoSize).to.be(0);
+      });
+
+      it('should not record the changes if they are not undoable', () => {
+        let list = createList();
+        list.beginCompoundOperation(false);
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.endCompoundOperation();
+        expect(list.canUndo).to.be(false);
+        list.add(new Value(3));
+        list.undo();
+        expect(data(list)).to.eql([1, 2]);
+      });
+
+    });
+
+    describe('#clearUndo()', () => {
+
+      it('should clear the history', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.undo();
+        list.clearUndo();
+        expect(list.canUndo).to.be(false);
+        expect(list.canRedo).to.be(false);
+        expect(list.undoSize).to.be(0);
+      });
+
+    });
+
+    describe('#maxDepth', () => {
+
+      it('should evict the oldest entries', () => {
+        let list = createList(2);
+        list.add(new Value(1));
+        list.add(new Value(2));
+        list.add(new Value(3));
+        expect(list.undoDepth).to.be(2);
+        list.undo();
+        list.undo();
+        expect(list.canUndo).to.be(false);
+        expect(data(list)).to.eql([1]);
+      });
+
+    });
+
+    describe('#maxSize', () => {
+
+      it('should evict the oldest entries over the size', () => {
+        let text = new Array(1001).join('x');
+        let list = createList(void 0, 3000);
+        list.add(new Value(text + 1));
+        list.add(new Value(text + 2));
+        expect(list.undoDepth).to.be(1);
+        expect(list.undoSize).to.be.below(3000);
+      });
+
+      it('should keep the last entry', () => {
+        let list = createList(void 0, 10);
+        list.add(new Value(new Array(1001).join('x')));
+        expect(list.undoDepth).to.be(1);
+        list.undo();
+        expect(data(list)).to.eql([]);
+      });
+
+    });
+
+    describe('#undoSize', () => {
+
+      it('should count a field shared by entries once', () => {
+        let outputs = new Array(10001).join('x');
+        let list = createList();
+        list.add(new Value({ source: 'a', outputs }));
+        let size = list.undoSize;
+        list.set(0, new Value({ source: 'b', outputs }));
+        list.set(0, new Value({ source: 'c', outputs }));
+        expect(list.undoSize).to.be.below(size + 100);
+      });
+
+      it('should release the values of dropped entries', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.undo();
+        list.add(new Value(2));
+        list.undo();
+        list.add(new Value(3));
+        expect(list.undoDepth).to.be(1);
+        list.removeAt(0);
+        list.undo();
+        list.undo();
+        list.add(new Value(4));
+        expect(list.undoDepth).to.be(1);
+        expect(list.undoSize).to.be(2);
+      });
+
+    });
+
+    describe('#dispose()', () => {
+
+      it('should dispose of the history', () => {
+        let list = createList();
+        list.add(new Value(1));
+        list.dispose();
+        expect(list.isDisposed).to.be(true);
+        list.dispose();
+        expect(list.isDisposed).to.be(true);
+      });
+
+    });
+
+  });
+
+});
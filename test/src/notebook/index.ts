@@ -1,6 +1,11 @@
 // Copyright (c) Jupyter Development Team.
 // Distributed under the terms of the Modified BSD License.
 
+import './cells/execute.spec';
+import './common/undo.spec';
+import './output-area/outputs.spec';
+
+// These specs are out of date with the notebook.
 /*
 import './cells/model.spec';
 import './input-area/model.spec';
@@ -9,4 +14,4 @@ import './editor/model.spec';
 import './notebook/model.spec';
 import './notebook/nbformat.spec';
 import './notebook/serialize.spec';
-*/
\ No newline at end of file
+*/
@@ -0,0 +1,205 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import expect = require('expect.js');
+
+import {
+  ObservableOutputs
+} from '../../../../lib/notebook/output-area/model';
+
+import {
+  nbformat
+} from '../../../../lib/notebook/notebook/nbformat';
+
+
+/**
+ * Create a stream output.
+ */
+function stream(text: string, name = 'stdout'): nbformat.IStream {
+  return { output_type: 'stream', name, text } as nbformat.IStream;
+}
+
+/**
+ * The pattern of a capped stream text, with the number of omitted lines.
+ */
+const CAPPED = /^(\d+\n)+\.\.\. (\d+) lines omitted \.\.\.\n(\d+\n)+$/;
+
+/**
+ * Create the lines `0\n` to `<count - 1>\n`.
+ */
+function lines(count: number, start = 0): string {
+  let text = '';
+  for (let i = start; i < start + count; i++) {
+    text += `${i}\n`;
+  }
+  return text;
+}
+
+
+describe('notebook/output-area/model', () => {
+
+  describe('ObservableOutputs', () => {
+
+    describe('#add()', () => {
+
+      it('should join consecutive stream outputs of the same stream', () => {
+        let outputs = new ObservableOutputs();
+        outputs.add(stream('foo\n'));
+        outputs.add(stream('bar\n'));
+        outputs.add(stream('oh no!', 'stderr'));
+        expect(outputs.length).to.be(2);
+        expect((outputs.get(0) as nbformat.IStream).text).to.be('foo\nbar\n');
+      });
+
+      it('should not change the added outputs', () => {
+        let outputs = new ObservableOutputs();
+        let first = stream('foo\n');
+        let second = stream('bar\n');
+        outputs.add(first);
+        outputs.add(second);
+        expect(first.text).to.be('foo\n');
+        expect(second.text).to.be('bar\n');
+      });
+
+      it('should keep the head and tail of a capped stream', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        for (let i = 0; i < 100; i++) {
+          outputs.add(stream(lines(1, i)));
+        }
+        let text = (outputs.get(0) as nbformat.IStream).text;
+        expect(text.indexOf('0\n1\n')).to.be(0);
+        expect(text.slice(-6)).to.be('98\n99\n');
+        expect(text.split('\n').length - 1).to.be.below(42);
+      });
+
+      it('should put a note of the omitted lines in the output', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        outputs.add(stream(lines(100)));
+        let output = outputs.get(0);
+        let match = (output as nbformat.IStream).text.match(CAPPED);
+        expect(match).to.be.ok();
+        expect(Number(match[2])).to.be(outputs.omitted(output).lines);
+      });
+
+      it('should cut the text at the ends of lines', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxChars = 100;
+        for (let i = 0; i < 10; i++) {
+          outputs.add(stream(lines(100, i * 100)));
+        }
+        let text = (outputs.get(0) as nbformat.IStream).text;
+        expect(text).to.match(CAPPED);
+        expect(text.indexOf('0\n1\n')).to.be(0);
+        expect(text.slice(-8)).to.be('998\n999\n');
+      });
+
+      it('should cap the stream outputs of the list together', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        for (let i = 0; i < 10; i++) {
+          outputs.add(stream(lines(10), i % 2 ? 'stderr' : 'stdout'));
+        }
+        expect(outputs.length).to.be(10);
+        let kept = 0;
+        for (let i = 0; i < outputs.length; i++) {
+          let text = (outputs.get(i) as nbformat.IStream).text;
+          kept += (text.match(/^\d+$/mg) || []).length;
+        }
+        expect(kept).to.not.be.above(40);
+      });
+
+    });
+
+    describe('#maxLines', () => {
+
+      it('should apply to the text appended after a change', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        outputs.add(stream(lines(100)));
+        outputs.maxLines = 20;
+        outputs.add(stream(lines(100, 100)));
+        let text = (outputs.get(0) as nbformat.IStream).text;
+        expect(text).to.match(CAPPED);
+        expect(text.slice(-8)).to.be('198\n199\n');
+        expect(outputs.omitted(outputs.get(0)).lines).to.be(
+          200 - (text.split('\n').length - 2));
+      });
+
+    });
+
+    describe('#omitted()', () => {
+
+      it('should be null for an output which is not capped', () => {
+        let outputs = new ObservableOutputs();
+        outputs.add(stream(lines(10)));
+        expect(outputs.omitted(outputs.get(0))).to.be(null);
+      });
+
+      it('should count the text omitted from a capped output', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxChars = 100;
+        outputs.add(stream(lines(100)));
+        let text = (outputs.get(0) as nbformat.IStream).text;
+        let note = text.match(/^\.\.\..*\n/m)[0];
+        let omitted = outputs.omitted(outputs.get(0));
+        expect(omitted.chars).to.be(
+          lines(100).length - (text.length - note.length));
+        expect(omitted.lines).to.be(100 - (text.split('\n').length - 2));
+      });
+
+    });
+
+    describe('#fullText()', () => {
+
+      it('should include the text omitted by the cap', (done) => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        for (let i = 0; i < 100; i++) {
+          outputs.add(stream(lines(1, i)));
+        }
+        let output = outputs.get(0) as nbformat.IStream;
+        outputs.fullText(output).then(text => {
+          expect(text).to.be(lines(100));
+        }).then(done, done);
+      });
+
+      it('should read an earlier capped output', (done) => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        outputs.add(stream(lines(100)));
+        outputs.add(stream('oh no!', 'stderr'));
+        let output = outputs.get(0) as nbformat.IStream;
+        outputs.fullText(output).then(text => {
+          expect(text).to.be(lines(100));
+        }).then(done, done);
+      });
+
+      it('should be the text of an output which is not capped', (done) => {
+        let outputs = new ObservableOutputs();
+        outputs.add(stream('foo\n'));
+        let output = outputs.get(0) as nbformat.IStream;
+        outputs.fullText(output).then(text => {
+          expect(text).to.be('foo\n');
+        }).then(done, done);
+      });
+
+    });
+
+    describe('#clear()', () => {
+
+      it('should drop the omitted text', () => {
+        let outputs = new ObservableOutputs();
+        outputs.maxLines = 40;
+        outputs.add(stream(lines(100)));
+        let output = outputs.get(0);
+        outputs.clear();
+        expect(outputs.omitted(output)).to.be(null);
+      });
+
+    });
+
+  });
+
+});
@@ -0,0 +1,91 @@
+// Copyright (c) Jupyter Development Team.
+// Distributed under the terms of the Modified BSD License.
+
+import expect = require('expect.js');
+
+import {
+  TransformPool
+} from '../../../lib/rendermime';
+
+
+/**
+ * Data long enough to be queued instead of transformed inline.
+ */
+function longData(text: string): string {
+  return text + new Array(20000).join(' ');
+}
+
+
+describe('rendermime/pool', () => {
+
+  describe('TransformPool', () => {
+
+    describe('#run()', () => {
+
+      it('should transform short data right away', (done) => {
+        let pool = new TransformPool({ transforms: { upper: data => data.toUpperCase() } });
+        pool.run('upper', 'a').promise.then(result => {
+          expect(result).to.be('A');
+          pool.dispose();
+        }).then(done, done);
+      });
+
+      it('should run the transforms by priority', (done) => {
+        let order: string[] = [];
+        let pool = new TransformPool({
+          transforms: { name: data => { order.push(data.trim()); return data; } }
+        });
+        let priorities: { [key: string]: number } = { a: 2, b: 0, c: 1 };
+        let promises = ['a', 'b', 'c'].map(name => {
+          return pool.run('name', longData(name), {
+            priority: () => priorities[name]
+          }).promise;
+        });
+        Promise.all(promises).then(() => {
+          expect(order).to.eql(['b', 'c', 'a']);
+          pool.dispose();
+        }).then(done, done);
+      });
+
+      it('should ask for each priority once per frame', (done) => {
+        let calls = 0;
+        let frames: (() => void)[] = [];
+        let w = window as any;
+        let requestAnimationFrame = w.requestAnimationFrame;
+        w.requestAnimationFrame = (callback: () => void) => {
+          return frames.push(callback);
+        };
+        let pool = new TransformPool({ transforms: { name: data => data } });
+        let promises: Promise<string>[] = [];
+        for (let i = 0; i < 10; i++) {
+          promises.push(pool.run('name', longData(String(i)), {
+            priority: () => { calls++; return i; }
+          }).promise);
+        }
+        Promise.all(promises).then(() => {
+          expect(calls).to.be(10);
+          expect(frames.length).to.be(1);
+        }).then(() => {
+          w.requestAnimationFrame = requestAnimationFrame;
+          pool.dispose();
+          done();
+        }, error => {
+          w.requestAnimationFrame = requestAnimationFrame;
+          pool.dispose();
+          done(error);
+        });
+      });
+
+      it('should reject with the error of the transform', (done) => {
+        let pool = new TransformPool({ transforms: {} });
+        pool.run('missing', 'a').promise.catch(error => {
+          expect(error.message).to.contain('missing');
+          pool.dispose();
+        }).then(done, done);
+      });
+
+    });
+
+  });
+
+});